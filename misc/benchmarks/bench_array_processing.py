@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Benchmark of :func:`obspy.signal.array_analysis.array_processing` on a
+synthetic 30 station array using an increasing number of threads.
+
+Usage: python bench_array_processing.py [max_threads]
+
+:copyright:
+    The ObsPy Development Team (devs@obspy.org)
+:license:
+    GNU Lesser General Public License, Version 3
+    (http://www.gnu.org/copyleft/lesser.html)
+"""
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+from future.builtins import *  # NOQA
+
+import multiprocessing
+import sys
+import time
+
+import numpy as np
+
+from obspy import Stream, Trace, UTCDateTime
+from obspy.core.util import AttribDict
+from obspy.signal.array_analysis import array_processing
+
+
+def synthetic_array(nstat=30, df=100.0, length=60.0, slowness=0.3, baz=45.0):
+    """
+    Plane wave crossing a random array of ``nstat`` stations.
+    """
+    rng = np.random.RandomState(42)
+    geometry = rng.uniform(-5.0, 5.0, size=(nstat, 2))
+    npts = int(length * df)
+    wave = rng.randn(npts + 2000)
+    baz = np.radians(baz)
+    shifts = df * slowness * (np.cos(baz) * geometry[:, 1] +
+                              np.sin(baz) * geometry[:, 0])
+    shifts = np.round(shifts).astype(np.int64) + 1000
+    st = Stream()
+    for i in range(nstat):
+        tr = Trace(wave[shifts[i]:shifts[i] + npts] +
+                   0.1 * rng.randn(npts))
+        tr.stats.sampling_rate = df
+        tr.stats.station = "S%02d" % i
+        tr.stats.coordinates = AttribDict(
+            {'x': geometry[i, 0], 'y': geometry[i, 1], 'elevation': 0.0})
+        st.append(tr)
+    return st
+
+
+def main(max_threads):
+    st = synthetic_array()
+    stime = UTCDateTime(0) + 1
+    etime = st[0].stats.endtime - 1
+    args = (st, 2.0, 0.1, -1.0, 1.0, -1.0, 1.0, 0.05, -1e99, -1e99, 1.0,
+            8.0, stime, etime)
+    for method, name in ((0, "beamforming"), (1, "capon")):
+        reference = None
+        for threads in sorted(set([1, 2, 4, max_threads])):
+            if threads > max_threads:
+                continue
+            t = time.time()
+            out = array_processing(*args, prewhiten=0, coordsys='xy',
+                                   method=method, threads=threads)
+            t = time.time() - t
+            if reference is None:
+                reference = t
+                np.testing.assert_equal(len(out) > 0, True)
+            print("%-12s threads=%2d windows=%4d  %7.2f s  speedup %.2f" % (
+                name, threads, len(out), t, reference / t))
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        max_threads = int(sys.argv[1])
+    else:
+        max_threads = multiprocessing.cpu_count()
+    main(max_threads)
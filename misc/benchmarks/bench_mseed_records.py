@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Benchmark of decoding SeedLink packets one by one with
+:meth:`obspy.clients.seedlink.slpacket.SLPacket.get_trace` against decoding
+the whole buffer with :func:`obspy.io.mseed.util.unpack_records`.
+
+Usage: python bench_mseed_records.py [records]
+
+:copyright:
+    The ObsPy Development Team (devs@obspy.org)
+:license:
+    GNU Lesser General Public License, Version 3
+    (http://www.gnu.org/copyleft/lesser.html)
+"""
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+from future.builtins import *  # NOQA
+
+import io
+import sys
+import time
+
+import numpy as np
+
+from obspy import Trace, UTCDateTime
+from obspy.clients.seedlink.slpacket import SLPacket
+from obspy.io.mseed.util import unpack_records
+
+
+def synthetic_records(nrecords):
+    """
+    Buffer of about ``nrecords`` 512 byte Steim2 records of random walk
+    data.
+    """
+    rng = np.random.RandomState(42)
+    # steim2 compresses the small differences to roughly 400 samples per
+    # record
+    npts = nrecords * 400
+    tr = Trace(np.cumsum(rng.randint(-50, 50, npts)).astype(np.int32))
+    tr.stats.network = "XX"
+    tr.stats.station = "TEST"
+    tr.stats.channel = "HHZ"
+    tr.stats.sampling_rate = 100.0
+    tr.stats.starttime = UTCDateTime(2015, 1, 1)
+    buf = io.BytesIO()
+    tr.write(buf, format="MSEED", reclen=512, encoding="STEIM2")
+    return buf.getvalue()
+
+
+def main(nrecords):
+    data = synthetic_records(nrecords)
+    nrecords = len(data) // 512
+    packets = b"".join(b"SL%06X" % i + data[i * 512:(i + 1) * 512]
+                       for i in range(nrecords))
+
+    t = time.time()
+    npts = 0
+    for i in range(nrecords):
+        tr = SLPacket(packets, i * 520).get_trace()
+        npts += tr.stats.npts
+    t_loop = time.time() - t
+
+    t = time.time()
+    headers, samples = unpack_records(data, reclen=512)
+    t_batch = time.time() - t
+
+    assert len(headers) == nrecords and len(samples) == npts
+    print("%d records, %d samples" % (nrecords, npts))
+    print("SLPacket.get_trace(): %8.3f s  %10.0f records/s" % (
+        t_loop, nrecords / t_loop))
+    print("unpack_records():     %8.3f s  %10.0f records/s  speedup %.1f" % (
+        t_batch, nrecords / t_batch, t_loop / t_batch))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
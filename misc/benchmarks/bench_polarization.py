@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Benchmark of the vectorized Flinn polarization analysis of
+:func:`obspy.signal.polarization.polarization_analysis` against calling
+:func:`obspy.signal.polarization.flinn` window by window.
+
+Usage: python bench_polarization.py [hours]
+
+:copyright:
+    The ObsPy Development Team (devs@obspy.org)
+:license:
+    GNU Lesser General Public License, Version 3
+    (http://www.gnu.org/copyleft/lesser.html)
+"""
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+from future.builtins import *  # NOQA
+
+import sys
+import time
+
+import numpy as np
+
+from obspy import Stream, Trace, UTCDateTime
+from obspy.signal.invsim import cosine_taper
+from obspy.signal.polarization import flinn, polarization_analysis
+
+
+def synthetic_stream(hours, df=20.0):
+    """
+    Three component noise with a linearly polarized component.
+    """
+    rng = np.random.RandomState(42)
+    npts = int(hours * 3600 * df)
+    signal = rng.randn(npts)
+    st = Stream()
+    for channel, amp in (("HHZ", 1.0), ("HHN", 0.5), ("HHE", -0.3)):
+        tr = Trace(amp * signal + 0.2 * rng.randn(npts))
+        tr.stats.sampling_rate = df
+        tr.stats.channel = channel
+        tr.stats.starttime = UTCDateTime(2015, 1, 1)
+        st.append(tr)
+    return st
+
+
+def main(hours):
+    st = synthetic_stream(hours)
+    stime = st[0].stats.starttime
+    etime = st[0].stats.endtime
+    win_len, win_frac = 10.0, 0.1
+    fs = st[0].stats.sampling_rate
+
+    t = time.time()
+    out = polarization_analysis(st, win_len, win_frac, 1.0, 5.0, stime,
+                                etime, method="flinn")
+    t_batch = time.time() - t
+    nwin = len(out["timestamp"])
+
+    # window by window, like polarization_analysis did before
+    nsamp = int(win_len * fs)
+    nstep = int(nsamp * win_frac)
+    tap = cosine_taper(nsamp, p=0.22)
+    t = time.time()
+    azimuth = np.empty(nwin)
+    for k in range(nwin):
+        data = []
+        for tr in st:
+            # polarization_analysis starts one sample after stime
+            dat = tr.data[1 + k * nstep:1 + k * nstep + nsamp]
+            data.append((dat - dat.mean()) * tap)
+        azimuth[k] = flinn(data)[0]
+    t_loop = time.time() - t
+
+    print("%d windows" % nwin)
+    print("window by window: %7.3f s" % t_loop)
+    print("vectorized:       %7.3f s  speedup %.1f" % (
+        t_batch, t_loop / t_batch))
+    print("max. azimuth difference: %g" % np.abs(
+        azimuth - out["azimuth"]).max())
+
+
+if __name__ == '__main__':
+    main(float(sys.argv[1]) if len(sys.argv) > 1 else 1.0)
@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Benchmark of constructing, writing and reading a QuakeML catalog with a large
+number of picks and arrivals.
+
+Usage: python bench_quakeml_picks.py [picks]
+
+:copyright:
+    The ObsPy Development Team (devs@obspy.org)
+:license:
+    GNU Lesser General Public License, Version 3
+    (http://www.gnu.org/copyleft/lesser.html)
+"""
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+from future.builtins import *  # NOQA
+
+import io
+import sys
+import time
+
+from obspy import UTCDateTime
+from obspy.core.event import (Arrival, Catalog, Event, Origin, Pick,
+                              WaveformStreamID, bulk_construction,
+                              read_events)
+
+
+def make_catalog(npicks, picks_per_event=100):
+    """
+    Catalog with ``npicks`` picks, each associated to an origin by an
+    arrival.
+    """
+    t0 = UTCDateTime(2015, 1, 1)
+    events = []
+    for i in range(npicks // picks_per_event):
+        origin = Origin(time=t0 + i * 600, latitude=10.0, longitude=20.0,
+                        depth=1e4)
+        event = Event(origins=[origin])
+        for j in range(picks_per_event):
+            pick = Pick(time=origin.time + j, phase_hint="P",
+                        waveform_id=WaveformStreamID(
+                            "XX", "S%03d" % j, "", "HHZ"))
+            event.picks.append(pick)
+            origin.arrivals.append(Arrival(
+                pick_id=pick.resource_id, phase="P", time_residual=0.1,
+                distance=j * 0.1))
+        events.append(event)
+    return Catalog(events)
+
+
+def main(npicks):
+    t = time.time()
+    cat = make_catalog(npicks)
+    t_construct = time.time() - t
+
+    t = time.time()
+    with bulk_construction():
+        make_catalog(npicks)
+    t_bulk = time.time() - t
+
+    buf = io.BytesIO()
+    t = time.time()
+    cat.write(buf, format="QUAKEML")
+    t_write = time.time() - t
+    size = buf.tell()
+    del cat
+
+    buf.seek(0)
+    t = time.time()
+    cat = read_events(buf, format="QUAKEML")
+    t_read = time.time() - t
+
+    assert sum(len(event.picks) for event in cat) == npicks
+    print("%d events, %d picks, %.1f MB QuakeML" % (
+        len(cat), npicks, size / 1024.0 ** 2))
+    for label, seconds in (("construct", t_construct),
+                           ("construct (bulk)", t_bulk),
+                           ("write", t_write),
+                           ("read", t_read)):
+        print("%-17s %8.3f s  %10.0f picks/s" % (
+            label + ":", seconds, npicks / seconds))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
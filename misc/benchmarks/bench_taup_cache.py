@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Benchmark of P and S travel times for many event-station pairs at a few
+catalog depths with and without the depth and phase caches of
+:class:`obspy.taup.tau.TauPyModel`.
+
+Usage: python bench_taup_cache.py [pairs]
+
+:copyright:
+    The ObsPy Development Team (devs@obspy.org)
+:license:
+    GNU Lesser General Public License, Version 3
+    (http://www.gnu.org/copyleft/lesser.html)
+"""
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+from future.builtins import *  # NOQA
+
+import sys
+import time
+
+import numpy as np
+
+from obspy.taup import TauPyModel
+
+
+def run(model, depths, distances):
+    t = time.time()
+    for depth, distance in zip(depths, distances):
+        model.get_travel_times(depth, distance, ["P", "S"])
+    return time.time() - t
+
+
+def main(npairs):
+    rng = np.random.RandomState(42)
+    # typical catalog depths
+    depths = rng.choice([0.0, 10.0, 33.0, 35.0, 100.0], npairs)
+    distances = rng.uniform(1.0, 100.0, npairs)
+
+    t_uncached = run(TauPyModel("iasp91", cache_size=0, phase_cache_size=0),
+                     depths, distances)
+    model = TauPyModel("iasp91")
+    t_cached = run(model, depths, distances)
+
+    print("%d event-station pairs" % npairs)
+    print("uncached: %8.3f s  %8.0f pairs/s" % (
+        t_uncached, npairs / t_uncached))
+    print("cached:   %8.3f s  %8.0f pairs/s  speedup %.1f" % (
+        t_cached, npairs / t_cached, t_uncached / t_cached))
+    for name, info in sorted(model.cache_info().items()):
+        print("%s cache: %s" % (name, info))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
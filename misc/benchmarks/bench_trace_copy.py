@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Benchmark of time and peak memory of copying a large stream with a deepcopy
+against a copy on write, both followed by filtering a single trace of the
+copy.
+
+Every case runs in its own process so that the peak resident memory of the
+processes can be compared. Linux only.
+
+Usage: python bench_trace_copy.py [channels] [samples]
+
+:copyright:
+    The ObsPy Development Team (devs@obspy.org)
+:license:
+    GNU Lesser General Public License, Version 3
+    (http://www.gnu.org/copyleft/lesser.html)
+"""
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+from future.builtins import *  # NOQA
+
+import multiprocessing
+import resource
+import sys
+import time
+
+import numpy as np
+
+from obspy import Stream, Trace
+
+
+def make_stream(nchannels, npts):
+    """
+    Stream of ``nchannels`` traces with ``npts`` random samples each.
+    """
+    rng = np.random.RandomState(42)
+    traces = []
+    for i in range(nchannels):
+        header = {"network": "XX", "station": "S%03d" % i, "channel": "HHZ",
+                  "sampling_rate": 100.0}
+        traces.append(Trace(rng.randn(npts), header=header))
+    return Stream(traces)
+
+
+def _run(queue, nchannels, npts, copy_on_write):
+    st = make_stream(nchannels, npts)
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    t = time.time()
+    st2 = st.copy(copy_on_write=copy_on_write)
+    t_copy = time.time() - t
+    t = time.time()
+    st2[0].filter("lowpass", freq=1.0)
+    t_filter = time.time() - t
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss
+    queue.put((t_copy, t_filter, peak / 1024.0))
+
+
+def run(nchannels, npts, copy_on_write):
+    """
+    Time of the copy, time of filtering one trace and increase of peak
+    memory in MB.
+    """
+    queue = multiprocessing.Queue()
+    process = multiprocessing.Process(
+        target=_run, args=(queue, nchannels, npts, copy_on_write))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def main(nchannels, npts):
+    print("%d channels with %d samples, %.1f MB of data" % (
+        nchannels, npts, nchannels * npts * 8 / 1024.0 ** 2))
+    for label, copy_on_write in (("deepcopy", False),
+                                 ("copy on write", True)):
+        t_copy, t_filter, peak = run(nchannels, npts, copy_on_write)
+        print("%-14s copy %8.3f s  filter %8.3f s  peak memory +%7.1f MB" % (
+            label + ":", t_copy, t_filter, peak))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500,
+         int(sys.argv[2]) if len(sys.argv) > 2 else 360000)
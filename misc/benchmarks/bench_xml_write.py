@@ -0,0 +1,139 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Benchmark of time and peak memory of writing large QuakeML and StationXML
+documents by serializing the whole XML tree at once against writing them
+event by event and network by network.
+
+Every writer runs in its own process so that the peak resident memory of
+the processes can be compared. Linux only.
+
+Usage: python bench_xml_write.py [events] [networks]
+
+:copyright:
+    The ObsPy Development Team (devs@obspy.org)
+:license:
+    GNU Lesser General Public License, Version 3
+    (http://www.gnu.org/copyleft/lesser.html)
+"""
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+from future.builtins import *  # NOQA
+
+import copy
+import multiprocessing
+import os
+import resource
+import sys
+import time
+
+from lxml import etree
+
+from obspy import UTCDateTime, read_inventory
+from obspy.core.event import (Arrival, Catalog, Event, Magnitude, Origin,
+                              Pick, WaveformStreamID)
+from obspy.core.util import NamedTemporaryFile
+from obspy.io.quakeml.core import Pickler, _write_quakeml
+from obspy.io.stationxml.core import _write_network, _write_stationxml
+
+
+def make_catalog(nevents, picks_per_event=10):
+    """
+    Catalog of ``nevents`` events, each with an origin, a magnitude and a
+    few picks and arrivals.
+    """
+    t0 = UTCDateTime(2015, 1, 1)
+    events = []
+    for i in range(nevents):
+        origin = Origin(time=t0 + i * 60, latitude=10.0, longitude=20.0,
+                        depth=1e4)
+        event = Event(origins=[origin], magnitudes=[Magnitude(mag=3.0)])
+        for j in range(picks_per_event):
+            pick = Pick(time=origin.time + j, phase_hint="P",
+                        waveform_id=WaveformStreamID(
+                            "XX", "S%03d" % j, "", "HHZ"))
+            event.picks.append(pick)
+            origin.arrivals.append(Arrival(pick_id=pick.resource_id,
+                                           phase="P", distance=j * 0.1))
+        events.append(event)
+    return Catalog(events)
+
+
+def make_inventory(nnetworks, stations_per_network=20):
+    """
+    Inventory of ``nnetworks`` networks, each with copies of a station with
+    a full response.
+    """
+    path = os.path.join(os.path.dirname(__file__), os.pardir, os.pardir,
+                        "obspy", "io", "stationxml", "tests", "data",
+                        "IRIS_single_channel_with_response.xml")
+    inv = read_inventory(path, format="STATIONXML")
+    network = inv.networks[0]
+    station = network.stations[0]
+    network.stations = [copy.deepcopy(station)
+                        for _i in range(stations_per_network)]
+    for i, sta in enumerate(network.stations):
+        sta.code = "S%03d" % i
+    inv.networks = [copy.deepcopy(network) for _i in range(nnetworks)]
+    for i, net in enumerate(inv.networks):
+        net.code = "N%d" % i
+    return inv
+
+
+def write_quakeml_tree(catalog, filename):
+    with open(filename, "wb") as fh:
+        fh.write(Pickler().dumps(catalog))
+
+
+def write_stationxml_tree(inventory, filename):
+    root = etree.Element("FDSNStationXML")
+    for network in inventory.networks:
+        _write_network(root, network)
+    with open(filename, "wb") as fh:
+        fh.write(etree.tostring(root, pretty_print=True,
+                                xml_declaration=True, encoding="UTF-8"))
+
+
+def _run(queue, make, size, writer):
+    obj = make(size)
+    with NamedTemporaryFile() as tf:
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        t = time.time()
+        writer(obj, tf.name)
+        seconds = time.time() - t
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss
+        filesize = os.path.getsize(tf.name)
+    queue.put((seconds, peak / 1024.0, filesize / 1024.0 ** 2))
+
+
+def run(make, size, writer):
+    """
+    Time, increase of peak memory in MB and file size in MB of the writer.
+    """
+    queue = multiprocessing.Queue()
+    process = multiprocessing.Process(target=_run,
+                                      args=(queue, make, size, writer))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def main(nevents, nnetworks):
+    cases = (
+        ("QuakeML tree", make_catalog, nevents, write_quakeml_tree),
+        ("QuakeML incremental", make_catalog, nevents, _write_quakeml),
+        ("StationXML tree", make_inventory, nnetworks,
+         write_stationxml_tree),
+        ("StationXML incremental", make_inventory, nnetworks,
+         _write_stationxml))
+    print("%d events, %d networks with 20 stations" % (nevents, nnetworks))
+    for label, make, size, writer in cases:
+        seconds, peak, filesize = run(make, size, writer)
+        print("%-23s %8.3f s  peak memory +%7.1f MB  file %7.1f MB" % (
+            label + ":", seconds, peak, filesize))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000,
+         int(sys.argv[2]) if len(sys.argv) > 2 else 50)
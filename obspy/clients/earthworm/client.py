@@ -13,12 +13,17 @@ Earthworm Wave Server client for ObsPy.
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 from future.builtins import *  # NOQA @UnusedWildImport
+from future import standard_library
 
+import threading
 from fnmatch import fnmatch
 
+with standard_library.hooks():
+    import queue
+
 from obspy import Stream, UTCDateTime
 from obspy.core.util.decorator import deprecated
-from .waveserver import get_menu, read_wave_server_v
+from .waveserver import get_menu, get_scnl_raw, get_sock, read_tb2_stream
 
 
 class Client(object):
@@ -101,28 +106,109 @@ class Client(object):
             st = client.get_waveforms('AV', 'ACH', '', 'EH*', dt, dt + 10)
             st.plot()
         """
+        return self.get_waveforms_bulk(
+            [(network, station, location, channel, starttime, endtime)],
+            cleanup=cleanup, connections=1)
+
+    def get_waveforms_bulk(self, bulk, cleanup=True, connections=4):
+        """
+        Retrieves waveform data of multiple channels from Earthworm Wave
+        Server and returns an ObsPy Stream object.
+
+        The requests are distributed over a small number of connections that
+        are kept open and reused for all requests, so no new connection has
+        to be set up per channel.
+
+        :type bulk: list of tuples
+        :param bulk: List of requests, one tuple per request, each containing
+            network, station, location, channel, starttime and endtime as
+            in :meth:`get_waveforms`. Last character of channel can be a
+            wildcard ('?' or '*') to fetch `Z`, `N` and `E` component.
+        :type cleanup: bool
+        :param cleanup: Specifies whether perfectly aligned traces should be
+            merged or not. See :meth:`obspy.core.stream.Stream.merge` for
+            ``method=-1``.
+        :type connections: int
+        :param connections: Maximum number of simultaneous connections to the
+            server. Defaults to ``4``.
+        :return: ObsPy :class:`~obspy.core.stream.Stream` object with the
+            traces in order of the requests.
+
+        .. rubric:: Example
+
+        >>> from obspy.clients.earthworm import Client
+        >>> client = Client("pubavo1.wr.usgs.gov", 16022)
+        >>> dt = UTCDateTime() - 2000  # now - 2000 seconds
+        >>> bulk = [('AV', 'ACH', '', 'EH*', dt, dt + 10),
+        ...         ('AV', 'AKV', '', 'BHZ', dt, dt + 10)]
+        >>> st = client.get_waveforms_bulk(bulk)  # doctest: +SKIP
+        """
         # replace wildcards in last char of channel and fetch all 3 components
-        if channel[-1] in "?*":
-            st = Stream()
-            for comp in ("Z", "N", "E"):
-                channel_new = channel[:-1] + comp
-                st += self.get_waveforms(network, station, location,
-                                         channel_new, starttime, endtime,
-                                         cleanup=cleanup)
-            return st
-        if location == '':
-            location = '--'
-        scnl = (station, channel, network, location)
-        # fetch waveform
-        tbl = read_wave_server_v(self.host, self.port, scnl, starttime,
-                                 endtime, timeout=self.timeout)
-        # create new stream
+        requests = []
+        for network, station, location, channel, starttime, endtime in bulk:
+            if location == '':
+                location = '--'
+            if channel[-1] in "?*":
+                channels = [channel[:-1] + comp for comp in ("Z", "N", "E")]
+            else:
+                channels = [channel]
+            for channel in channels:
+                requests.append(((station, channel, network, location),
+                                 starttime, endtime))
+        results = [None] * len(requests)
+        errors = []
+        todo = queue.Queue()
+        for i in range(len(requests)):
+            todo.put(i)
+
+        def worker():
+            sock = None
+            try:
+                while True:
+                    try:
+                        i = todo.get_nowait()
+                    except queue.Empty:
+                        break
+                    scnl, starttime, endtime = requests[i]
+                    dat = None
+                    if sock is not None:
+                        dat = get_scnl_raw(sock, scnl, starttime, endtime,
+                                           timeout=self.timeout)
+                        if dat is None:
+                            # server closed the connection, reconnect
+                            sock.close()
+                            sock = None
+                    if sock is None:
+                        sock = get_sock(self.host, self.port,
+                                        timeout=self.timeout)
+                        dat = get_scnl_raw(sock, scnl, starttime, endtime,
+                                           timeout=self.timeout)
+                    st = read_tb2_stream(dat or b'', merge=cleanup)
+                    if cleanup:
+                        st._cleanup()
+                    st.trim(starttime, endtime)
+                    results[i] = st
+            except Exception as e:
+                errors.append(e)
+            finally:
+                if sock is not None:
+                    sock.close()
+
+        connections = max(1, min(connections, len(requests)))
+        if connections == 1:
+            worker()
+        else:
+            threads = [threading.Thread(target=worker)
+                       for _i in range(connections)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        if errors:
+            raise errors[0]
         st = Stream()
-        for tb in tbl:
-            st.append(tb.get_obspy_trace())
-        if cleanup:
-            st._cleanup()
-        st.trim(starttime, endtime)
+        for result in results:
+            st += result
         return st
 
     @deprecated("'saveWaveform' has been renamed to 'save_waveforms'. Use "
@@ -5,14 +5,24 @@ The obspy.clients.earthworm.client test suite.
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 from future.builtins import *  # NOQA @UnusedWildImport
+from future import standard_library
 
+import struct
+import threading
 import unittest
 
+import numpy as np
+
+with standard_library.hooks():
+    import socketserver
+
 from obspy import read
 from obspy.core.utcdatetime import UTCDateTime
 from obspy.core.util import NamedTemporaryFile
 from obspy.core.util.decorator import skip_on_network_error
 from obspy.clients.earthworm import Client
+from obspy.clients.earthworm.waveserver import (read_tb2_stream,
+                                                read_wave_server_v)
 
 
 class ClientTestCase(unittest.TestCase):
@@ -116,9 +126,155 @@ class ClientTestCase(unittest.TestCase):
         self.assertIn('AV.ACH.--.EHZ', seeds)
 
 
+def tracebuf2(station, channel, network, location, starttime, data,
+              sampling_rate=100.0, datatype=b'i4'):
+    """
+    Returns a TraceBuf2 packet.
+    """
+    endian = '>' if datatype[:1] in b'ts' else '<'
+    data = np.require(data, np.dtype(endian + datatype[:1].decode().replace(
+        't', 'f').replace('s', 'i') + datatype[1:].decode()))
+    endtime = starttime + (len(data) - 1) / sampling_rate
+    header = struct.pack(
+        str(endian + '2i3d7s9s4s3s2s3s2s2s'), 1, len(data), starttime,
+        endtime, sampling_rate, station.encode(), network.encode(),
+        channel.encode(), location.encode(), b'20', datatype, b'\x00\x00',
+        b'\x00\x00')
+    return header + data.tostring()
+
+
+class FakeWaveServerV(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    """
+    Minimal local waveserverV answering GETSCNLRAW requests from a dict of
+    TraceBuf2 packets per scnl. Connections stay open for further requests.
+    """
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, packets):
+        self.packets = packets
+        self.connections = 0
+        self.requests = 0
+        socketserver.TCPServer.__init__(self, ('127.0.0.1', 0),
+                                        FakeWaveServerVHandler)
+
+
+class FakeWaveServerVHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        self.server.connections += 1
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                break
+            self.server.requests += 1
+            tokens = line.decode().split()
+            rid, scnl = tokens[1], tuple(tokens[2:6])
+            dat = self.server.packets.get(scnl)
+            if dat is None:
+                response = '%s 0 %s FN\n' % (rid, ' '.join(scnl))
+                self.wfile.write(response.encode())
+                continue
+            response = '%s 0 %s F i4 %s %s %d\n' % (
+                rid, ' '.join(scnl), tokens[6], tokens[7], len(dat))
+            self.wfile.write(response.encode() + dat)
+            self.wfile.flush()
+
+
+class FakeServerTestCase(unittest.TestCase):
+    """
+    Test cases for obspy.clients.earthworm against a local fake waveserverV.
+    """
+    def setUp(self):
+        self.t = UTCDateTime(2015, 1, 1)
+        t = self.t.timestamp
+        self.packets = {}
+        for i, sta in enumerate(('AAA', 'BBB', 'CCC')):
+            for cha in ('EHZ', 'EHN', 'EHE'):
+                # four contiguous packets, one gap and big endian samples
+                dat = [tracebuf2(sta, cha, 'XX', '--', t + 0.5 * k,
+                                 np.arange(50) + 50 * k + 1000 * i)
+                       for k in range(4)]
+                dat.append(tracebuf2(sta, cha, 'XX', '--', t + 3.0,
+                                     np.arange(50), datatype=b's4'))
+                self.packets[(sta, cha, 'XX', '--')] = b''.join(dat)
+        self.server = FakeWaveServerV(self.packets)
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+        self.client = Client(*self.server.server_address, timeout=10)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_readTraceBuf2Stream(self):
+        """
+        Tests decoding of TraceBuf2 packets into merged traces.
+        """
+        dat = bytearray(self.packets[('BBB', 'EHZ', 'XX', '--')])
+        st = read_tb2_stream(dat)
+        self.assertEqual(len(st), 2)
+        self.assertEqual(st[0].id, 'XX.BBB..EHZ')
+        self.assertEqual(st[0].stats.starttime, self.t)
+        self.assertEqual(st[0].stats.sampling_rate, 100.0)
+        np.testing.assert_array_equal(st[0].data, np.arange(200) + 1000)
+        self.assertTrue(st[0].data.dtype.isnative)
+        self.assertEqual(st[1].stats.starttime, self.t + 3.0)
+        np.testing.assert_array_equal(st[1].data, np.arange(50))
+        self.assertEqual(st[1].data.dtype, np.int32)
+        self.assertTrue(st[1].data.dtype.isnative)
+        # one trace per packet without merging
+        st = read_tb2_stream(dat, merge=False)
+        self.assertEqual([tr.stats.npts for tr in st], [50] * 5)
+        # truncated packets are ignored
+        self.assertEqual(len(read_tb2_stream(dat[:-10])), 1)
+
+    def test_readWaveServerV(self):
+        """
+        Tests read_wave_server_v against the fake server.
+        """
+        host, port = self.server.server_address
+        tbl = read_wave_server_v(host, port, ('AAA', 'EHN', 'XX', '--'),
+                                 self.t, self.t + 10)
+        self.assertEqual(len(tbl), 5)
+        np.testing.assert_array_equal(tbl[1].data, np.arange(50, 100))
+        self.assertEqual(tbl[4].start, self.t + 3.0)
+        self.assertEqual(read_wave_server_v(
+            host, port, ('ZZZ', 'EHN', 'XX', '--'), self.t, self.t + 10), [])
+
+    def test_getWaveformsBulk(self):
+        """
+        Tests get_waveforms_bulk against the fake server.
+        """
+        bulk = [('XX', sta, '', 'EH?', self.t, self.t + 10)
+                for sta in ('AAA', 'BBB', 'CCC')]
+        bulk.append(('XX', 'ZZZ', '', 'EHZ', self.t, self.t + 10))
+        st = self.client.get_waveforms_bulk(bulk, connections=2)
+        self.assertEqual(len(st), 18)
+        self.assertLessEqual(self.server.connections, 2)
+        self.assertEqual(self.server.requests, 10)
+        ids = [tr.id for tr in st[::2]]
+        self.assertEqual(ids, ['XX.%s..EH%s' % (sta, cha)
+                               for sta in ('AAA', 'BBB', 'CCC')
+                               for cha in 'ZNE'])
+        for i, tr in enumerate(st[::2]):
+            np.testing.assert_array_equal(tr.data,
+                                          np.arange(200) + 1000 * (i // 3))
+        # same result as fetching one by one
+        for sta in ('AAA', 'BBB', 'CCC'):
+            st2 = self.client.get_waveforms('XX', sta, '', 'EHZ', self.t,
+                                            self.t + 1.0, cleanup=False)
+            self.assertEqual(len(st2), 3)
+            self.assertEqual(st2[-1].stats.endtime, self.t + 1.0)
+        st2 = self.client.get_waveforms('XX', 'BBB', '', 'EHE', self.t,
+                                        self.t + 10)
+        self.assertEqual(st2, st.select(station='BBB', channel='EHE'))
+
+
 def suite():
     suite = unittest.TestSuite()
     suite.addTest(unittest.makeSuite(ClientTestCase, 'test'))
+    suite.addTest(unittest.makeSuite(FakeServerTestCase, 'test'))
     return suite
 
 
@@ -58,20 +58,30 @@ class TraceBuf2(object):
     ndata = 0           # number of samples in instance
     inputType = None    # NumPy data type
 
-    def read_tb2(self, tb2):
+    def read_tb2(self, tb2, offset=0):
         """
-        Reads single TraceBuf2 packet from beginning of input byte array tb.
+        Reads single TraceBuf2 packet starting at offset of input byte array
+        tb.
         returns number of bytes read or 0 on read fail.
         """
-        if len(tb2) < 64:
+        nbytes = self.read_tb2_header(tb2, offset)
+        if not nbytes:
+            return 0
+        self.parse_data(tb2[offset + 64:offset + nbytes])
+        return nbytes
+
+    def read_tb2_header(self, tb2, offset=0):
+        """
+        Reads header of single TraceBuf2 packet starting at offset of input
+        byte array tb without touching the data.
+        returns number of bytes of the whole packet or 0 on read fail.
+        """
+        if len(tb2) - offset < 64:
             return 0   # not enough array to hold header
-        head = tb2[:64]
-        self.parse_header(head)
+        self.parse_header(bytes(tb2[offset:offset + 64]))
         nbytes = 64 + self.ndata * self.inputType.itemsize
-        if len(tb2) < nbytes:
+        if len(tb2) - offset < nbytes:
             return 0   # not enough array to hold data specified in header
-        dat = tb2[64:nbytes]
-        self.parse_data(dat)
         return nbytes
 
     def parse_header(self, head):
@@ -100,7 +110,7 @@ class TraceBuf2(object):
         """
         Parse tracebuf char array data into self.data
         """
-        self.data = np.fromstring(dat, self.inputType)
+        self.data = np.frombuffer(dat, self.inputType).copy()
         ndat = len(self.data)
         if self.ndata != ndat:
             print('data count in header (%d) != data count (%d)' % (self.nsamp,
@@ -112,6 +122,12 @@ class TraceBuf2(object):
         """
         Return class contents as obspy.Trace object
         """
+        return Trace(data=self.data, header=self.get_obspy_stats())
+
+    def get_obspy_stats(self):
+        """
+        Return class header as obspy.Stats object
+        """
         stat = Stats()
         stat.network = self.net.split(b'\x00')[0].decode()
         stat.station = self.sta.split(b'\x00')[0].decode()
@@ -123,22 +139,30 @@ class TraceBuf2(object):
         stat.channel = self.chan.split(b'\x00')[0].decode()
         stat.starttime = UTCDateTime(self.start)
         stat.sampling_rate = self.rate
-        stat.npts = len(self.data)
-        return Trace(data=self.data, header=stat)
+        stat.npts = self.ndata
+        return stat
 
 
-def send_sock_req(server, port, reqStr, timeout=None):
+def get_sock(server, port, timeout=None):
     """
-    Sets up socket to server and port, sends reqStr
-    to socket and returns open socket
+    Sets up socket to server and port and returns open socket
     """
     s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
     s.settimeout(timeout)
     s.connect((server, port))
+    return s
+
+
+def send_sock_req(server, port, reqStr, timeout=None):
+    """
+    Sets up socket to server and port, sends reqStr
+    to socket and returns open socket
+    """
+    s = get_sock(server, port, timeout=timeout)
     if reqStr[-1:] == b'\n':
-        s.send(reqStr)
+        s.sendall(reqStr)
     else:
-        s.send(reqStr + b'\n')
+        s.sendall(reqStr + b'\n')
     return s
 
 
@@ -151,9 +175,13 @@ def get_sock_char_line(sock, timeout=10.):
     indat = b'^'
     try:
         while indat[-1:] != b'\n':
-            # see http://obspy.org/ticket/383
-            # indat = sock.recv(8192)
-            indat = sock.recv(1)
+            # only consume the pending data up to the newline, binary data
+            # following the line has to stay in the socket
+            # (see http://obspy.org/ticket/383)
+            indat = sock.recv(8192, socket.MSG_PEEK)
+            if not indat:
+                break  # connection closed by server
+            indat = sock.recv(indat.find(b'\n') + 1 or len(indat))
             chunks.append(indat)
     except socket.timeout:
         print('socket timeout in get_sock_char_line()')
@@ -168,21 +196,24 @@ def get_sock_char_line(sock, timeout=10.):
 def get_sock_bytes(sock, nbytes, timeout=None):
     """
     Listens for nbytes from open socket.
-    Returns byte array as python string or None if timeout
+    Returns bytearray or None if timeout
     """
     sock.settimeout(timeout)
-    chunks = []
-    btoread = nbytes
+    # receive directly into one preallocated buffer
+    response = bytearray(nbytes)
+    view = memoryview(response)
+    bread = 0
     try:
-        while btoread:
-            indat = sock.recv(min(btoread, 8192))
-            btoread -= len(indat)
-            chunks.append(indat)
+        while bread < nbytes:
+            indat = sock.recv_into(view[bread:], min(nbytes - bread, 65536))
+            if not indat:
+                print('connection closed in get_sock_bytes()')
+                return None
+            bread += indat
     except socket.timeout:
         print('socket timeout in get_sock_bytes()')
         return None
-    if chunks:
-        response = b''.join(chunks)
+    if nbytes:
         return response
     else:
         return None
@@ -234,35 +265,55 @@ def get_menu(server, port, scnl=None, timeout=None):
     return []
 
 
-def read_wave_server_v(server, port, scnl, start, end, timeout=None):
+def get_scnl_raw(sock, scnl, start, end, timeout=None):
     """
-    Reads data for specified time interval and scnl on specified waveserverV.
+    Requests data for specified time interval and scnl on an open socket to
+    a waveserverV.
 
-    Returns list of TraceBuf2 objects
+    The socket stays open and can be used for further requests.
+    Returns a bytearray with the concatenated TraceBuf2 packets, an empty
+    bytearray if the request returned no data or None if the connection
+    failed.
     """
     rid = 'rwserv'
     scnlstr = '%s %s %s %s' % scnl
     reqstr = 'GETSCNLRAW: %s %s %f %f\n' % (rid, scnlstr, start, end)
-    sock = send_sock_req(server, port, reqstr.encode('ascii', 'strict'),
-                         timeout=timeout)
+    try:
+        sock.sendall(reqstr.encode('ascii', 'strict'))
+    except socket.error:
+        return None
     r = get_sock_char_line(sock, timeout=timeout)
     if not r:
-        return []
+        return None
     tokens = str(r.decode()).split()
     flag = tokens[6]
     if flag != 'F':
         msg = 'read_wave_server_v returned flag %s - %s'
         print(msg % (flag, RETURNFLAG_KEY[flag]))
-        return []
+        return bytearray()
     nbytes = int(tokens[-1])
-    dat = get_sock_bytes(sock, nbytes, timeout=timeout)
-    sock.close()
+    return get_sock_bytes(sock, nbytes, timeout=timeout)
+
+
+def read_wave_server_v(server, port, scnl, start, end, timeout=None):
+    """
+    Reads data for specified time interval and scnl on specified waveserverV.
+
+    Returns list of TraceBuf2 objects
+    """
+    sock = get_sock(server, port, timeout=timeout)
+    try:
+        dat = get_scnl_raw(sock, scnl, start, end, timeout=timeout)
+    finally:
+        sock.close()
+    if not dat:
+        return []
     tbl = []
     new = TraceBuf2()  # empty..filled below
     bytesread = 1
     p = 0
     while bytesread and p < len(dat):
-        bytesread = new.read_tb2(dat[p:])
+        bytesread = new.read_tb2(dat, p)
         if bytesread:
             tbl.append(new)
             new = TraceBuf2()  # empty..filled on next iteration
@@ -270,6 +321,59 @@ def read_wave_server_v(server, port, scnl, start, end, timeout=None):
     return tbl
 
 
+def read_tb2_stream(dat, merge=True):
+    """
+    Returns obspy.Stream object from a byte array of concatenated TraceBuf2
+    packets.
+
+    Only the packet headers are parsed up front. The samples of all packets
+    of one channel are then copied into a single preallocated array in
+    native byte order, without slicing the input array. If merge is True,
+    packets directly following each other (sampling points misaligned by less
+    than 1% of the sampling interval, same as
+    :meth:`~obspy.core.stream.Stream._cleanup`) end up in one trace, otherwise
+    every packet is returned as a separate trace.
+    """
+    channels = {}
+    order = []
+    tb = TraceBuf2()
+    p = 0
+    while p < len(dat):
+        nbytes = tb.read_tb2_header(dat, p)
+        if not nbytes:
+            break
+        key = (tb.net, tb.sta, tb.loc, tb.chan)
+        if key not in channels:
+            channels[key] = []
+            order.append(key)
+        channels[key].append((p + 64, tb.ndata, tb.inputType, tb.start,
+                              tb.rate, tb.get_obspy_stats()))
+        p += nbytes
+    st = Stream()
+    for key in order:
+        packets = channels[key]
+        dtype = packets[0][2].newbyteorder(native_str('='))
+        data = np.empty(sum(x[1] for x in packets), dtype=dtype)
+        i = first = 0
+        stats = next_start = None
+        for offset, ndata, tp, start, rate, stat in packets:
+            data[i:i + ndata] = np.frombuffer(dat, tp, ndata, offset)
+            # start a new trace on gaps, overlaps or sampling rate changes
+            if merge and stats is not None and \
+                    rate == stats.sampling_rate and \
+                    abs(start - next_start) < 1e-2 / rate:
+                stats.npts += ndata
+            else:
+                if stats is not None:
+                    st.append(Trace(data=data[first:i], header=stats))
+                stats = stat
+                first = i
+            next_start = start + ndata / rate
+            i += ndata
+        st.append(Trace(data=data[first:i], header=stats))
+    return st
+
+
 def trace_bufs2obspy_stream(tbuflist):
     """
     Returns obspy.Stream object from input list of TraceBuf2 objects
@@ -0,0 +1,638 @@
+# -*- coding: utf-8 -*-
+"""
+A SeedLink client multiplexing many connections in one thread.
+
+The :class:`~.MultiSeedLinkClient` class contained in this module receives
+data from any number of SeedLink servers. All connections are handled by a
+single ``select()`` loop on non-blocking sockets, so no thread per
+connection is needed. Received packets are not decoded one by one. They are
+collected and handed to the consumer in batches at a configurable cadence,
+either as raw MiniSEED records or coalesced into one trace per channel and
+contiguous data segment.
+
+.. code-block:: python
+
+    from obspy.clients.seedlink.multiclient import MultiSeedLinkClient
+
+    class MyClient(MultiSeedLinkClient):
+        def on_data(self, trace):
+            print(trace)
+
+    client = MyClient(flush_interval=2.0, statefile='multi.state')
+    client.add_server('geofon.gfz-potsdam.de:18000',
+                      [('GE', 'APE', 'BH?'), ('GE', 'WLF', 'BHZ')])
+    client.add_server('rtserve.iris.washington.edu',
+                      [('IU', 'ANMO', '00BH?')])
+    client.run()
+
+The state file has the same format as the one written by
+:meth:`~obspy.clients.seedlink.client.seedlinkconnection.SeedLinkConnection.saveState`
+and is only written once per flush instead of once per packet.
+
+.. rubric:: Limitations
+
+Only multi-station mode is supported and in-stream ``INFO`` packets (e.g.
+responses to keepalive requests) are skipped.
+
+:copyright:
+    The ObsPy Development Team (devs@obspy.org)
+:license:
+    GNU Lesser General Public License, Version 3
+    (http://www.gnu.org/copyleft/lesser.html)
+"""
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+from future.builtins import *  # NOQA
+
+import errno
+import logging
+import select
+import socket
+import time
+from collections import OrderedDict
+
+from future import standard_library
+with standard_library.hooks():
+    import urllib.parse
+
+import numpy as np
+
+from obspy.core.trace import Trace
+from obspy.core.utcdatetime import UTCDateTime
+from obspy.io.mseed.headers import HPTMODULUS
+from obspy.io.mseed.util import unpack_records
+from .client.slnetstation import SLNetStation
+from .seedlinkexception import SeedLinkException
+from .slpacket import SLPacket
+
+
+logger = logging.getLogger('obspy.clients.seedlink.multiclient')
+
+PACKET_SIZE = SLPacket.SLHEADSIZE + SLPacket.SLRECSIZE
+
+
+def coalesce_records(records):
+    """
+    Decodes MiniSEED records and joins the samples of contiguous records of
+    the same channel.
+
+    All records are decoded at once with
+    :func:`~obspy.io.mseed.util.unpack_records`.
+
+    :type records: list of bytes
+    :param records: The MiniSEED records.
+    :return: List of :class:`~obspy.core.trace.Trace` objects, one per
+        channel and contiguous data segment, in order of the first record of
+        every channel. Traces of text records (e.g. log channels) mixed with
+        numeric records follow after all numeric traces.
+    """
+    if not records:
+        return []
+    headers, samples = unpack_records(b"".join(records),
+                                      reclen=SLPacket.SLRECSIZE)
+    text = headers['offset'] < 0
+    if text.any():
+        # text records can not share the float64 samples of numeric records
+        return (coalesce_records([x for x, t in zip(records, text) if not t]) +
+                coalesce_records([x for x, t in zip(records, text) if t]))
+    bad = headers['status'] != 0
+    if bad.any():
+        logger.error("bad packets: %d record(s) could not be decoded" % (
+            bad.sum()))
+        headers = headers[~bad]
+    channels = OrderedDict()
+    for i, key in enumerate(zip(headers['network'], headers['station'],
+                                headers['location'], headers['channel'])):
+        channels.setdefault(key, []).append(i)
+    traces = []
+    for key, index in channels.items():
+        # records of one channel sorted by start time
+        chan = headers[index]
+        chan = chan[np.argsort(chan['starttime'], kind='mergesort')]
+        starttime = chan['starttime'] / HPTMODULUS
+        endtime = starttime + chan['npts'] / chan['samprate']
+        # start a new trace on gaps, overlaps or sampling rate changes
+        split = (np.abs(starttime[1:] - endtime[:-1]) >=
+                 1e-2 / chan['samprate'][1:]) | \
+            (chan['samprate'][1:] != chan['samprate'][:-1])
+        bounds = np.concatenate([[0], np.nonzero(split)[0] + 1, [len(chan)]])
+        header = dict(zip(('network', 'station', 'location', 'channel'),
+                          (x.decode() for x in key)))
+        for start, end in zip(bounds[:-1], bounds[1:]):
+            data = np.concatenate([
+                samples[x['offset']:x['offset'] + x['npts']]
+                for x in chan[start:end]])
+            stats = dict(header, starttime=UTCDateTime(starttime[start]),
+                         sampling_rate=chan['samprate'][start])
+            traces.append(Trace(data=data, header=stats))
+    return traces
+
+
+class _MultiSeedLinkConnection(object):
+    """
+    State of one server connection of a MultiSeedLinkClient.
+    """
+    DOWN, CONNECTING, HANDSHAKE, DATA, DONE = range(5)
+
+    def __init__(self, server_url, host, port, begin_time, end_time):
+        self.server_url = server_url
+        self.host = host
+        self.port = port
+        self.begin_time = begin_time
+        self.end_time = end_time
+        # SLNetStation objects per (net, station)
+        self.streams = OrderedDict()
+        # (seqnum, record) of last packet per (net, station) since last flush
+        self.latest = {}
+        self.records = []
+        self.sock = None
+        self.state = self.DOWN
+        self.buffer = bytearray()
+        self.commands = []
+        self.lines = 0
+        self.server_id = None
+        self.retry_time = 0.0
+        self.last_recv = 0.0
+        self.last_send = 0.0
+
+    def get_commands(self):
+        """
+        Returns the handshake commands as list of (command, number of
+        response lines, (net, station)) tuples.
+        """
+        commands = [(b"HELLO", 2, None)]
+        for key, stream in self.streams.items():
+            net, station = key
+            commands.append((("STATION %s %s" % (station, net)).encode(
+                'ascii', 'strict'), 1, key))
+            for selector in stream.getSelectors():
+                commands.append((("SELECT %s" % selector).encode(
+                    'ascii', 'strict'), 1, key))
+            if stream.seqnum != -1:
+                # resume after the last received packet
+                cmd = "DATA %06X" % ((stream.seqnum + 1) & 0xFFFFFF)
+            elif self.begin_time is not None:
+                cmd = "TIME " + self.begin_time.format_seedlink()
+                if self.end_time is not None:
+                    cmd += " " + self.end_time.format_seedlink()
+            else:
+                cmd = "DATA"
+            commands.append((cmd.encode('ascii', 'strict'), 1, key))
+        commands.append((b"END", 0, None))
+        return commands
+
+
+class MultiSeedLinkClient(object):
+    """
+    SeedLink client receiving data from many servers in a single thread.
+
+    This class is meant to be used as a base class, with a subclass
+    implementing :meth:`~.MultiSeedLinkClient.on_data` and/or
+    :meth:`~.MultiSeedLinkClient.on_records`.
+
+    :type flush_interval: float
+    :param flush_interval: Interval in seconds in which received packets are
+        handed to the callbacks and the state file is written.
+    :type coalesce: bool
+    :param coalesce: If ``True``, the records received since the last flush
+        are decoded and passed to :meth:`~.MultiSeedLinkClient.on_data` as one
+        trace per channel and contiguous data segment. If ``False``, only
+        :meth:`~.MultiSeedLinkClient.on_records` is called and no records are
+        decoded.
+    :type statefile: str
+    :param statefile: Name of a state file to recover the sequence numbers
+        from on start and to save them to on every flush.
+    :type netto: float
+    :param netto: Network timeout in seconds, a connection without data for
+        this long is reconnected. ``0`` disables it.
+    :type netdly: float
+    :param netdly: Delay in seconds before reconnecting.
+    :type keepalive: float
+    :param keepalive: Interval in seconds in which keepalive requests are sent
+        to the servers if no data is received. ``0`` disables it.
+    """
+    def __init__(self, flush_interval=1.0, coalesce=True, statefile=None,
+                 netto=120, netdly=30, keepalive=0):
+        self.flush_interval = flush_interval
+        self.coalesce = coalesce
+        self.statefile = statefile
+        self.netto = netto
+        self.netdly = netdly
+        self.keepalive = keepalive
+        self.connections = []
+        self._terminate = False
+
+    def add_server(self, server_url, streams, begin_time=None,
+                   end_time=None):
+        """
+        Adds a SeedLink server and the streams to request from it.
+
+        :type server_url: str
+        :param server_url: The SeedLink server URL, e.g.
+            ``'geofon.gfz-potsdam.de:18000'``.
+        :type streams: list of tuples
+        :param streams: List of (network, station, selector) tuples. The
+            selector can be ``None`` or a valid SeedLink selector, e.g.
+            ``'EHZ'`` or ``'00BH?'``.
+        :type begin_time: :class:`~obspy.core.utcdatetime.UTCDateTime`
+        :param begin_time: Request data starting at this time instead of
+            the next available data (``TIME`` command).
+        :type end_time: :class:`~obspy.core.utcdatetime.UTCDateTime`
+        :param end_time: End of the requested time window. The server closes
+            the connection once all data was sent.
+        """
+        if '://' not in server_url and not server_url.startswith('//'):
+            server_url = '//' + server_url
+        parsed_url = urllib.parse.urlparse(server_url, scheme='seedlink')
+        if not parsed_url.scheme == 'seedlink':
+            msg = 'Unsupported scheme %s (expected "seedlink")' % \
+                  parsed_url.scheme
+            raise SeedLinkException(msg)
+        if not parsed_url.hostname:
+            raise SeedLinkException('No host name provided')
+        host = parsed_url.hostname
+        port = parsed_url.port or 18000
+        conn = _MultiSeedLinkConnection('%s:%d' % (host, port), host, port,
+                                        begin_time, end_time)
+        for net, station, selector in streams:
+            key = (net, station)
+            if key not in conn.streams:
+                conn.streams[key] = SLNetStation(net, station, None, -1,
+                                                 None)
+            if selector:
+                for sel in selector.split():
+                    conn.streams[key].appendSelectors(sel)
+        self.connections.append(conn)
+        return conn.server_url
+
+    def recover_state(self, statefile):
+        """
+        Recovers the sequence numbers and time stamps of all streams from a
+        state file as written by
+        :meth:`~obspy.clients.seedlink.client.seedlinkconnection.SeedLinkConnection.saveState`.
+
+        :return: the number of streams recovered.
+        """
+        try:
+            with open(statefile, 'r') as fh:
+                lines = fh.readlines()
+        except IOError as e:
+            logger.error("cannot open state file: %s" % (e))
+            return 0
+        stacount = 0
+        for line in lines:
+            if line.startswith('#') or line.startswith('*'):
+                continue
+            tokens = line.split()
+            if len(tokens) < 4 or tokens[3] == "null":
+                continue
+            key = (tokens[0], tokens[1])
+            for conn in self.connections:
+                if key in conn.streams:
+                    stream = conn.streams[key]
+                    try:
+                        stream.seqnum = int(tokens[2])
+                        stream.btime = UTCDateTime(tokens[3])
+                    except Exception as e:
+                        msg = "parsing state file line '%s': %s"
+                        logger.error(msg % (line.strip(), e))
+                        continue
+                    stacount += 1
+        return stacount
+
+    def save_state(self, statefile):
+        """
+        Saves the sequence numbers and time stamps of all streams to a state
+        file readable by
+        :meth:`~obspy.clients.seedlink.client.seedlinkconnection.SeedLinkConnection.recoverState`.
+
+        :return: the number of streams saved.
+        """
+        stacount = 0
+        with open(statefile, 'w') as fh:
+            for conn in self.connections:
+                for stream in conn.streams.values():
+                    if stream.btime is not None:
+                        fh.write(stream.net + " " + stream.station + " " +
+                                 str(stream.seqnum) + " " +
+                                 stream.btime.format_seedlink() + "\n")
+                        stacount += 1
+        return stacount
+
+    def terminate(self):
+        """
+        Stops :meth:`~.MultiSeedLinkClient.run` after the current pass.
+        """
+        self._terminate = True
+
+    def close(self):
+        """
+        Closes all connections.
+        """
+        for conn in self.connections:
+            self._disconnect(conn)
+
+    def run(self, timeout=None):
+        """
+        Starts receiving data from all servers.
+
+        Returns when :meth:`~.MultiSeedLinkClient.terminate` was called, all
+        servers closed their connections after the requested time windows or
+        after ``timeout`` seconds.
+        """
+        if not any(conn.streams for conn in self.connections):
+            msg = 'No streams specified. Use add_server() to add streams.'
+            raise SeedLinkException(msg)
+        if self.statefile is not None:
+            self.recover_state(self.statefile)
+        self._terminate = False
+        start = time.time()
+        next_flush = start + self.flush_interval
+        try:
+            while not self._terminate:
+                now = time.time()
+                if timeout is not None and now - start > timeout:
+                    break
+                active = [conn for conn in self.connections
+                          if conn.state != conn.DONE]
+                if not active:
+                    break
+                for conn in active:
+                    if conn.state == conn.DOWN and now >= conn.retry_time:
+                        self._connect(conn, now)
+                socks = dict((conn.sock, conn) for conn in active
+                             if conn.sock is not None)
+                writers = [sock for sock, conn in socks.items()
+                           if conn.state == conn.CONNECTING]
+                wait = max(0.0, min(next_flush - now, 0.5))
+                if socks:
+                    readable, writable, _ = select.select(
+                        list(socks.keys()), writers, [], wait)
+                else:
+                    readable, writable = [], []
+                    time.sleep(wait)
+                now = time.time()
+                for sock in writable:
+                    self._connected(socks[sock], now)
+                for sock in readable:
+                    conn = socks[sock]
+                    if conn.sock is sock and conn.state != conn.CONNECTING:
+                        self._receive(conn, now)
+                for conn in active:
+                    self._check_timers(conn, now)
+                if now >= next_flush:
+                    self.flush()
+                    next_flush = now + self.flush_interval
+        finally:
+            self.flush()
+            self.close()
+
+    def flush(self):
+        """
+        Hands all records received since the last flush to the callbacks and
+        writes the state file.
+        """
+        updated = False
+        for conn in self.connections:
+            latest = [(key, seqnum, record) for key, (seqnum, record) in
+                      conn.latest.items() if key in conn.streams]
+            conn.latest = {}
+            if latest:
+                headers = unpack_records(b"".join(x[2] for x in latest),
+                                         reclen=SLPacket.SLRECSIZE,
+                                         headonly=True)[0]
+                for (key, seqnum, _), header in zip(latest, headers):
+                    if header['status'] != 0:
+                        continue
+                    stream = conn.streams[key]
+                    stream.seqnum = seqnum
+                    stream.btime = UTCDateTime(
+                        header['starttime'] / HPTMODULUS)
+                    updated = True
+            records, conn.records = conn.records, []
+            if not records:
+                continue
+            self.on_records(conn.server_url, records)
+            if self.coalesce:
+                for trace in coalesce_records([x[1] for x in records]):
+                    self.on_data(trace)
+        if updated and self.statefile is not None:
+            self.save_state(self.statefile)
+
+    def _connect(self, conn, now):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setblocking(0)
+        err = sock.connect_ex((conn.host, conn.port))
+        if err not in (0, errno.EINPROGRESS, errno.EWOULDBLOCK, errno.EAGAIN):
+            sock.close()
+            msg = "cannot connect to %s: %s, reconnecting in %ss"
+            logger.error(msg % (conn.server_url, errno.errorcode.get(err, err),
+                                self.netdly))
+            conn.retry_time = now + self.netdly
+            return
+        conn.sock = sock
+        conn.state = conn.CONNECTING
+        conn.last_recv = conn.last_send = now
+
+    def _connected(self, conn, now):
+        err = conn.sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+        if err:
+            msg = "cannot connect to %s: %s"
+            logger.error(msg % (conn.server_url,
+                                errno.errorcode.get(err, err)))
+            self._reconnect(conn, now)
+            return
+        logger.info("connected to %s" % (conn.server_url))
+        conn.state = conn.HANDSHAKE
+        conn.buffer = bytearray()
+        conn.commands = conn.get_commands()
+        self._send_command(conn, now)
+
+    def _send_command(self, conn, now):
+        """
+        Sends the next handshake command, skips commands of stations that
+        were not accepted.
+        """
+        while conn.commands:
+            command, lines, _key = conn.commands[0]
+            logger.debug("sending to %s: %s" % (conn.server_url,
+                                                command.decode()))
+            if not self._send(conn, command + b"\r", now):
+                return
+            if lines:
+                conn.lines = lines
+                return
+            conn.commands.pop(0)
+        # END was sent, data is following
+        conn.state = conn.DATA
+
+    def _send(self, conn, bytes_, now):
+        try:
+            conn.sock.sendall(bytes_)
+        except socket.error as e:
+            logger.error("socket write error %s: %s" % (conn.server_url, e))
+            self._reconnect(conn, now)
+            return False
+        conn.last_send = now
+        return True
+
+    def _receive(self, conn, now):
+        try:
+            data = conn.sock.recv(65536)
+        except socket.error as e:
+            if e.args[0] in (errno.EAGAIN, errno.EWOULDBLOCK):
+                return
+            logger.error("socket read error %s: %s" % (conn.server_url, e))
+            self._reconnect(conn, now)
+            return
+        if not data:
+            logger.warning("connection closed by %s" % (conn.server_url))
+            self._reconnect(conn, now)
+            return
+        conn.last_recv = now
+        conn.buffer += data
+        if conn.state == conn.HANDSHAKE:
+            self._process_handshake(conn, now)
+        if conn.state == conn.DATA:
+            self._process_packets(conn)
+
+    def _process_handshake(self, conn, now):
+        while conn.state == conn.HANDSHAKE:
+            pos = conn.buffer.find(b"\r\n")
+            if pos == -1:
+                return
+            line = bytes(conn.buffer[:pos]).decode('ascii', 'replace')
+            del conn.buffer[:pos + 2]
+            command, _lines, key = conn.commands[0]
+            if command == b"HELLO":
+                if conn.lines == 2:
+                    conn.server_id = line
+                    logger.info("%s: %s" % (conn.server_url, line))
+            elif line == "ERROR":
+                msg = "%s: command '%s' not accepted"
+                logger.error(msg % (conn.server_url, command.decode()))
+                if command.startswith(b"STATION"):
+                    # skip the remaining commands of this station
+                    conn.commands = [conn.commands[0]] + [
+                        x for x in conn.commands[1:] if x[2] != key]
+            elif line != "OK":
+                msg = "%s: invalid response to '%s': %s"
+                logger.error(msg % (conn.server_url, command.decode(), line))
+                self._reconnect(conn, now)
+                return
+            conn.lines -= 1
+            if conn.lines == 0:
+                conn.commands.pop(0)
+                self._send_command(conn, now)
+
+    def _process_packets(self, conn):
+        """
+        Splits the receive buffer into SeedLink packets.
+
+        Records are only collected here, the decoding of all records received
+        until the next flush happens at once.
+        """
+        buf = conn.buffer
+        length = len(buf)
+        pos = 0
+        while length - pos >= 3:
+            if buf[pos:pos + 2] == SLPacket.SIGNATURE:
+                if length - pos < PACKET_SIZE:
+                    break
+                if buf[pos:pos + 6] != SLPacket.INFOSIGNATURE:
+                    try:
+                        seqnum = int(bytes(buf[pos + 2:pos + 8]), 16)
+                    except ValueError:
+                        seqnum = -1
+                    record = bytes(buf[pos + SLPacket.SLHEADSIZE:
+                                       pos + PACKET_SIZE])
+                    conn.records.append((seqnum, record))
+                    if seqnum != -1:
+                        # station and network codes of the fixed header
+                        key = (record[18:20].decode().strip(),
+                               record[8:13].decode().strip())
+                        conn.latest[key] = (seqnum, record)
+                pos += PACKET_SIZE
+            elif buf[pos:pos + 3] == SLPacket.ENDSIGNATURE:
+                logger.info("%s: end of selected time window" % (
+                    conn.server_url))
+                self._finish(conn)
+                return
+            elif buf[pos:pos + 7] == SLPacket.ERRORSIGNATURE:
+                logger.error("%s: SeedLink reported an error" % (
+                    conn.server_url))
+                self._finish(conn)
+                return
+            else:
+                logger.error("%s: invalid packet signature, reconnecting" % (
+                    conn.server_url))
+                self._reconnect(conn, time.time())
+                return
+        del buf[:pos]
+
+    def _check_timers(self, conn, now):
+        if conn.state == conn.CONNECTING and self.netto > 0 and \
+                now - conn.last_send > self.netto:
+            logger.error("%s: connection timeout" % (conn.server_url))
+            self._reconnect(conn, now)
+        elif conn.state in (conn.HANDSHAKE, conn.DATA):
+            if self.netto > 0 and now - conn.last_recv > self.netto:
+                msg = "%s: network timeout (%s), reconnecting in %ss"
+                logger.warning(msg % (conn.server_url, self.netto,
+                                      self.netdly))
+                self._reconnect(conn, now)
+            elif conn.state == conn.DATA and self.keepalive > 0 and \
+                    now - max(conn.last_recv, conn.last_send) > \
+                    self.keepalive:
+                logger.debug("%s: sending keepalive request" % (
+                    conn.server_url))
+                self._send(conn, b"INFO ID\r", now)
+
+    def _disconnect(self, conn):
+        if conn.sock is not None:
+            try:
+                conn.sock.close()
+            except socket.error:
+                pass
+        conn.sock = None
+        conn.buffer = bytearray()
+
+    def _reconnect(self, conn, now):
+        self._disconnect(conn)
+        if conn.state != conn.DONE:
+            conn.state = conn.DOWN
+            conn.retry_time = now + self.netdly
+
+    def _finish(self, conn):
+        self._disconnect(conn)
+        conn.state = conn.DONE
+        self.on_terminate(conn.server_url)
+
+    def on_records(self, server_url, records):
+        """
+        Callback for handling raw records, called once per flush and server.
+
+        :type server_url: str
+        :param server_url: The server the records were received from.
+        :type records: list of tuples
+        :param records: (sequence number, 512 byte MiniSEED record) tuples in
+            order of reception.
+        """
+        pass
+
+    def on_data(self, trace):
+        """
+        Callback for handling coalesced waveform data, called for every
+        channel and contiguous data segment received since the last flush.
+
+        :type trace: :class:`~obspy.core.trace.Trace`
+        :param trace: The trace received from the server(s).
+        """
+        pass
+
+    def on_terminate(self, server_url):
+        """
+        Callback for handling a server closing the connection after all data
+        of the requested time window was sent.
+        """
+        pass
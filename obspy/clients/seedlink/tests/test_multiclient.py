@@ -0,0 +1,285 @@
+# -*- coding: utf-8 -*-
+"""
+The obspy.clients.seedlink.multiclient test suite.
+"""
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+from future.builtins import *  # NOQA
+from future import standard_library
+
+import io
+import threading
+import unittest
+
+import numpy as np
+
+with standard_library.hooks():
+    import socketserver
+
+from obspy import Stream, Trace, UTCDateTime
+from obspy.core.util import NamedTemporaryFile
+from obspy.clients.seedlink.client.seedlinkconnection import SeedLinkConnection
+from obspy.clients.seedlink.multiclient import (MultiSeedLinkClient,
+                                                coalesce_records)
+
+
+def mseed_records(network, station, channel, starttime, data):
+    """
+    Returns a list of 512 byte MiniSEED records.
+    """
+    tr = Trace(data=data.astype(np.int32))
+    tr.stats.network = network
+    tr.stats.station = station
+    tr.stats.channel = channel
+    tr.stats.starttime = starttime
+    tr.stats.sampling_rate = 20.0
+    buf = io.BytesIO()
+    tr.write(buf, format='MSEED', reclen=512, encoding='STEIM2')
+    buf = buf.getvalue()
+    return [buf[i:i + 512] for i in range(0, len(buf), 512)]
+
+
+def log_record(network, station, starttime, text):
+    """
+    Returns a 512 byte MiniSEED record with ASCII data of a LOG channel.
+    """
+    tr = Trace(data=np.frombuffer(text, dtype='|S1').copy())
+    tr.stats.network = network
+    tr.stats.station = station
+    tr.stats.channel = 'LOG'
+    tr.stats.starttime = starttime
+    buf = io.BytesIO()
+    tr.write(buf, format='MSEED', reclen=512, encoding='ASCII')
+    return buf.getvalue()
+
+
+class FakeSeedLinkServer(socketserver.ThreadingMixIn,
+                         socketserver.TCPServer):
+    """
+    Minimal local SeedLink server in multi-station mode, sending all records
+    of the selected stations after END. In time window mode (``TIME``) it
+    terminates the stream with ``END``.
+    """
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, records):
+        # list of (net, sta, record), index is the sequence number
+        self.records = records
+        self.commands = []
+        socketserver.TCPServer.__init__(self, ('127.0.0.1', 0),
+                                        FakeSeedLinkHandler)
+
+
+class FakeSeedLinkHandler(socketserver.BaseRequestHandler):
+    def readline(self):
+        line = b''
+        while not line.endswith(b'\r'):
+            char = self.request.recv(1)
+            if not char:
+                return None
+            line += char
+        return line.strip().decode()
+
+    def handle(self):
+        stations = {}
+        current = None
+        time_window = False
+        while True:
+            line = self.readline()
+            if line is None:
+                return
+            self.server.commands.append(line)
+            tokens = line.split()
+            if tokens[0] == 'HELLO':
+                self.request.sendall(b'SeedLink v3.1 (fake)\r\nObsPy\r\n')
+            elif tokens[0] == 'STATION':
+                current = (tokens[2], tokens[1])
+                if any(x[:2] == current for x in self.server.records):
+                    stations[current] = 0
+                    self.request.sendall(b'OK\r\n')
+                else:
+                    self.request.sendall(b'ERROR\r\n')
+            elif tokens[0] == 'SELECT':
+                self.request.sendall(b'OK\r\n')
+            elif tokens[0] in ('DATA', 'TIME'):
+                if tokens[0] == 'TIME':
+                    time_window = True
+                elif len(tokens) > 1:
+                    stations[current] = int(tokens[1], 16)
+                self.request.sendall(b'OK\r\n')
+            elif tokens[0] == 'END':
+                break
+        packets = [('SL%06X' % i).encode() + rec
+                   for i, (net, sta, rec) in enumerate(self.server.records)
+                   if (net, sta) in stations and i >= stations[(net, sta)]]
+        # some in-stream INFO packet in between
+        packets.insert(1, b'SLINFO *' + b'\x00' * 512)
+        # send in odd chunks to test reassembly of packets
+        data = b''.join(packets)
+        for i in range(0, len(data), 700):
+            self.request.sendall(data[i:i + 700])
+        if time_window:
+            self.request.sendall(b'END')
+        else:
+            while self.readline() is not None:
+                pass
+
+
+class MultiSeedLinkClientTestCase(unittest.TestCase):
+    """
+    Test cases for MultiSeedLinkClient against local fake SeedLink servers.
+    """
+    def setUp(self):
+        self.t = UTCDateTime(2015, 1, 1)
+        self.data = {}
+        self.servers = []
+        for net, stations in (('XX', ('AAA', 'BBB')), ('YY', ('CCC',))):
+            records = []
+            for i, sta in enumerate(stations):
+                for cha in ('HHZ', 'HHN'):
+                    data = np.arange(3000) * (i + 1) + len(self.data)
+                    self.data['%s.%s..%s' % (net, sta, cha)] = data
+                    records.extend((net, sta, rec) for rec in mseed_records(
+                        net, sta, cha, self.t, data))
+            server = FakeSeedLinkServer(records)
+            thread = threading.Thread(target=server.serve_forever)
+            thread.daemon = True
+            thread.start()
+            self.servers.append(server)
+
+    def tearDown(self):
+        for server in self.servers:
+            server.shutdown()
+            server.server_close()
+
+    def _client(self, statefile=None):
+        class Client(MultiSeedLinkClient):
+            def on_data(self, trace):
+                self.st.append(trace)
+
+            def on_records(self, server_url, records):
+                self.records.setdefault(server_url, []).extend(records)
+
+            def on_terminate(self, server_url):
+                self.terminated.append(server_url)
+
+        client = Client(flush_interval=0.1, statefile=statefile, netdly=1)
+        client.st = Stream()
+        client.records = {}
+        client.terminated = []
+        return client
+
+    def test_coalesceRecords(self):
+        """
+        Tests decoding and joining of records.
+        """
+        records = mseed_records('XX', 'AAA', 'HHZ', self.t, np.arange(3000))
+        self.assertGreater(len(records), 3)
+        # gap after the first record, records out of order
+        st = Stream(coalesce_records(records[2:] + records[:1]))
+        self.assertEqual(len(st), 2)
+        self.assertEqual(st[0].id, 'XX.AAA..HHZ')
+        self.assertEqual(st[0].stats.starttime, self.t)
+        self.assertEqual(st[0].stats.sampling_rate, 20.0)
+        np.testing.assert_array_equal(st[0].data,
+                                      np.arange(st[0].stats.npts))
+        self.assertEqual(st[1].stats.endtime, self.t + 2999 / 20.0)
+        np.testing.assert_array_equal(st[1].data,
+                                      np.arange(3000)[-st[1].stats.npts:])
+
+    def test_textRecords(self):
+        """
+        Text records mixed with data records are decoded separately and do
+        not break the state update of flush().
+        """
+        records = mseed_records('XX', 'AAA', 'HHZ', self.t, np.arange(1000))
+        log = log_record('XX', 'AAA', self.t, b'clock locked')
+        st = Stream(coalesce_records(records + [log]))
+        self.assertEqual(len(st), 2)
+        self.assertEqual(st[0].id, 'XX.AAA..HHZ')
+        np.testing.assert_array_equal(st[0].data, np.arange(1000))
+        self.assertEqual(st[1].id, 'XX.AAA..LOG')
+        self.assertEqual(b''.join(st[1].data), b'clock locked')
+        client = self._client()
+        client.add_server('%s:%d' % self.servers[0].server_address,
+                          [('XX', 'AAA', None), ('XX', 'BBB', None)])
+        conn = client.connections[0]
+        conn.latest = {('XX', 'AAA'): (5, log),
+                       ('XX', 'BBB'): (3, records[-1])}
+        conn.records = [(i, x) for i, x in enumerate(records + [log])]
+        client.flush()
+        self.assertEqual(conn.streams[('XX', 'AAA')].seqnum, 5)
+        self.assertEqual(conn.streams[('XX', 'BBB')].seqnum, 3)
+        self.assertEqual(len(client.st), 2)
+
+    def test_timeWindow(self):
+        """
+        Tests receiving time windows from two servers.
+        """
+        client = self._client()
+        urls = []
+        urls.append(client.add_server(
+            '%s:%d' % self.servers[0].server_address,
+            [('XX', 'AAA', 'HHZ HHN'), ('XX', 'BBB', None),
+             ('XX', 'NOPE', None)], begin_time=self.t,
+            end_time=self.t + 3600))
+        urls.append(client.add_server(
+            '%s:%d' % self.servers[1].server_address,
+            [('YY', 'CCC', 'HH?')], begin_time=self.t,
+            end_time=self.t + 3600))
+        client.run(timeout=20)
+        self.assertEqual(sorted(client.terminated), sorted(urls))
+        self.assertIn('STATION NOPE XX', self.servers[0].commands)
+        self.assertIn('SELECT HHN', self.servers[0].commands)
+        self.assertIn('TIME 2015,1,1,0,0,0 2015,1,1,1,0,0',
+                      self.servers[1].commands)
+        st = client.st
+        st.merge()
+        self.assertEqual(sorted(tr.id for tr in st), sorted(self.data))
+        for tr in st:
+            self.assertEqual(tr.stats.starttime, self.t)
+            np.testing.assert_array_equal(tr.data, self.data[tr.id])
+        # raw records in order of reception, without the INFO packet
+        records = client.records[urls[1]]
+        self.assertEqual([x[0] for x in records], list(range(len(records))))
+        self.assertEqual(records[0][1], self.servers[1].records[0][2])
+
+    def test_stateFile(self):
+        """
+        Tests that the state file is compatible with SeedLinkConnection and
+        used to resume the data transfer.
+        """
+        with NamedTemporaryFile() as tf:
+            client = self._client(statefile=tf.name)
+            client.add_server('%s:%d' % self.servers[0].server_address,
+                              [('XX', 'AAA', None), ('XX', 'BBB', None)])
+            client.run(timeout=1.0)
+            self.assertEqual(len(client.st.select(station='AAA')) > 0, True)
+            last = len(self.servers[0].records) - 1
+            conn = SeedLinkConnection()
+            conn.addStream('XX', 'AAA', None, seqnum=-1, timestamp=None)
+            conn.addStream('XX', 'BBB', None, seqnum=-1, timestamp=None)
+            conn.statefile = tf.name
+            self.assertEqual(conn.recoverState(tf.name), 2)
+            self.assertEqual(conn.streams[1].seqnum, last)
+            self.assertGreater(conn.streams[1].btime, self.t)
+            # state file written by SeedLinkConnection
+            conn.streams[0].seqnum = 2
+            conn.saveState(tf.name)
+            client = self._client(statefile=tf.name)
+            client.add_server('%s:%d' % self.servers[0].server_address,
+                              [('XX', 'AAA', None), ('XX', 'BBB', None)])
+            client.run(timeout=1.0)
+            self.assertIn('DATA 000003', self.servers[0].commands)
+            self.assertIn('DATA %06X' % (last + 1), self.servers[0].commands)
+            records = [x[0] for x in list(client.records.values())[0]]
+            self.assertEqual(records[0], 3)
+
+
+def suite():
+    return unittest.makeSuite(MultiSeedLinkClientTestCase, 'test')
+
+
+if __name__ == '__main__':
+    unittest.main(defaultTest='suite')
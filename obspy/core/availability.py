@@ -0,0 +1,364 @@
+# -*- coding: utf-8 -*-
+"""
+Vectorized data availability, gap and overlap analysis.
+
+All functions work on plain arrays of segments, i.e. one entry per trace,
+record or archive index row with the SEED id, the time of the first and the
+last sample in nanoseconds since 1970-01-01 and the sampling rate. This
+avoids creating :class:`~obspy.core.trace.Trace` or
+:class:`~obspy.core.utcdatetime.UTCDateTime` objects and scales to millions
+of segments, e.g. a year of single record traces of a Mini-SEED archive.
+
+Every segment covers the time from its first sample up to one sample period
+after its last sample, so contiguous segments do not overlap. Gaps and
+overlaps smaller than ``tolerance`` sample periods are ignored, like
+:meth:`~obspy.core.stream.Stream.getGaps` ignores time differences of about
+one sample.
+
+:copyright:
+    The ObsPy Development Team (devs@obspy.org)
+:license:
+    GNU Lesser General Public License, Version 3
+    (http://www.gnu.org/copyleft/lesser.html)
+"""
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+from future.builtins import *  # NOQA
+from future.utils import native_str
+
+import numpy as np
+
+from obspy.core.utcdatetime import UTCDateTime
+
+
+NS = 10 ** 9
+
+
+def _gap_dtype(id_dtype):
+    return np.dtype([
+        (native_str('id'), id_dtype),
+        (native_str('starttime'), np.int64),
+        (native_str('endtime'), np.int64),
+        (native_str('duration'), np.float64),
+        (native_str('samples'), np.int64)])
+
+
+def _coverage_dtype(id_dtype):
+    return np.dtype([
+        (native_str('id'), id_dtype),
+        (native_str('starttime'), np.int64),
+        (native_str('endtime'), np.int64),
+        (native_str('covered'), np.float64),
+        (native_str('percentage'), np.float64)])
+
+
+def _to_ns(time):
+    """
+    Nanoseconds since 1970-01-01 of an UTCDateTime or an integer.
+    """
+    if isinstance(time, UTCDateTime):
+        # timestamps are only precise to about a microsecond
+        return int(round(time.timestamp * 1e6)) * 1000
+    return int(time)
+
+
+def segments_from_stream(stream):
+    """
+    Segment arrays of all traces of a stream.
+
+    :type stream: :class:`~obspy.core.stream.Stream`
+    :rtype: tuple of :class:`numpy.ndarray`
+    :returns: SEED ids, times of the first and last samples in nanoseconds
+        and sampling rates.
+
+    >>> from obspy import read
+    >>> ids, starttimes, endtimes, rates = segments_from_stream(read())
+    >>> print(ids[0], starttimes[0], endtimes[0], rates[0])
+    BW.RJOB..EHZ 1251073203000000000 1251073232990000000 100.0
+    """
+    ids = np.array([native_str(tr.id) for tr in stream])
+    starttimes = np.array([_to_ns(tr.stats.starttime) for tr in stream],
+                          dtype=np.int64)
+    endtimes = np.array([_to_ns(tr.stats.endtime) for tr in stream],
+                        dtype=np.int64)
+    rates = np.array([tr.stats.sampling_rate for tr in stream],
+                     dtype=np.float64)
+    return ids, starttimes, endtimes, rates
+
+
+def segments_from_mseed_headers(headers):
+    """
+    Segment arrays of Mini-SEED record headers.
+
+    :type headers: :class:`numpy.ndarray`
+    :param headers: Structured array of record headers as returned by
+        :func:`obspy.io.mseed.util.unpack_records`, e.g. with
+        ``headonly=True``. Records without samples or that could not be
+        decoded are skipped.
+    :rtype: tuple of :class:`numpy.ndarray`
+    :returns: SEED ids (as bytes), times of the first and last samples in
+        nanoseconds and sampling rates of all records.
+    """
+    valid = (headers['npts'] > 0) & (headers['samprate'] > 0) & \
+        (headers['status'] == 0)
+    headers = headers[valid]
+    ids = headers['network']
+    for key in ('station', 'location', 'channel'):
+        ids = np.char.add(np.char.add(ids, b'.'), headers[key])
+    rates = headers['samprate'].astype(np.float64)
+    starttimes = headers['starttime'].astype(np.int64) * 1000
+    endtimes = starttimes + np.round(
+        (headers['npts'] - 1) / rates * NS).astype(np.int64)
+    return ids, starttimes, endtimes, rates
+
+
+def _sweep(ids, starttimes, endtimes, sampling_rates, tolerance):
+    """
+    Sweeps over the start and end events of all segments.
+
+    Returns the unique ids, the id index, start, end and sample period of
+    all continuously covered intervals and the same for all time spans
+    covered more than once, everything sorted by id and time.
+    """
+    ids = np.asarray(ids)
+    starttimes = np.asarray(starttimes, dtype=np.int64)
+    rates = np.asarray(sampling_rates, dtype=np.float64)
+    periods = np.round(NS / np.where(rates > 0, rates, 1.0)).astype(np.int64)
+    # every segment covers one sample period after its last sample
+    endtimes = np.asarray(endtimes, dtype=np.int64) + periods
+    valid = (rates > 0) & (endtimes > starttimes)
+    ids, starttimes, endtimes = ids[valid], starttimes[valid], endtimes[valid]
+    periods = periods[valid]
+    unique_ids, codes = np.unique(ids, return_inverse=True)
+    # +1 for each start and -1 for each end event, at the same time ends
+    # come first so contiguous segments do not overlap
+    n = len(starttimes)
+    times = np.concatenate([starttimes, endtimes])
+    kinds = np.concatenate([np.ones(n, dtype=np.int64),
+                            -np.ones(n, dtype=np.int64)])
+    codes = np.concatenate([codes, codes])
+    periods = np.concatenate([periods, periods])
+    order = np.lexsort((kinds, times, codes))
+    times, kinds = times[order], kinds[order]
+    codes, periods = codes[order], periods[order]
+    # the number of segments covering the time after every event, the sum of
+    # the events of every id is zero
+    depth = np.cumsum(kinds)
+    before = depth - kinds
+
+    def _intervals(level):
+        # spans covered by at least level segments, starts and ends alternate
+        first = np.flatnonzero((before < level) & (depth >= level))
+        last = np.flatnonzero((before >= level) & (depth < level))
+        return (codes[first], times[first], times[last], periods[first],
+                periods[last])
+
+    # covered intervals, joined if separated by less than tolerance
+    code, start, end, _, period = _intervals(1)
+    if len(code):
+        joined = (code[1:] == code[:-1]) & \
+            (start[1:] - end[:-1] < tolerance * period[:-1])
+        first = np.flatnonzero(np.concatenate([[True], ~joined]))
+        last = np.concatenate([first[1:] - 1, [len(code) - 1]])
+        covered = code[first], start[first], end[last], period[last]
+    else:
+        covered = code, start, end, period
+    # overlaps longer than tolerance
+    code, start, end, period, _ = _intervals(2)
+    keep = end - start >= tolerance * period
+    overlaps = code[keep], start[keep], end[keep], period[keep]
+    return unique_ids, covered, overlaps
+
+
+def get_gaps(ids, starttimes, endtimes, sampling_rates, min_gap=None,
+             max_gap=None, tolerance=0.5):
+    """
+    Gaps and overlaps of all segments.
+
+    :type ids: :class:`numpy.ndarray`
+    :param ids: SEED id of every segment.
+    :type starttimes: :class:`numpy.ndarray`
+    :param starttimes: Time of the first sample of every segment in
+        nanoseconds since 1970-01-01.
+    :type endtimes: :class:`numpy.ndarray`
+    :param endtimes: Time of the last sample of every segment in nanoseconds
+        since 1970-01-01.
+    :type sampling_rates: :class:`numpy.ndarray`
+    :param sampling_rates: Sampling rate of every segment in Hz.
+    :param min_gap: All gaps smaller than this value will be omitted. The
+        value is assumed to be in seconds. Defaults to None.
+    :param max_gap: All gaps larger than this value will be omitted. The
+        value is assumed to be in seconds. Defaults to None.
+    :type tolerance: float
+    :param tolerance: Gaps and overlaps shorter than this number of sample
+        periods are ignored.
+    :rtype: :class:`numpy.ndarray`
+    :returns: Structured array with one row per gap or overlap sorted by id
+        and time. Like in :meth:`~obspy.core.stream.Stream.getGaps`
+        ``starttime`` is the last sample before and ``endtime`` the first
+        sample after the gap in nanoseconds, ``duration`` their difference
+        in seconds (negative for overlaps) and ``samples`` the number of
+        missing or overlapping samples.
+
+    .. rubric:: Example
+
+    >>> from obspy import read, UTCDateTime
+    >>> st = read()
+    >>> st[0].trim(endtime=UTCDateTime("2009-08-24T00:20:13.0"))
+    ... # doctest: +ELLIPSIS
+    <...Trace object at 0x...>
+    >>> gaps = get_gaps(*segments_from_stream(st + read()[:1]))
+    >>> print(gaps['id'][0], gaps['duration'][0], gaps['samples'][0])
+    BW.RJOB..EHZ -10.0 1001
+    """
+    unique_ids, covered, overlaps = _sweep(ids, starttimes, endtimes,
+                                           sampling_rates, tolerance)
+    # gaps between the covered intervals of the same id
+    code, start, end, period = covered
+    same = code[1:] == code[:-1]
+    gap_code = code[:-1][same]
+    gap_end = start[1:][same]
+    # last sample before the gap
+    gap_start = (end - period)[:-1][same]
+    gap_samples = np.round(
+        (gap_end - end[:-1][same]) / period[:-1][same]).astype(np.int64)
+    # for overlaps the last sample of the earlier and the first sample of the
+    # later segment
+    code, start, end, period = overlaps
+    codes = np.concatenate([gap_code, code])
+    starttimes = np.concatenate([gap_start, end - period])
+    endtimes = np.concatenate([gap_end, start])
+    samples = np.concatenate([
+        gap_samples, np.round((end - start) / period).astype(np.int64)])
+    result = np.empty(len(codes), dtype=_gap_dtype(unique_ids.dtype))
+    result['id'] = unique_ids[codes]
+    result['starttime'] = starttimes
+    result['endtime'] = endtimes
+    result['duration'] = (endtimes - starttimes) / float(NS)
+    result['samples'] = samples
+    result = result[np.lexsort((starttimes, codes))]
+    if min_gap:
+        result = result[result['duration'] >= min_gap]
+    if max_gap:
+        result = result[result['duration'] <= max_gap]
+    return result
+
+
+def get_coverage(ids, starttimes, endtimes, sampling_rates, starttime=None,
+                 endtime=None, interval=None, tolerance=0.5):
+    """
+    Covered time and availability percentage per id.
+
+    Time spans covered by several segments are only counted once.
+
+    :type ids: :class:`numpy.ndarray`
+    :param ids: SEED id of every segment.
+    :type starttimes: :class:`numpy.ndarray`
+    :param starttimes: Time of the first sample of every segment in
+        nanoseconds since 1970-01-01.
+    :type endtimes: :class:`numpy.ndarray`
+    :param endtimes: Time of the last sample of every segment in nanoseconds
+        since 1970-01-01.
+    :type sampling_rates: :class:`numpy.ndarray`
+    :param sampling_rates: Sampling rate of every segment in Hz.
+    :type starttime: :class:`~obspy.core.utcdatetime.UTCDateTime` or int
+    :param starttime: Start of the time window to analyze (nanoseconds if
+        an integer). Defaults to the start of the first segment of every id.
+    :type endtime: :class:`~obspy.core.utcdatetime.UTCDateTime` or int
+    :param endtime: End of the time window to analyze (nanoseconds if an
+        integer). Defaults to one sample period after the last segment of
+        every id.
+    :type interval: float
+    :param interval: If given, the time window is split into intervals of
+        this length in seconds aligned to multiples of it since 1970-01-01,
+        e.g. ``86400`` for daily availability. One row per id and interval
+        is returned, also for intervals without any data.
+    :type tolerance: float
+    :param tolerance: Gaps shorter than this number of sample periods are
+        counted as covered.
+    :rtype: :class:`numpy.ndarray`
+    :returns: Structured array with the ``id``, the ``starttime`` and
+        ``endtime`` of the window or interval in nanoseconds, the
+        ``covered`` time in seconds and its ``percentage``.
+
+    .. rubric:: Example
+
+    >>> from obspy import read, UTCDateTime
+    >>> st = read()
+    >>> st[0].trim(endtime=UTCDateTime("2009-08-24T00:20:13.0"))
+    ... # doctest: +ELLIPSIS
+    <...Trace object at 0x...>
+    >>> coverage = get_coverage(*segments_from_stream(st))
+    >>> print(coverage['id'][2], coverage['covered'][2])
+    BW.RJOB..EHZ 10.01
+    >>> print(coverage['id'][0], coverage['percentage'][0])
+    BW.RJOB..EHE 100.0
+    """
+    unique_ids, covered, _ = _sweep(ids, starttimes, endtimes,
+                                    sampling_rates, tolerance)
+    code, start, end, _ = covered
+    nids = len(unique_ids)
+    # time window of every id
+    window_start = np.zeros(nids, dtype=np.int64)
+    window_end = np.zeros(nids, dtype=np.int64)
+    has_data = np.zeros(nids, dtype=np.bool_)
+    if len(code):
+        first = np.flatnonzero(np.concatenate([[True],
+                                               code[1:] != code[:-1]]))
+        last = np.concatenate([first[1:] - 1, [len(code) - 1]])
+        window_start[code[first]] = start[first]
+        window_end[code[last]] = end[last]
+        has_data[code[first]] = True
+    if starttime is not None:
+        window_start[:] = _to_ns(starttime)
+    if endtime is not None:
+        window_end[:] = _to_ns(endtime)
+    valid = has_data & (window_end > window_start)
+    # rows of the result, one per id or per id and interval
+    if interval:
+        step = int(round(interval * NS))
+        first_row = window_start // step
+        nrows = np.where(valid, (window_end - 1) // step - first_row + 1, 0)
+    else:
+        nrows = valid.astype(np.int64)
+    offsets = np.cumsum(nrows) - nrows
+    row_code = np.repeat(np.arange(nids), nrows)
+    if interval:
+        row = first_row[row_code] + np.arange(len(row_code)) - \
+            offsets[row_code]
+        row_start = np.maximum(row * step, window_start[row_code])
+        row_end = np.minimum((row + 1) * step, window_end[row_code])
+    else:
+        row_start = window_start[row_code]
+        row_end = window_end[row_code]
+    # covered intervals clipped to the window, split at interval boundaries
+    start = np.maximum(start, window_start[code])
+    end = np.minimum(end, window_end[code])
+    keep = (end > start) & valid[code]
+    code, start, end = code[keep], start[keep], end[keep]
+    if interval:
+        first_piece = start // step
+        npieces = (end - 1) // step - first_piece + 1
+        piece_code = np.repeat(code, npieces)
+        piece = np.repeat(first_piece, npieces) + \
+            np.arange(npieces.sum()) - \
+            np.repeat(np.cumsum(npieces) - npieces, npieces)
+        start = np.maximum(np.repeat(start, npieces), piece * step)
+        end = np.minimum(np.repeat(end, npieces), (piece + 1) * step)
+        row_index = offsets[piece_code] + piece - first_row[piece_code]
+    else:
+        row_index = offsets[code]
+    covered_time = np.bincount(row_index, weights=end - start,
+                               minlength=len(row_code))
+    result = np.empty(len(row_code), dtype=_coverage_dtype(unique_ids.dtype))
+    result['id'] = unique_ids[row_code]
+    result['starttime'] = row_start
+    result['endtime'] = row_end
+    result['covered'] = covered_time / NS
+    result['percentage'] = 100.0 * covered_time / (row_end - row_start)
+    return result
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod(exclude_empty=True)
@@ -26,12 +26,15 @@ from future import standard_library
 from future.utils import native_str
 
 import collections
+import contextlib
 import copy
 import glob
 import inspect
 import io
+import itertools
 import os
 import re
+import threading
 import warnings
 import weakref
 from copy import deepcopy
@@ -62,6 +65,19 @@ EVENT_ENTRY_POINTS = ENTRY_POINTS['event']
 EVENT_ENTRY_POINTS_WRITE = ENTRY_POINTS['event_write']
 ATTRIBUTE_HAS_ERRORS = True
 
+# Changes with every attribute or item assignment on any event type object
+# after its initialization. Used to invalidate the cached tables of catalogs,
+# see Catalog.to_table(). Every change takes a new value from the thread safe
+# counter so concurrent changes can not restore a previous state.
+_MODIFICATIONS = [0]
+_MODIFICATION_COUNTER = itertools.count(1)
+# Per thread nesting level of event type object initializations, which do
+# not modify any existing objects.
+_CONSTRUCTION = threading.local()
+# Nesting level of bulk_construction() blocks. Referred objects of resource
+# identifiers are not registered while it is larger than zero.
+_BULK_CONSTRUCTION = [0]
+
 
 @map_example_filename("pathname_or_url")
 def read_events(pathname_or_url=None, format=None, **kwargs):
@@ -157,6 +173,36 @@ def _read(filename, format=None, **kwargs):
     return catalog
 
 
+@contextlib.contextmanager
+def bulk_construction():
+    """
+    Context manager for quickly creating large numbers of event type objects.
+
+    Inside the block, objects are not registered as the referred object of
+    their resource identifier. This saves time and memory when building large
+    catalogs, but
+    :meth:`~obspy.core.event.ResourceIdentifier.get_referred_object` will not
+    find the objects created inside the block (e.g. the picks referred to by
+    arrivals). Register them afterwards with
+    :meth:`~obspy.core.event.ResourceIdentifier.set_referred_object` if
+    needed.
+
+    >>> from obspy.core.event import Pick, bulk_construction
+    >>> with bulk_construction():
+    ...     picks = [Pick() for _i in range(3)]
+    >>> print(picks[0].resource_id.get_referred_object())
+    None
+    >>> picks[0].resource_id.set_referred_object(picks[0])
+    >>> picks[0].resource_id.get_referred_object() is picks[0]
+    True
+    """
+    _BULK_CONSTRUCTION[0] += 1
+    try:
+        yield
+    finally:
+        _BULK_CONSTRUCTION[0] -= 1
+
+
 def _create_example_catalog():
     """
     Create an example catalog.
@@ -275,9 +321,19 @@ def _event_type_class_factory(class_name, class_attributes=[],
         _property_dict = {}
         for key, value in _properties:
             _property_dict[key] = value
+        _error_keys = set(_i for _i in _property_keys
+                          if _i.endswith("_errors"))
         _containers = class_contains
 
         def __init__(self, *args, **kwargs):
+            # Creating new objects does not modify any existing ones.
+            _CONSTRUCTION.depth = getattr(_CONSTRUCTION, 'depth', 0) + 1
+            try:
+                self._init(*args, **kwargs)
+            finally:
+                _CONSTRUCTION.depth -= 1
+
+        def _init(self, *args, **kwargs):
             # Make sure the args work as expected. Therefore any specified
             # arg will overwrite a potential kwarg, e.g. arg at position 0 will
             # overwrite kwargs class_attributes[0].
@@ -285,27 +341,31 @@ def _event_type_class_factory(class_name, class_attributes=[],
                 # Use the class_attributes list here because it is not yet
                 # polluted be the error quantities.
                 kwargs[class_attributes[_i][0]] = item
-            # Set all property values to None or the kwarg value.
-            for key, _ in self._properties:
+            # Set all property values to None or the kwarg value. Values that
+            # need no conversion are written directly.
+            dict_ = self.__dict__
+            for key in self._property_keys:
                 value = kwargs.get(key, None)
-                # special handling for resource id
-                if key == "resource_id":
-                    if kwargs.get("force_resource_id", False):
-                        if value is None:
-                            value = ResourceIdentifier()
+                if value is None:
+                    # All errors are QuantityError.
+                    if key in self._error_keys:
+                        dict_[key] = QuantityError()
+                        continue
+                    # special handling for resource id
+                    if key != "resource_id" or \
+                            not kwargs.get("force_resource_id", False):
+                        dict_[key] = None
+                        continue
+                    value = ResourceIdentifier()
                 setattr(self, key, value)
             # Containers currently are simple lists.
             for name in self._containers:
-                setattr(self, name, list(kwargs.get(name, [])))
-            # All errors are QuantityError. If they are not set yet, set them
-            # now.
-            for key, _ in self._properties:
-                if key.endswith("_errors") and getattr(self, key) is None:
-                    setattr(self, key, QuantityError())
+                dict_[name] = list(kwargs.get(name, []))
 
         def clear(self):
             super(AbstractEventType, self).clear()
             self.__init__(force_resource_id=False)
+            _MODIFICATIONS[0] = next(_MODIFICATION_COUNTER)
 
         def __str__(self, force_one_line=False):
             """
@@ -416,16 +476,27 @@ def _event_type_class_factory(class_name, class_attributes=[],
         def __ne__(self, other):
             return not self.__eq__(other)
 
+        def __setitem__(self, name, value):
+            if not getattr(_CONSTRUCTION, 'depth', 0):
+                _MODIFICATIONS[0] = next(_MODIFICATION_COUNTER)
+            AttribDict.__setitem__(self, name, value)
+
+        def __delitem__(self, name):
+            _MODIFICATIONS[0] = next(_MODIFICATION_COUNTER)
+            AttribDict.__delitem__(self, name)
+
         def __setattr__(self, name, value):
             """
             Custom property implementation that works if the class is
             inheriting from AttribDict.
             """
+            if not getattr(_CONSTRUCTION, 'depth', 0):
+                _MODIFICATIONS[0] = next(_MODIFICATION_COUNTER)
             # Pass to the parent method if not a custom property.
-            if name not in self._property_dict.keys():
+            attrib_type = self._property_dict.get(name)
+            if attrib_type is None:
                 AttribDict.__setattr__(self, name, value)
                 return
-            attrib_type = self._property_dict[name]
             # If the value is None or already the correct type just set it.
             if (value is not None) and (type(value) is not attrib_type):
                 # If it is a dict, and the attrib_type is no dict, than all
@@ -440,11 +511,14 @@ def _event_type_class_factory(class_name, class_attributes=[],
                         (str(value), str(attrib_type))
                     raise ValueError(msg)
                 value = new_value
-            AttribDict.__setattr__(self, name, value)
+            # Converted values are never plain mappings, so they can be stored
+            # without the checks of AttribDict.__setitem__().
+            self.__dict__[name] = value
             # If "name" is resource_id and value is not None, set the referred
             # object of the ResourceIdentifier to self.
-            if name == "resource_id" and value is not None:
-                self.resource_id.set_referred_object(self)
+            if name == "resource_id" and value is not None and \
+                    not _BULK_CONSTRUCTION[0]:
+                value.set_referred_object(self)
 
     class AbstractEventTypeWithResourceID(AbstractEventType):
         def __init__(self, force_resource_id=True, *args, **kwargs):
@@ -628,7 +702,12 @@ class ResourceIdentifier(object):
         if id is None:
             self.fixed = False
             self._prefix = prefix
-            self._uuid = str(uuid4())
+            # The uuid is generated when the id is needed for the first time.
+            # Until then nobody else can refer to this id, so the referred
+            # object is only kept in a weak reference of this instance.
+            self._uuid = None
+            self._generated_id = None
+            self._referred_object = None
         else:
             self.fixed = True
             self.id = id
@@ -637,10 +716,42 @@ class ResourceIdentifier(object):
         if referred_object is not None:
             self.set_referred_object(referred_object)
 
-        # Increment the counter for the current resource id.
+        if self.fixed:
+            # Increment the counter for the current resource id.
+            ResourceIdentifier.__resource_id_tracker[self.id] += 1
+
+    def _is_pending(self):
+        """
+        True as long as the uuid of a generated id has not been created.
+        """
+        return not self.__dict__.get("fixed", True) and \
+            self.__dict__.get("_uuid") is None
+
+    def _generate_uuid(self):
+        """
+        Creates the uuid of a generated id and registers the instance and its
+        referred object.
+        """
+        self._uuid = str(uuid4())
+        self._generated_id = None
         ResourceIdentifier.__resource_id_tracker[self.id] += 1
+        referred_object = self.__dict__.pop("_referred_object", None)
+        if referred_object is not None:
+            referred_object = referred_object()
+            if referred_object is not None:
+                self.set_referred_object(referred_object)
+
+    def __getstate__(self):
+        # copies and pickles have to share the id
+        if self._is_pending():
+            self._generate_uuid()
+        state = self.__dict__.copy()
+        state.pop("_referred_object", None)
+        return state
 
     def __del__(self):
+        if self._is_pending():
+            return
         if self.id not in ResourceIdentifier.__resource_id_tracker:
             return
         # Decrement the resource id counter.
@@ -668,6 +779,9 @@ class ResourceIdentifier(object):
 
         Will return None if no object could be found.
         """
+        if self._is_pending():
+            referred_object = self.__dict__.get("_referred_object")
+            return referred_object() if referred_object is not None else None
         try:
             return ResourceIdentifier.__resource_id_weak_dict[self.id]
         except KeyError:
@@ -688,6 +802,9 @@ class ResourceIdentifier(object):
         Will also append self again to the global class level reference list so
         everything stays consistent.
         """
+        if self._is_pending():
+            self._referred_object = weakref.ref(referred_object)
+            return
         # If it does not yet exists simply set it.
         if self.id not in ResourceIdentifier.__resource_id_weak_dict:
             ResourceIdentifier.__resource_id_weak_dict[self.id] = \
@@ -789,12 +906,15 @@ class ResourceIdentifier(object):
         """
         if self.fixed:
             return self.__dict__.get("id")
-        else:
-            id = self.prefix
-            if not id.endswith("/"):
-                id += "/"
-            id += self.uuid
-            return id
+        id = self.__dict__.get("_generated_id")
+        if id is None:
+            prefix = self.prefix
+            if prefix.endswith("/"):
+                id = "%s%s" % (prefix, self.uuid)
+            else:
+                id = "%s/%s" % (prefix, self.uuid)
+            self._generated_id = id
+        return id
 
     @id.deleter
     def id(self):
@@ -817,6 +937,7 @@ class ResourceIdentifier(object):
     @prefix.deleter
     def prefix(self):
         self._prefix = ""
+        self._generated_id = None
 
     @prefix.setter
     def prefix(self, value):
@@ -824,9 +945,12 @@ class ResourceIdentifier(object):
             msg = "prefix id needs to be a string."
             raise TypeError(msg)
         self._prefix = value
+        self._generated_id = None
 
     @property
     def uuid(self):
+        if self._is_pending():
+            self._generate_uuid()
         return self._uuid
 
     @uuid.deleter
@@ -891,7 +1015,11 @@ class ResourceIdentifier(object):
         Regenerates the uuid part of the ID. Does nothing for resource
         identifiers with a user-set, fixed id.
         """
+        if self._is_pending():
+            self._generate_uuid()
+            return
         self._uuid = str(uuid4())
+        self._generated_id = None
 
 
 __CreationInfo = _event_type_class_factory(
@@ -3020,41 +3148,20 @@ class Catalog(object):
         2012-04-04T14:21:42.300000Z | +41.818,  +79.689 | 4.4 mb | manual
         2012-04-04T14:08:46.000000Z | +38.017,  +37.736 | 3.0 ML | manual
         """
-        # Helper functions. Only first argument might be None. Avoid
-        # unorderable types by checking first shortcut on positive is None
-        # also for the greater stuff (is confusing but correct)
-        def __is_smaller(value_1, value_2):
-            if value_1 is None or value_1 < value_2:
-                return True
-            return False
-
-        def __is_smaller_or_equal(value_1, value_2):
-            if value_1 is None or value_1 <= value_2:
-                return True
-            return False
-
-        def __is_greater(value_1, value_2):
-            if value_1 is None or value_1 <= value_2:
-                return False
-            return True
-
-        def __is_greater_or_equal(value_1, value_2):
-            if value_1 is None or value_1 < value_2:
-                return False
-            return True
-
-        # Map the function to the operators.
-        operator_map = {"<": __is_smaller,
-                        "<=": __is_smaller_or_equal,
-                        ">": __is_greater,
-                        ">=": __is_greater_or_equal}
+        # Events without a value pass the "smaller" comparisons and fail the
+        # "greater" ones.
+        operator_map = {"<": (np.less, True),
+                        "<=": (np.less_equal, True),
+                        ">": (np.greater, False),
+                        ">=": (np.greater_equal, False)}
 
         try:
             inverse = kwargs["inverse"]
         except KeyError:
             inverse = False
 
-        events = list(self.events)
+        table, has_origin, has_quality = self._get_table()
+        mask = np.ones(len(table), dtype=np.bool_)
         for arg in args:
             try:
                 key, operator, value = arg.split(" ", 2)
@@ -3062,42 +3169,213 @@ class Catalog(object):
                 msg = "%s is not a valid filter rule." % arg
                 raise ValueError(msg)
             if key == "magnitude":
-                temp_events = []
-                for event in events:
-                    if (event.magnitudes and event.magnitudes[0].mag and
-                        operator_map[operator](
-                            event.magnitudes[0].mag,
-                            float(value))):
-                        temp_events.append(event)
-                events = temp_events
+                values = table[key]
+                # events without a (non zero) magnitude never match
+                valid = ~np.isnan(values) & (values != 0)
+                value = float(value)
             elif key in ("longitude", "latitude", "depth", "time"):
-                temp_events = []
-                for event in events:
-                    if (event.origins and key in event.origins[0] and
-                        operator_map[operator](
-                            event.origins[0].get(key),
-                            UTCDateTime(value) if key == 'time' else
-                            float(value))):
-                        temp_events.append(event)
-                events = temp_events
+                valid = has_origin
+                if key == "time":
+                    # compare like UTCDateTime objects do
+                    values = np.round(
+                        table[key] - UTCDateTime(value).timestamp,
+                        UTCDateTime.DEFAULT_PRECISION)
+                    value = 0.0
+                else:
+                    values = table[key]
+                    value = float(value)
             elif key in ('standard_error', 'azimuthal_gap',
                          'used_station_count', 'used_phase_count'):
-                temp_events = []
-                for event in events:
-                    if (event.origins and event.origins[0].quality and
-                        key in event.origins[0].quality and
-                        operator_map[operator](
-                            event.origins[0].quality.get(key),
-                            float(value))):
-                        temp_events.append(event)
-                events = temp_events
+                valid = has_quality
+                values = table[key]
+                value = float(value)
             else:
                 msg = "%s is not a valid filter key" % key
                 raise ValueError(msg)
+            compare, missing = operator_map[operator]
+            with np.errstate(invalid='ignore'):
+                matches = compare(values, value)
+            matches[np.isnan(values)] = missing
+            mask &= valid & matches
         if inverse:
-            events = [ev for ev in self.events if ev not in events]
+            mask = ~mask
+        events = [ev for ev, match in zip(self.events, mask) if match]
         return Catalog(events=events)
 
+    def to_table(self, rebuild=False):
+        """
+        Returns the main parameters of all events as columns of a NumPy
+        structured array.
+
+        Each row describes one event by its preferred origin and magnitude
+        (or the first origin and magnitude if no preferred one is set). The
+        table is computed once and cached. It is rebuilt when events are
+        added, removed or replaced, when origins or magnitudes of an event are
+        added, removed or replaced and after attributes or items of any event
+        type object were set. Use ``rebuild=True`` to force a rebuild after
+        other modifications, e.g. of a preferred origin which is not part of
+        its event.
+
+        ======================  ==================================
+        Field                   Content
+        ======================  ==================================
+        ``time``                Origin time as POSIX timestamp
+        ``latitude``            Origin latitude in degrees
+        ``longitude``           Origin longitude in degrees
+        ``depth``               Origin depth in m
+        ``magnitude``           Magnitude value
+        ``magnitude_type``      Magnitude type
+        ``standard_error``      Origin quality: standard error
+        ``azimuthal_gap``       Origin quality: azimuthal gap
+        ``used_station_count``  Origin quality: used station count
+        ``used_phase_count``    Origin quality: used phase count
+        ``event_id``            Resource identifier of the event
+        ``origin_id``           Resource identifier of the origin
+        ``magnitude_id``        Resource identifier of the magnitude
+        ======================  ==================================
+
+        Missing numeric values are NaN, missing strings are empty.
+
+        :type rebuild: bool
+        :param rebuild: Rebuild the table even if a cached one is valid.
+        :rtype: :class:`numpy.ndarray`
+
+        .. rubric:: Example
+
+        >>> from obspy.core.event import read_events
+        >>> cat = read_events()
+        >>> table = cat.to_table()
+        >>> print(table.dtype.names[:5])
+        ('time', 'latitude', 'longitude', 'depth', 'magnitude')
+        >>> for row in table:
+        ...     print("%.3f %.1f %s" % (row['latitude'], row['magnitude'],
+        ...                             row['magnitude_type']))
+        41.818 4.4 mb
+        39.342 4.3 ML
+        38.017 3.0 ML
+        >>> print("%.1f" % table['magnitude'].mean())
+        3.9
+        """
+        return self._get_table(rebuild=rebuild)[0]
+
+    def _get_table(self, rebuild=False):
+        """
+        Returns the cached table and the masks of all events with an origin
+        and with an origin quality.
+        """
+        # identities of all events and of all their origins and magnitudes,
+        # which include the preferred ones
+        state = (_MODIFICATIONS[0],
+                 [(id(ev), tuple(map(id, ev.origins)),
+                   tuple(map(id, ev.magnitudes))) for ev in self.events])
+        cache = self.__dict__.get("_table_cache")
+        if rebuild or cache is None or cache[0] != state:
+            # release replaced objects before resolving preferred origins and
+            # magnitudes
+            cache = None
+            self.__dict__.pop("_table_cache", None)
+            # the events, origins and magnitudes are referenced by the cache
+            # so their ids are not reused
+            objects = [(ev, tuple(ev.origins), tuple(ev.magnitudes))
+                       for ev in self.events]
+            cache = (state, objects) + self._build_table()
+            self.__dict__["_table_cache"] = cache
+        return cache[2:]
+
+    def _build_table(self):
+        """
+        Collects the table columns, see :meth:`to_table`.
+        """
+        float_keys = ["time", "latitude", "longitude", "depth", "magnitude",
+                      "standard_error", "azimuthal_gap", "used_station_count",
+                      "used_phase_count"]
+        str_keys = ["magnitude_type", "event_id", "origin_id", "magnitude_id"]
+        columns = dict((key, []) for key in float_keys + str_keys)
+        has_origin = []
+        has_quality = []
+
+        def _float(value):
+            return np.nan if value is None else float(value)
+
+        def _str(value):
+            return "" if value is None else str(value)
+
+        def _id(resource_id):
+            return "" if resource_id is None else resource_id.id
+
+        def _preferred(objects, preferred_id, lookup):
+            # look for the preferred object in the event itself first,
+            # resolving the resource identifier is slower
+            if preferred_id is not None:
+                preferred_id = str(preferred_id)
+                for obj in objects:
+                    if obj.resource_id is not None and \
+                            obj.resource_id.id == preferred_id:
+                        return obj
+                obj = lookup()
+                if obj is not None:
+                    return obj
+            return objects[0]
+
+        for event in self.events:
+            # avoid the truth value of event type objects, it is expensive
+            origin = None
+            if event.origins:
+                origin = _preferred(event.origins,
+                                    event.get("preferred_origin_id"),
+                                    event.preferred_origin)
+            magnitude = None
+            if event.magnitudes:
+                magnitude = _preferred(event.magnitudes,
+                                       event.get("preferred_magnitude_id"),
+                                       event.preferred_magnitude)
+            if origin is None:
+                has_origin.append(False)
+                has_quality.append(False)
+                for key in float_keys[:4] + float_keys[5:]:
+                    columns[key].append(np.nan)
+                columns["origin_id"].append("")
+            else:
+                has_origin.append(True)
+                time = origin.time
+                columns["time"].append(
+                    np.nan if time is None else time.timestamp)
+                for key in ("latitude", "longitude", "depth"):
+                    columns[key].append(_float(origin.get(key)))
+                quality = origin.quality
+                values = [None] * 4
+                if quality is not None:
+                    values = [quality.get(key) for key in float_keys[5:]]
+                for i, key in enumerate(float_keys[5:]):
+                    columns[key].append(_float(values[i]))
+                has_quality.append(
+                    any(value is not None for value in values) or
+                    bool(quality))
+                columns["origin_id"].append(_id(origin.resource_id))
+            if magnitude is None:
+                columns["magnitude"].append(np.nan)
+                columns["magnitude_type"].append("")
+                columns["magnitude_id"].append("")
+            else:
+                columns["magnitude"].append(_float(magnitude.mag))
+                columns["magnitude_type"].append(
+                    _str(magnitude.magnitude_type))
+                columns["magnitude_id"].append(_id(magnitude.resource_id))
+            columns["event_id"].append(_id(event.resource_id))
+
+        dtype = [(native_str(key), np.float64) for key in float_keys[:5]]
+        dtype.append((native_str("magnitude_type"), np.unicode_,
+                      max([1] + [len(x) for x in columns["magnitude_type"]])))
+        dtype += [(native_str(key), np.float64) for key in float_keys[5:]]
+        dtype += [(native_str(key), np.unicode_,
+                   max([1] + [len(x) for x in columns[key]]))
+                  for key in str_keys[1:]]
+        table = np.empty(len(self.events), dtype=dtype)
+        for key, values in columns.items():
+            table[key] = values
+        return (table, np.array(has_origin, dtype=np.bool_),
+                np.array(has_quality, dtype=np.bool_))
+
     def copy(self):
         """
         Returns a deepcopy of the Catalog object.
@@ -247,3 +247,203 @@ def resample_preview(trace, samples, method='accurate'):
         return npts - int(samples * step)
     else:
         raise NotImplementedError('Unknown method')
+
+
+class MinMaxPyramid(object):
+    """
+    Minimum and maximum values of a trace at power of two decimation levels.
+
+    Level ``2**k`` holds the minimum and maximum of every ``2**k`` successive
+    samples, each level being computed from the next finer one. The minimum
+    and maximum of arbitrary sample ranges, e.g. the pixels of a waveform
+    plot, can then be taken from the coarsest level which still resolves
+    the ranges instead of the full data.
+
+    Attach a pyramid as ``trace.stats.minmax_pyramid`` to use it in
+    :meth:`~obspy.core.stream.Stream.plot`. It is used as long as the trace
+    lies within the time span of the pyramid and the samples of the trace
+    still match the checkpoints the pyramid keeps of every ``stride``-th
+    sample, so pyramids of processed (e.g. filtered) traces are ignored.
+    Copies of a trace share the same pyramid.
+
+    :type trace: :class:`~obspy.core.trace.Trace`
+    :param trace: Trace object to compute the pyramid for. Masked samples
+        are ignored.
+
+    .. rubric:: Example
+
+    >>> from obspy import read
+    >>> tr = read()[0]
+    >>> pyramid = MinMaxPyramid(tr)
+    >>> print(pyramid)  # doctest: +ELLIPSIS
+    MinMaxPyramid BW.RJOB..EHZ | 2009-08-24T00:20:03.000000Z | 100.0 Hz, \
+3000 samples, 12 levels
+    >>> tr.stats.minmax_pyramid = pyramid
+    """
+    #: Maximum number of samples kept as checkpoints of the data
+    max_checkpoints = 2 ** 16
+
+    def __init__(self, trace=None):
+        self.levels = {}
+        if trace is None:
+            self.id = ''
+            self.starttime = UTCDateTime(0)
+            self.sampling_rate = 1.0
+            self.npts = 0
+            self.stride = 1
+            self.checkpoints = np.empty(0, dtype=np.float64)
+            return
+        self.id = trace.id
+        self.starttime = trace.stats.starttime
+        self.sampling_rate = trace.stats.sampling_rate
+        self.npts = len(trace.data)
+        data = trace.data
+        if isinstance(data, np.ma.masked_array):
+            data = np.ma.filled(data.astype(np.float64), np.nan)
+        self.stride = max(1, -(-self.npts // self.max_checkpoints))
+        self.checkpoints = data[::self.stride].astype(np.float64)
+        mins = maxs = data
+        factor = 1
+        while len(mins) > 1:
+            if len(mins) % 2:
+                mins = np.concatenate([mins, mins[-1:]])
+                maxs = np.concatenate([maxs, maxs[-1:]])
+            # fmin/fmax skip the NaN values of masked samples
+            mins = np.fmin(mins[0::2], mins[1::2])
+            maxs = np.fmax(maxs[0::2], maxs[1::2])
+            factor *= 2
+            self.levels[factor] = (mins, maxs)
+
+    def __str__(self):
+        return "MinMaxPyramid %s | %s | %.1f Hz, %d samples, %d levels" % (
+            self.id, self.starttime, self.sampling_rate, self.npts,
+            len(self.levels))
+
+    def __deepcopy__(self, memo):
+        # the pyramid is never modified, copies of a trace can share it
+        return self
+
+    def sample_offset(self, trace):
+        """
+        Returns the index of the first sample of the trace within the
+        pyramid or ``None`` if the sampling rates differ or the trace does
+        not start on a sample of the pyramid.
+        """
+        if trace.stats.sampling_rate != self.sampling_rate:
+            return None
+        offset = (trace.stats.starttime - self.starttime) * \
+            self.sampling_rate
+        if abs(offset - round(offset)) > 1e-3:
+            return None
+        return int(round(offset))
+
+    def covers(self, trace):
+        """
+        Checks if all samples of the trace lie within the pyramid and match
+        the checkpoints of the pyramid. Traces without any checkpoint, i.e.
+        shorter than ``stride`` samples, are never covered.
+        """
+        offset = self.sample_offset(trace)
+        if offset is None or offset < 0 or \
+                offset + len(trace.data) > self.npts:
+            return False
+        # data changed since the pyramid was computed, e.g. by processing
+        first = -(-offset // self.stride)
+        indices = np.arange(first * self.stride, offset + len(trace.data),
+                            self.stride) - offset
+        if not len(indices):
+            return False
+        data = trace.data[indices]
+        if isinstance(data, np.ma.masked_array):
+            data = np.ma.filled(data.astype(np.float64), np.nan)
+        data = data.astype(np.float64)
+        expected = self.checkpoints[first:first + len(indices)]
+        return bool(np.all((data == expected) |
+                           (np.isnan(data) & np.isnan(expected))))
+
+    def min_max(self, bounds):
+        """
+        Returns the minimum and maximum values of consecutive sample ranges.
+
+        Range ``i`` spans the samples ``bounds[i]`` up to but excluding
+        ``bounds[i + 1]``, counted from the start of the pyramid. The level
+        is chosen by the median length of the ranges: the ranges are resolved
+        to ``2**k`` samples at the largest ``2**k`` not exceeding an eighth
+        of that length, so the values are exact for range boundaries at
+        multiples of ``2**k``. Otherwise boundaries are rounded down to the
+        next multiple of ``2**k``, i.e. a range includes at most
+        ``2**k - 1`` samples of the preceding range and misses as many at its
+        end, except for the last range whose end is rounded up. Ranges
+        outside of the pyramid or without any unmasked samples are masked.
+
+        :type bounds: :class:`numpy.ndarray`
+        :param bounds: Monotonically increasing sample indices.
+        :rtype: tuple of two :class:`numpy.ma.MaskedArray`
+        :return: Minimum and maximum value of each range or ``None`` if the
+            ranges are too short to benefit from the pyramid.
+        """
+        bounds = np.asarray(bounds, dtype=np.int64)
+        length = np.median(np.diff(bounds)) / 8.0
+        factor = 2
+        while factor * 2 <= length and factor * 2 in self.levels:
+            factor *= 2
+        if factor > length or factor not in self.levels:
+            return None
+        mins, maxs = self.levels[factor]
+        bounds = np.clip(bounds, 0, self.npts)
+        empty = bounds[1:] <= bounds[:-1]
+        starts = np.minimum(bounds[:-1] // factor, len(mins) - 1)
+        end = -(-bounds[-1] // factor)
+        # the trailing index only limits the last range and is dropped again
+        indices = np.append(starts, end) if end < len(mins) else starts
+        # fmin/fmax skip the NaN values of fully masked blocks, a range is
+        # only NaN if all of its blocks are
+        min_ = np.fmin.reduceat(mins, indices)[:len(starts)]
+        max_ = np.fmax.reduceat(maxs, indices)[:len(starts)]
+        if min_.dtype.kind == 'f':
+            empty |= np.isnan(min_)
+        return (np.ma.masked_array(min_, mask=empty),
+                np.ma.masked_array(max_, mask=empty))
+
+    def save(self, filename):
+        """
+        Writes the pyramid into a NumPy ``.npz`` file, e.g. next to the
+        waveform file it was computed from.
+        """
+        arrays = {}
+        for factor, (mins, maxs) in self.levels.items():
+            arrays[native_str('min_%d' % factor)] = mins
+            arrays[native_str('max_%d' % factor)] = maxs
+        np.savez(filename, id=np.array(native_str(self.id)),
+                 starttime=np.array(native_str(self.starttime)),
+                 sampling_rate=np.array(self.sampling_rate),
+                 npts=np.array(self.npts), stride=np.array(self.stride),
+                 checkpoints=self.checkpoints, **arrays)
+
+    @classmethod
+    def load(cls, filename):
+        """
+        Reads a pyramid written by :meth:`MinMaxPyramid.save`.
+        """
+        pyramid = cls()
+        npz = np.load(filename)
+        try:
+            pyramid.id = str(npz['id'])
+            pyramid.starttime = UTCDateTime(str(npz['starttime']))
+            pyramid.sampling_rate = float(npz['sampling_rate'])
+            pyramid.npts = int(npz['npts'])
+            pyramid.stride = int(npz['stride'])
+            pyramid.checkpoints = npz['checkpoints']
+            for key in npz.files:
+                if key.startswith('min_'):
+                    factor = int(key[4:])
+                    pyramid.levels[factor] = (npz[key],
+                                              npz['max_%d' % factor])
+        finally:
+            npz.close()
+        return pyramid
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod(exclude_empty=True)
@@ -755,6 +755,10 @@ class Stream(object):
         is done. This method only compares the start and end times of the
         Traces.
 
+        .. seealso:: :func:`obspy.core.availability.get_gaps` and
+            :func:`obspy.core.availability.get_coverage` for the analysis of
+            very large numbers of traces or Mini-SEED records.
+
         .. rubric:: Example
 
         Our example stream has no gaps:
@@ -2581,10 +2585,15 @@ seismometer_correction_simulation.html#using-a-resp-file>`_.
                     comp.stats.inclination = inclination
         return self
 
-    def copy(self):
+    def copy(self, copy_on_write=False):
         """
         Return a deepcopy of the Stream object.
 
+        :type copy_on_write: bool, optional
+        :param copy_on_write: If ``True``, the traces share their data arrays
+            read-only with the traces of the original stream until they get
+            processed. See :meth:`Trace.copy()
+            <obspy.core.trace.Trace.copy>` for details.
         :rtype: :class:`~obspy.core.stream.Stream`
         :return: Copy of current stream.
 
@@ -2615,8 +2624,20 @@ seismometer_correction_simulation.html#using-a-resp-file>`_.
             True
             >>> st == st3
             True
+
+        3. A copy on write only duplicates the data of traces that get
+           processed:
+
+            >>> st4 = st.copy(copy_on_write=True)
+            >>> st4 == st
+            True
+            >>> st4[0].data is st[0].data
+            True
         """
-        return copy.deepcopy(self)
+        if not copy_on_write:
+            return copy.deepcopy(self)
+        memo = dict((id(tr), tr.copy(copy_on_write=True)) for tr in self)
+        return copy.deepcopy(self, memo)
 
     def clear(self):
         """
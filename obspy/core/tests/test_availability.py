@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+from future.builtins import *  # NOQA
+
+import io
+import unittest
+
+import numpy as np
+
+from obspy import Stream, Trace, UTCDateTime
+from obspy.core.availability import (get_coverage, get_gaps,
+                                     segments_from_mseed_headers,
+                                     segments_from_stream)
+from obspy.io.mseed.util import unpack_records
+
+
+class AvailabilityTestCase(unittest.TestCase):
+    """
+    Test suite for obspy.core.availability.
+    """
+    def _random_stream(self, ntraces=200):
+        """
+        Traces of two channels with gaps of at least two and overlaps of at
+        least three samples (Stream.getGaps() ignores overlaps of two
+        samples), every overlap only involves two traces.
+        """
+        rng = np.random.RandomState(815)
+        st = Stream()
+        for channel in ("HHZ", "HHN"):
+            t = UTCDateTime(2015, 1, 1)
+            for _i in range(ntraces):
+                npts = rng.randint(25, 100)
+                tr = Trace(np.zeros(npts), header={
+                    "network": "XX", "station": "A", "channel": channel,
+                    "sampling_rate": 10.0, "starttime": t})
+                st.append(tr)
+                # contiguous, gap or overlap of the next trace
+                shift = rng.choice([0, 0, rng.randint(2, 50),
+                                    -rng.randint(3, 11)])
+                t = tr.stats.endtime + (1 + shift) * 0.1
+        return st
+
+    def test_get_gaps_like_stream_get_gaps(self):
+        """
+        Gaps and partial overlaps are the same as found by Stream.getGaps().
+        """
+        st = self._random_stream()
+        expected = st.getGaps()
+        self.assertTrue(any(gap[6] > 0 for gap in expected))
+        self.assertTrue(any(gap[6] < 0 for gap in expected))
+        gaps = get_gaps(*segments_from_stream(st))
+        self.assertEqual(len(gaps), len(expected))
+        for gap, exp in zip(gaps, expected):
+            self.assertEqual(gap['id'], ".".join(exp[:4]))
+            self.assertAlmostEqual(gap['starttime'] / 1e9, exp[4].timestamp,
+                                   5)
+            self.assertAlmostEqual(gap['endtime'] / 1e9, exp[5].timestamp, 5)
+            self.assertAlmostEqual(gap['duration'], exp[6], 5)
+            self.assertEqual(gap['samples'], exp[7])
+        # min_gap and max_gap
+        gaps = get_gaps(*segments_from_stream(st), min_gap=1.0, max_gap=3.0)
+        self.assertEqual(len(gaps), len(st.getGaps(min_gap=1.0, max_gap=3.0)))
+        self.assertTrue(((gaps['duration'] >= 1.0) &
+                         (gaps['duration'] <= 3.0)).all())
+
+    def test_get_coverage(self):
+        """
+        Covered time counts overlapping data once, per id and per interval.
+        """
+        ids = np.array(["XX.A..HHZ"] * 4 + ["XX.B..HHZ"])
+        day = 86400 * 10 ** 9
+        t0 = UTCDateTime(2015, 1, 1).timestamp * 10 ** 9
+        # 1 Hz data: 12 hours on day one, overlapping a second segment which
+        # ends after 6 hours on day two, 1 hour each on day two and four
+        starts = np.array([0, 6 * 3600, 36 * 3600, 3 * 86400, 0],
+                          dtype=np.int64) * 10 ** 9 + int(t0)
+        ends = starts + np.array([12 * 3600, 24 * 3600, 3600, 3600, 60],
+                                 dtype=np.int64) * 10 ** 9 - 10 ** 9
+        rates = np.ones(5)
+        coverage = get_coverage(ids, starts, ends, rates)
+        self.assertEqual(list(coverage['id']), ["XX.A..HHZ", "XX.B..HHZ"])
+        self.assertEqual(list(coverage['covered']), [32 * 3600.0, 60.0])
+        self.assertEqual(coverage['starttime'][0], int(t0))
+        self.assertEqual(coverage['endtime'][0], int(t0) + 3 * day + 3600e9)
+        self.assertAlmostEqual(coverage['percentage'][0],
+                               100.0 * 32 / (3 * 24 + 1))
+        self.assertEqual(coverage['percentage'][1], 100.0)
+        # daily in a fixed window, days without data are included
+        coverage = get_coverage(ids, starts, ends, rates,
+                                starttime=UTCDateTime(2015, 1, 1),
+                                endtime=UTCDateTime(2015, 1, 5),
+                                interval=86400)
+        self.assertEqual(len(coverage), 8)
+        self.assertEqual(list(coverage['covered'][:4] / 3600),
+                         [24.0, 7.0, 0.0, 1.0])
+        self.assertEqual(list(coverage['percentage'][:4] * 24 / 100),
+                         [24.0, 7.0, 0.0, 1.0])
+        self.assertEqual(list((coverage['starttime'][:5] - t0) / day),
+                         [0, 1, 2, 3, 0])
+        self.assertEqual(coverage['covered'][4], 60.0)
+        # a gap of less than half a sample is covered
+        ends[0] += 10 ** 9 // 2
+        starts[1] = ends[0] + 1.4 * 10 ** 9
+        coverage = get_coverage(ids[:2], starts[:2], ends[:2], rates[:2])
+        self.assertEqual(coverage['percentage'][0], 100.0)
+        self.assertEqual(len(get_gaps(ids[:2], starts[:2], ends[:2],
+                                      rates[:2])), 0)
+
+    def test_segments_from_mseed_headers(self):
+        """
+        Gaps from Mini-SEED record headers match the ones of the stream.
+        """
+        st = self._random_stream(20)
+        for tr in st:
+            tr.data = tr.data.astype(np.int32)
+        buf = io.BytesIO()
+        st.write(buf, format="MSEED", reclen=256, encoding="STEIM1")
+        headers, _ = unpack_records(buf.getvalue(), headonly=True)
+        ids, starts, ends, rates = segments_from_mseed_headers(headers)
+        self.assertEqual(len(ids), len(headers))
+        gaps = get_gaps(ids, starts, ends, rates)
+        expected = get_gaps(*segments_from_stream(st))
+        np.testing.assert_array_equal(gaps['id'].astype(np.str_),
+                                      expected['id'])
+        np.testing.assert_array_equal(gaps['samples'], expected['samples'])
+        # the record start times are rounded to microseconds
+        for key in ('starttime', 'endtime'):
+            self.assertTrue((np.abs(gaps[key] - expected[key]) <= 1000).all())
+
+
+def suite():
+    return unittest.makeSuite(AvailabilityTestCase, 'test')
+
+
+if __name__ == '__main__':
+    unittest.main(defaultTest='suite')
@@ -6,11 +6,16 @@ from future.builtins import *  # NOQA
 import copy
 import os
 import sys
+import threading
 import unittest
 import warnings
 
-from obspy.core.event import (Catalog, Comment, CreationInfo, Event, Origin,
-                              Pick, ResourceIdentifier, WaveformStreamID,
+import numpy as np
+
+from obspy.core.event import (Catalog, Comment, CreationInfo, Event,
+                              Magnitude, Origin, Pick, ResourceIdentifier,
+                              WaveformStreamID, _CONSTRUCTION,
+                              _MODIFICATIONS, bulk_construction,
                               read_events)
 from obspy.core.utcdatetime import UTCDateTime
 from obspy.core.util.base import get_basemap_version, get_cartopy_version
@@ -422,6 +427,119 @@ class CatalogTestCase(unittest.TestCase):
             self.assertTrue(all(event in cat_smaller
                                 for event in cat_bigger_inverse))
 
+    def test_to_table(self):
+        """
+        Tests the columnar view of a catalog, its caching and filtering on
+        events with missing values.
+        """
+        cat = read_events()
+        table = cat.to_table()
+        self.assertEqual(len(table), 3)
+        for row, event in zip(table, cat):
+            origin = event.origins[0]
+            self.assertEqual(row['time'], origin.time.timestamp)
+            self.assertEqual(row['latitude'], origin.latitude)
+            self.assertEqual(row['depth'], origin.depth)
+            self.assertEqual(row['magnitude'], event.magnitudes[0].mag)
+            self.assertEqual(row['magnitude_type'],
+                             event.magnitudes[0].magnitude_type)
+            self.assertEqual(row['event_id'], str(event.resource_id))
+            self.assertEqual(row['origin_id'], str(origin.resource_id))
+        # cached as long as nothing changes
+        self.assertTrue(cat.to_table() is table)
+        self.assertFalse(cat.to_table(rebuild=True) is table)
+        table = cat.to_table()
+        # setting attributes invalidates the table
+        cat[0].origins[0].latitude = 10.0
+        self.assertEqual(cat.to_table()[0]['latitude'], 10.0)
+        self.assertEqual(len(cat.filter("latitude < 11")), 1)
+        # the preferred origin and magnitude are used
+        origin = Origin(time=UTCDateTime(2012, 4, 4, 14), latitude=60.0,
+                        longitude=10.0)
+        cat[1].origins.append(origin)
+        self.assertEqual(cat.to_table()[1]['latitude'],
+                         cat[1].origins[0].latitude)
+        cat[1].preferred_origin_id = str(origin.resource_id)
+        table = cat.to_table()
+        self.assertEqual(table[1]['latitude'], 60.0)
+        self.assertEqual(table[1]['origin_id'], str(origin.resource_id))
+        self.assertTrue(np.isnan(table[1]['depth']))
+        # the preferred origin has no quality
+        self.assertTrue(np.isnan(table[1]['azimuthal_gap']))
+        self.assertEqual(len(cat.filter("azimuthal_gap < 360")), 2)
+        # events without origins and magnitudes
+        cat.append(Event(magnitudes=[Magnitude(mag=0.0)]))
+        table = cat.to_table()
+        self.assertEqual(len(table), 4)
+        self.assertTrue(np.isnan(table[3]['time']))
+        self.assertEqual(table[3]['origin_id'], "")
+        self.assertEqual(table[3]['magnitude'], 0.0)
+        # missing depths pass "smaller" comparisons, but only for events
+        # with origins; zero magnitudes never match
+        self.assertEqual([ev.resource_id for ev in cat.filter("depth < 0")],
+                         [cat[1].resource_id])
+        self.assertEqual(len(cat.filter("depth > -1")), 2)
+        self.assertEqual(len(cat.filter("magnitude < 5")), 3)
+        self.assertTrue(cat.filter("depth < 0", inverse=True)[-1] is cat[3])
+        self.assertEqual(
+            [ev.resource_id for ev in cat.filter(
+                "time >= 2012-04-04T14:00", "time < 2012-04-04T14:08:46")],
+            [cat[1].resource_id])
+        self.assertRaises(ValueError, cat.filter, "distance < 5")
+
+    def test_filter_in_place_modifications(self):
+        """
+        Catalog.filter() uses the cached table, which is rebuilt after
+        in-place modifications of the events.
+        """
+        cat = read_events()
+        self.assertEqual(len(cat.filter("latitude > 40")), 1)
+        self.assertEqual(len(cat.filter("magnitude > 4")), 2)
+        table = cat.to_table()
+        self.assertEqual(len(cat.filter("magnitude > 4")), 2)
+        self.assertTrue(cat.to_table() is table)
+        # replacing an origin keeps identity and length of the list
+        cat[1].origins[0] = Origin(latitude=45.0, longitude=10.0,
+                                   time=cat[1].origins[0].time)
+        self.assertEqual(len(cat.filter("latitude > 40")), 2)
+        self.assertFalse(cat.to_table() is table)
+        # item assignment
+        table = cat.to_table()
+        cat[2].magnitudes[0]['mag'] = 9.0
+        self.assertEqual(len(cat.filter("magnitude > 4")), 3)
+        self.assertFalse(cat.to_table() is table)
+        self.assertEqual(cat.to_table()[2]['magnitude'], 9.0)
+        # replacing an event
+        table = cat.to_table()
+        cat[0] = cat[1].copy()
+        self.assertEqual(len(cat.filter("latitude > 40")), 2)
+        self.assertFalse(cat.to_table() is table)
+        # filtering again reuses the table
+        table = cat.to_table()
+        cat.filter("latitude > 40")
+        self.assertTrue(cat.to_table() is table)
+
+    def test_modifications_while_constructing(self):
+        """
+        Objects created in another thread do not hide modifications.
+        """
+        cat = read_events()
+        table = cat.to_table()
+        modifications = _MODIFICATIONS[0]
+        # a modification while an object is constructed in this thread
+        _CONSTRUCTION.depth = 1
+        try:
+            thread = threading.Thread(target=setattr,
+                                      args=(cat[0].origins[0], 'depth', 1.0))
+            thread.start()
+            thread.join()
+        finally:
+            _CONSTRUCTION.depth = 0
+        Origin()
+        self.assertNotEqual(_MODIFICATIONS[0], modifications)
+        self.assertFalse(cat.to_table() is table)
+        self.assertEqual(cat.to_table()[0]['depth'], 1.0)
+
     def test_catalog_resource_id(self):
         """
         See #662
@@ -656,7 +774,12 @@ class ResourceIdentifierTestCase(unittest.TestCase):
         # Give it a reference and it will stick around.
         obj = UTCDateTime()
         _r3 = ResourceIdentifier(referred_object=obj)  # NOQA
+        # It is registered once the id is generated.
+        self.assertEqual(len(list(r_dict.keys())), 0)
+        self.assertTrue(_r3.get_referred_object() is obj)
+        _r3.id
         self.assertEqual(len(list(r_dict.keys())), 1)
+        self.assertTrue(_r3.get_referred_object() is obj)
 
     def test_adding_a_referred_object_after_creation(self):
         """
@@ -690,7 +813,8 @@ class ResourceIdentifierTestCase(unittest.TestCase):
         obj_b = UTCDateTime()
         res1 = ResourceIdentifier(referred_object=obj_a)
         res2 = ResourceIdentifier(referred_object=obj_b)
-        # Now two keys should be in the global dict.
+        # Generate the ids, now two keys should be in the global dict.
+        res1.id, res2.id
         rdict = ResourceIdentifier._ResourceIdentifier__resource_id_weak_dict
         self.assertEqual(len(list(rdict.keys())), 2)
         # Deleting the objects should also remove the from the dictionary.
@@ -819,6 +943,48 @@ class ResourceIdentifierTestCase(unittest.TestCase):
                 ResourceIdentifier._ResourceIdentifier__resource_id_weak_dict),
             {})
 
+    def test_lazy_uuid_generation(self):
+        """
+        The uuid of a generated id is only created when it is needed, copies
+        share the id of the original.
+        """
+        tracker = ResourceIdentifier._ResourceIdentifier__resource_id_tracker
+        pick = Pick()
+        rid = pick.resource_id
+        self.assertTrue(rid._is_pending())
+        self.assertEqual(dict(tracker), {})
+        self.assertTrue(rid.get_referred_object() is pick)
+        pick_copy = copy.deepcopy(pick)
+        self.assertFalse(rid._is_pending())
+        self.assertEqual(pick_copy.resource_id.id, rid.id)
+        self.assertIn(rid.id, tracker)
+        self.assertTrue(rid.get_referred_object() is not None)
+        # the id is cached until the uuid or the prefix are changed
+        old_id = rid.id
+        rid.regenerate_uuid()
+        self.assertNotEqual(rid.id, old_id)
+        rid.prefix = "smi:local/test"
+        self.assertTrue(rid.id.startswith("smi:local/test/"))
+
+    def test_bulk_construction(self):
+        """
+        Objects created inside bulk_construction() are not registered as
+        referred objects.
+        """
+        r_dict = ResourceIdentifier._ResourceIdentifier__resource_id_weak_dict
+        with bulk_construction():
+            picks = [Pick(resource_id="smi:local/pick/%d" % _i)
+                     for _i in range(3)]
+            with bulk_construction():
+                pass
+            pick = Pick(resource_id="smi:local/pick/nested")
+        self.assertEqual(len(r_dict), 0)
+        self.assertEqual(picks[0].resource_id.get_referred_object(), None)
+        self.assertEqual(pick.resource_id.get_referred_object(), None)
+        # outside of the block objects are registered again
+        pick = Pick(resource_id="smi:local/pick/after")
+        self.assertTrue(pick.resource_id.get_referred_object() is pick)
+
 
 def suite():
     suite = unittest.TestSuite()
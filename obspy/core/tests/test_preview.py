@@ -8,7 +8,9 @@ import unittest
 import numpy as np
 
 from obspy import Stream, Trace, UTCDateTime
-from obspy.core.preview import create_preview, merge_previews, resample_preview
+from obspy.core.preview import (MinMaxPyramid, create_preview, merge_previews,
+                                resample_preview)
+from obspy.core.util import NamedTemporaryFile
 
 
 class UtilTestCase(unittest.TestCase):
@@ -211,6 +213,105 @@ class UtilTestCase(unittest.TestCase):
         tr.stats.sampling_rate = 1
         create_preview(tr)
 
+    def test_minMaxPyramid(self):
+        """
+        Tests minimum and maximum values of sample ranges from a pyramid.
+        """
+        rng = np.random.RandomState(815)
+        tr = Trace(data=rng.randint(-1000, 1000, 10001).astype(np.int32))
+        tr.stats.starttime = UTCDateTime(2012, 1, 1)
+        tr.stats.sampling_rate = 20.0
+        pyramid = MinMaxPyramid(tr)
+        self.assertEqual(sorted(pyramid.levels), [2 ** k for k in
+                                                  range(1, 15)])
+        self.assertEqual(len(pyramid.levels[2][0]), 5001)
+        np.testing.assert_array_equal(pyramid.levels[2 ** 14][0],
+                                      [tr.data.min()])
+        np.testing.assert_array_equal(pyramid.levels[2 ** 14][1],
+                                      [tr.data.max()])
+        # ranges resolved by a level are exact, range 3 exceeds the data
+        bounds = np.array([0, 64, 128, 10001, 10100])
+        min_, max_ = pyramid.min_max(bounds)
+        np.testing.assert_array_equal(min_.mask, [False] * 3 + [True])
+        for i in range(3):
+            data = tr.data[bounds[i]:bounds[i + 1]]
+            self.assertEqual(min_[i], data.min())
+            self.assertEqual(max_[i], data.max())
+        # too short ranges can not be taken from the pyramid
+        self.assertEqual(pyramid.min_max([0, 10, 20]), None)
+        # sample offset of slices
+        tr2 = tr.slice(tr.stats.starttime + 10)
+        self.assertEqual(pyramid.sample_offset(tr2), 200)
+        self.assertTrue(pyramid.covers(tr2))
+        tr2.stats.starttime -= 20
+        self.assertFalse(pyramid.covers(tr2))
+        tr2.stats.starttime += 0.01
+        self.assertEqual(pyramid.sample_offset(tr2), None)
+        # processed data is not covered any more
+        tr2 = tr.slice(tr.stats.starttime + 10)
+        tr2.filter('highpass', freq=1.0)
+        self.assertFalse(pyramid.covers(tr2))
+        tr2 = tr.slice(tr.stats.starttime + 10)
+        tr2.data = tr2.data * 2
+        self.assertFalse(pyramid.covers(tr2))
+        # copies of a trace share the pyramid
+        tr.stats.minmax_pyramid = pyramid
+        self.assertTrue(tr.copy().stats.minmax_pyramid is pyramid)
+        # save and load
+        with NamedTemporaryFile(suffix='.npz') as tf:
+            pyramid.save(tf.name)
+            pyramid2 = MinMaxPyramid.load(tf.name)
+        self.assertEqual(str(pyramid2), str(pyramid))
+        self.assertEqual(pyramid2.starttime, tr.stats.starttime)
+        self.assertEqual(sorted(pyramid2.levels), sorted(pyramid.levels))
+        self.assertTrue(pyramid2.covers(tr))
+        for factor, (mins, maxs) in pyramid.levels.items():
+            np.testing.assert_array_equal(pyramid2.levels[factor][0], mins)
+            np.testing.assert_array_equal(pyramid2.levels[factor][1], maxs)
+
+    def test_minMaxPyramidCheckpoints(self):
+        """
+        Long traces are checked at every ``stride``-th sample.
+        """
+        tr = Trace(data=np.arange(200000, dtype=np.int32))
+        pyramid = MinMaxPyramid(tr)
+        self.assertEqual(pyramid.stride, 4)
+        self.assertEqual(len(pyramid.checkpoints), 50000)
+        self.assertTrue(pyramid.covers(tr))
+        # slices are checked at the checkpoints within them
+        self.assertTrue(pyramid.covers(tr.slice(tr.stats.starttime + 1001,
+                                                tr.stats.starttime + 1004)))
+        self.assertFalse(pyramid.covers(tr.slice(tr.stats.starttime + 1001,
+                                                 tr.stats.starttime + 1003)))
+        tr2 = tr.copy()
+        tr2.data[1001] += 1
+        self.assertTrue(pyramid.covers(tr2))
+        tr2.data[1004] += 1
+        self.assertFalse(pyramid.covers(tr2))
+
+    def test_minMaxPyramidWithMaskedArrays(self):
+        """
+        Masked samples are ignored and ranges without data are masked.
+        """
+        tr = Trace(data=np.ma.arange(1000))
+        tr.data[128:320] = np.ma.masked
+        pyramid = MinMaxPyramid(tr)
+        min_, max_ = pyramid.min_max(np.append(np.arange(0, 1000, 64), 1000))
+        np.testing.assert_array_equal(
+            min_.mask, [False] * 2 + [True] * 3 + [False] * 11)
+        self.assertEqual(max_[1], 127)
+        self.assertEqual(min_[5], 320)
+        self.assertEqual(max_[-1], 999)
+        # a short masked run within a range
+        tr = Trace(data=np.ma.arange(1000))
+        tr.data[150:160] = np.ma.masked
+        pyramid = MinMaxPyramid(tr)
+        bounds = np.append(np.arange(0, 1000, 104), 1000)
+        min_, max_ = pyramid.min_max(bounds)
+        self.assertFalse(min_.mask.any())
+        np.testing.assert_array_equal(min_, bounds[:-1])
+        np.testing.assert_array_equal(max_, bounds[1:] - 1)
+
 
 def suite():
     return unittest.makeSuite(UtilTestCase, 'test')
@@ -1743,6 +1743,29 @@ class StreamTestCase(unittest.TestCase):
         self.assertEqual(st.traces[0], st2.traces[0])
         self.assertFalse(st.traces[0] is st2.traces[0])
 
+    def test_copy_on_write(self):
+        """
+        Processing a stream copied on write leaves the original untouched.
+        """
+        st = read()
+        original = [tr.data.copy() for tr in st]
+        st2 = st.copy(copy_on_write=True)
+        self.assertEqual(st, st2)
+        for tr, tr2 in zip(st, st2):
+            self.assertFalse(tr is tr2)
+            self.assertTrue(np.may_share_memory(tr.data, tr2.data))
+        st2.filter('bandpass', freqmin=1.0, freqmax=10.0)
+        st2.pop(0)
+        st2[0].stats.channel = 'XXX'
+        self.assertEqual(len(st), 3)
+        self.assertEqual(st[1].stats.channel, 'EHN')
+        for tr, data in zip(st, original):
+            np.testing.assert_array_equal(tr.data, data)
+            self.assertFalse('processing' in tr.stats)
+        for tr in st2:
+            self.assertFalse(np.may_share_memory(tr.data, st[0].data))
+            self.assertEqual(len(tr.stats.processing), 1)
+
     def test_merge_with_empty_trace(self):
         """
         Merging a stream containing a empty trace with a differing sampling
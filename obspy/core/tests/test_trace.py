@@ -1931,6 +1931,78 @@ class TraceTestCase(unittest.TestCase):
         self.assertRaises(ValueError, tr.resample,
                           sampling_rate=0.5, window=window, no_filter=True)
 
+    def test_copy_on_write(self):
+        """
+        Copies on write share the data until a trace gets processed or its
+        data gets reassigned.
+        """
+        tr = read()[0]
+        tr.stats.mseed = {'dataquality': 'D'}
+        original = tr.data.copy()
+        tr2 = tr.copy(copy_on_write=True)
+        self.assertEqual(tr, tr2)
+        self.assertTrue(np.may_share_memory(tr.data, tr2.data))
+        # the shared data can not be modified in place by either trace
+        for trace in (tr, tr2):
+            self.assertFalse(trace.data.flags.writeable)
+            with self.assertRaises(ValueError):
+                trace.data[0] = 1.0
+        # stats are independent
+        tr2.stats.station = 'XXX'
+        tr2.stats.mseed.dataquality = 'Q'
+        tr2.stats.response = None
+        self.assertEqual(tr.stats.station, 'RJOB')
+        self.assertEqual(tr.stats.mseed.dataquality, 'D')
+        self.assertIsNotNone(tr.stats.response)
+        # processing the copy does not touch the original and vice versa
+        tr3 = tr.copy(copy_on_write=True)
+        tr2.detrend('demean')
+        tr2.taper(0.05)
+        tr2.normalize()
+        self.assertFalse(np.may_share_memory(tr.data, tr2.data))
+        self.assertFalse('processing' in tr.stats)
+        self.assertEqual(len(tr2.stats.processing), 3)
+        np.testing.assert_array_equal(tr.data, original)
+        tr.filter('lowpass', freq=1.0)
+        tr.simulate(paz_remove={'poles': [-4.440 + 4.440j, -4.440 - 4.440j],
+                                'zeros': [0j, 0j], 'gain': 1.0,
+                                'sensitivity': 1.0})
+        tr.trim(tr.stats.starttime + 1, tr.stats.endtime - 1)
+        self.assertTrue(tr.data.flags.writeable)
+        self.assertEqual(len(tr.stats.processing), 3)
+        self.assertEqual(len(tr2.stats.processing), 3)
+        self.assertFalse('processing' in tr3.stats)
+        np.testing.assert_array_equal(tr3.data, original)
+        # reassigning data gives a private array
+        tr4 = tr3.copy(copy_on_write=True)
+        tr4.data = tr4.data * 2
+        tr4.data[0] = 0.0
+        self.assertEqual(tr4.stats.npts, len(original))
+        np.testing.assert_array_equal(tr3.data, original)
+        # a reassigned slice still is shared until processed
+        tr5 = tr3.copy(copy_on_write=True)
+        tr5.data = tr5.data[100:]
+        self.assertTrue(np.may_share_memory(tr3.data, tr5.data))
+        tr5.detrend('linear')
+        np.testing.assert_array_equal(tr3.data, original)
+        # trimming and slicing keep sharing the data
+        tr6 = tr3.copy(copy_on_write=True)
+        for trace in (tr6.slice(tr6.stats.starttime + 1),
+                      tr3.slice(endtime=tr3.stats.endtime - 1),
+                      tr6.trim(tr6.stats.starttime + 2)):
+            self.assertTrue(np.may_share_memory(trace.data, tr3.data))
+            self.assertFalse(trace.data.flags.writeable)
+        tr6.taper(0.05)
+        self.assertFalse(np.may_share_memory(tr6.data, tr3.data))
+        np.testing.assert_array_equal(tr3.data, original)
+        # masked arrays are always copied
+        tr7 = Trace(ma.masked_array(np.arange(5), mask=[0, 1, 0, 0, 0]))
+        tr8 = tr7.copy(copy_on_write=True)
+        tr8.data.mask[1] = False
+        tr8.data[0] = 10
+        self.assertTrue(tr7.data.mask[1])
+        self.assertEqual(tr7.data[0], 0)
+
 
 def suite():
     return unittest.makeSuite(TraceTestCase, 'test')
@@ -205,6 +205,11 @@ class Stats(AttribDict):
         p.text(str(self))
 
 
+# Processing methods which only reassign views or new arrays to Trace.data and
+# so can keep data shared by Trace.copy(copy_on_write=True), e.g. for slicing.
+_KEEPS_SHARED_DATA = ('trim',)
+
+
 def _add_processing_info(func):
     """
     This is a decorator that attaches information about a processing call as a
@@ -229,6 +234,9 @@ def _add_processing_info(func):
         arguments.sort()
         info = info % "::".join(arguments)
         self = args[0]
+        # processing works on a private copy of data shared by copy on write
+        if func.__name__ not in _KEEPS_SHARED_DATA:
+            self._materialize_data()
         result = func(*args, **kwargs)
         # Attach after executing the function to avoid having it attached
         # while the operation failed.
@@ -2011,10 +2019,23 @@ seismometer_correction_simulation.html#using-a-resp-file>`_.
 
         return self
 
-    def copy(self):
+    def copy(self, copy_on_write=False):
         """
         Returns a deepcopy of the trace.
 
+        :type copy_on_write: bool, optional
+        :param copy_on_write: If ``True``, the data array is not copied but
+            shared read-only between the original and the copied trace. Any
+            processing method of either trace (e.g.
+            :meth:`~Trace.filter`, :meth:`~Trace.detrend`) first replaces the
+            shared array with a private copy, as does assigning a new array
+            to ``data``. Trimming and slicing only take views and keep
+            sharing the data. In-place
+            modifications of the shared array itself
+            (e.g. ``tr.data *= 2``) raise a :class:`ValueError`. The stats
+            are copied shallowly, nested dictionaries and lists (e.g.
+            ``processing`` or format specific headers) one level deep. Masked
+            arrays are always copied.
         :return: Copy of trace.
 
         This actually copies all data in the trace and does not only provide
@@ -2047,8 +2068,44 @@ seismometer_correction_simulation.html#using-a-resp-file>`_.
         True
         >>> tr3 == tr
         True
+
+        A copy on write shares the data until either trace gets processed:
+
+        >>> tr4 = tr.copy(copy_on_write=True)
+        >>> np.may_share_memory(tr4.data, tr.data)
+        True
+        >>> tr4.data.flags.writeable
+        False
+        >>> tr4.normalize()  # doctest: +ELLIPSIS
+        <...Trace object at 0x...>
+        >>> np.may_share_memory(tr4.data, tr.data)
+        False
         """
-        return deepcopy(self)
+        if not copy_on_write or isinstance(self.data, np.ma.MaskedArray):
+            return deepcopy(self)
+        data = self.data
+        if data.flags.writeable:
+            data = data.view()
+            data.flags.writeable = False
+            super(Trace, self).__setattr__('data', data)
+        self.__dict__['_shared_data'] = True
+        stats = copy(self.stats)
+        for key, value in self.stats.items():
+            if isinstance(value, (AttribDict, list)):
+                stats.__dict__[key] = copy(value)
+        # the memo makes deepcopy reuse the shared data and the stats copy
+        memo = {id(data): data, id(self.stats): stats}
+        return deepcopy(self, memo)
+
+    def _materialize_data(self):
+        """
+        Replace data shared with other traces by
+        :meth:`~Trace.copy` with ``copy_on_write=True`` by a private,
+        writeable copy.
+        """
+        if self.__dict__.pop('_shared_data', False) and \
+                not self.data.flags.writeable:
+            super(Trace, self).__setattr__('data', self.data.copy())
 
     def _addProcessingInfo(self, info):
         """
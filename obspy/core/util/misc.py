@@ -490,6 +490,79 @@ def factorize_int(x):
     return factors
 
 
+def _write_xml_incrementally(file_object, root, parent, index, elements,
+                             encoding="utf-8", xml_declaration=True):
+    """
+    Writes a pretty printed XML document element by element.
+
+    The output is byte-identical to inserting all ``elements`` as children of
+    ``parent`` at position ``index`` and serializing ``root`` with
+    :func:`lxml.etree.tostring`, but only one of the elements is part of the
+    tree at any time. Passing a generator for ``elements`` thus avoids
+    building the whole tree in memory.
+
+    :param file_object: Open binary file-like object to write to.
+    :type root: :class:`lxml.etree._Element`
+    :param root: Root element of the document.
+    :type parent: :class:`lxml.etree._Element`
+    :param parent: Element in the tree of ``root`` receiving the elements.
+    :type index: int
+    :param index: Position of the elements among the children of ``parent``.
+    :param elements: Iterable of :class:`lxml.etree._Element` objects.
+
+    >>> import io
+    >>> from lxml import etree
+    >>> root = etree.Element("root")
+    >>> parent = etree.SubElement(root, "parent")
+    >>> buf = io.BytesIO()
+    >>> _write_xml_incrementally(buf, root, parent, 0,
+    ...                          (etree.Element("child") for _i in range(2)))
+    >>> print(buf.getvalue().decode())  # doctest: +NORMALIZE_WHITESPACE
+    <?xml version='1.0' encoding='utf-8'?>
+    <root>
+      <parent>
+        <child/>
+        <child/>
+      </parent>
+    </root>
+    """
+    from lxml import etree
+
+    kwargs = {"pretty_print": True, "encoding": encoding,
+              "xml_declaration": xml_declaration}
+    elements = iter(elements)
+    try:
+        element = next(elements)
+    except StopIteration:
+        file_object.write(etree.tostring(root, **kwargs))
+        return
+    # Serialize the document once with an empty placeholder element to get
+    # everything before and after the elements.
+    tag = "obspyIncrementalWriterPlaceholder"
+    placeholder = etree.Element(tag)
+    parent.insert(index, placeholder)
+    doc = etree.tostring(root, **kwargs)
+    marker = ("<%s/>" % tag).encode("ascii")
+    pos = doc.index(marker)
+    head, tail = doc[:pos], doc[pos + len(marker):]
+    # Pretty printed siblings are separated by a line break and the
+    # indentation of their level.
+    separator = b"\n" + head[head.rindex(b"\n") + 1:]
+    file_object.write(head)
+    first = True
+    while element is not None:
+        if not first:
+            file_object.write(separator)
+        first = False
+        parent.replace(placeholder, element)
+        doc = etree.tostring(root, **kwargs)
+        parent.replace(element, placeholder)
+        file_object.write(doc[len(head):len(doc) - len(tail)])
+        element = next(elements, None)
+    parent.remove(placeholder)
+    file_object.write(tail)
+
+
 if __name__ == '__main__':
     import doctest
     doctest.testmod(exclude_empty=True)
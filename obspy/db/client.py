@@ -15,14 +15,16 @@ from future.utils import native_str
 
 import os
 
+import numpy as np
 from sqlalchemy import and_, create_engine, func, or_
 from sqlalchemy.orm import sessionmaker
 
-from obspy.core.preview import merge_previews
 from obspy.core.stream import Stream
+from obspy.core.trace import Trace
 from obspy.core.utcdatetime import UTCDateTime
 from obspy.core.util.decorator import deprecated
-from obspy.db.db import Base, WaveformChannel, WaveformFile, WaveformPath
+from obspy.db.db import (PREVIEW_LEVELS, Base, WaveformChannel, WaveformFile,
+                         WaveformPath, WaveformPreview, _preview_starttime)
 
 
 class Client(object):
@@ -257,13 +259,36 @@ class Client(object):
 
     def get_preview(self, trace_ids=[], starttime=None, endtime=None,
                     network=None, station=None, location=None, channel=None,
-                    pad=False):
+                    pad=False, delta=PREVIEW_LEVELS[0]):
         """
         Returns the preview trace.
+
+        :type delta: int, optional
+        :param delta: Sampling interval of the preview in seconds, one of
+            :const:`~obspy.db.db.PREVIEW_LEVELS`. Coarse levels contain the
+            maximum of all 30 seconds preview samples within ``delta`` and
+            are much faster for long time spans.
         """
+        if delta not in PREVIEW_LEVELS:
+            msg = "delta must be one of %s" % (PREVIEW_LEVELS, )
+            raise ValueError(msg)
         # build up query
         session = self.session()
-        query = session.query(WaveformChannel)
+        columns = [WaveformChannel.network, WaveformChannel.station,
+                   WaveformChannel.location, WaveformChannel.channel,
+                   WaveformChannel.calib]
+        if delta == PREVIEW_LEVELS[0]:
+            query = session.query(WaveformChannel.starttime,
+                                  WaveformChannel.sampling_rate,
+                                  WaveformChannel.preview, *columns)
+        else:
+            query = session.query(WaveformPreview.starttime,
+                                  WaveformPreview.delta,
+                                  WaveformPreview.data, *columns)
+            query = query.join(WaveformPreview,
+                               WaveformPreview.channel_id ==
+                               WaveformChannel.id)
+            query = query.filter(WaveformPreview.delta == delta)
         # start and end time
         try:
             starttime = UTCDateTime(starttime)
@@ -310,12 +335,36 @@ class Client(object):
         # execute query
         results = query.all()
         session.close()
-        # create Stream
+        # group by channel
+        channels = {}
+        for row in results:
+            if row[2] is None or not len(row[2]):
+                continue
+            if delta == PREVIEW_LEVELS[0]:
+                start = _preview_starttime(row[0], row[1], delta)
+            else:
+                start = UTCDateTime(row[0])
+            channels.setdefault(tuple(row[3:7]), []).append(
+                (start.timestamp, row[2], row[7]))
+        # merge all previews of a channel into one array, overlapping
+        # previews are combined by their maximum, -1 marks missing data
         st = Stream()
-        for result in results:
-            preview = result.get_preview()
-            st.append(preview)
-        # merge and trim
-        st = merge_previews(st)
+        for key, items in sorted(channels.items()):
+            t0 = min(item[0] for item in items)
+            offsets = [int(round((item[0] - t0) / delta)) for item in items]
+            npts = max(i + len(item[1]) for i, item in zip(offsets, items))
+            data = np.empty(npts, dtype=np.float32)
+            data.fill(-1)
+            for i, item in zip(offsets, items):
+                temp = data[i:i + len(item[1])]
+                np.maximum(temp, item[1], out=temp)
+            tr = Trace(data=data, header=dict(zip(
+                ['network', 'station', 'location', 'channel'], key)))
+            tr.stats.starttime = UTCDateTime(t0)
+            tr.stats.delta = delta
+            tr.stats.calib = items[0][2]
+            tr.stats.preview = True
+            st.append(tr)
+        # trim
         st.trim(starttime, endtime, pad=pad)
         return st
@@ -12,13 +12,15 @@ from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 from future.builtins import *  # NOQA
 
+import math
 import pickle
 
 from sqlalchemy import (Boolean, Column, DateTime, Float, ForeignKey, Integer,
-                        PickleType, String)
+                        LargeBinary, PickleType, String)
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relation
 from sqlalchemy.schema import UniqueConstraint
+from sqlalchemy.types import TypeDecorator
 import numpy as np
 
 from obspy import Trace, UTCDateTime
@@ -27,6 +29,104 @@ from obspy.core.util.decorator import deprecated
 
 Base = declarative_base()
 
+#: Sampling intervals in seconds of the preview pyramid. The indexer stores
+#: previews of the first level with each channel, all others are derived
+#: from these and stored in :class:`WaveformPreview`.
+PREVIEW_LEVELS = (30, 600, 3600)
+
+
+#: Marker prefixed to preview data stored as raw little-endian float32. Values
+#: without it have been pickled by earlier versions.
+PREVIEW_MARKER = b'OPF4'
+
+
+def _preview_to_array(value):
+    """
+    Decodes preview data stored as raw little-endian float32 after
+    :data:`PREVIEW_MARKER` or pickled by ``numpy.ndarray.dumps()`` as done by
+    earlier versions.
+
+    An incomplete trailing sample of raw data is ignored.
+    """
+    if value is None:
+        return None
+    if isinstance(value, np.ndarray):
+        return value
+    if not isinstance(value, bytes):
+        value = bytes(bytearray(value))
+    if value[:len(PREVIEW_MARKER)] == PREVIEW_MARKER:
+        npts = (len(value) - len(PREVIEW_MARKER)) // 4
+        return np.frombuffer(value, dtype=np.dtype('<f4'), count=npts,
+                             offset=len(PREVIEW_MARKER)).astype(np.float32)
+    # the dumped array, written by PickleType as another protocol 0 pickle
+    data = pickle.loads(value)
+    if isinstance(data, (bytes, str)):
+        data = pickle.loads(data)
+    return np.require(data, dtype=np.float32)
+
+
+class PreviewType(TypeDecorator):
+    """
+    Column type storing preview data as raw little-endian float32 BLOB
+    prefixed by :data:`PREVIEW_MARKER`.
+
+    Accepts :class:`numpy.ndarray` objects and, for backwards compatibility,
+    arrays pickled by ``numpy.ndarray.dumps()``. Values written by earlier
+    versions into a ``PickleType`` column are decoded on the fly, see
+    :func:`obspy.db.util.migrate_previews` for converting them.
+    """
+    impl = LargeBinary
+
+    def process_bind_param(self, value, dialect):
+        value = _preview_to_array(value)
+        if value is None:
+            return None
+        return PREVIEW_MARKER + \
+            np.require(value, dtype=np.dtype('<f4')).tostring()
+
+    def process_result_value(self, value, dialect):
+        return _preview_to_array(value)
+
+    def compare_values(self, x, y):
+        types = (np.ndarray, bytes)
+        if isinstance(x, types) and isinstance(y, types):
+            return np.array_equal(_preview_to_array(x), _preview_to_array(y))
+        if isinstance(x, np.ndarray) or isinstance(y, np.ndarray):
+            return False
+        return x == y
+
+
+def _preview_starttime(starttime, sampling_rate, delta=PREVIEW_LEVELS[0]):
+    """
+    Returns the time of the first preview sample of a channel as created by
+    :func:`~obspy.core.preview.create_preview`.
+    """
+    starttime = UTCDateTime(starttime).timestamp
+    offset = starttime % delta
+    # a first slice of only a few samples is skipped
+    if int((delta - offset) * int(sampling_rate)) > delta / 2:
+        return UTCDateTime(starttime - offset)
+    return UTCDateTime(starttime - offset + delta)
+
+
+def _downsample_preview(data, starttime, delta, new_delta):
+    """
+    Takes the maximum of all preview samples within ``new_delta`` seconds.
+
+    The new slices are aligned to multiples of ``new_delta`` seconds.
+    Returns the new data and its start time.
+    """
+    factor = int(round(new_delta / delta))
+    starttime = UTCDateTime(starttime).timestamp
+    new_starttime = math.floor(starttime / new_delta) * new_delta
+    front = int(round((starttime - new_starttime) / delta))
+    npts = int(math.ceil((front + len(data)) / factor)) * factor
+    temp = np.empty(npts, dtype=np.float32)
+    # -1 marks missing data
+    temp.fill(-1)
+    temp[front:front + len(data)] = data
+    return temp.reshape(-1, factor).max(axis=1), UTCDateTime(new_starttime)
+
 
 class WaveformPath(Base):
     """
@@ -96,7 +196,7 @@ class WaveformChannel(Base):
     calib = Column(Float, nullable=False)
     sampling_rate = Column(Float, nullable=False)
     npts = Column(Integer, nullable=False)
-    preview = Column(PickleType(protocol=0), nullable=True)
+    preview = Column(PreviewType, nullable=True)
 
     gaps = relation("WaveformGaps", order_by="WaveformGaps.id",
                     backref="channel", cascade="all, delete, delete-orphan")
@@ -105,6 +205,10 @@ class WaveformChannel(Base):
                         backref="channel",
                         cascade="all, delete, delete-orphan")
 
+    previews = relation("WaveformPreview", order_by="WaveformPreview.delta",
+                        backref="channel",
+                        cascade="all, delete, delete-orphan")
+
     def __init__(self, data={}):
         self.update(data)
 
@@ -130,14 +234,17 @@ class WaveformChannel(Base):
 
     def get_preview(self, apply_calibration=False):
         try:
-            data = np.loads(self.preview)
+            data = _preview_to_array(self.preview)
         except:
-            data = np.array([])
+            data = None
+        if data is None:
+            data = np.array([], dtype=np.float32)
         if apply_calibration:
             data = data * self.calib
         tr = Trace(data=data)
-        tr.stats.starttime = UTCDateTime(self.starttime)
-        tr.stats.delta = 30.0
+        tr.stats.starttime = _preview_starttime(self.starttime,
+                                                self.sampling_rate)
+        tr.stats.delta = PREVIEW_LEVELS[0]
         tr.stats.network = self.network
         tr.stats.station = self.station
         tr.stats.location = self.location
@@ -146,6 +253,45 @@ class WaveformChannel(Base):
         tr.stats.preview = True
         return tr
 
+    def update_preview_levels(self, levels=PREVIEW_LEVELS[1:]):
+        """
+        Replaces the coarse preview levels by levels derived from the preview
+        of the channel.
+        """
+        tr = self.get_preview()
+        previews = []
+        if tr.stats.npts:
+            for delta in levels:
+                data, starttime = _downsample_preview(
+                    tr.data, tr.stats.starttime, tr.stats.delta, delta)
+                previews.append(WaveformPreview({
+                    'delta': delta, 'starttime': starttime.datetime,
+                    'data': data}))
+        self.previews = previews
+
+
+class WaveformPreview(Base):
+    """
+    DB table containing coarse preview levels of a channel.
+    """
+    __tablename__ = 'default_waveform_previews'
+    __table_args__ = (UniqueConstraint('channel_id', 'delta'), {})
+
+    id = Column(Integer, primary_key=True)
+    channel_id = Column(Integer, ForeignKey('default_waveform_channels.id'),
+                        index=True)
+    delta = Column(Integer, nullable=False, index=True)
+    starttime = Column(DateTime, nullable=False)
+    data = Column(PreviewType, nullable=False)
+
+    def __init__(self, data={}):
+        self.delta = data.get('delta')
+        self.starttime = data.get('starttime')
+        self.data = data.get('data')
+
+    def __repr__(self):
+        return "<WaveformPreview('%s')>" % (self.id)
+
 
 class WaveformGaps(Base):
     """
@@ -12,17 +12,35 @@ storing in into a standard SQL database.
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 from future.builtins import *  # NOQA
+from future import standard_library
 
+import collections
 import fnmatch
+import multiprocessing.queues
 import os
 import sys
 import time
 
-from obspy import read
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.orm.exc import NoResultFound
+
+with standard_library.hooks():
+    import queue
+
+from obspy import Trace, UTCDateTime, read
+from obspy.core import compatibility
 from obspy.core.preview import create_preview
 from obspy.core.util.base import _get_entry_points
 from obspy.db.db import (WaveformChannel, WaveformFeatures, WaveformFile,
                          WaveformGaps, WaveformPath)
+from obspy.io.mseed.core import _is_mseed
+from obspy.io.mseed.util import unpack_records
+
+
+# The standard library hooks may import a second instance of the Queue module
+# on Python 2, multiprocessing raises the exception of the first one.
+_QUEUE_EMPTY = (queue.Empty, multiprocessing.queues.Empty)
 
 
 class WaveformFileCrawler(object):
@@ -32,13 +50,59 @@ class WaveformFileCrawler(object):
     This class scans periodically all given paths for waveform files and
     collects them into a watch list.
     """
+    #: Maximal number of files written to the database in one transaction.
+    batch_size = 100
+    #: Number of files handed to the worker processes per CPU before the
+    #: crawler waits for results.
+    files_per_cpu = 20
+
     def _update_or_insert(self, dataset):
         """
         Add a new file into or modifies existing file in database.
         """
-        if len(dataset) < 1:
+        self._update_or_insert_many([dataset])
+
+    def _update_or_insert_many(self, datasets):
+        """
+        Add or modify multiple files within a single database transaction.
+
+        If the transaction fails, the files are written one by one so a single
+        broken file does not discard the whole batch.
+        """
+        datasets = [dataset for dataset in datasets if len(dataset) > 0]
+        if not datasets:
             return
         session = self.session()
+        paths = {}
+        messages = []
+        try:
+            for dataset in datasets:
+                msg = self._add_dataset(session, dataset, paths)
+                if msg:
+                    messages.append(msg)
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            session.close()
+            if len(datasets) == 1:
+                self.log.error(str(e))
+            else:
+                for dataset in datasets:
+                    self._update_or_insert_many([dataset])
+            return
+        for msg in messages:
+            self.log.debug(msg)
+        session.close()
+
+    def _add_dataset(self, session, dataset, paths=None):
+        """
+        Add a new file or replace an existing file within the given session.
+
+        Paths already fetched or created within the session are looked up in
+        ``paths``. Returns a log message or ``None`` for duplicates.
+        """
+        if paths is None:
+            paths = {}
         data = dataset[0]
         # check for duplicates
         if self.options.check_duplicates:
@@ -59,14 +123,18 @@ class WaveformFileCrawler(object):
                 self.log.error(msg % (data['file'], data['path']))
                 return
         # fetch or create path
-        try:
-            # search for existing path
-            query = session.query(WaveformPath)
-            path = query.filter_by(path=data['path']).one()
-        except:
-            # create new path entry
-            path = WaveformPath(data)
-            session.add(path)
+        if data['path'] in paths:
+            path = paths[data['path']]
+        else:
+            try:
+                # search for existing path
+                query = session.query(WaveformPath)
+                path = query.filter_by(path=data['path']).one()
+            except NoResultFound:
+                # create new path entry
+                path = WaveformPath(data)
+                session.add(path)
+            paths[data['path']] = path
         # search and delete existing file entry
         msg = "Inserted"
         if path.id is not None:
@@ -86,6 +154,7 @@ class WaveformFileCrawler(object):
         for data in dataset:
             # create new channel entry
             channel = WaveformChannel(data)
+            channel.update_preview_levels()
             file.channels.append(channel)
             # add gaps
             for gap in data['gaps']:
@@ -93,15 +162,7 @@ class WaveformFileCrawler(object):
             # add features
             for feature in data['features']:
                 channel.features.append(WaveformFeatures(feature))
-        try:
-            session.commit()
-        except Exception as e:
-            session.rollback()
-            self.log.error(str(e))
-        else:
-            self.log.debug("%s '%s' in '%s'" % (msg, data['file'],
-                                                data['path']))
-        session.close()
+        return "%s '%s' in '%s'" % (msg, data['file'], data['path'])
 
     def _delete(self, path, file=None):
         """
@@ -145,16 +206,16 @@ class WaveformFileCrawler(object):
         session = self.session()
         if path:
             # check database for file entries in specific path
-            result = session.query("file", "mtime").from_statement("""
+            result = session.query("file", "mtime").from_statement(text("""
                 SELECT file, mtime
                 FROM default_waveform_paths as p, default_waveform_files as f
                 WHERE p.id=f.path_id
-                AND p.path=:path""").params(path=path).all()
+                AND p.path=:path""")).params(path=path).all()
             result = dict(result)
         else:
             # get all path entries from database
-            result = session.query("path").from_statement("""
-                SELECT path FROM default_waveform_paths""").all()
+            result = session.query("path").from_statement(text("""
+                SELECT path FROM default_waveform_paths""")).all()
             result = [r[0] for r in result]
         session.close()
         return result
@@ -178,20 +239,42 @@ class WaveformFileCrawler(object):
                 return True
         return False
 
-    def _process_output_queue(self):
-        try:
-            dataset = self.output_queue.pop(0)
-        except:
-            pass
-        else:
-            self._update_or_insert(dataset)
+    def _enqueue(self, path, file):
+        """
+        Hands a file to the worker processes unless it is already in work.
+        """
+        filepath = os.path.join(path, file)
+        if filepath in self._pending:
+            return
+        self._pending.add(filepath)
+        self.input_queue.put((filepath, (path, file, self.features)))
+
+    def _process_output_queue(self, timeout=None):
+        """
+        Writes all processed files waiting in the output queue to the
+        database using a single transaction.
+
+        If ``timeout`` is given, blocks up to ``timeout`` seconds until the
+        first file is available.
+        """
+        datasets = []
+        block = bool(timeout)
+        while len(datasets) < self.batch_size:
+            try:
+                filepath, dataset = self.output_queue.get(block, timeout)
+            except _QUEUE_EMPTY:
+                break
+            block = False
+            self._pending.discard(filepath)
+            datasets.append(dataset)
+        self._update_or_insert_many(datasets)
 
     def _process_log_queue(self):
-        try:
-            msg = self.log_queue.pop(0)
-        except:
-            pass
-        else:
+        while True:
+            try:
+                msg = self.log_queue.get_nowait()
+            except _QUEUE_EMPTY:
+                break
             if msg.startswith('['):
                 self.log.error(msg)
             else:
@@ -201,37 +284,27 @@ class WaveformFileCrawler(object):
         """
         Resets the crawler parameters.
         """
+        # files handed to the worker processes but not yet written to the
+        # database
+        if not hasattr(self, '_pending'):
+            self._pending = set()
         # break if options run_once is set and a run was completed already
         if self.options.run_once and \
                 getattr(self, 'first_run_complete', False):
-            # before shutting down make sure all queues are empty!
-            while self.output_queue or self.work_queue:
-                msg = 'Crawler stopped but waiting for empty queues to exit.'
-                self.log.debug(msg)
-                if self.log_queue:
-                    msg = 'log_queue still has %s item(s)'
-                    self.log.debug(msg % len(self.log_queue))
-                    # Fetch items from the log queue
-                    self._process_log_queue()
-                    continue
-                if self.output_queue:
-                    msg = 'output_queue still has %s item(s)'
-                    self.log.debug(msg % len(self.output_queue))
-                    # try to finalize a single processed stream object from
-                    # output queue
-                    self._process_output_queue()
-                    continue
-                if self.work_queue:
-                    msg = 'work_queue still has %s items'
-                    self.log.debug(msg % len(self.work_queue))
-                time.sleep(10)
+            # before shutting down make sure all files are processed!
+            while self._pending:
+                msg = 'Crawler stopped but waiting for %d file(s) to exit.'
+                self.log.debug(msg % len(self._pending))
+                self._process_log_queue()
+                self._process_output_queue(timeout=10)
+            self._process_log_queue()
             self.log.debug('Crawler stopped by option run_once.')
             sys.exit()
             return
         self.log.debug('Crawler restarted.')
         # reset attributes
         self._current_path = None
-        self._current_files = []
+        self._current_files = collections.deque()
         self._db_files = {}
         # get search paths for waveform crawler
         self._roots = list(self.paths.keys())
@@ -271,7 +344,7 @@ class WaveformFileCrawler(object):
                 return
             # reset attributes
             self._current_path = None
-            self._current_files = []
+            self._current_files = collections.deque()
             self._db_files = {}
             # create new walker
             self._walker = os.walk(self._root, topdown=True, followlinks=True)
@@ -280,14 +353,11 @@ class WaveformFileCrawler(object):
             return
         # remove files or paths starting with a dot
         if self.options.skip_dots:
-            for file in files:
-                if file.startswith('.'):
-                    files.remove(file)
-            for dir in dirs:
-                if dir.startswith('.'):
-                    dirs.remove(dir)
+            files = [file for file in files if not file.startswith('.')]
+            # os.walk only skips directories removed in place
+            dirs[:] = [dir for dir in dirs if not dir.startswith('.')]
         self._current_path = root
-        self._current_files = files
+        self._current_files = collections.deque(files)
         # logging
         self.log.debug("Scanning path '%s' ..." % self._current_path)
         # get all database entries for current path
@@ -323,22 +393,37 @@ class WaveformFileCrawler(object):
 
     def iterate(self):
         """
-        Handles exactly one directory.
+        Hands files to the worker processes until enough files are in work
+        and writes processed files to the database.
+
+        Stops at the end of the current directory.
         """
         # skip if service is not running
         # be aware that the processor pool is still active waiting for work
         if not self.running:
             return
-        # skip if input queue is full
-        if len(self.input_queue) > self.options.number_of_cpus:
-            return
-        # try to finalize a single processed stream object from output queue
-        self._process_output_queue()
         # Fetch items from the log queue
         self._process_log_queue()
+        max_pending = self.options.number_of_cpus * self.files_per_cpu
+        if len(self._pending) >= max_pending:
+            # enough files in work - wait for results instead of polling
+            self._process_output_queue(timeout=0.5)
+            return
+        # finalize all processed files from output queue
+        self._process_output_queue()
         # walk through directories and files
+        while len(self._pending) < max_pending:
+            if not self._iterate_file():
+                break
+
+    def _iterate_file(self):
+        """
+        Handles exactly one file of the current directory.
+
+        Returns ``False`` if the current directory has been completed.
+        """
         try:
-            file = self._current_files.pop(0)
+            file = self._current_files.popleft()
         except IndexError:
             # file list is empty
             # clean up not existing files in current path
@@ -347,10 +432,10 @@ class WaveformFileCrawler(object):
                     self._delete(self._current_path, file)
             # jump into next directory
             self._step_walker()
-            return
+            return False
         # skip file with wrong pattern
         if not self.has_pattern(file):
-            return
+            return True
         # process a single file
         path = self._current_path
         filepath = os.path.join(path, file)
@@ -360,7 +445,7 @@ class WaveformFileCrawler(object):
             mtime = int(stats.st_mtime)
         except Exception as e:
             self.log.error(str(e))
-            return
+            return True
         # check if recent
         if self.options.recent:
             # skip older files
@@ -369,31 +454,240 @@ class WaveformFileCrawler(object):
                     db_file_mtime = self._db_files.pop(file)
                 except:
                     pass
-                return
+                return True
         # option force-reindex set -> process file regardless if already in
         # database or recent or whatever
         if self.options.force_reindex:
-            self.input_queue[filepath] = (path, file, self.features)
-            return
+            self._enqueue(path, file)
+            return True
         # compare with database entries
         if file not in self._db_files.keys():
             # file does not exists in database -> add file
-            self.input_queue[filepath] = (path, file, self.features)
-            return
+            self._enqueue(path, file)
+            return True
         # file is already in database
         # -> remove from file list so it won't be deleted on database cleanup
         try:
             db_file_mtime = self._db_files.pop(file)
         except:
-            return
+            return True
         # -> compare modification times of current file with database entry
         if mtime == db_file_mtime:
-            return
+            return True
         # modification time differs -> update file
-        self.input_queue[filepath] = (path, file, self.features)
+        self._enqueue(path, file)
+        return True
 
 
-def worker(_i, input_queue, work_queue, output_queue, log_queue, mappings={}):
+def _preview_pieces(headers, samples, delta):
+    """
+    Splits the samples of Mini-SEED records into pieces of single preview
+    slices.
+
+    The slices of ``delta`` seconds are counted from 1970-01-01 and are
+    placed like in :func:`~obspy.core.preview.create_preview`. Returns the
+    record index, slice index, minimum, maximum and number of samples of
+    every piece.
+    """
+    index = np.flatnonzero((headers['npts'] > 0) &
+                           (headers['samprate'] > 0))
+    npts = headers['npts'][index]
+    offset = headers['offset'][index]
+    samprate = headers['samprate'][index]
+    starttime = headers['starttime'][index]
+    delta_us = delta * 1000000
+    first = starttime // delta_us
+    # number of samples before the next slice boundary
+    start = ((delta_us - starttime % delta_us) * samprate /
+             1e6).astype(np.int64)
+    step = delta * samprate
+    nsplit = np.where(npts > start, np.ceil((npts - start) / step), 0)
+    nsplit = nsplit.astype(np.int64)
+    rec = np.repeat(np.arange(len(index)), nsplit)
+    # running number of the split within its record
+    j = np.arange(nsplit.sum())
+    j -= np.repeat(np.cumsum(nsplit) - nsplit, nsplit)
+    pos = np.concatenate([
+        offset, offset[rec] + start[rec] + (j * step[rec]).astype(np.int64)])
+    slices = np.concatenate([first, first[rec] + 1 + j])
+    recs = np.concatenate([np.arange(len(index)), rec])
+    order = np.argsort(pos, kind='mergesort')
+    pos, slices, recs = pos[order], slices[order], recs[order]
+    ends = np.minimum(np.append(pos[1:], len(samples)),
+                      offset[recs] + npts[recs])
+    keep = ends > pos
+    pos, ends, slices, recs = pos[keep], ends[keep], slices[keep], recs[keep]
+    if len(pos) == 0:
+        return index[recs], slices, samples[:0], samples[:0], pos
+    # reduce [start, end) of every piece, the results at the end indices
+    # are discarded
+    bounds = np.column_stack([pos, ends]).ravel()
+    if bounds[-1] >= len(samples):
+        bounds = bounds[:-1]
+    mins = np.minimum.reduceat(samples, bounds)[::2]
+    maxs = np.maximum.reduceat(samples, bounds)[::2]
+    return index[recs], slices, mins, maxs, ends - pos
+
+
+def _preview_from_pieces(slices, mins, maxs, counts, delta):
+    """
+    Combines the pieces of :func:`_preview_pieces` of one channel into
+    preview data, slices without any data are set to ``-1``.
+    """
+    order = np.argsort(slices, kind='mergesort')
+    slices = slices[order]
+    first = np.flatnonzero(np.r_[True, slices[1:] != slices[:-1]])
+    mins = np.minimum.reduceat(mins[order].astype(np.float64), first)
+    maxs = np.maximum.reduceat(maxs[order].astype(np.float64), first)
+    counts = np.add.reduceat(counts[order], first)
+    slices = slices[first]
+    # skip short first slice like create_preview
+    if counts[0] <= delta / 2:
+        slices, mins, maxs = slices[1:], mins[1:], maxs[1:]
+    if len(slices) == 0:
+        return None
+    data = np.empty(slices[-1] - slices[0] + 1, dtype=np.float32)
+    data.fill(-1)
+    data[slices - slices[0]] = maxs - mins
+    return data
+
+
+def _read_mseed_index(filepath, preview=True, delta=30, chunksize=2 ** 20):
+    """
+    Collects spans, gaps and previews of all channels of a Mini-SEED file
+    without reading it into a Stream object.
+
+    Spans and gaps are determined from the record headers only. The file is
+    decoded chunk by chunk and only the minimum and maximum of every preview
+    slice are kept. Returns a list of ``(trace, gaps, preview)`` tuples with
+    header only traces, gap dictionaries as used by the indexer and the
+    preview data (or ``None``), or ``None`` if the file contains records
+    which can only be handled by :func:`~obspy.core.stream.read` (broken or
+    text records, different sampling rates per channel, ...).
+
+    The previews are computed from the recorded samples only, whereas the
+    stream based path of the indexer merges the traces with gaps and
+    differing overlaps filled with zeros first. The previews of both paths
+    therefore differ for slices touching a gap or an overlap: slices
+    completely within a gap are ``-1`` instead of ``0`` and the
+    peak-to-peak values of slices partially within a gap or containing an
+    overlap do not include the zero fill value.
+    """
+    headers = []
+    pieces = []
+    with open(filepath, 'rb') as fh:
+        data = b''
+        while True:
+            chunk = fh.read(chunksize)
+            data += chunk
+            if not data:
+                break
+            # check the headers before decoding any samples - files with
+            # text records are left to read()
+            new, samples = unpack_records(data, headonly=True)
+            if not len(new) and chunk:
+                # record larger than chunk, read more
+                continue
+            if (new['status'] != 0).any() or (new['encoding'] == 0).any() \
+                    or (new['sampletype'] == b'a').any():
+                return None
+            if preview:
+                new, samples = unpack_records(data[:new['reclen'].sum()])
+                if (new['status'] != 0).any():
+                    return None
+            ids = new['network']
+            for key in ('station', 'location', 'channel'):
+                ids = np.char.add(np.char.add(ids, b'.'), new[key])
+            headers.append((ids, new['starttime'], new['samprate'],
+                            new['npts']))
+            if preview:
+                recs, slices, mins, maxs, counts = _preview_pieces(
+                    new, samples, delta)
+                pieces.append((ids[recs], slices, mins, maxs, counts))
+            data = data[new['reclen'].sum():]
+            if not chunk:
+                # end of file, skip trailing garbage
+                break
+    if not headers:
+        return None
+    ids, starttime, samprate, npts = [np.concatenate(x)
+                                      for x in zip(*headers)]
+    valid = (npts > 0) & (samprate > 0)
+    if not valid.any():
+        return None
+    ids, starttime = ids[valid], starttime[valid]
+    samprate, npts = samprate[valid], npts[valid]
+    # join contiguous records of a channel to segments like libmseed, i.e.
+    # with a time tolerance of half a sample
+    order = np.lexsort((starttime, ids))
+    ids, starttime = ids[order], starttime[order]
+    samprate, npts = samprate[order], npts[order]
+    expected = starttime[:-1] + npts[:-1] / samprate[:-1] * 1e6
+    first = np.flatnonzero(np.r_[
+        True, (ids[1:] != ids[:-1]) | (samprate[1:] != samprate[:-1]) |
+        (np.abs(starttime[1:] - expected) > 0.5e6 / samprate[:-1])])
+    seg_ids = ids[first]
+    seg_samprate = samprate[first]
+    seg_start = starttime[first] / 1e6
+    seg_end = seg_start + (np.add.reduceat(npts, first) - 1) / seg_samprate
+    if pieces:
+        piece_ids, slices, mins, maxs, counts = [np.concatenate(x)
+                                                 for x in zip(*pieces)]
+    results = []
+    for id in np.unique(seg_ids):
+        index = np.flatnonzero(seg_ids == id)
+        sampling_rate = seg_samprate[index[0]]
+        if (seg_samprate[index] != sampling_rate).any():
+            return None
+        start = seg_start[index]
+        end = seg_end[index]
+        # gaps and overlaps like Stream.get_gaps()
+        gaps = []
+        for i in range(len(index) - 1):
+            diff = start[i + 1] - end[i]
+            if diff < 0 and -diff > end[i + 1] - start[i + 1]:
+                diff = -(end[i + 1] - start[i + 1])
+            nsamples = int(compatibility.round_away(abs(diff) *
+                                                    sampling_rate))
+            if nsamples == 1:
+                continue
+            elif diff > 0:
+                nsamples -= 1
+            else:
+                nsamples += 1
+            gaps.append({
+                'gap': diff >= 0,
+                'starttime': UTCDateTime(end[i]).datetime,
+                'endtime': UTCDateTime(start[i + 1]).datetime,
+                'samples': abs(nsamples)})
+        trace = Trace(header=dict(zip(
+            ['network', 'station', 'location', 'channel'],
+            id.decode().split('.'))))
+        trace.stats.sampling_rate = sampling_rate
+        trace.stats.starttime = UTCDateTime(start.min())
+        # number of samples of the merged trace
+        trace.stats.npts = int(round((end.max() - start.min()) *
+                                     sampling_rate)) + 1
+        trace.stats._format = 'MSEED'
+        data = None
+        if pieces:
+            match = piece_ids == id
+            if match.any():
+                data = _preview_from_pieces(slices[match], mins[match],
+                                            maxs[match], counts[match],
+                                            delta)
+        results.append((trace, gaps, data))
+    return results
+
+
+def worker(_i, input_queue, output_queue, log_queue, mappings={}):
+    """
+    Indexes the files of the input queue until ``None`` is received.
+
+    For every ``(filepath, (path, file, features))`` item of the input queue
+    a ``(filepath, dataset)`` tuple is put into the output queue, the dataset
+    is empty if the file could not be read.
+    """
     try:
         # fetch and initialize all possible waveform feature plug-ins
         all_features = {}
@@ -405,7 +699,7 @@ def worker(_i, input_queue, work_queue, output_queue, log_queue, mappings={}):
                 func = cls().process
             except Exception as e:
                 msg = 'Could not initialize feature %s. (%s)'
-                log_queue.append(msg % (key, str(e)))
+                log_queue.put(msg % (key, str(e)))
                 continue
             all_features[key] = {}
             all_features[key]['run'] = func
@@ -413,42 +707,44 @@ def worker(_i, input_queue, work_queue, output_queue, log_queue, mappings={}):
                 all_features[key]['indexer_kwargs'] = cls['indexer_kwargs']
             except:
                 all_features[key]['indexer_kwargs'] = {}
-        # loop through input queue
-        while True:
-            # fetch a unprocessed item
-            try:
-                filepath, (path, file, features) = input_queue.popitem()
-            except:
-                continue
-            # skip item if already in work queue
-            if filepath in work_queue:
-                continue
-            work_queue.append(filepath)
-            # get additional kwargs for read method from waveform plug-ins
-            kwargs = {'verify_chksum': False}
-            for feature in features:
-                if feature not in all_features:
-                    log_queue.append('%s: Unknown feature %s' % (filepath,
-                                                                 feature))
-                    continue
-                kwargs.update(all_features[feature]['indexer_kwargs'])
-            # read file and get file stats
-            try:
-                stats = os.stat(filepath)
-                stream = read(filepath, **kwargs)
-                # get gap and overlap information
-                gap_list = stream.getGaps()
-                # merge channels and replace gaps/overlaps with 0 to prevent
-                # generation of masked arrays
-                stream.merge(fill_value=0)
-            except Exception as e:
-                msg = '[Reading stream] %s: %s'
-                log_queue.append(msg % (filepath, e))
-                try:
-                    work_queue.remove(filepath)
-                except:
-                    pass
-                continue
+        # block until the next file is available
+        for filepath, (path, file, features) in iter(input_queue.get, None):
+            dataset = _index_file(filepath, path, file, features,
+                                  all_features, log_queue, mappings)
+            # return results to main loop
+            output_queue.put((filepath, dataset))
+    except KeyboardInterrupt:
+        return
+
+
+def _index_file(filepath, path, file, features, all_features, log_queue,
+                mappings={}):
+    """
+    Returns the list of channel entries of a single file.
+    """
+    # get additional kwargs for read method from waveform plug-ins
+    kwargs = {'verify_chksum': False}
+    for feature in features:
+        if feature not in all_features:
+            log_queue.put('%s: Unknown feature %s' % (filepath, feature))
+            continue
+        kwargs.update(all_features[feature]['indexer_kwargs'])
+    # read file and get file stats
+    try:
+        stats = os.stat(filepath)
+        items = None
+        # fast path for Mini-SEED files if no feature needs the data
+        if not features and _is_mseed(filepath):
+            items = _read_mseed_index(filepath,
+                                      preview='.LOG.L.' not in file)
+        from_headers = items is not None
+        if not from_headers:
+            stream = read(filepath, **kwargs)
+            # get gap and overlap information
+            gap_list = stream.getGaps()
+            # merge channels and replace gaps/overlaps with 0 to prevent
+            # generation of masked arrays
+            stream.merge(fill_value=0)
             # build up dictionary of gaps and overlaps for easier lookup
             gap_dict = {}
             for gap in gap_list:
@@ -460,85 +756,84 @@ def worker(_i, input_queue, work_queue, output_queue, log_queue, mappings={}):
                     'samples': abs(gap[7])
                 }
                 gap_dict.setdefault(id, []).append(temp)
-            # loop through traces
-            dataset = []
-            for trace in stream:
-                result = {}
-                # general file information
-                result['mtime'] = int(stats.st_mtime)
-                result['size'] = stats.st_size
-                result['path'] = path
-                result['file'] = file
-                result['filepath'] = filepath
-                # trace information
-                result['format'] = trace.stats._format
-                result['station'] = trace.stats.station
-                result['location'] = trace.stats.location
-                result['channel'] = trace.stats.channel
-                result['network'] = trace.stats.network
-                result['starttime'] = trace.stats.starttime.datetime
-                result['endtime'] = trace.stats.endtime.datetime
-                result['calib'] = trace.stats.calib
-                result['npts'] = trace.stats.npts
-                result['sampling_rate'] = trace.stats.sampling_rate
-                # check for any id mappings
-                if trace.id in mappings:
-                    old_id = trace.id
-                    for mapping in mappings[old_id]:
-                        if trace.stats.starttime and \
-                           trace.stats.starttime > mapping['endtime']:
-                            continue
-                        if trace.stats.endtime and \
-                           trace.stats.endtime < mapping['starttime']:
-                            continue
-                        result['network'] = mapping['network']
-                        result['station'] = mapping['station']
-                        result['location'] = mapping['location']
-                        result['channel'] = mapping['channel']
-                        msg = "Mapping '%s' to '%s.%s.%s.%s'" % \
-                            (old_id, mapping['network'], mapping['station'],
-                             mapping['location'], mapping['channel'])
-                        log_queue.append(msg)
-                # gaps/overlaps for current trace
-                result['gaps'] = gap_dict.get(trace.id, [])
-                # apply feature functions
-                result['features'] = []
-                for key in features:
-                    if key not in all_features:
-                        continue
-                    try:
-                        # run plug-in and update results
-                        temp = all_features[key]['run'](trace)
-                        for key, value in temp.items():
-                            result['features'].append({'key': key,
-                                                       'value': value})
-                    except Exception as e:
-                        msg = '[Processing feature] %s: %s'
-                        log_queue.append(msg % (filepath, e))
-                        continue
-                # generate preview of trace
-                result['preview'] = None
-                if '.LOG.L.' not in file or trace.stats.channel != 'LOG':
-                    # create previews only for non-log files (see issue #400)
-                    try:
-                        trace = create_preview(trace, 30)
-                        result['preview'] = trace.data.dumps()
-                    except ValueError:
-                        pass
-                    except Exception as e:
-                        msg = '[Creating preview] %s: %s'
-                        log_queue.append(msg % (filepath, e))
-                # update dataset
-                dataset.append(result)
+            items = [(trace, gap_dict.get(trace.id, []), None)
+                     for trace in stream]
             del stream
-            # return results to main loop
+    except Exception as e:
+        msg = '[Reading stream] %s: %s'
+        log_queue.put(msg % (filepath, e))
+        return []
+    # loop through traces
+    dataset = []
+    for trace, gaps, preview_data in items:
+        result = {}
+        # general file information
+        result['mtime'] = int(stats.st_mtime)
+        result['size'] = stats.st_size
+        result['path'] = path
+        result['file'] = file
+        result['filepath'] = filepath
+        # trace information
+        result['format'] = trace.stats._format
+        result['station'] = trace.stats.station
+        result['location'] = trace.stats.location
+        result['channel'] = trace.stats.channel
+        result['network'] = trace.stats.network
+        result['starttime'] = trace.stats.starttime.datetime
+        result['endtime'] = trace.stats.endtime.datetime
+        result['calib'] = trace.stats.calib
+        result['npts'] = trace.stats.npts
+        result['sampling_rate'] = trace.stats.sampling_rate
+        # check for any id mappings
+        if trace.id in mappings:
+            old_id = trace.id
+            for mapping in mappings[old_id]:
+                if trace.stats.starttime and \
+                   trace.stats.starttime > mapping['endtime']:
+                    continue
+                if trace.stats.endtime and \
+                   trace.stats.endtime < mapping['starttime']:
+                    continue
+                result['network'] = mapping['network']
+                result['station'] = mapping['station']
+                result['location'] = mapping['location']
+                result['channel'] = mapping['channel']
+                msg = "Mapping '%s' to '%s.%s.%s.%s'" % \
+                    (old_id, mapping['network'], mapping['station'],
+                     mapping['location'], mapping['channel'])
+                log_queue.put(msg)
+        # gaps/overlaps for current trace
+        result['gaps'] = gaps
+        # apply feature functions
+        result['features'] = []
+        for key in features:
+            if key not in all_features:
+                continue
             try:
-                output_queue.append(dataset)
-            except:
-                pass
+                # run plug-in and update results
+                temp = all_features[key]['run'](trace)
+                for key, value in temp.items():
+                    result['features'].append({'key': key,
+                                               'value': value})
+            except Exception as e:
+                msg = '[Processing feature] %s: %s'
+                log_queue.put(msg % (filepath, e))
+                continue
+        # generate preview of trace
+        result['preview'] = None
+        if from_headers:
+            if preview_data is not None:
+                result['preview'] = preview_data
+        elif '.LOG.L.' not in file or trace.stats.channel != 'LOG':
+            # create previews only for non-log files (see issue #400)
             try:
-                work_queue.remove(filepath)
-            except:
+                trace = create_preview(trace, 30)
+                result['preview'] = trace.data
+            except ValueError:
                 pass
-    except KeyboardInterrupt:
-        return
+            except Exception as e:
+                msg = '[Creating preview] %s: %s'
+                log_queue.put(msg % (filepath, e))
+        # update dataset
+        dataset.append(result)
+    return dataset
@@ -86,6 +86,8 @@ class MyHandler(http.server.BaseHTTPRequestHandler):
             ('\n'.join(self.server.features))
         out += "<tr><th>file queue</th><td><pre>%s</pre></td></tr>" % \
             ('\n'.join(self.server._current_files))
+        out += "<tr><th>files in work</th><td>%d</td></tr>" % \
+            (len(self.server._pending))
         out += '</table>'
         out += "</body></html>"
         self.send_response(200)
@@ -130,18 +132,19 @@ def _runIndexer(options):
                          (len(data), options.mapping_file))
         else:
             mappings = {}
-        # create file queue and worker processes
-        manager = multiprocessing.Manager()
-        in_queue = manager.dict()
-        work_queue = manager.list()
-        out_queue = manager.list()
-        log_queue = manager.list()
+        # create file queues and worker processes - workers block on the
+        # input queue while idle
+        in_queue = multiprocessing.Queue()
+        out_queue = multiprocessing.Queue()
+        log_queue = multiprocessing.Queue()
         # spawn processes
+        processes = []
         for i in range(options.number_of_cpus):
-            args = (i, in_queue, work_queue, out_queue, log_queue, mappings)
+            args = (i, in_queue, out_queue, log_queue, mappings)
             p = multiprocessing.Process(target=worker, args=args)
             p.daemon = True
             p.start()
+            processes.append(p)
         # connect to database
         engine = create_engine(options.db_uri, encoding='utf-8',
                                convert_unicode=True)
@@ -157,13 +160,19 @@ def _runIndexer(options):
         service.mappings = mappings
         # set queues
         service.input_queue = in_queue
-        service.work_queue = work_queue
         service.output_queue = out_queue
         service.log_queue = log_queue
         service.paths = paths
         service._reset_walker()
         service._step_walker()
-        service.serve_forever(options.poll_interval)
+        try:
+            service.serve_forever(options.poll_interval)
+        finally:
+            # stop the workers - one sentinel per worker process
+            for p in processes:
+                in_queue.put(None)
+            for p in processes:
+                p.join(options.poll_interval)
     except KeyboardInterrupt:
         quit()
     logging.info("Indexer stopped.")
@@ -274,7 +283,7 @@ Default path option is 'data=*.*'.""")
         logging.basicConfig(stream=sys.stdout, level=level,
                             format="%(asctime)s [%(levelname)s] %(message)s")
     else:
-        logging.basicConfig(filename=options.log, level=level,
+        logging.basicConfig(filename=args.log, level=level,
                             format="%(asctime)s [%(levelname)s] %(message)s")
     _runIndexer(args)
 
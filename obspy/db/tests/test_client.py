@@ -80,7 +80,9 @@ class ClientTestCase(unittest.TestCase):
         header['starttime'] = tr.stats.starttime.datetime
         header['endtime'] = tr.stats.endtime.datetime
         channel3 = WaveformChannel(header)
+        # pickled arrays as written by earlier versions are still accepted
         channel3.preview = cls.preview.dumps()
+        channel3.update_preview_levels()
         file1.channels.append(channel1)
         file2.channels.append(channel2)
         file3.channels.append(channel3)
@@ -248,6 +250,26 @@ class ClientTestCase(unittest.TestCase):
                                      starttime=dt, endtime=dt2)
         self.assertEqual(len(st), 1)
         self.assertEqual(st[0].stats.npts, 3380)
+        # 5 - coarse levels
+        dt = UTCDateTime('2012-01-01 00:00:00.000000')
+        dt2 = UTCDateTime('2012-01-02 00:00:00.000000')
+        for delta in (600, 3600):
+            st = self.client.get_preview(network='GE', starttime=dt,
+                                         endtime=dt2, delta=delta)
+            self.assertEqual(len(st), 1)
+            self.assertEqual(st[0].stats.delta, delta)
+            self.assertEqual(st[0].stats.starttime, dt)
+            self.assertEqual(st[0].stats.npts, int(np.ceil(30000 / delta)))
+            self.assertEqual(st[0].stats.preview, True)
+            factor = delta // 30
+            expected = np.empty(st[0].stats.npts * factor, dtype=np.float32)
+            expected.fill(-1)
+            expected[:1000] = self.preview
+            np.testing.assert_equal(
+                st[0].data, expected.reshape(-1, factor).max(axis=1))
+        # peaks in the preview
+        self.assertEqual(st[0].data.max(), 44)
+        self.assertRaises(ValueError, self.client.get_preview, delta=60)
 
 
 def suite():
@@ -0,0 +1,241 @@
+# -*- coding: utf-8 -*-
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+from future.builtins import *  # NOQA
+from future import standard_library
+
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+import numpy as np
+from sqlalchemy import create_engine
+from sqlalchemy.orm.session import sessionmaker
+
+with standard_library.hooks():
+    import queue
+
+from obspy import Stream, Trace, UTCDateTime, read
+from obspy.core.preview import create_preview
+from obspy.core.util import AttribDict
+from obspy.db.db import (Base, WaveformChannel, WaveformFile, WaveformGaps,
+                         WaveformPreview)
+from obspy.db.indexer import (WaveformFileCrawler, _index_file,
+                              _read_mseed_index, worker)
+
+
+class WaveformFileCrawlerTestCase(unittest.TestCase):
+    """
+    Test suite for obspy.db.indexer.
+    """
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        rng = np.random.RandomState(42)
+        self.t = UTCDateTime(2012, 1, 1, 0, 0, 7.3)
+        tr = Trace(rng.randint(-1000, 1000, 100000).astype(np.int32))
+        tr.stats.network = 'BW'
+        tr.stats.station = 'MANZ'
+        tr.stats.channel = 'EHZ'
+        tr.stats.sampling_rate = 100.0
+        tr.stats.starttime = self.t
+        self.trace = tr
+        # one gap of 200 seconds
+        st = Stream([tr.slice(endtime=self.t + 400),
+                     tr.slice(starttime=self.t + 600)])
+        tr2 = tr.copy()
+        tr2.stats.channel = 'EHN'
+        st.append(tr2)
+        self.file = os.path.join(self.path, 'gaps.mseed')
+        st.write(self.file, format='MSEED', reclen=512, encoding='STEIM2')
+        os.mkdir(os.path.join(self.path, 'sub'))
+        tr.write(os.path.join(self.path, 'sub', 'BW.MANZ..EHZ.gse2'),
+                 format='GSE2')
+        with open(os.path.join(self.path, 'sub', 'no_waveform.txt'),
+                  'wb') as fh:
+            fh.write(b'nothing in here')
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def test_readMseedIndex(self):
+        """
+        Spans and gaps from the record headers and streamed previews have to
+        match the results based on the merged stream.
+        """
+        # small chunks to test reading records across chunk boundaries
+        result = _read_mseed_index(self.file, chunksize=1000)
+        st = read(self.file)
+        gaps = st.getGaps()
+        st.merge(fill_value=0)
+        self.assertEqual(len(result), 2)
+        for trace, gap_list, preview in result:
+            expected = st.select(id=trace.id)[0]
+            self.assertEqual(trace.stats.starttime, expected.stats.starttime)
+            self.assertEqual(trace.stats.endtime, expected.stats.endtime)
+            self.assertEqual(trace.stats.npts, expected.stats.npts)
+            self.assertEqual(trace.stats.sampling_rate, 100.0)
+            self.assertEqual(trace.stats._format, 'MSEED')
+            expected_preview = create_preview(expected, 30).data
+            if trace.stats.channel == 'EHN':
+                self.assertEqual(gap_list, [])
+                np.testing.assert_array_equal(preview, expected_preview)
+                continue
+            self.assertEqual(len(gap_list), 1)
+            self.assertEqual(gap_list[0]['gap'], True)
+            self.assertEqual(gap_list[0]['starttime'], gaps[0][4].datetime)
+            self.assertEqual(gap_list[0]['endtime'], gaps[0][5].datetime)
+            self.assertEqual(gap_list[0]['samples'], gaps[0][7])
+            # slices without any data are marked with -1
+            self.assertEqual(len(preview), len(expected_preview))
+            empty = preview == -1
+            self.assertEqual(empty.sum(), 6)
+            np.testing.assert_array_equal(preview[~empty],
+                                          expected_preview[~empty])
+        # slices partially within a gap only include the recorded samples,
+        # the stream based preview includes the zero fill value
+        rng = np.random.RandomState(815)
+        tr = Trace(5000 + rng.randint(0, 1000, 12000).astype(np.int32))
+        tr.stats.sampling_rate = 100.0
+        tr.stats.starttime = UTCDateTime(2012, 1, 1)
+        st = Stream([tr.slice(endtime=tr.stats.starttime + 44.99),
+                     tr.slice(starttime=tr.stats.starttime + 75)])
+        partial = os.path.join(self.path, 'partial.mseed')
+        st.write(partial, format='MSEED', reclen=512, encoding='STEIM2')
+        ((_, gap_list, preview),) = _read_mseed_index(partial)
+        self.assertEqual(len(gap_list), 1)
+        expected = [np.ptp(tr.data[i:i + 3000]) for i in (0, 9000)]
+        expected[1:1] = [np.ptp(tr.data[3000:4500]),
+                         np.ptp(tr.data[7500:9000])]
+        np.testing.assert_array_equal(preview, expected)
+        st.merge(fill_value=0)
+        stream_preview = create_preview(st[0], 30).data
+        np.testing.assert_array_equal(stream_preview[[0, 3]],
+                                      preview[[0, 3]])
+        np.testing.assert_array_equal(
+            stream_preview[1:3], [tr.data[3000:4500].max(),
+                                  tr.data[7500:9000].max()])
+        # files which can not be handled from the record headers
+        self.assertEqual(_read_mseed_index(os.path.join(
+            self.path, 'sub', 'no_waveform.txt')), None)
+        # mixed data and text records are left to read()
+        mixed = os.path.join(self.path, 'mixed.mseed')
+        log = Trace(np.frombuffer(b'log message ' * 100, dtype='|S1'))
+        log.stats.channel = 'LOG'
+        log.stats.starttime = self.t
+        with open(mixed, 'wb') as fh:
+            self.trace.write(fh, format='MSEED', reclen=512,
+                             encoding='STEIM2')
+            log.write(fh, format='MSEED', reclen=512, encoding='ASCII')
+        self.assertEqual(len(read(mixed)), 2)
+        for preview in (True, False):
+            self.assertEqual(_read_mseed_index(mixed, preview=preview), None)
+
+    def test_worker(self):
+        """
+        Worker processes files from the input queue until None is received.
+        """
+        input_queue = queue.Queue()
+        output_queue = queue.Queue()
+        log_queue = queue.Queue()
+        gse2 = os.path.join(self.path, 'sub', 'BW.MANZ..EHZ.gse2')
+        txt = os.path.join(self.path, 'sub', 'no_waveform.txt')
+        for filepath in (self.file, gse2, txt):
+            path, file = os.path.split(filepath)
+            input_queue.put((filepath, (path, file, [])))
+        input_queue.put(None)
+        mappings = {'BW.MANZ..EHN': [{
+            'network': 'GE', 'station': 'FUR', 'location': '',
+            'channel': 'HHN', 'starttime': None, 'endtime': None}]}
+        worker(0, input_queue, output_queue, log_queue, mappings)
+        results = dict(output_queue.get_nowait() for _i in range(3))
+        self.assertTrue(output_queue.empty())
+        # Mini-SEED file indexed from the record headers
+        dataset = sorted(results[self.file], key=lambda x: x['channel'])
+        self.assertEqual([x['channel'] for x in dataset], ['EHZ', 'HHN'])
+        self.assertEqual(dataset[1]['station'], 'FUR')
+        self.assertEqual(len(dataset[0]['gaps']), 1)
+        self.assertEqual(dataset[0]['format'], 'MSEED')
+        self.assertEqual(dataset[0]['size'], os.path.getsize(self.file))
+        # GSE2 file read into a stream
+        dataset = results[gse2]
+        self.assertEqual(len(dataset), 1)
+        self.assertEqual(dataset[0]['format'], 'GSE2')
+        self.assertEqual(dataset[0]['starttime'],
+                         read(gse2)[0].stats.starttime.datetime)
+        np.testing.assert_array_equal(
+            dataset[0]['preview'],
+            create_preview(self.trace.copy(), 30).data)
+        # unreadable files are reported with an empty dataset
+        self.assertEqual(results[txt], [])
+        messages = [log_queue.get_nowait() for _i in range(log_queue.qsize())]
+        self.assertTrue(any(msg.startswith('[Reading stream] ' + txt)
+                            for msg in messages))
+        self.assertIn("Mapping 'BW.MANZ..EHN' to 'GE.FUR..HHN'", messages)
+
+    def test_crawler(self):
+        """
+        Crawls a directory using a worker thread and writes the results into
+        a database.
+        """
+        engine = create_engine('sqlite:///:memory:')
+        Base.metadata.create_all(engine)
+        crawler = WaveformFileCrawler()
+        crawler.session = sessionmaker(bind=engine)
+        crawler.log = logging.getLogger('obspy.db.indexer.test')
+        crawler.options = AttribDict({
+            'number_of_cpus': 1, 'run_once': False, 'cleanup': False,
+            'check_duplicates': False, 'recent': 0, 'force_reindex': False,
+            'skip_dots': True})
+        crawler.input_queue = queue.Queue()
+        crawler.output_queue = queue.Queue()
+        crawler.log_queue = queue.Queue()
+        crawler.running = True
+        crawler.paths = crawler._prepare_paths([self.path])
+        thread = threading.Thread(target=worker, args=(
+            0, crawler.input_queue, crawler.output_queue, crawler.log_queue))
+        thread.start()
+        try:
+            crawler._reset_walker()
+            crawler._step_walker()
+            # one full cycle through all directories
+            for _i in range(10):
+                crawler.iterate()
+            while crawler._pending:
+                crawler._process_output_queue(timeout=10)
+        finally:
+            crawler.input_queue.put(None)
+            thread.join()
+        session = crawler.session()
+        files = session.query(WaveformFile).order_by(WaveformFile.file).all()
+        self.assertEqual([(f.file, f.format, len(f.channels)) for f in files],
+                         [('BW.MANZ..EHZ.gse2', 'GSE2', 1),
+                          ('gaps.mseed', 'MSEED', 2)])
+        self.assertEqual(session.query(WaveformChannel).count(), 3)
+        self.assertEqual(session.query(WaveformGaps).count(), 1)
+        # 10 minutes and 1 hour previews for every channel
+        self.assertEqual(session.query(WaveformPreview).count(), 6)
+        session.close()
+        # a broken entry does not prevent other entries of the same batch
+        dataset = [dict(x, file='copy.mseed') for x in
+                   _index_file(self.file, self.path, 'gaps.mseed', [], {},
+                               queue.Queue())]
+        broken = [dict(dataset[0], file='broken.mseed', starttime=None)]
+        crawler.log = logging.getLogger('obspy.db.indexer.test.silent')
+        crawler.log.disabled = True
+        crawler._update_or_insert_many([broken, dataset])
+        session = crawler.session()
+        files = [f.file for f in session.query(WaveformFile)]
+        self.assertIn('copy.mseed', files)
+        self.assertNotIn('broken.mseed', files)
+        session.close()
+
+
+def suite():
+    return unittest.makeSuite(WaveformFileCrawlerTestCase, 'test')
+
+
+if __name__ == '__main__':
+    unittest.main(defaultTest='suite')
@@ -3,9 +3,18 @@ from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 from future.builtins import *  # NOQA
 
+import pickle
 import unittest
 
-from obspy.db.util import parse_mapping_data
+import numpy as np
+from sqlalchemy import create_engine
+from sqlalchemy.orm.session import sessionmaker
+
+from obspy import UTCDateTime
+from obspy.db.client import Client
+from obspy.db.db import (PREVIEW_MARKER, Base, PreviewType, WaveformChannel,
+                         WaveformFile, WaveformPath, WaveformPreview)
+from obspy.db.util import migrate_previews, parse_mapping_data
 
 
 class UtilTestCase(unittest.TestCase):
@@ -55,6 +64,80 @@ class UtilTestCase(unittest.TestCase):
         data = ["BW.MANZ.00.EHE GE.ROTZ..EHZ 2009-01-01 2008-01-01"]
         self.assertRaises(Exception, parse_mapping_data, data)
 
+    def test_migratePreviews(self):
+        """
+        Tests for function migrate_previews.
+        """
+        engine = create_engine('sqlite:///:memory:')
+        Base.metadata.create_all(engine)
+        session = sessionmaker(bind=engine)()
+        path = WaveformPath({'path': '/path'})
+        file = WaveformFile({'file': 'file.mseed', 'size': 1, 'mtime': 0,
+                             'format': 'MSEED'})
+        channel = WaveformChannel({
+            'network': 'BW', 'station': 'MANZ', 'location': '',
+            'channel': 'EHZ', 'sampling_rate': 100.0,
+            'starttime': UTCDateTime(2012, 1, 1, 0, 5).datetime,
+            'endtime': UTCDateTime(2012, 1, 1, 2).datetime})
+        path.files.append(file)
+        file.channels.append(channel)
+        session.add(path)
+        session.commit()
+        # preview as written by earlier versions into a PickleType column
+        preview = np.arange(210, dtype=np.float32)
+        legacy = pickle.dumps(preview.dumps(), protocol=0)
+        engine.execute(WaveformChannel.__table__.update().values(
+            preview=legacy))
+        session.expire_all()
+        np.testing.assert_array_equal(channel.preview, preview)
+        self.assertEqual(migrate_previews(session), 1)
+        raw = engine.execute(
+            'SELECT preview FROM default_waveform_channels').scalar()
+        self.assertEqual(raw[:4], PREVIEW_MARKER)
+        np.testing.assert_array_equal(
+            np.frombuffer(raw[4:], dtype=np.dtype('<f4')), preview)
+        previews = session.query(WaveformPreview).all()
+        self.assertEqual([x.delta for x in previews], [600, 3600])
+        # slices of 10 minutes aligned to 00:00, the first one is covered by
+        # 10 of the 30 seconds preview samples only
+        self.assertEqual(UTCDateTime(previews[0].starttime),
+                         UTCDateTime(2012, 1, 1))
+        np.testing.assert_array_equal(previews[0].data, np.arange(9, 210, 20))
+        np.testing.assert_array_equal(previews[1].data, [109, 209])
+        # nothing left to do
+        self.assertEqual(migrate_previews(session), 0)
+        session.close()
+        # retrieval of the coarse levels
+        client = Client(session=sessionmaker(bind=engine))
+        st = client.get_preview(starttime=UTCDateTime(2012, 1, 1),
+                                endtime=UTCDateTime(2012, 1, 1, 3),
+                                delta=3600)
+        self.assertEqual(st[0].id, 'BW.MANZ..EHZ')
+        np.testing.assert_array_equal(st[0].data, [109, 209])
+
+    def test_previewType(self):
+        """
+        Preview data is stored as raw float32 after a format marker.
+        """
+        column = PreviewType()
+        # raw data resembling a protocol 0 pickle
+        data = np.frombuffer(b'S...', dtype=np.dtype('<f4'))
+        value = column.process_bind_param(data, None)
+        self.assertEqual(value, PREVIEW_MARKER + b'S...')
+        np.testing.assert_array_equal(
+            column.process_result_value(value, None), data)
+        # an incomplete trailing sample is ignored
+        np.testing.assert_array_equal(
+            column.process_result_value(value + b'.', None), data)
+        self.assertEqual(
+            len(column.process_result_value(PREVIEW_MARKER + b'..', None)), 0)
+        # arrays pickled by earlier versions
+        preview = np.arange(10, dtype=np.float32)
+        for value in (preview.dumps(),
+                      pickle.dumps(preview.dumps(), protocol=0)):
+            np.testing.assert_array_equal(
+                column.process_result_value(value, None), preview)
+
 
 def suite():
     return unittest.makeSuite(UtilTestCase, 'test')
@@ -12,7 +12,11 @@ from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 from future.builtins import *  # NOQA
 
+from sqlalchemy import func
+from sqlalchemy.orm.attributes import flag_modified
+
 from obspy import UTCDateTime
+from obspy.db.db import PREVIEW_LEVELS, WaveformChannel, WaveformPreview
 
 
 def parse_mapping_data(lines):
@@ -73,3 +77,39 @@ def parse_mapping_data(lines):
         results.setdefault(old_id, [])
         results.get(old_id).append(temp)
     return results
+
+
+def migrate_previews(session, levels=PREVIEW_LEVELS[1:], batch_size=1000):
+    """
+    Converts previews of a database created by an earlier version of
+    obspy.db into raw float32 and creates the coarse preview levels.
+
+    Channels which already have all coarse preview levels are skipped, so
+    an interrupted migration may simply be started again.
+
+    :type session: :class:`sqlalchemy.orm.session.Session`
+    :param session: Database session, e.g. ``Client(url).session()``.
+    :type levels: tuple of int
+    :param levels: Coarse preview levels to create.
+    :type batch_size: int
+    :param batch_size: Number of channels converted per transaction.
+    :rtype: int
+    :return: Number of converted channels.
+    """
+    # channels with all levels
+    query = session.query(WaveformPreview.channel_id)
+    query = query.filter(WaveformPreview.delta.in_(levels))
+    query = query.group_by(WaveformPreview.channel_id)
+    query = query.having(func.count(WaveformPreview.delta) == len(levels))
+    done = set(row[0] for row in query)
+    ids = [row[0] for row in session.query(WaveformChannel.id)
+           if row[0] not in done]
+    for i in range(0, len(ids), batch_size):
+        query = session.query(WaveformChannel)
+        query = query.filter(WaveformChannel.id.in_(ids[i:i + batch_size]))
+        for channel in query:
+            # rewrite preview in new format
+            flag_modified(channel, 'preview')
+            channel.update_preview_levels(levels)
+        session.commit()
+    return len(ids)
@@ -14,11 +14,29 @@ from future.builtins import *  # NOQA
 
 import math
 import warnings
+from multiprocessing.pool import ThreadPool
 
 import numpy as np
 
 from obspy.core.util.decorator import deprecated
 
+try:
+    from geographiclib.geodesic import Geodesic
+    HAS_GEOGRAPHICLIB = True
+except ImportError:
+    HAS_GEOGRAPHICLIB = False
+
+
+# Data on the WGS84 reference ellipsoid
+WGS84_A = 6378137.0
+WGS84_F = 1 / 298.257223563
+
+ANTIPODE_WARNING = (
+    "Catching unstable calculation on antipodes. The currently used "
+    "Vincenty's Inverse formulae has known limitations for two nearly "
+    "antipodal points. Install the Python module 'geographiclib' to solve "
+    "this issue.")
+
 
 @deprecated("'calcVincentyInverse' has been renamed to "
             "'calc_vincenty_inverse'. Use that instead.")
@@ -220,33 +238,202 @@ def gps2dist_azimuth(lat1, lon1, lat2, lon2):
         has known limitations for two nearly antipodal points and is ca. 4x
         slower.
     """
-    try:
-        # try using geographiclib
-        from geographiclib.geodesic import Geodesic
+    if HAS_GEOGRAPHICLIB:
         result = Geodesic.WGS84.Inverse(lat1, lon1, lat2, lon2)
         azim = result['azi1']
         if azim < 0:
             azim += 360
         bazim = result['azi2'] + 180
         return (result['s12'], azim, bazim)
-    except ImportError:
-        pass
     try:
         values = calc_vincenty_inverse(lat1, lon1, lat2, lon2)
         if np.alltrue(np.isnan(values)):
             raise StopIteration
         return values
     except StopIteration:
-        msg = "Catching unstable calculation on antipodes. " + \
-              "The currently used Vincenty's Inverse formulae " + \
-              "has known limitations for two nearly antipodal points. " + \
-              "Install the Python module 'geographiclib' to solve this issue."
-        warnings.warn(msg)
+        warnings.warn(ANTIPODE_WARNING)
         return (20004314.5, 0.0, 0.0)
     except ValueError as e:
         raise e
 
 
+def _vincenty_inverse_array(lat1, lon1, lat2, lon2, iterlimit=100):
+    """
+    Vectorized Vincenty Inverse Solution on the WGS84 ellipsoid.
+
+    Takes 1-D arrays of coordinates in degrees and returns the distances in
+    m, the azimuths and back azimuths in degrees and a boolean mask of all
+    elements for which the iteration did not converge (nearly antipodal
+    points).
+    """
+    a = WGS84_A
+    f = WGS84_F
+    b = a * (1 - f)
+
+    U1 = np.arctan((1 - f) * np.tan(np.radians(lat1)))
+    U2 = np.arctan((1 - f) * np.tan(np.radians(lat2)))
+    sinU1, cosU1 = np.sin(U1), np.cos(U1)
+    sinU2, cosU2 = np.sin(U2), np.cos(U2)
+    omega = np.radians(lon2 - lon1)
+    # wrap the longitude difference to [-pi, pi]
+    omega = np.arctan2(np.sin(omega), np.cos(omega))
+
+    dlon = omega.copy()
+    failed = np.zeros(len(dlon), dtype=np.bool_)
+    # indices of all elements still iterating
+    active = np.arange(len(dlon))
+    for _i in range(iterlimit):
+        if not len(active):
+            break
+        lam = dlon[active]
+        sinU1_, cosU1_ = sinU1[active], cosU1[active]
+        sinU2_, cosU2_ = sinU2[active], cosU2[active]
+        sin_lam, cos_lam = np.sin(lam), np.cos(lam)
+        sin_sigma = np.sqrt((cosU2_ * sin_lam) ** 2 +
+                            (cosU1_ * sinU2_ - sinU1_ * cosU2_ * cos_lam) ** 2)
+        cos_sigma = sinU1_ * sinU2_ + cosU1_ * cosU2_ * cos_lam
+        sigma = np.arctan2(sin_sigma, cos_sigma)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            sin_alpha = np.where(sin_sigma != 0,
+                                 cosU1_ * cosU2_ * sin_lam / sin_sigma, 0.0)
+            cos2_alpha = 1 - sin_alpha ** 2
+            # equatorial lines have cos2_alpha = 0
+            cos2sigma_m = np.where(
+                cos2_alpha != 0,
+                cos_sigma - 2 * sinU1_ * sinU2_ / cos2_alpha, 0.0)
+        C = f / 16 * cos2_alpha * (4 + f * (4 - 3 * cos2_alpha))
+        new = omega[active] + (1 - C) * f * sin_alpha * (
+            sigma + C * sin_sigma * (
+                cos2sigma_m + C * cos_sigma * (-1 + 2 * cos2sigma_m ** 2)))
+        dlon[active] = new
+        diverged = ~np.isfinite(new) | (np.abs(new) > np.pi)
+        converged = np.abs(new - lam) <= 1e-12 * np.maximum(np.abs(new), 1)
+        failed[active[diverged]] = True
+        active = active[~(converged | diverged)]
+    failed[active] = True
+
+    sin_lam, cos_lam = np.sin(dlon), np.cos(dlon)
+    sin_sigma = np.sqrt((cosU2 * sin_lam) ** 2 +
+                        (cosU1 * sinU2 - sinU1 * cosU2 * cos_lam) ** 2)
+    cos_sigma = sinU1 * sinU2 + cosU1 * cosU2 * cos_lam
+    sigma = np.arctan2(sin_sigma, cos_sigma)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sin_alpha = np.where(sin_sigma != 0,
+                             cosU1 * cosU2 * sin_lam / sin_sigma, 0.0)
+        cos2_alpha = 1 - sin_alpha ** 2
+        cos2sigma_m = np.where(cos2_alpha != 0,
+                               cos_sigma - 2 * sinU1 * sinU2 / cos2_alpha, 0.0)
+    u2 = cos2_alpha * (a * a - b * b) / (b * b)
+    A = 1 + u2 / 16384 * (4096 + u2 * (-768 + u2 * (320 - 175 * u2)))
+    B = u2 / 1024 * (256 + u2 * (-128 + u2 * (74 - 47 * u2)))
+    delta_sigma = B * sin_sigma * (
+        cos2sigma_m + B / 4 * (
+            cos_sigma * (-1 + 2 * cos2sigma_m ** 2) - B / 6 * cos2sigma_m *
+            (-3 + 4 * sin_sigma ** 2) * (-3 + 4 * cos2sigma_m ** 2)))
+    dist = b * A * (sigma - delta_sigma)
+    azimuth = np.degrees(np.arctan2(
+        cosU2 * sin_lam, cosU1 * sinU2 - sinU1 * cosU2 * cos_lam)) % 360.0
+    back_azimuth = (np.degrees(np.arctan2(
+        cosU1 * sin_lam, -sinU1 * cosU2 + cosU1 * sinU2 * cos_lam)) +
+        180.0) % 360.0
+    return dist, azimuth, back_azimuth, failed
+
+
+def gps2dist_azimuth_array(lat1, lon1, lat2, lon2, threads=1, chunk=100000):
+    """
+    Computes distances and azimuths for arrays of pairs of geographic points.
+
+    Vectorized version of :func:`gps2dist_azimuth`. The coordinates are
+    broadcast against each other, so e.g. ``lat1[:, None]`` and
+    ``lat2[None, :]`` give the full event x station matrices. The distances
+    are computed by a vectorized version of Vincenty's Inverse formulae on
+    the WGS84 ellipsoid, iterating only the elements which have not
+    converged yet. Nearly antipodal points, for which the iteration does not
+    converge, are solved with the module
+    `geographiclib <http://geographiclib.sf.net>`_ if it is installed and
+    are otherwise handled like in :func:`gps2dist_azimuth` (with a warning).
+
+    :type lat1: float or array-like
+    :param lat1: Latitude(s) of point A in degrees.
+    :type lon1: float or array-like
+    :param lon1: Longitude(s) of point A in degrees.
+    :type lat2: float or array-like
+    :param lat2: Latitude(s) of point B in degrees.
+    :type lon2: float or array-like
+    :param lon2: Longitude(s) of point B in degrees.
+    :type threads: int
+    :param threads: Number of threads the chunks of pairs are distributed
+        over.
+    :type chunk: int
+    :param chunk: Number of pairs computed in one go.
+    :rtype: tuple of three :class:`numpy.ndarray`
+    :return: (Great circle distances in m, azimuths A->B in degrees,
+        azimuths B->A in degrees), each with the broadcast shape of the
+        input.
+
+    .. rubric:: Example
+
+    >>> import numpy as np
+    >>> from obspy.geodetics import gps2dist_azimuth_array
+    >>> dist, az, baz = gps2dist_azimuth_array(
+    ...     np.array([0.0, 10.0]), 0.0, 10.0, np.array([10.0, 0.0]))
+    >>> print("%.1f %.2f %.2f" % (dist[0], az[0], baz[0]))
+    1565109.1 44.75 225.63
+    >>> print("%.1f %.2f %.2f" % (dist[1], az[1], baz[1]))
+    0.0 0.00 0.00
+    """
+    lat1, lon1, lat2, lon2 = [np.asarray(x, dtype=np.float64) for x in
+                              np.broadcast_arrays(lat1, lon1, lat2, lon2)]
+    shape = lat1.shape
+    lat1, lon1, lat2, lon2 = [x.ravel() for x in (lat1, lon1, lat2, lon2)]
+    if np.any(np.abs(lat1) > 90):
+        msg = "Latitude of Point 1 out of bounds! (-90 <= lat1 <=90)"
+        raise ValueError(msg)
+    if np.any(np.abs(lat2) > 90):
+        msg = "Latitude of Point 2 out of bounds! (-90 <= lat2 <=90)"
+        raise ValueError(msg)
+
+    dist = np.empty(len(lat1), dtype=np.float64)
+    azimuth = np.empty(len(lat1), dtype=np.float64)
+    back_azimuth = np.empty(len(lat1), dtype=np.float64)
+    failed = np.empty(len(lat1), dtype=np.bool_)
+
+    def _compute(start):
+        sl = slice(start, start + chunk)
+        dist[sl], azimuth[sl], back_azimuth[sl], failed[sl] = \
+            _vincenty_inverse_array(lat1[sl], lon1[sl], lat2[sl], lon2[sl])
+
+    starts = range(0, len(lat1), chunk)
+    if threads > 1 and len(starts) > 1:
+        pool = ThreadPool(threads)
+        try:
+            pool.map(_compute, starts)
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        for start in starts:
+            _compute(start)
+
+    # identical points
+    same = (np.abs(lat1 - lat2) < 1e-8) & \
+        (np.abs(((lon1 - lon2) + 180.0) % 360.0 - 180.0) < 1e-8)
+    dist[same] = azimuth[same] = back_azimuth[same] = 0.0
+    failed[same] = False
+
+    if np.any(failed):
+        if HAS_GEOGRAPHICLIB:
+            for i in np.nonzero(failed)[0]:
+                dist[i], azimuth[i], back_azimuth[i] = gps2dist_azimuth(
+                    lat1[i], lon1[i], lat2[i], lon2[i])
+        else:
+            warnings.warn(ANTIPODE_WARNING)
+            dist[failed] = 20004314.5
+            azimuth[failed] = back_azimuth[failed] = 0.0
+    return (dist.reshape(shape), azimuth.reshape(shape),
+            back_azimuth.reshape(shape))
+
+
 def kilometer2degrees(kilometer, radius=6371):
     """
     Convenience function to convert kilometers to degrees assuming a perfectly
@@ -7,9 +7,11 @@ import math
 import unittest
 import warnings
 
+import numpy as np
+
 from obspy.geodetics import (calc_vincenty_inverse, degrees2kilometers,
-                             gps2dist_azimuth, kilometer2degrees,
-                             locations2degrees)
+                             gps2dist_azimuth, gps2dist_azimuth_array,
+                             kilometer2degrees, locations2degrees)
 
 # checking for geographiclib
 try:
@@ -110,6 +112,63 @@ class UtilGeodeticsTestCase(unittest.TestCase):
         self.assertAlmostEqual(alpha12, calc_alpha12)
         self.assertAlmostEqual(alpha21, calc_alpha21)
 
+    def test_gps2DistAzimuthArray(self):
+        """
+        The vectorized calculation has to match the scalar one.
+        """
+        rng = np.random.RandomState(42)
+        lat1 = rng.uniform(-90, 90, 500)
+        lon1 = rng.uniform(-180, 180, 500)
+        lat2 = rng.uniform(-90, 90, 500)
+        lon2 = rng.uniform(-180, 180, 500)
+        dist, azim, bazim = gps2dist_azimuth_array(lat1, lon1, lat2, lon2)
+        for i in range(500):
+            try:
+                expected = calc_vincenty_inverse(lat1[i], lon1[i], lat2[i],
+                                                 lon2[i])
+            except StopIteration:
+                continue
+            self.assertLess(abs(dist[i] - expected[0]), 0.1)
+            self.assertLess(abs((azim[i] - expected[1] + 180) % 360 - 180),
+                            1e-5)
+            self.assertLess(abs((bazim[i] - expected[2] + 180) % 360 - 180),
+                            1e-5)
+        # chunks distributed over threads give the same result
+        result = gps2dist_azimuth_array(lat1, lon1, lat2, lon2, threads=3,
+                                        chunk=64)
+        for got, expected in zip(result, (dist, azim, bazim)):
+            np.testing.assert_array_equal(got, expected)
+        # event x station matrix by broadcasting, identical points and
+        # lines along the equator
+        dist, azim, bazim = gps2dist_azimuth_array(
+            np.array([[0.0], [10.0]]), 0.0, np.array([10.0, 10.0, 0.0]),
+            np.array([[10.0, 0.0, 13.0]]))
+        self.assertEqual(dist.shape, (2, 3))
+        self.assertEqual(dist[1, 1], 0.0)
+        self.assertAlmostEqual(dist[0, 2], 1447153.3803, 3)
+        self.assertAlmostEqual(azim[0, 2], 90.0)
+        self.assertAlmostEqual(bazim[0, 2], 270.0)
+        self.assertAlmostEqual(
+            dist[0, 0], calc_vincenty_inverse(0, 0, 10, 10)[0], 3)
+        # out of bounds
+        self.assertRaises(ValueError, gps2dist_azimuth_array, [0, 91], 0, 0,
+                          0)
+        self.assertRaises(ValueError, gps2dist_azimuth_array, 0, 0, [-91], 0)
+        # nearly antipodal points are handled like in gps2dist_azimuth()
+        with warnings.catch_warnings(record=True):
+            warnings.simplefilter('always')
+            expected = gps2dist_azimuth(15.26804251, 2.93007342,
+                                        -14.80522806, -177.2299081)
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter('always')
+            result = gps2dist_azimuth_array(
+                [15.26804251, 0], [2.93007342, 0], [-14.80522806, 0],
+                [-177.2299081, 10])
+        self.assertEqual(len(w), 0 if HAS_GEOGRAPHICLIB else 1)
+        for got, expected_ in zip(result, expected):
+            self.assertAlmostEqual(got[0], expected_)
+        self.assertAlmostEqual(result[0][1], 1113194.9078, 3)
+
     @unittest.skipIf(HAS_GEOGRAPHICLIB, 'Module geographiclib is installed, '
                                         'not using calc_vincenty_inverse')
     def test_gps2DistAzimuthBUG150(self):
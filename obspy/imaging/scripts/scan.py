@@ -19,6 +19,10 @@ considerably.
 Gap data can be written to a NumPy npz file. This file can be loaded later
 for optionally adding more data and plotting.
 
+Files are read in parallel with "-p PROCESSES". With "--cache FILE" the
+headers of all scanned files are kept in a NumPy npz file, repeated scans
+only read new files and files with changed size or modification time.
+
 Supported formats: All formats supported by ObsPy modules (currently: MSEED,
 GSE2, SAC, SACXY, WAV, SH-ASC, SH-Q, SEISAN).
 If the format is known beforehand, the reading speed can be increased
@@ -31,7 +35,10 @@ http://tutorial.obspy.org
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 from future.builtins import *  # NOQA
+from future.utils import native_str
 
+import datetime
+import multiprocessing
 import os
 import sys
 import warnings
@@ -45,91 +52,241 @@ from obspy.imaging.util import ObsPyAutoDateFormatter, \
     decimal_seconds_format_date_first_tick
 
 
-def compressStartend(x, stop_iteration):
+def compressStartend(x, stop_iteration=None):
     """
     Compress 2-dimensional array of piecewise continuous start/end time pairs
     by merging overlapping and exactly fitting pieces into one.
     This reduces the number of lines needed in the plot considerably and is
     necessary for very large data sets.
-    The maximum number of iterations can be specified.
+
+    The pieces have to be sorted by start time. All pieces are merged in a
+    single pass, ``stop_iteration`` is only kept for backwards
+    compatibility.
     """
-    diffs = x[1:, 0] - x[:-1, 1]
-    inds = np.concatenate([(diffs <= 0), [False]])
-    i = 0
-    while any(inds):
-        if i >= stop_iteration:
-            msg = "Stopping to merge lines for plotting at iteration %d"
-            msg = msg % i
-            warnings.warn(msg)
-            break
-        i += 1
-        first_ind = np.nonzero(inds)[0][0]
-        # to use fast NumPy methods currently we only can merge two consecutive
-        # pieces, so we set every second entry to False
-        inds[first_ind + 1::2] = False
-        inds_next = np.roll(inds, 1)
-        x[inds, 1] = x[inds_next, 1]
-        inds_del = np.nonzero(inds_next)
-        x = np.delete(x, inds_del, 0)
-        diffs = x[1:, 0] - x[:-1, 1]
-        inds = np.concatenate([(diffs <= 0), [False]])
-    return x
+    if len(x) < 2:
+        return x
+    # end of the merged piece up to each position
+    ends = np.maximum.accumulate(x[:, 1])
+    new_piece = np.concatenate([[True], x[1:, 0] > ends[:-1]])
+    first = np.nonzero(new_piece)[0]
+    last = np.concatenate([first[1:] - 1, [len(x) - 1]])
+    return np.column_stack([x[first, 0], ends[last]])
 
 
-def parse_file_to_dict(data_dict, samp_int_dict, file, counter, format=None,
-                       verbose=False, quiet=False, ignore_links=False):
-    from matplotlib.dates import date2num
-    if ignore_links and os.path.islink(file):
-        if verbose or not quiet:
-            print("Ignoring symlink: %s" % (file))
-        return counter
+def _scan_file(args):
+    """
+    Reads the headers of a single waveform file.
+
+    Takes a tuple of file name and format to be usable with
+    :meth:`multiprocessing.pool.Pool.imap`. Returns the file name and a list
+    of ``(id, starttime, endtime, sampling_rate)`` tuples with POSIX
+    timestamps for all traces or ``None`` if the file can not be read.
+    """
+    file, format = args
     try:
         stream = read(file, format=format, headonly=True)
     except:
+        return file, None
+    return file, [(tr.id, tr.stats.starttime.timestamp,
+                   tr.stats.endtime.timestamp, tr.stats.sampling_rate)
+                  for tr in stream]
+
+
+def _add_traces(data_dict, samp_int_dict, file, traces, counter,
+                verbose=False, quiet=False):
+    """
+    Adds the result of :func:`_scan_file` to the start/end time and sample
+    interval dictionaries.
+    """
+    from matplotlib.dates import date2num
+    if traces is None:
         if verbose or not quiet:
             print("Can not read %s" % (file))
         return counter
-    s = "%s %s" % (counter, file)
     if verbose and not quiet:
-        sys.stdout.write("%s\n" % s)
-        for line in str(stream).split("\n"):
-            sys.stdout.write("    " + line + "\n")
+        sys.stdout.write("%s %s\n" % (counter, file))
+        for _id, start, end, sampling_rate in traces:
+            sys.stdout.write("    %s | %s - %s | %.1f Hz\n" % (
+                _id, UTCDateTime(start), UTCDateTime(end), sampling_rate))
         sys.stdout.flush()
-    for tr in stream:
-        _id = tr.getId()
-        data_dict.setdefault(_id, [])
-        data_dict[_id].append([date2num(tr.stats.starttime),
-                               date2num(tr.stats.endtime)])
-        try:
-            samp_int_dict.setdefault(_id, [])
-            samp_int_dict[_id].\
-                append(1. / (24 * 3600 * tr.stats.sampling_rate))
-        except ZeroDivisionError:
-            if verbose or not quiet:
-                print("Skipping file with zero samlingrate: %s" % (file))
-            return counter
+    if any(x[3] == 0 for x in traces):
+        if verbose or not quiet:
+            print("Skipping file with zero samlingrate: %s" % (file))
+        return counter
+    # matplotlib date number of the POSIX epoch
+    epoch = date2num(datetime.datetime(1970, 1, 1))
+    for _id, start, end, sampling_rate in traces:
+        data_dict.setdefault(_id, []).append(
+            [epoch + start / 86400.0, epoch + end / 86400.0])
+        samp_int_dict.setdefault(_id, []).append(
+            1. / (24 * 3600 * sampling_rate))
     return (counter + 1)
 
 
-def recursive_parse(data_dict, samp_int_dict, path, counter, format=None,
-                    verbose=False, quiet=False, ignore_links=False):
-    if ignore_links and os.path.islink(path):
+def parse_file_to_dict(data_dict, samp_int_dict, file, counter, format=None,
+                       verbose=False, quiet=False, ignore_links=False):
+    if ignore_links and os.path.islink(file):
         if verbose or not quiet:
-            print("Ignoring symlink: %s" % (path))
+            print("Ignoring symlink: %s" % (file))
         return counter
-    if os.path.isfile(path):
-        counter = parse_file_to_dict(data_dict, samp_int_dict, path, counter,
+    file, traces = _scan_file((file, format))
+    return _add_traces(data_dict, samp_int_dict, file, traces, counter,
+                       verbose=verbose, quiet=quiet)
+
+
+def recursive_parse(data_dict, samp_int_dict, path, counter, format=None,
+                    verbose=False, quiet=False, ignore_links=False):
+    for file in _list_files([path], recursive=True,
+                            ignore_links=ignore_links, verbose=verbose,
+                            quiet=quiet):
+        counter = parse_file_to_dict(data_dict, samp_int_dict, file, counter,
                                      format, verbose, quiet=quiet)
-    elif os.path.isdir(path):
-        for file in (os.path.join(path, file) for file in os.listdir(path)):
-            counter = recursive_parse(data_dict, samp_int_dict, file, counter,
-                                      format, verbose, quiet, ignore_links)
-    else:
-        if verbose or not quiet:
-            print("Problem with filename/dirname: %s" % (path))
     return counter
 
 
+def _list_files(paths, recursive=True, ignore_links=False, verbose=False,
+                quiet=False):
+    """
+    Generator of all files in the given files and directories.
+    """
+    for path in paths:
+        if ignore_links and os.path.islink(path):
+            if verbose or not quiet:
+                print("Ignoring symlink: %s" % (path))
+        elif os.path.isfile(path):
+            yield path
+        elif os.path.isdir(path) and recursive:
+            for root, dirs, files in os.walk(path,
+                                             followlinks=not ignore_links):
+                dirs.sort()
+                for file in sorted(files):
+                    file = os.path.join(root, file)
+                    if ignore_links and os.path.islink(file):
+                        if verbose or not quiet:
+                            print("Ignoring symlink: %s" % (file))
+                        continue
+                    yield file
+        elif os.path.isdir(path):
+            # only the files directly within the directory
+            for file in sorted(os.listdir(path)):
+                file = os.path.join(path, file)
+                if os.path.isfile(file) and not (
+                        ignore_links and os.path.islink(file)):
+                    yield file
+        else:
+            if verbose or not quiet:
+                print("Problem with filename/dirname: %s" % (path))
+
+
+def scan(paths, format=None, recursive=True, ignore_links=False,
+         processes=1, cache=None, verbose=False, quiet=False):
+    """
+    Reads the headers of all files in the given paths.
+
+    Files are read in a pool of ``processes`` worker processes. With a
+    ``cache`` dictionary as returned by :func:`load_cache`, files with
+    unchanged size and modification time are taken from the cache and only
+    new or changed files are read. The cache is updated in place.
+
+    Returns a generator of ``(file, traces)`` tuples as returned by
+    :func:`_scan_file`.
+    """
+    todo = []
+    for file in _list_files(paths, recursive=recursive,
+                            ignore_links=ignore_links, verbose=verbose,
+                            quiet=quiet):
+        if cache is None:
+            todo.append(file)
+            continue
+        try:
+            stat = os.stat(file)
+        except OSError:
+            todo.append(file)
+            continue
+        key = os.path.abspath(file)
+        cached = cache.get(key)
+        if cached is not None and cached[:2] == (stat.st_size,
+                                                 stat.st_mtime):
+            yield file, cached[2]
+        else:
+            cache[key] = (stat.st_size, stat.st_mtime, None)
+            todo.append(file)
+    args = [(file, format) for file in todo]
+    if processes > 1 and len(args) > 1:
+        pool = multiprocessing.Pool(processes)
+        try:
+            results = pool.imap(_scan_file, args,
+                                chunksize=max(1, min(100, len(args) //
+                                                     (4 * processes))))
+            for file, traces in results:
+                _update_cache(cache, file, traces)
+                yield file, traces
+        finally:
+            pool.terminate()
+    else:
+        for file, traces in map(_scan_file, args):
+            _update_cache(cache, file, traces)
+            yield file, traces
+
+
+def _update_cache(cache, file, traces):
+    key = os.path.abspath(file)
+    if cache is not None and key in cache:
+        cache[key] = cache[key][:2] + (traces, )
+
+
+def load_cache(file_):
+    """
+    Loads a scan cache written by :func:`write_cache`.
+
+    Returns a dictionary mapping absolute file names to tuples of file size,
+    modification time and the traces found in the file (see
+    :func:`_scan_file`). An empty cache is returned if the file does not
+    exist.
+    """
+    cache = {}
+    if not os.path.exists(file_):
+        return cache
+    npz = np.load(file_)
+    try:
+        files = npz['files']
+        traces = npz['traces']
+    finally:
+        npz.close()
+    entries = [[] if readable else None
+               for readable in files['readable']]
+    for index, _id, start, end, sampling_rate in traces.tolist():
+        entries[index].append((_id, start, end, sampling_rate))
+    for (file, size, mtime, _), traces_ in zip(files.tolist(), entries):
+        cache[file] = (size, mtime, traces_)
+    return cache
+
+
+def write_cache(file_, cache):
+    """
+    Writes a scan cache as returned by :func:`load_cache` into a NumPy npz
+    file.
+    """
+    keys = sorted(cache)
+    files = np.empty(len(keys), dtype=[
+        (native_str('file'), np.unicode_, max([len(x) for x in keys] + [1])),
+        (native_str('size'), np.int64), (native_str('mtime'), np.float64),
+        (native_str('readable'), np.bool_)])
+    traces = []
+    for i, key in enumerate(keys):
+        size, mtime, traces_ = cache[key]
+        files[i] = (key, size, mtime, traces_ is not None)
+        traces.extend((i, ) + tuple(x) for x in traces_ or [])
+    traces = np.array(traces, dtype=[
+        (native_str('file'), np.int32),
+        (native_str('id'), np.unicode_,
+         max([len(x[1]) for x in traces] + [1])),
+        (native_str('starttime'), np.float64),
+        (native_str('endtime'), np.float64),
+        (native_str('sampling_rate'), np.float64)])
+    np.savez(file_, files=files, traces=traces)
+
+
 def write_npz(file_, data_dict, samp_int_dict):
     npz_dict = data_dict.copy()
     for key in samp_int_dict.keys():
@@ -192,6 +349,14 @@ def main(argv=None):
     parser.add_argument('-l', '--load', default=None,
                         help='Optional, npz file for loading data '
                              'before scanning waveform files')
+    parser.add_argument('-c', '--cache', default=None,
+                        help='Optional, npz file caching the scan results '
+                             'per file. Only new files and files with '
+                             'changed size or modification time are read '
+                             'again.')
+    parser.add_argument('-p', '--processes', default=1, type=int,
+                        help='Optional, number of processes reading the '
+                             'files (default is 1).')
     parser.add_argument('--no-x', action='store_true',
                         help='Optional, Do not plot crosses.')
     parser.add_argument('--no-gaps', action='store_true',
@@ -235,12 +400,6 @@ def main(argv=None):
     if len(args.paths) == 0 and args.load is None:
         parser.error('No paths specified.')
 
-    # Use recursively parsing function?
-    if args.recursive:
-        parse_func = recursive_parse
-    else:
-        parse_func = parse_file_to_dict
-
     if args.output is not None:
         import matplotlib
         matplotlib.use("agg")
@@ -284,10 +443,16 @@ def main(argv=None):
     counter = 1
     if args.load:
         load_npz(args.load, data, samp_int)
-    for path in args.paths:
-        counter = parse_func(data, samp_int, path, counter, args.format,
-                             verbose=args.verbose, quiet=args.quiet,
-                             ignore_links=args.ignore_links)
+    cache = load_cache(args.cache) if args.cache else None
+    for file, traces in scan(args.paths, format=args.format,
+                             recursive=args.recursive,
+                             ignore_links=args.ignore_links,
+                             processes=args.processes, cache=cache,
+                             verbose=args.verbose, quiet=args.quiet):
+        counter = _add_traces(data, samp_int, file, traces, counter,
+                              verbose=args.verbose, quiet=args.quiet)
+    if args.cache:
+        write_cache(args.cache, cache)
     if not data:
         if args.verbose or not args.quiet:
             print("No waveform data found.")
@@ -309,17 +474,22 @@ def main(argv=None):
         print('\n')
     for _i, _id in enumerate(ids):
         labels[_i] = ids[_i]
-        data[_id].sort()
         startend = np.array(data[_id])
         if len(startend) == 0:
             continue
+        # sort sample intervals along with the start/end times
+        order = np.lexsort((startend[:, 1], startend[:, 0]))
+        startend = startend[order]
+        samp_ints = np.array(samp_int[_id])[order]
         # restrict plotting of results to given start/end time
         if args.start_time:
-            startend = startend[startend[:, 1] > args.start_time]
+            keep = startend[:, 1] > args.start_time
+            startend, samp_ints = startend[keep], samp_ints[keep]
         if len(startend) == 0:
             continue
-        if args.start_time:
-            startend = startend[startend[:, 0] < args.end_time]
+        if args.end_time:
+            keep = startend[:, 0] < args.end_time
+            startend, samp_ints = startend[keep], samp_ints[keep]
         if len(startend) == 0:
             continue
         timerange = startend[:, 1].max() - startend[:, 0].min()
@@ -339,7 +509,7 @@ def main(argv=None):
         gapsum = diffs[diffs > 0].sum()
         perc = (timerange - gapsum) / timerange
         labels[_i] = labels[_i] + "\n%.1f%%" % (perc * 100)
-        gap_indices = diffs > 1.8 * np.array(samp_int[_id][:-1])
+        gap_indices = diffs > 1.8 * samp_ints[:-1]
         gap_indices = np.concatenate((gap_indices, [False]))
         if any(gap_indices):
             # don't handle last end time as start of gap
@@ -11,10 +11,14 @@ import shutil
 import unittest
 from os.path import abspath, dirname, join, pardir
 
+import numpy as np
+
+from obspy import read
 from obspy.core.util.base import NamedTemporaryFile
 from obspy.core.util.misc import TemporaryWorkingDirectory
 from obspy.core.util.testing import ImageComparison
-from obspy.imaging.scripts.scan import main as obspy_scan
+from obspy.imaging.scripts.scan import (compressStartend, load_cache,
+                                        main as obspy_scan, scan, write_cache)
 
 
 class ScanTestCase(unittest.TestCase):
@@ -94,6 +98,56 @@ class ScanTestCase(unittest.TestCase):
                     as ic:
                 obspy_scan(files + ['--output', ic.name, '--quiet'])
 
+    def test_compressStartend(self):
+        """
+        Overlapping, contained and exactly fitting pieces are merged.
+        """
+        x = np.array([[0., 1.], [1., 2.], [1.5, 1.8], [3., 4.], [3.5, 5.],
+                      [6., 7.]])
+        np.testing.assert_array_equal(compressStartend(x),
+                                      [[0., 2.], [3., 5.], [6., 7.]])
+        np.testing.assert_array_equal(compressStartend(x[:1]), x[:1])
+
+    def test_scanCache(self):
+        """
+        Scans with a process pool and rescans only changed files from a
+        cache.
+        """
+        with TemporaryWorkingDirectory():
+            os.mkdir('sub')
+            for filename in self.all_files[:4]:
+                shutil.copy(filename, 'sub')
+            with open(join('sub', 'no_waveform.txt'), 'wb') as fh:
+                fh.write(b'nothing in here')
+            cache = {}
+            result = dict(scan([os.curdir], processes=2, cache=cache,
+                               quiet=True))
+            self.assertEqual(len(result), 5)
+            self.assertEqual(result[join(os.curdir, 'sub',
+                                         'no_waveform.txt')], None)
+            for filename in self.all_files[:4]:
+                file = join(os.curdir, 'sub', os.path.basename(filename))
+                st = read(filename, headonly=True)
+                self.assertEqual(result[file], [
+                    (tr.id, tr.stats.starttime.timestamp,
+                     tr.stats.endtime.timestamp, tr.stats.sampling_rate)
+                    for tr in st])
+            write_cache('cache.npz', cache)
+            cache = load_cache('cache.npz')
+            self.assertEqual(len(cache), 5)
+            # unchanged files are not read again
+            changed = join(os.curdir, 'sub',
+                           os.path.basename(self.all_files[0]))
+            for file in result:
+                if file != changed:
+                    size, mtime, traces = cache[os.path.abspath(file)]
+                    cache[os.path.abspath(file)] = (size, mtime, 'cached')
+            os.utime(changed, (0, 0))
+            result2 = dict(scan([os.curdir], cache=cache, quiet=True))
+            self.assertEqual(result2[changed], result[changed])
+            self.assertEqual(sorted(x for x in result2.values()
+                                    if x == 'cached'), ['cached'] * 4)
+
 
 def suite():
     return unittest.makeSuite(ScanTestCase, 'test')
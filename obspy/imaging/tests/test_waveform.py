@@ -13,9 +13,11 @@ import numpy as np
 
 from obspy import Stream, Trace, UTCDateTime
 from obspy.core.event import read_events
+from obspy.core.preview import MinMaxPyramid
 from obspy.core.stream import read
-from obspy.core.util import AttribDict
+from obspy.core.util import AttribDict, NamedTemporaryFile
 from obspy.core.util.testing import ImageComparison
+from obspy.imaging.waveform import WaveformPlotting
 
 
 class WaveformTestCase(unittest.TestCase):
@@ -351,6 +353,49 @@ class WaveformTestCase(unittest.TestCase):
             st.plot(outfile=ic.name, type='dayplot',
                     timezone='EST', time_offset=-5)
 
+    def test_plotWithMinMaxPyramid(self):
+        """
+        Min/max plots and day plots using a min/max pyramid attached to the
+        trace.
+        """
+        rng = np.random.RandomState(815)
+        tr = Trace(data=rng.randn(360000))
+        tr.stats.sampling_rate = 100.0
+        tr.stats.starttime = UTCDateTime(0)
+        tr.stats.calib = 2.0
+        tr2 = tr.copy()
+        tr2.stats.minmax_pyramid = MinMaxPyramid(tr2)
+        # day plot with 64 samples per pixel is resolved by the pyramid
+        result = []
+        for trace in (tr, tr2):
+            with NamedTemporaryFile(suffix='.png') as tf:
+                wp = WaveformPlotting(stream=trace, type='dayplot',
+                                      interval=8, size=(750, 600),
+                                      outfile=tf.name)
+                wp.plot_waveform()
+            result.append(wp.extreme_values)
+        np.testing.assert_array_equal(result[1].mask, result[0].mask)
+        np.testing.assert_array_equal(result[1], result[0])
+        # min/max plot of a trace slice
+        result = []
+        for trace in (tr, tr2):
+            trace = trace.slice(trace.stats.starttime + 1)
+            with NamedTemporaryFile(suffix='.png') as tf:
+                wp = WaveformPlotting(stream=trace, outfile=tf.name,
+                                      method='fast')
+                wp.plot_waveform()
+            result.append(wp.axis[0].lines[0].get_ydata())
+        self.assertEqual(len(result[1]), len(result[0]))
+        self.assertEqual(result[1].min(), tr.data[100:].min() * 2.0)
+        self.assertEqual(result[1].max(), tr.data[100:].max() * 2.0)
+        # the pyramid is not used for the processed data
+        tr2.filter('highpass', freq=1.0)
+        with NamedTemporaryFile(suffix='.png') as tf:
+            wp = WaveformPlotting(stream=tr2, outfile=tf.name, method='fast')
+            wp.plot_waveform()
+        result = wp.axis[0].lines[0].get_ydata()
+        self.assertEqual(result.max(), tr2.data.max() * 2.0)
+
     def test_plotDayPlotExplicitEvent(self):
         '''
         Plots day plot, starting Jan 1970, with several events.
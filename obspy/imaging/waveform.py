@@ -400,6 +400,13 @@ class WaveformPlotting(object):
         """
         Extend the seismogram.
         """
+        # A min/max pyramid can only be used if it covers all data, padding
+        # during the merge and trim is masked anyway.
+        self._minmax_pyramid = None
+        if len(self.stream) == 1:
+            pyramid = self.stream[0].stats.get('minmax_pyramid')
+            if pyramid is not None and pyramid.covers(self.stream[0]):
+                self._minmax_pyramid = pyramid
         # Merge and trim to pad.
         self.stream.merge()
         if len(self.stream) != 1:
@@ -732,28 +739,17 @@ class WaveformPlotting(object):
             remaining_seconds = remaining_samples / sampling_rate
             if self.type != "relative":
                 remaining_seconds /= SECONDS_PER_DAY
-            # Reference to new data array which does not copy data but can be
-            # reshaped.
-            if remaining_samples:
-                data = tr.data[:-remaining_samples]
-            else:
-                data = tr.data
-            data = data.reshape(pixel_count, pixel_length)
-            min_ = data.min(axis=1) * tr.stats.calib
-            max_ = data.max(axis=1) * tr.stats.calib
-            # Calculate extreme_values and put them into new array.
-            if remaining_samples:
-                extreme_values = np.empty((pixel_count + 1, 2), dtype=np.float)
-                extreme_values[:-1, 0] = min_
-                extreme_values[:-1, 1] = max_
-                extreme_values[-1, 0] = \
-                    tr.data[-remaining_samples:].min() * tr.stats.calib
-                extreme_values[-1, 1] = \
-                    tr.data[-remaining_samples:].max() * tr.stats.calib
+            # Use the min/max pyramid of the trace if there is one.
+            extreme_values = self.__pyramid_min_max(
+                tr, np.append(np.arange(0, trace_length, pixel_length),
+                              trace_length))
+            if extreme_values is not None:
+                extreme_values = np.ma.filled(
+                    np.column_stack(extreme_values).astype(np.float64) *
+                    tr.stats.calib, np.nan)
             else:
-                extreme_values = np.empty((pixel_count, 2), dtype=np.float)
-                extreme_values[:, 0] = min_
-                extreme_values[:, 1] = max_
+                extreme_values = self.__min_max_values(
+                    tr, pixel_count, pixel_length, remaining_samples)
             # Finally plot the data.
             start = self._time_to_xvalue(tr.stats.starttime)
             end = self._time_to_xvalue(tr.stats.endtime)
@@ -779,6 +775,51 @@ class WaveformPlotting(object):
             tr_id = trace[0].id
         self.ids.append(tr_id)
 
+    def __min_max_values(self, tr, pixel_count, pixel_length,
+                         remaining_samples):
+        """
+        Calculates the minimum and maximum values of each pixel from the data
+        of the trace.
+        """
+        # Reference to new data array which does not copy data but can be
+        # reshaped.
+        if remaining_samples:
+            data = tr.data[:-remaining_samples]
+        else:
+            data = tr.data
+        data = data.reshape(pixel_count, pixel_length)
+        min_ = data.min(axis=1) * tr.stats.calib
+        max_ = data.max(axis=1) * tr.stats.calib
+        # Calculate extreme_values and put them into new array.
+        if remaining_samples:
+            extreme_values = np.empty((pixel_count + 1, 2), dtype=np.float)
+            extreme_values[:-1, 0] = min_
+            extreme_values[:-1, 1] = max_
+            extreme_values[-1, 0] = \
+                tr.data[-remaining_samples:].min() * tr.stats.calib
+            extreme_values[-1, 1] = \
+                tr.data[-remaining_samples:].max() * tr.stats.calib
+        else:
+            extreme_values = np.empty((pixel_count, 2), dtype=np.float)
+            extreme_values[:, 0] = min_
+            extreme_values[:, 1] = max_
+        return extreme_values
+
+    def __pyramid_min_max(self, trace, bounds, pyramid=None):
+        """
+        Returns minimum and maximum values of the given sample ranges of the
+        trace from the min/max pyramid attached to it or ``None`` if there
+        is no suitable pyramid.
+        """
+        if pyramid is None:
+            pyramid = trace.stats.get('minmax_pyramid')
+            if pyramid is None or not pyramid.covers(trace):
+                return None
+        offset = pyramid.sample_offset(trace)
+        if offset is None:
+            return None
+        return pyramid.min_max(np.asarray(bounds) + offset)
+
     def __plot_set_x_ticks(self, *args, **kwargs):  # @UnusedVariable
         """
         Goes through all axes in pyplot and sets time ticks on the x axis.
@@ -858,6 +899,23 @@ class WaveformPlotting(object):
         else:
             noi = inoi
 
+        ispp = int(spp)
+        if self._minmax_pyramid is not None:
+            # Pixel boundaries, the last pixel of each interval takes the
+            # remaining samples.
+            bounds = (np.arange(noi)[:, np.newaxis] * spi +
+                      np.arange(self.width)[np.newaxis, :] * ispp).ravel()
+            extreme_values = self.__pyramid_min_max(
+                trace, np.append(bounds, noi * spi),
+                pyramid=self._minmax_pyramid)
+            if extreme_values is not None:
+                self.extreme_values = np.ma.empty((noi, self.width, 2))
+                self.extreme_values[:, :, 0] = \
+                    extreme_values[0].reshape(noi, self.width)
+                self.extreme_values[:, :, 1] = \
+                    extreme_values[1].reshape(noi, self.width)
+                return
+
         # Adjust data. Fill with masked values in case it is necessary.
         number_of_samples = noi * spi
         delta = number_of_samples - trace_length
@@ -871,7 +929,6 @@ class WaveformPlotting(object):
         extreme_values = np.ma.empty((noi, self.width, 2))
         trace.data.shape = (noi, spi)
 
-        ispp = int(spp)
         fspp = spp % 1.0
         if fspp == 0.0:
             delta = None
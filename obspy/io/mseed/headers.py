@@ -693,6 +693,25 @@ LinkedIDList._fields_ = [
 ]
 
 
+# Header of a single record as returned by readMSEEDRecords, same memory
+# layout as the RecordHeader struct
+RECORD_HEADER_DTYPE = np.dtype([
+    (native_str('network'), native_str('S11')),
+    (native_str('station'), native_str('S11')),
+    (native_str('location'), native_str('S11')),
+    (native_str('channel'), native_str('S11')),
+    (native_str('dataquality'), native_str('S1')),
+    (native_str('sampletype'), native_str('S1')),
+    (native_str('starttime'), np.int64),
+    (native_str('samprate'), np.float64),
+    (native_str('npts'), np.int64),
+    (native_str('offset'), np.int64),
+    (native_str('sequence_number'), np.int32),
+    (native_str('reclen'), np.int32),
+    (native_str('status'), np.int32),
+    (native_str('encoding'), np.int32)], align=True)
+
+
 #########################################
 # Done with the C structures definitions.
 #########################################
@@ -715,6 +734,22 @@ clibmseed.readMSEEDBuffer.argtypes = [
 
 clibmseed.readMSEEDBuffer.restype = C.POINTER(LinkedIDList)
 
+clibmseed.readMSEEDRecords.argtypes = [
+    np.ctypeslib.ndpointer(dtype=np.int8, ndim=1,
+                           flags=native_str('C_CONTIGUOUS')),
+    C.c_int,
+    C.c_int,
+    np.ctypeslib.ndpointer(dtype=RECORD_HEADER_DTYPE, ndim=1,
+                           flags=native_str('C_CONTIGUOUS')),
+    C.c_int,
+    np.ctypeslib.ndpointer(dtype=np.int8, ndim=1,
+                           flags=native_str('C_CONTIGUOUS')),
+    C.c_long,
+    C.c_int8
+]
+
+clibmseed.readMSEEDRecords.restype = C.c_int
+
 clibmseed.msr_free.argtypes = [C.POINTER(C.POINTER(MSRecord))]
 clibmseed.msr_free.restype = C.c_void_p
 
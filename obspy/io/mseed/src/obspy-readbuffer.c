@@ -569,3 +569,107 @@ readMSEEDBuffer (char *mseed, int buflen, Selections *selections, flag
     }
     return idListHead;
 }
+
+
+// Header information of a single record as filled in by readMSEEDRecords().
+typedef struct RecordHeader_s {
+    char network[11];         // Network designation, NULL terminated
+    char station[11];         // Station designation, NULL terminated
+    char location[11];        // Location designation, NULL terminated
+    char channel[11];         // Channel designation, NULL terminated
+    char dataquality;         // Data quality indicator
+    char sampletype;          // Sample type code: a, i, f, d
+    hptime_t starttime;       // Time of the first sample
+    double samprate;          // Nominal sample rate
+    int64_t npts;             // Number of decoded samples
+    int64_t offset;           // Byte offset of the samples in the sample buffer
+    int32_t sequence_number;  // SEED record sequence number
+    int32_t reclen;           // Record length
+    int32_t status;           // libmseed return code, MS_NOERROR on success
+    int32_t encoding;         // Data encoding format
+}
+RecordHeader;
+
+
+// Unpacks all records of a buffer in one call without merging them.
+//
+// The headers are written to the array of maxrecords headers and the
+// samples of all records are concatenated in the sample buffer of maxbytes
+// bytes, the offset of every record is stored in its header. A record that
+// cannot be unpacked gets a non-zero status, no samples and the next record
+// is searched at the offset given by reclen (or 256 bytes further if the
+// record length is not known). With a negative maxbytes only the headers
+// are read and npts is the sample count given in the record header.
+// Returns the number of headers written.
+int
+readMSEEDRecords (char *mseed, int buflen, int reclen,
+                  RecordHeader *headers, int maxrecords,
+                  char *samples, long maxbytes, flag verbose)
+{
+    int retcode;
+    int offset = 0;
+    int nrecords = 0;
+    long nbytes = 0;
+    long datasize;
+    flag dataflag = maxbytes >= 0;
+    MSRecord *msr = NULL;
+    RecordHeader *header;
+
+    if (verbose < 0) {
+        ms_loginit(&empty_print, NULL, &empty_print, NULL);
+    }
+    MS_UNPACKHEADERBYTEORDER(-1);
+
+    while (nrecords < maxrecords &&
+           offset + (reclen > 0 ? reclen : 128) <= buflen) {
+        header = headers + nrecords;
+        memset(header, 0, sizeof(RecordHeader));
+        datasize = 0;
+        // msr_parse() reuses the already allocated record structures.
+        retcode = msr_parse((mseed + offset), buflen - offset, &msr, reclen,
+                            dataflag, verbose > 0 ? verbose : 0);
+        if (retcode > 0 ||
+            (retcode == MS_NOERROR && offset + msr->reclen > buflen)) {
+            // Incomplete record at the end of the buffer.
+            break;
+        }
+        if (retcode == MS_NOERROR && dataflag) {
+            datasize = (long)(msr->numsamples * ms_samplesize(msr->sampletype));
+            if (nbytes + datasize > maxbytes) {
+                // Not enough space left, the caller has to continue with a
+                // new call.
+                break;
+            }
+        }
+        header->status = retcode;
+        header->offset = nbytes;
+        if (retcode != MS_NOERROR) {
+            // Skip the broken record if the record length is known,
+            // otherwise the rest of the buffer is not read.
+            header->reclen = reclen > 0 ? reclen : buflen - offset;
+            offset += header->reclen;
+            nrecords++;
+            continue;
+        }
+        strncpy(header->network, msr->network, 11);
+        strncpy(header->station, msr->station, 11);
+        strncpy(header->location, msr->location, 11);
+        strncpy(header->channel, msr->channel, 11);
+        header->dataquality = msr->dataquality;
+        header->sampletype = msr->sampletype;
+        header->starttime = msr->starttime;
+        header->samprate = msr->samprate;
+        header->npts = dataflag ? msr->numsamples : msr->samplecnt;
+        header->sequence_number = msr->sequence_number;
+        header->reclen = msr->reclen;
+        header->encoding = msr->encoding;
+        if (datasize > 0) {
+            memcpy(samples + nbytes, msr->datasamples, datasize);
+            nbytes += datasize;
+        }
+        offset += msr->reclen;
+        nrecords++;
+    }
+    msr_free(&msr);
+    return nrecords;
+}
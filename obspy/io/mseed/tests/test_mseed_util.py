@@ -216,6 +216,84 @@ class MSEEDUtilTestCase(unittest.TestCase):
         data_record = _read_mseed(steim2_file)[0].data
         np.testing.assert_array_equal(data, data_record)
 
+    def test_unpackRecords(self):
+        """
+        Tests decoding of many records at once.
+        """
+        st = Stream()
+        for i, (channel, dtype, encoding) in enumerate((
+                ('HHZ', np.int32, 'STEIM2'), ('HHN', np.int32, 'STEIM1'),
+                ('HHE', np.int32, 'INT32'))):
+            tr = Trace(np.arange(2000, dtype=dtype) * (i + 1))
+            tr.stats.network = 'XX'
+            tr.stats.station = 'TEST'
+            tr.stats.channel = channel
+            tr.stats.sampling_rate = 20.0
+            tr.stats.starttime = UTCDateTime(2015, 1, 1)
+            buf = io.BytesIO()
+            tr.write(buf, format='MSEED', reclen=512, encoding=encoding)
+            st.append(tr)
+            if i == 0:
+                data = buf.getvalue()
+            else:
+                data += buf.getvalue()
+        headers, samples = util.unpack_records(data, reclen=512)
+        self.assertEqual(len(headers), len(data) // 512)
+        self.assertEqual(samples.dtype, np.int32)
+        self.assertTrue((headers['status'] == 0).all())
+        self.assertTrue((headers['reclen'] == 512).all())
+        self.assertEqual(headers['npts'].sum(), 6000)
+        np.testing.assert_array_equal(
+            headers['offset'][1:],
+            np.cumsum(headers['npts'])[:-1])
+        for tr in st:
+            index = headers['channel'] == tr.stats.channel.encode()
+            self.assertTrue(
+                (headers['station'][index] == b'TEST').all())
+            self.assertEqual(headers['starttime'][index][0],
+                             tr.stats.starttime.timestamp * 1e6)
+            np.testing.assert_array_equal(
+                np.concatenate([samples[x['offset']:x['offset'] + x['npts']]
+                                for x in headers[index]]), tr.data)
+        # headers only
+        headers5, samples5 = util.unpack_records(data, headonly=True)
+        for key in ('npts', 'starttime', 'reclen', 'channel'):
+            np.testing.assert_array_equal(headers5[key], headers[key])
+        self.assertEqual(len(samples5), 0)
+        # same with detected record lengths and a trailing partial record
+        headers2, samples2 = util.unpack_records(data[:-100])
+        np.testing.assert_array_equal(headers2, headers[:-1])
+        np.testing.assert_array_equal(samples2,
+                                      samples[:headers[-1]['offset']])
+        # a broken record is reported and skipped
+        broken = data[:512] + b'\x00' * 512 + data[1024:]
+        headers3, samples3 = util.unpack_records(broken, reclen=512)
+        self.assertEqual(len(headers3), len(headers))
+        self.assertNotEqual(headers3['status'][1], 0)
+        self.assertEqual(headers3['npts'][1], 0)
+        self.assertEqual(len(samples3), 6000 - headers['npts'][1])
+        # mixed sample types are returned as float64
+        tr = Trace(np.arange(100, dtype=np.float32))
+        buf = io.BytesIO()
+        tr.write(buf, format='MSEED', reclen=512, encoding='FLOAT32')
+        headers4, samples4 = util.unpack_records(data + buf.getvalue(), 512)
+        self.assertEqual(samples4.dtype, np.float64)
+        np.testing.assert_array_equal(samples4[:6000], samples)
+        np.testing.assert_array_equal(samples4[6000:], np.arange(100))
+        # text records are not converted to float64
+        tr = Trace(np.frombuffer(b'clock locked', dtype='|S1').copy())
+        buf2 = io.BytesIO()
+        tr.write(buf2, format='MSEED', reclen=512, encoding='ASCII')
+        headers6, samples6 = util.unpack_records(
+            data + buf2.getvalue() + buf.getvalue(), 512)
+        self.assertEqual(samples6.dtype, np.float64)
+        self.assertEqual(len(samples6), 6100)
+        self.assertEqual(headers6['sampletype'][-2], b'a')
+        self.assertEqual(headers6['npts'][-2], 12)
+        self.assertEqual(headers6['offset'][-2], -1)
+        self.assertEqual(headers6['offset'][-1], 6000)
+        np.testing.assert_array_equal(samples6, samples4)
+
     def test_time_shifting(self):
         """
         Tests the shift_time_of_file() function.
@@ -24,7 +24,8 @@ from obspy.core.util.decorator import deprecated
 from .headers import (ENCODINGS, ENDIAN, FIXED_HEADER_ACTIVITY_FLAGS,
                       FIXED_HEADER_DATA_QUAL_FLAGS,
                       FIXED_HEADER_IO_CLOCK_FLAGS, FRAME, HPTMODULUS,
-                      SAMPLESIZES, UNSUPPORTED_ENCODINGS, clibmseed)
+                      RECORD_HEADER_DTYPE, SAMPLESIZES, UNSUPPORTED_ENCODINGS,
+                      clibmseed)
 
 
 @deprecated("'getStartAndEndTime' has been renamed to "
@@ -500,6 +501,116 @@ def _get_record_information(file_object, offset=0, endian=None):
     return info
 
 
+def unpack_records(data, reclen=-1, verbose=-1, headonly=False):
+    """
+    Unpacks all Mini-SEED records of a buffer with a single call to libmseed.
+
+    In contrast to :func:`~obspy.core.stream.read` the records are neither
+    merged nor turned into :class:`~obspy.core.trace.Trace` objects. The
+    header of every record ends up in one row of a structured array and the
+    samples of all records are concatenated into one array. This is meant
+    for real time applications receiving many small records (e.g. SeedLink),
+    where creating objects per record is much more expensive than decoding
+    the record itself.
+
+    :type data: bytes, bytearray or :class:`numpy.ndarray`
+    :param data: Buffer with consecutive Mini-SEED records.
+    :type reclen: int
+    :param reclen: Record length of all records, e.g. ``512`` for SeedLink.
+        If ``-1``, the record length of every record is determined from its
+        blockette 1000.
+    :type verbose: int
+    :param verbose: Verbosity of libmseed, a negative value suppresses all
+        messages.
+    :type headonly: bool
+    :param headonly: If ``True``, only the record headers are read and the
+        samples array is empty. ``npts`` is the number of samples given in
+        the record headers.
+    :return: Tuple of the header array and the samples. The header array has
+        one entry of dtype
+        :const:`~obspy.io.mseed.headers.RECORD_HEADER_DTYPE` per record with
+        the ``network``, ``station``, ``location``, ``channel``,
+        ``dataquality`` and ``sampletype`` codes, the ``starttime`` in
+        microseconds since 1970-01-01, the ``samprate``, the number of
+        samples ``npts``, the ``offset`` of the first sample in the samples
+        array, ``sequence_number``, ``reclen``, ``encoding`` and the libmseed
+        ``status`` (``0`` on success, records that could not be decoded have
+        no samples). All samples are returned with the sample type of the
+        records or as float64 if the records have different numeric sample
+        types. Text records (sample type ``a``, e.g. log channels) mixed with
+        numeric records have no samples in the float64 array, their
+        ``offset`` is ``-1``.
+
+    .. rubric:: Example
+
+    >>> from obspy.core.util import get_example_file
+    >>> with open(get_example_file("test.mseed"), "rb") as fh:
+    ...     headers, samples = unpack_records(fh.read())
+    >>> print(headers['station'][0].decode(), headers['samprate'][0])
+    HGN 40.0
+    >>> print(headers['npts'], headers['offset'])
+    [5980 5967] [   0 5980]
+    >>> print(samples.dtype, len(samples))
+    int32 11947
+    """
+    buf = np.require(np.frombuffer(data, dtype=np.int8), requirements=['C'])
+    buflen = len(buf)
+    # smallest possible record length
+    minreclen = reclen if reclen > 0 else 128
+    headers = np.zeros(buflen // minreclen + 1, dtype=RECORD_HEADER_DTYPE)
+    if headonly:
+        n = clibmseed.readMSEEDRecords(
+            buf, buflen, reclen, headers, len(headers),
+            np.empty(0, dtype=np.int8), -1, verbose)
+        return headers[:n], np.empty(0, dtype=np.int32)
+    # decoded samples need at most seven times the size of the records
+    # (Steim2 packs up to seven samples in a 32 bit word), continue with
+    # another call if the buffer is full
+    maxbytes = min(7 * buflen + 8, 16 * 1024 * 1024)
+    chunks = []
+    nrecords = 0
+    offset = 0
+    while offset < buflen:
+        samples = np.empty(maxbytes, dtype=np.int8)
+        n = clibmseed.readMSEEDRecords(
+            buf[offset:], buflen - offset, reclen, headers[nrecords:],
+            len(headers) - nrecords, samples, maxbytes, verbose)
+        if n == 0:
+            break
+        new = headers[nrecords:nrecords + n]
+        nbytes = (new['npts'] * [SAMPLESIZES.get(x.decode(), 0) for x in
+                                 new['sampletype']]).sum()
+        new['offset'] += sum(len(x) for x in chunks)
+        chunks.append(samples[:nbytes])
+        offset += new['reclen'].sum()
+        nrecords += n
+    headers = headers[:nrecords]
+    raw = np.concatenate(chunks) if chunks else np.empty(0, dtype=np.int8)
+    sampletypes = set(headers['sampletype'][headers['status'] == 0])
+    dtypes = {b'a': 'S1', b'i': np.int32, b'f': np.float32, b'd': np.float64}
+    if len(sampletypes) <= 1:
+        dtype = np.dtype(dtypes[sampletypes.pop()] if sampletypes else
+                         np.int32)
+        headers['offset'] //= dtype.itemsize
+        return headers, raw.view(dtype)
+    # different sample types, convert all numeric samples to float64
+    text = headers['sampletype'] == b'a'
+    samples = np.empty(headers['npts'][~text].sum(), dtype=np.float64)
+    i = 0
+    for header in headers:
+        if header['sampletype'] == b'a':
+            header['offset'] = -1
+            continue
+        if header['npts']:
+            dtype = np.dtype(dtypes[header['sampletype']])
+            start = header['offset']
+            samples[i:i + header['npts']] = raw[
+                start:start + header['npts'] * dtype.itemsize].view(dtype)
+        header['offset'] = i
+        i += header['npts']
+    return headers, samples
+
+
 def _ctypes_array_2_numpy_array(buffer_, buffer_elements, sampletype):
     """
     Takes a Ctypes array and its length and type and returns it as a
@@ -24,6 +24,7 @@ from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 from future.builtins import *  # NOQA
 
+import gzip
 import inspect
 import io
 import os
@@ -43,6 +44,7 @@ from obspy.core.event import (Amplitude, Arrival, Axis, Catalog, Comment,
                               WaveformStreamID)
 from obspy.core.utcdatetime import UTCDateTime
 from obspy.core.util import AttribDict
+from obspy.core.util.misc import _write_xml_incrementally
 
 
 NSMAP_QUAKEML = {None: "http://quakeml.org/xmlns/bed/1.2",
@@ -128,6 +130,8 @@ class Unpickler(object):
     """
     def __init__(self, xml_doc=None):
         self.xml_doc = xml_doc
+        # compiled XPath expressions, keyed by expression and namespace
+        self._xpath_cache = {}
 
     @property
     def xml_root(self):
@@ -195,7 +199,13 @@ class Unpickler(object):
             xpath = "b:%s" % xpath
             namespaces = {"b": self.nsmap[None]}
 
-        return element.xpath(xpath, namespaces=namespaces)
+        key = (xpath, namespaces and namespaces["b"])
+        try:
+            compiled = self._xpath_cache[key]
+        except KeyError:
+            compiled = etree.XPath(xpath, namespaces=namespaces)
+            self._xpath_cache[key] = compiled
+        return compiled(element)
 
     def _comments(self, parent):
         obj = []
@@ -1038,6 +1048,8 @@ class Pickler(object):
         if self.ns_dict is None:
             self.ns_dict = {}
         self.ns_dict.update(NSMAP_QUAKEML.copy())
+        # attributes holding other event type objects per class
+        self._nested_keys = {}
 
     def dump(self, catalog, file):
         """
@@ -1048,9 +1060,8 @@ class Pickler(object):
         :type file: str
         :param file: File name.
         """
-        fh = open(file, 'wt')
-        fh.write(self._serialize(catalog))
-        fh.close()
+        with open(file, 'wb') as fh:
+            self._serialize_incrementally(catalog, fh)
 
     def dumps(self, catalog):
         """
@@ -1683,9 +1694,63 @@ class Pickler(object):
         self._extra(focal_mechanism, element)
         return element
 
-    def _serialize(self, catalog, pretty_print=True):
-        """
-        Converts a Catalog object into XML string.
+    def _event(self, event):
+        """
+        Converts an Event object into an XML element.
+        """
+        # create event node
+        event_el = etree.Element(
+            'event', attrib={'publicID': self._id(event.resource_id)})
+        # optional event attributes
+        if hasattr(event, "preferred_origin_id"):
+            self._str(event.preferred_origin_id, event_el,
+                      'preferredOriginID')
+        if hasattr(event, "preferred_magnitude_id"):
+            self._str(event.preferred_magnitude_id, event_el,
+                      'preferredMagnitudeID')
+        if hasattr(event, "preferred_focal_mechanism_id"):
+            self._str(event.preferred_focal_mechanism_id, event_el,
+                      'preferredFocalMechanismID')
+        # event type and event type certainty also are optional attributes.
+        if hasattr(event, "event_type"):
+            self._str(event.event_type, event_el, 'type')
+        if hasattr(event, "event_type_certainty"):
+            self._str(event.event_type_certainty, event_el,
+                      'typeCertainty')
+        # event descriptions
+        for description in event.event_descriptions:
+            el = etree.Element('description')
+            self._str(description.text, el, 'text', True)
+            self._str(description.type, el, 'type')
+            self._extra(description, el)
+            event_el.append(el)
+        self._comments(event.comments, event_el)
+        self._creation_info(event.creation_info, event_el)
+        # origins
+        for origin in event.origins:
+            event_el.append(self._origin(origin))
+        # magnitudes
+        for magnitude in event.magnitudes:
+            event_el.append(self._magnitude(magnitude))
+        # station magnitudes
+        for magnitude in event.station_magnitudes:
+            event_el.append(self._station_magnitude(magnitude))
+        # picks
+        for pick in event.picks:
+            event_el.append(self._pick(pick))
+        # amplitudes
+        for amp in event.amplitudes:
+            event_el.append(self._amplitude(amp))
+        # focal mechanisms
+        for focal_mechanism in event.focal_mechanisms:
+            event_el.append(self._focal_mechanism(focal_mechanism))
+        self._extra(event, event_el)
+        return event_el
+
+    def _catalog(self, catalog):
+        """
+        Converts the optional parameters of a Catalog object into an XML
+        element without any events.
         """
         catalog_el = etree.Element('eventParameters', attrib={'publicID':
                                    self._id(catalog.resource_id)})
@@ -1694,64 +1759,78 @@ class Pickler(object):
             self._str(catalog.description, catalog_el, 'description')
         self._comments(catalog.comments, catalog_el)
         self._creation_info(catalog.creation_info, catalog_el)
-        for event in catalog:
-            # create event node
-            event_el = etree.Element(
-                'event', attrib={'publicID': self._id(event.resource_id)})
-            # optional event attributes
-            if hasattr(event, "preferred_origin_id"):
-                self._str(event.preferred_origin_id, event_el,
-                          'preferredOriginID')
-            if hasattr(event, "preferred_magnitude_id"):
-                self._str(event.preferred_magnitude_id, event_el,
-                          'preferredMagnitudeID')
-            if hasattr(event, "preferred_focal_mechanism_id"):
-                self._str(event.preferred_focal_mechanism_id, event_el,
-                          'preferredFocalMechanismID')
-            # event type and event type certainty also are optional attributes.
-            if hasattr(event, "event_type"):
-                self._str(event.event_type, event_el, 'type')
-            if hasattr(event, "event_type_certainty"):
-                self._str(event.event_type_certainty, event_el,
-                          'typeCertainty')
-            # event descriptions
-            for description in event.event_descriptions:
-                el = etree.Element('description')
-                self._str(description.text, el, 'text', True)
-                self._str(description.type, el, 'type')
-                self._extra(description, el)
-                event_el.append(el)
-            self._comments(event.comments, event_el)
-            self._creation_info(event.creation_info, event_el)
-            # origins
-            for origin in event.origins:
-                event_el.append(self._origin(origin))
-            # magnitudes
-            for magnitude in event.magnitudes:
-                event_el.append(self._magnitude(magnitude))
-            # station magnitudes
-            for magnitude in event.station_magnitudes:
-                event_el.append(self._station_magnitude(magnitude))
-            # picks
-            for pick in event.picks:
-                event_el.append(self._pick(pick))
-            # amplitudes
-            for amp in event.amplitudes:
-                event_el.append(self._amplitude(amp))
-            # focal mechanisms
-            for focal_mechanism in event.focal_mechanisms:
-                event_el.append(self._focal_mechanism(focal_mechanism))
-            self._extra(event, event_el)
-            # add event node to catalog
-            catalog_el.append(event_el)
-        self._extra(catalog, catalog_el)
+        return catalog_el
+
+    def _root(self, catalog_el):
+        """
+        Returns the root element with all namespaces used so far.
+        """
         nsmap = self._get_namespace_map()
         root_el = etree.Element('{%s}quakeml' % NSMAP_QUAKEML['q'],
                                 nsmap=nsmap)
         root_el.append(catalog_el)
+        return root_el
+
+    def _collect_namespaces(self, obj):
+        """
+        Adds the namespaces of the custom tags of obj and all its children.
+
+        Needed to write the root element with all namespace declarations
+        before any event has been converted.
+        """
+        dict_ = obj.__dict__
+        extra = dict_.get("extra")
+        if extra:
+            for item in extra.values():
+                self._add_namespace(item["namespace"])
+        cls = type(obj)
+        keys = self._nested_keys.get(cls)
+        if keys is None:
+            # waveform ids are written without custom tags
+            keys = [key for key, type_ in obj._properties
+                    if hasattr(type_, "_property_keys") and
+                    type_ is not WaveformStreamID]
+            self._nested_keys[cls] = keys
+        for key in keys:
+            value = dict_.get(key)
+            if value is not None:
+                self._collect_namespaces(value)
+        for key in obj._containers:
+            for item in dict_.get(key, ()):
+                self._collect_namespaces(item)
+
+    def _serialize(self, catalog, pretty_print=True):
+        """
+        Converts a Catalog object into XML string.
+        """
+        catalog_el = self._catalog(catalog)
+        for event in catalog:
+            # add event node to catalog
+            catalog_el.append(self._event(event))
+        self._extra(catalog, catalog_el)
+        root_el = self._root(catalog_el)
         return etree.tostring(root_el, pretty_print=pretty_print,
                               encoding="utf-8", xml_declaration=True)
 
+    def _serialize_incrementally(self, catalog, file_object):
+        """
+        Writes the XML document of a Catalog object event by event to an
+        open binary file-like object.
+
+        The output is identical to the one of
+        :meth:`~obspy.io.quakeml.core.Pickler.dumps` but only a single event
+        is converted into an XML element at any time.
+        """
+        catalog_el = self._catalog(catalog)
+        index = len(catalog_el)
+        self._extra(catalog, catalog_el)
+        for event in catalog:
+            self._collect_namespaces(event)
+        root_el = self._root(catalog_el)
+        _write_xml_incrementally(
+            file_object, root_el, catalog_el, index,
+            (self._event(event) for event in catalog))
+
 
 def _read_quakeml(filename):
     """
@@ -1780,7 +1859,7 @@ def _read_quakeml(filename):
 
 
 def _write_quakeml(catalog, filename, validate=False, nsmap=None,
-                   **kwargs):  # @UnusedVariable
+                   compress=False, **kwargs):  # @UnusedVariable
     """
     Writes a QuakeML file.
 
@@ -1800,15 +1879,23 @@ def _write_quakeml(catalog, filename, validate=False, nsmap=None,
     :type nsmap: dict, optional
     :param nsmap: Additional custom namespace abbreviation mappings
         (e.g. `{"edb": "http://erdbeben-in-bayern.de/xmlns/0.1"}`).
+    :type compress: bool, optional
+    :param compress: If True, the QuakeML document is gzip compressed.
+
+    Unless validation is requested, the document is written event by event
+    without building the XML tree of the whole catalog in memory.
     """
     nsmap_ = getattr(catalog, "nsmap", {})
     if nsmap:
         nsmap_.update(nsmap)
-    xml_doc = Pickler(nsmap=nsmap_).dumps(catalog)
+    pickler = Pickler(nsmap=nsmap_)
 
-    if validate is True and not _validate(io.BytesIO(xml_doc)):
-        raise AssertionError(
-            "The final QuakeML file did not pass validation.")
+    xml_doc = None
+    if validate is True:
+        xml_doc = pickler.dumps(catalog)
+        if not _validate(io.BytesIO(xml_doc)):
+            raise AssertionError(
+                "The final QuakeML file did not pass validation.")
 
     # Open filehandler or use an existing file like object.
     if not hasattr(filename, "write"):
@@ -1818,11 +1905,20 @@ def _write_quakeml(catalog, filename, validate=False, nsmap=None,
         file_opened = False
         fh = filename
 
-    fh.write(xml_doc)
-
-    # Close if a file has been opened by this function.
-    if file_opened is True:
-        fh.close()
+    try:
+        out = fh
+        if compress:
+            out = gzip.GzipFile(fileobj=fh, mode="wb")
+        if xml_doc is not None:
+            out.write(xml_doc)
+        else:
+            pickler._serialize_incrementally(catalog, out)
+        if compress:
+            out.close()
+    finally:
+        # Close if a file has been opened by this function.
+        if file_opened is True:
+            fh.close()
 
 
 def _read_seishub_event_xml(filename):
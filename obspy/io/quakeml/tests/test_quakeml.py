@@ -3,6 +3,7 @@ from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 from future.builtins import *  # NOQA @UnusedWildImport
 
+import gzip
 import io
 import math
 import os
@@ -951,6 +952,50 @@ class QuakeMLTestCase(unittest.TestCase):
         self.assertTrue(hasattr(cat, "nsmap"))
         self.assertEqual(getattr(cat, "nsmap")['ns0'], nsmap['ns0'])
 
+    def test_incremental_write_is_identical(self):
+        """
+        Writing event by event results in exactly the same document as
+        serializing the whole XML tree, also for custom tags and compressed
+        output.
+        """
+        filename = os.path.join(self.path, "quakeml_1.2_origin.xml")
+        cat = _read_quakeml(filename)
+        cat += self.neries_catalog
+        cat.resource_id = ResourceIdentifier("smi:local/catalog")
+        cat.extra = {'note': {'value': 'catalog',
+                              'namespace': 'http://test.org/xmlns/0.1'}}
+        cat[0].origins[0].extra = {
+            'tag': {'value': 'origin',
+                    'namespace': 'http://some-page.de/xmlns/1.0'}}
+        cat[0].origins[0].creation_info.extra = {
+            'id': {'value': '1', 'type': 'attribute',
+                   'namespace': 'http://anss.org/xmlns/catalog/0.1'}}
+        pick = Pick(resource_id="smi:local/incremental_write/pick")
+        pick.extra = {
+            'weight': {'value': 2, 'namespace': 'http://test.org/xmlns/0.1'}}
+        cat[-1].picks.append(pick)
+        nsmap = {"catalog": 'http://anss.org/xmlns/catalog/0.1'}
+        expected = Pickler(nsmap=nsmap.copy()).dumps(cat)
+        self.assertIn(b'ns1:tag', expected)
+        buf = io.BytesIO()
+        _write_quakeml(cat, buf, nsmap=nsmap.copy())
+        self.assertEqual(buf.getvalue(), expected)
+        # catalog without events
+        buf = io.BytesIO()
+        _write_quakeml(Catalog(resource_id=cat.resource_id), buf)
+        self.assertEqual(buf.getvalue(), Pickler().dumps(
+            Catalog(resource_id=cat.resource_id)))
+        # gzip compressed output can be read again
+        with NamedTemporaryFile() as tf:
+            _write_quakeml(cat, tf.name, nsmap=nsmap.copy(), compress=True)
+            with gzip.open(tf.name, "rb") as fh:
+                self.assertEqual(fh.read(), expected)
+            with warnings.catch_warnings(record=True):
+                warnings.simplefilter("always")
+                cat2 = read_events(tf.name)
+            self.assertEqual([str(ev.resource_id) for ev in cat2],
+                             [str(ev.resource_id) for ev in cat])
+
 
 def suite():
     return unittest.makeSuite(QuakeMLTestCase, 'test')
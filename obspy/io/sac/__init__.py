@@ -69,7 +69,8 @@ from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 from future.builtins import *  # NOQA
 
-from .sacio import (SacError, SacIO, SacIOError, attach_paz, attach_resp)
+from .sacio import (SacError, SacIO, SacIOError, attach_paz, attach_resp,
+                    read_sac_headers)
 
 
 if __name__ == '__main__':
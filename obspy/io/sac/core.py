@@ -16,9 +16,11 @@ from future.utils import native_str
 import os
 import struct
 
+import numpy as np
+
 from obspy import Stream, Trace
 from obspy.core.compatibility import is_bytes_buffer
-from .sacio import SacIO
+from .sacio import SacIO, SacIOError
 
 
 def _is_sac(filename):
@@ -307,7 +309,7 @@ def __write_sacXY(trace, buf, **kwargs):  # @UnusedVariable
 
 
 def _read_sac(filename, headonly=False, debug_headers=False, fsize=True,
-              **kwargs):  # @UnusedVariable
+              mmap=False, **kwargs):  # @UnusedVariable
     """
     Reads an SAC file and returns an ObsPy Stream object.
 
@@ -330,6 +332,10 @@ def _read_sac(filename, headonly=False, debug_headers=False, fsize=True,
     :param fsize: Check if file size is consistent with theoretical size
         from header. Defaults to ``True``.
     :type fsize: bool
+    :param mmap: If set to True, the data of the trace is a read-only memory
+        map of the file instead of a copy in memory. Only possible for files
+        on disk. Defaults to ``False``.
+    :type mmap: bool
     :rtype: :class:`~obspy.core.stream.Stream`
     :return: A ObsPy Stream object.
 
@@ -340,19 +346,21 @@ def _read_sac(filename, headonly=False, debug_headers=False, fsize=True,
     """
     # Only byte buffers for binary SAC.
     if is_bytes_buffer(filename):
+        if mmap:
+            raise ValueError("Memory mapping requires a file name.")
         return __read_sac(buf=filename, headonly=headonly,
                           debug_headers=debug_headers, fsize=fsize, **kwargs)
     elif isinstance(filename, (str, bytes)):
         with open(filename, "rb") as fh:
             return __read_sac(buf=fh, headonly=headonly,
                               debug_headers=debug_headers, fsize=fsize,
-                              **kwargs)
+                              mmap=mmap, **kwargs)
     else:
         raise ValueError("Cannot open '%s'." % filename)
 
 
 def __read_sac(buf, headonly=False, debug_headers=False, fsize=True,
-               **kwargs):  # @UnusedVariable
+               mmap=False, **kwargs):  # @UnusedVariable
     """
     Reads an SAC file and returns an ObsPy Stream object.
 
@@ -375,6 +383,10 @@ def __read_sac(buf, headonly=False, debug_headers=False, fsize=True,
     :param fsize: Check if file size is consistent with theoretical size
         from header. Defaults to ``True``.
     :type fsize: bool
+    :param mmap: If set to True, the data of the trace is a read-only memory
+        map of the file instead of a copy in memory. Only possible for files
+        on disk. Defaults to ``False``.
+    :type mmap: bool
     :rtype: :class:`~obspy.core.stream.Stream`
     :return: A ObsPy Stream object.
     """
@@ -382,6 +394,19 @@ def __read_sac(buf, headonly=False, debug_headers=False, fsize=True,
     t = SacIO(debug_headers=debug_headers)
     if headonly:
         t.read_sac_header(buf)
+    elif mmap:
+        t.read_sac_header(buf, fsize)
+        dtype = native_str('>f4' if t.byteorder == 'big' else '<f4')
+        npts = int(t.hi[9])
+        # without the file size check longer files are allowed only
+        buf.seek(0, os.SEEK_END)
+        if buf.tell() < 632 + 4 * npts:
+            raise SacIOError("Cannot read all data points")
+        if npts:
+            t.seis = np.memmap(buf.name, dtype=dtype, mode='r', offset=632,
+                               shape=(npts,))
+        else:
+            t.seis = np.array([], dtype=dtype)
     else:
         t.read_sac_file(buf, fsize)
     # assign all header entries to a new dictionary compatible with an ObsPy
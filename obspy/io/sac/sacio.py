@@ -494,11 +494,13 @@ class SacIO(object):
         if self.get_header_value('delta') <= 0:
             raise SacError("Delta < 0 is not a valid header entry!")
 
-    def read_sac_header(self, fh):
+    def read_sac_header(self, fh, fsize=True):
         """
         Reads only the header portion of a binary SAC-file.
 
         :param fh: file or file-like object.
+        :param fsize: Check if file size is consistent with theoretical size
+            from header. Defaults to ``True``.
 
         >>> from obspy.io.sac import SacIO # doctest: +SKIP
         >>> tr = SacIO() # doctest: +SKIP
@@ -525,7 +527,7 @@ class SacIO(object):
             self.hf = self.hi = self.hs = None
             raise SacIOError("Cannot read all header values")
         try:
-            self.is_sac_file(fh)
+            self.is_sac_file(fh, fsize)
         except SacError as e:
             try:
                 # if it is not a valid SAC-file try with big endian
@@ -535,7 +537,7 @@ class SacIO(object):
                 self.hi = from_buffer(fh.read(4 * 40), dtype=native_str('>i4'))
                 # read in the char values
                 self.hs = from_buffer(fh.read(24 * 8), dtype=native_str('|S8'))
-                self.is_sac_file(fh)
+                self.is_sac_file(fh, fsize)
                 self.byteorder = 'big'
             except SacError as e:
                 self.hf = self.hi = self.hs = None
@@ -1268,6 +1270,87 @@ class SacIO(object):
         return header
 
 
+def _get_sac_header_dtype(byteorder='<'):
+    """
+    Returns the structured dtype of the 632 byte binary SAC header with one
+    field per header variable, see :data:`FDICT`, :data:`IDICT` and
+    :data:`SDICT`.
+
+    :param byteorder: ``'<'`` for little or ``'>'`` for big endian.
+    """
+    fields = []
+    for name, index in FDICT.items():
+        fields.append((4 * index, name, byteorder + 'f4'))
+    for name, index in IDICT.items():
+        fields.append((280 + 4 * index, name, byteorder + 'i4'))
+    for name, index in SDICT.items():
+        if index == 0:
+            fields.append((440, name, 'S8'))
+        elif index == 1:
+            # kevnm is the only string header with 16 bytes
+            fields.append((448, name, 'S16'))
+        else:
+            fields.append((440 + 8 * (index + 1), name, 'S8'))
+    fields.sort()
+    return np.dtype({'names': [native_str(x[1]) for x in fields],
+                     'formats': [native_str(x[2]) for x in fields],
+                     'offsets': [x[0] for x in fields],
+                     'itemsize': 632})
+
+
+def read_sac_headers(filenames):
+    """
+    Reads the binary headers of many SAC files into one structured array.
+
+    Only the first 632 bytes of every file are read, the byte order is
+    detected per file from the header version. This is much faster than
+    reading the files with ``headonly=True`` if only some header values are
+    needed, e.g. distances and picks of a large data set.
+
+    :type filenames: list of str
+    :param filenames: Names of the binary SAC files.
+    :rtype: :class:`numpy.ndarray`
+    :return: Little endian structured array with one record per file and
+        one field per header variable. The 16 byte ``kevnm`` is one field,
+        strings are not stripped.
+
+    .. rubric:: Example
+
+    >>> from obspy.core.util import get_example_file
+    >>> filename = get_example_file('test.sac')
+    >>> headers = read_sac_headers([filename, filename])
+    >>> print(headers['npts'])
+    [100 100]
+    >>> print(headers['b'][0])
+    10.0
+    >>> print(headers['kstnm'][0].decode().strip())
+    STA
+    """
+    buf = []
+    for filename in filenames:
+        with open(filename, 'rb') as fh:
+            header = fh.read(632)
+        if len(header) != 632:
+            msg = "Cannot read all header values of %s" % filename
+            raise SacIOError(msg)
+        buf.append(header)
+    buf = b''.join(buf)
+    headers = from_buffer(buf, dtype=_get_sac_header_dtype('<')).copy()
+    # same check of the header version as SacIO.is_sac_file()
+    version = headers['nvhdr']
+    little = (version >= 0) & (version <= 20)
+    if not little.all():
+        swapped = from_buffer(buf, dtype=_get_sac_header_dtype('>'))
+        version = swapped['nvhdr']
+        big = ~little & (version >= 0) & (version <= 20)
+        if not (little | big).all():
+            index = np.nonzero(~(little | big))[0][0]
+            msg = "Unknown header version in %s" % filenames[index]
+            raise SacError(msg)
+        headers[big] = swapped[big]
+    return headers
+
+
 # UTILITIES
 def attach_paz(tr, paz_file, todisp=False, tovel=False, torad=False,
                tohz=False):
@@ -15,7 +15,7 @@ import numpy as np
 
 from obspy import Stream, Trace, UTCDateTime, read
 from obspy.core.util import NamedTemporaryFile
-from obspy.io.sac import SacError, SacIO, SacIOError
+from obspy.io.sac import SacError, SacIO, SacIOError, read_sac_headers
 from obspy.io.sac.core import (_is_sac, _is_sacXY, _read_sac, _read_sacXY,
                                _write_sac, _write_sacXY)
 
@@ -739,6 +739,60 @@ class CoreTestCase(unittest.TestCase):
         with io.BytesIO() as fh:
             self.assertRaises(ValueError, st.write, fh, format="sacxy")
 
+    def test_readSacHeaders(self):
+        """
+        Reads the headers of several files in both byte orders at once.
+        """
+        files = [self.file, self.filebe,
+                 os.path.join(self.path, 'data', 'seism.sac')]
+        headers = read_sac_headers(files)
+        self.assertEqual(len(headers), 3)
+        for filename, header in zip(files, headers):
+            stats = read(filename, headonly=True)[0].stats
+            self.assertEqual(header['npts'], stats.npts)
+            self.assertEqual(header['nvhdr'], 6)
+            self.assertEqual(header['kstnm'].decode().strip(), stats.station)
+            for key in ('b', 'e', 'a', 'evla', 'stlo', 'baz', 'cmpaz'):
+                self.assertEqual(header[key], stats.sac[key])
+            self.assertEqual(header['kevnm'].decode(), stats.sac.kevnm)
+        # files which are too short or have no valid header version
+        with NamedTemporaryFile() as tf:
+            with open(self.file, 'rb') as fh:
+                tf.write(fh.read(600))
+            tf.flush()
+            self.assertRaises(SacIOError, read_sac_headers, [tf.name])
+        self.assertRaises(SacError, read_sac_headers, [self.filexy])
+
+    def test_readMmap(self):
+        """
+        Memory mapped data of both byte orders is read-only and equal to the
+        data read into memory.
+        """
+        for filename in (self.file, self.filebe):
+            tr = read(filename, format='SAC', mmap=True)[0]
+            expected = read(filename, format='SAC')[0]
+            self.assertTrue(isinstance(tr.data, np.memmap))
+            self.assertEqual(tr.stats, expected.stats)
+            np.testing.assert_array_equal(tr.data, expected.data)
+            self.assertRaises(ValueError, tr.data.__setitem__, 0, 1.0)
+        with open(self.file, 'rb') as fh:
+            self.assertRaises(ValueError, _read_sac, io.BytesIO(fh.read()),
+                              mmap=True)
+        # the fsize option is honored like for data read into memory
+        longer_file = os.path.join(self.path, 'data', 'seism-longer.sac')
+        shorter_file = os.path.join(self.path, 'data', 'seism-shorter.sac')
+        for filename in (longer_file, shorter_file):
+            self.assertRaises(SacError, read, filename, mmap=True)
+            self.assertRaises(SacError, read, filename, mmap=True,
+                              fsize=True)
+        self.assertRaises(SacIOError, read, shorter_file, mmap=True,
+                          fsize=False)
+        tr = read(longer_file, mmap=True, fsize=False)[0]
+        expected = read(longer_file, fsize=False)[0]
+        self.assertTrue(isinstance(tr.data, np.memmap))
+        self.assertEqual(tr.stats, expected.stats)
+        np.testing.assert_array_equal(tr.data, expected.data)
+
 
 def suite():
     return unittest.makeSuite(CoreTestCase, 'test')
@@ -6,6 +6,7 @@ and write support.
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 from future.builtins import *  # NOQA
+from future.utils import native_str
 
 import numpy as np
 
@@ -167,6 +168,26 @@ TRACE_HEADER_FORMAT = [
 TRACE_HEADER_KEYS = [_i[1] for _i in TRACE_HEADER_FORMAT]
 
 
+def get_trace_header_dtype(endian='>'):
+    """
+    Returns a structured NumPy dtype of the 240 byte trace header in the
+    given byte order with one field per entry of ``TRACE_HEADER_FORMAT``.
+    """
+    fields = []
+    for length, name, special_format, _ in TRACE_HEADER_FORMAT:
+        if special_format == 'H':
+            fmt = endian + 'u2'
+        elif length == 2:
+            fmt = endian + 'i2'
+        elif length == 4:
+            fmt = endian + 'i4'
+        else:
+            # the unassigned field is kept as raw bytes
+            fmt = 'V%d' % length
+        fields.append((native_str(name), native_str(fmt)))
+    return np.dtype(fields)
+
+
 # Functions that unpack the chosen data format. The keys correspond to the
 # number given for each format by the SEG Y format reference.
 DATA_SAMPLE_FORMAT_UNPACK_FUNCTIONS = {
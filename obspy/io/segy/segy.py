@@ -13,22 +13,34 @@ Routines to read and write SEG Y rev 1 encoded seismic data files.
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 from future.builtins import *  # NOQA
+from future.utils import native_str
 
 import io
 import os
+from functools import partial
+from operator import itemgetter
+from multiprocessing.pool import ThreadPool
 from struct import pack, unpack
 
 import numpy as np
 
 from .header import (BINARY_FILE_HEADER_FORMAT,
+                     DATA_SAMPLE_FORMAT_CODE_DTYPE,
                      DATA_SAMPLE_FORMAT_PACK_FUNCTIONS,
                      DATA_SAMPLE_FORMAT_SAMPLE_SIZE,
                      DATA_SAMPLE_FORMAT_UNPACK_FUNCTIONS, ENDIAN,
-                     TRACE_HEADER_FORMAT, TRACE_HEADER_KEYS)
-from .unpack import OnTheFlyDataUnpacker
+                     TRACE_HEADER_FORMAT, TRACE_HEADER_KEYS,
+                     get_trace_header_dtype)
+from .unpack import OnTheFlyDataUnpacker, ibm2ieee
 from .util import unpack_header_value
 
 
+# field length and start byte of all trace header fields
+_TRACE_HEADER_FIELDS = dict((name, (length, start)) for
+                            length, name, _, start in TRACE_HEADER_FORMAT)
+_TRACE_HEADER_NAMES = [name for _, name, _, _ in TRACE_HEADER_FORMAT]
+
+
 class SEGYError(Exception):
     """
     Base SEGY exception class.
@@ -216,20 +228,24 @@ class SEGYFile(object):
                 'Please contact the developers.'
             raise NotImplementedError(msg)
 
-    def write(self, file, data_encoding=None, endian=None):
+    def write(self, file, data_encoding=None, endian=None, threads=1):
         """
         Write a SEG Y file to file which is either a file like object with a
         write method or a filename string.
 
         If data_encoding or endian is set, these values will be enforced.
+        With ``threads`` larger than one, chunks of traces are packed in a
+        pool of threads, mostly useful for IBM floating point data.
         """
         if not hasattr(file, 'write'):
             with open(file, 'wb') as file:
-                self._write(file, data_encoding=data_encoding, endian=endian)
+                self._write(file, data_encoding=data_encoding, endian=endian,
+                            threads=threads)
             return
-        self._write(file, data_encoding=data_encoding, endian=endian)
+        self._write(file, data_encoding=data_encoding, endian=endian,
+                    threads=threads)
 
-    def _write(self, file, data_encoding=None, endian=None):
+    def _write(self, file, data_encoding=None, endian=None, threads=1):
         """
         Writes SEG Y to a file like object.
 
@@ -267,8 +283,8 @@ class SEGYFile(object):
         # Write the binary header.
         self.binary_file_header.write(file, endian=endian)
         # Write all traces.
-        for trace in self.traces:
-            trace.write(file, data_encoding=data_encoding, endian=endian)
+        _write_traces(file, self.traces, data_encoding=data_encoding,
+                      endian=endian, threads=threads)
 
     def _write_textual_header(self, file):
         """
@@ -758,8 +774,156 @@ class SEGYTraceHeader(object):
             setattr(self, field[1], 0)
 
 
+def _write_traces(file, traces, data_encoding=None, endian=None, threads=1,
+                  chunk=1000):
+    """
+    Writes the traces to a file like object, see :meth:`SEGYTrace.write`.
+
+    The traces are packed in chunks of ``chunk`` traces into one buffer each
+    by :func:`_pack_traces`, optionally in a pool of ``threads`` threads.
+    """
+    chunks = (traces[_i:_i + chunk] for _i in range(0, len(traces), chunk))
+    pack = partial(_pack_traces, data_encoding=data_encoding, endian=endian)
+    if threads > 1 and len(traces) > chunk:
+        pool = ThreadPool(threads)
+        try:
+            for buf in pool.imap(pack, chunks):
+                file.write(buf)
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        for buf in map(pack, chunks):
+            file.write(buf)
+
+
+def _pack_traces(traces, data_encoding=None, endian=None):
+    """
+    Packs the headers and data of a list of traces into one byte string,
+    identical to writing the traces one by one with :meth:`SEGYTrace.write`.
+
+    All trace headers are filled into one structured array and the data of
+    successive traces with the same encoding and dtype is packed at once.
+    Falls back to :meth:`SEGYTrace.write` for traces with different header
+    byte orders or header values which do not fit into their fields.
+    """
+    buf = io.BytesIO()
+    header_endians = set(endian or tr.header.endian for tr in traces)
+    data = []
+    for trace in traces:
+        trace_data = trace.data
+        if trace_data is None:
+            msg = "No data in the SEGYTrace."
+            raise SEGYWritingError(msg)
+        # Set the data length in the header before writing it.
+        trace.header.number_of_samples_in_this_trace = len(trace_data)
+        data.append(trace_data)
+    headers = None
+    if len(header_endians) == 1:
+        headers = _pack_trace_headers([tr.header for tr in traces],
+                                      header_endians.pop())
+    if headers is None:
+        for trace in traces:
+            trace.write(buf, data_encoding=data_encoding, endian=endian)
+        return buf.getvalue()
+    # Pack runs of traces with the same encoding, byte order and dtype.
+    keys = [(data_encoding or tr.data_encoding, endian or tr.endian, d.dtype)
+            for tr, d in zip(traces, data)]
+    packed = []
+    start = 0
+    for _i in range(1, len(traces) + 1):
+        if _i < len(traces) and keys[_i] == keys[start]:
+            continue
+        encoding, data_endian, _ = keys[start]
+        run = io.BytesIO()
+        DATA_SAMPLE_FORMAT_PACK_FUNCTIONS[encoding](
+            run, np.concatenate(data[start:_i]), endian=data_endian)
+        packed.append(run.getvalue())
+        start = _i
+    packed = np.frombuffer(b''.join(packed), dtype=np.uint8)
+    # Interleave headers and data.
+    headers = headers.view(np.uint8).reshape(len(traces), 240)
+    sizes = np.array([len(d) * DATA_SAMPLE_FORMAT_SAMPLE_SIZE[k[0]]
+                      for d, k in zip(data, keys)])
+    if len(set(sizes)) == 1:
+        out = np.empty((len(traces), 240 + sizes[0]), dtype=np.uint8)
+        out[:, :240] = headers
+        out[:, 240:] = packed.reshape(len(traces), sizes[0])
+    else:
+        out = np.empty(len(packed) + 240 * len(traces), dtype=np.uint8)
+        offsets = np.concatenate([[0], np.cumsum(sizes + 240)])
+        data_offsets = np.concatenate([[0], np.cumsum(sizes)])
+        for _i in range(len(traces)):
+            out[offsets[_i]:offsets[_i] + 240] = headers[_i]
+            out[offsets[_i] + 240:offsets[_i + 1]] = \
+                packed[data_offsets[_i]:data_offsets[_i + 1]]
+    return out.tostring()
+
+
+def _pack_trace_headers(headers, endian):
+    """
+    Fills a list of :class:`SEGYTraceHeader` objects into a structured array
+    of the trace header dtype in the given byte order.
+
+    Headers which are not unpacked are taken over as a whole, all unpacked or
+    explicitly set values are filled per field. Returns ``None`` if a value
+    does not fit into its field.
+    """
+    array = np.zeros(len(headers), dtype=get_trace_header_dtype(endian))
+    # Still packed headers, grouped by their byte order.
+    packed = {}
+    for _i, header in enumerate(headers):
+        if header.__dict__.get('unpacked_header') is not None:
+            packed.setdefault(header.endian, []).append(_i)
+    for header_endian, indices in packed.items():
+        array[indices] = np.frombuffer(
+            b''.join(headers[_i].unpacked_header for _i in indices),
+            dtype=get_trace_header_dtype(header_endian))
+    # Unpacked or explicitly set values. Headers with all values set, like
+    # newly created ones, are fetched as rows of one table.
+    names = frozenset(_TRACE_HEADER_NAMES)
+    full = [_i for _i, header in enumerate(headers)
+            if names.issubset(header.__dict__)]
+    values = {}
+    if full:
+        getter = itemgetter(*_TRACE_HEADER_NAMES)
+        table = list(zip(*[getter(headers[_i].__dict__) for _i in full]))
+        for name, column in zip(_TRACE_HEADER_NAMES, table):
+            values[name] = (full, list(column))
+    full = set(full)
+    for _i, header in enumerate(headers):
+        if _i in full:
+            continue
+        for name, value in header.__dict__.items():
+            if name in _TRACE_HEADER_FIELDS:
+                values.setdefault(name, ([], []))
+                values[name][0].append(_i)
+                values[name][1].append(value)
+    raw = array.view(np.uint8).reshape(len(headers), 240)
+    for name, (indices, field_values) in values.items():
+        length, start = _TRACE_HEADER_FIELDS[name]
+        if length == 8:
+            for _i, value in zip(indices, field_values):
+                # An empty field will have a zero.
+                if value == 0:
+                    value = b'\x00' * 8
+                if not isinstance(value, bytes) or len(value) != 8:
+                    return None
+                raw[_i, start:start + 8] = np.frombuffer(value, np.uint8)
+            continue
+        field_values = np.array(field_values)
+        if field_values.dtype.kind not in 'iub':
+            return None
+        info = np.iinfo(array.dtype[native_str(name)])
+        if len(field_values) and (field_values.min() < info.min or
+                                  field_values.max() > info.max):
+            return None
+        array[native_str(name)][indices] = field_values
+    return array
+
+
 def _read_segy(file, endian=None, textual_header_encoding=None,
-               unpack_headers=False, headonly=False):
+               unpack_headers=False, headonly=False, mmap=False):
     """
     Reads a SEG Y file and returns a SEGYFile object.
 
@@ -782,6 +946,10 @@ def _read_segy(file, endian=None, textual_header_encoding=None,
     :param headonly: Determines whether or not the actual data records will be
         read and unpacked. Has a huge impact on memory usage. Data can be read
         and unpacked on-the-fly after reading the file. Defaults to False.
+    :type mmap: bool
+    :param mmap: If True, a :class:`SEGYMemmapFile` with memory mapped
+        trace headers and data is returned. Requires a file on disk with a
+        constant trace length. Defaults to False.
     """
     # Open the file if it is not a file like object.
     if not hasattr(file, 'read') or not hasattr(file, 'tell') or not \
@@ -790,15 +958,16 @@ def _read_segy(file, endian=None, textual_header_encoding=None,
             return __read_segy(
                 open_file, endian=endian,
                 textual_header_encoding=textual_header_encoding,
-                unpack_headers=unpack_headers, headonly=headonly)
+                unpack_headers=unpack_headers, headonly=headonly, mmap=mmap)
     # Otherwise just read it.
     return __read_segy(file, endian=endian,
                        textual_header_encoding=textual_header_encoding,
-                       unpack_headers=unpack_headers, headonly=headonly)
+                       unpack_headers=unpack_headers, headonly=headonly,
+                       mmap=mmap)
 
 
 def __read_segy(file, endian=None, textual_header_encoding=None,
-                unpack_headers=False, headonly=False):
+                unpack_headers=False, headonly=False, mmap=False):
     """
     Reads on open file object and returns a SEGYFile object.
 
@@ -821,6 +990,10 @@ def __read_segy(file, endian=None, textual_header_encoding=None,
         read and unpacked. Has a huge impact on memory usage. Data can be read
         and unpacked on-the-fly after reading the file. Defaults to False.
     """
+    if mmap:
+        return SEGYMemmapFile(file, endian=endian,
+                              textual_header_encoding=textual_header_encoding,
+                              unpack_headers=unpack_headers)
     return SEGYFile(file, endian=endian,
                     textual_header_encoding=textual_header_encoding,
                     unpack_headers=unpack_headers, headonly=headonly)
@@ -943,11 +1116,183 @@ class SUFile(object):
         If endian is set it will be enforced.
         """
         # Write all traces.
-        for trace in self.traces:
-            trace.write(file, data_encoding=5, endian=endian)
+        _write_traces(file, self.traces, data_encoding=5, endian=endian)
+
+
+class _MemmapTraces(object):
+    """
+    Lazy sequence of :class:`SEGYTrace` objects of a memory mapped file.
+
+    Traces are only created on access. Iterating decodes the data in chunks.
+    """
+    def __init__(self, segy, chunk=1000):
+        self._segy = segy
+        self._chunk = chunk
+
+    def __len__(self):
+        return len(self._segy.headers)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[_i] for _i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('trace index out of range')
+        return self._segy._get_trace(index, self._segy.get_data(
+            index, index + 1)[0])
+
+    def __iter__(self):
+        start = 0
+        for _, data in self._segy.iter_traces(chunk=self._chunk):
+            for _i, trace_data in enumerate(data):
+                yield self._segy._get_trace(start + _i, trace_data)
+            start += len(data)
+
+
+class _MemmapMixin(object):
+    """
+    Memory mapped access to files with a constant trace length, shared by
+    :class:`SEGYMemmapFile` and :class:`SUMemmapFile`.
+    """
+    def _read_traces(self, unpack_headers=False, headonly=False):
+        """
+        Maps all traces starting at the current file pointer position to the
+        end of the file.
+        """
+        self.unpack_headers = unpack_headers
+        if not hasattr(self.file, 'name'):
+            msg = 'Memory mapping requires a file on disk.'
+            raise SEGYError(msg)
+        if self.data_encoding not in DATA_SAMPLE_FORMAT_CODE_DTYPE:
+            msg = 'Data sample format code %s is not supported.' % \
+                self.data_encoding
+            raise NotImplementedError(msg)
+        offset = self.file.tell()
+        filesize = os.fstat(self.file.fileno())[6]
+        header_dtype = get_trace_header_dtype(self.endian)
+        if filesize - offset < 240:
+            npts = 0
+        else:
+            self.file.seek(offset + 114, 0)
+            npts = unpack(('%sH' % self.endian).encode('ascii', 'strict'),
+                          self.file.read(2))[0]
+            self.file.seek(offset, 0)
+        if self.data_encoding == 1:
+            # IBM floats are converted on demand
+            sample_dtype = '%su4' % self.endian
+        else:
+            sample_dtype = np.dtype(
+                DATA_SAMPLE_FORMAT_CODE_DTYPE[self.data_encoding]).str[1:]
+            sample_dtype = self.endian + sample_dtype
+        dtype = np.dtype([
+            (native_str('header'), header_dtype),
+            (native_str('data'), native_str(sample_dtype), (npts, ))])
+        ntraces = (filesize - offset) // dtype.itemsize if npts else 0
+        if npts and (filesize - offset) % dtype.itemsize:
+            msg = 'The file size does not match a constant trace length ' + \
+                'of %i samples. Memory mapping requires all traces to ' + \
+                'have the same length.'
+            raise SEGYError(msg % npts)
+        if ntraces:
+            self._memmap = np.memmap(self.file.name, dtype=dtype, mode='r',
+                                     offset=offset, shape=(ntraces, ))
+        else:
+            self._memmap = np.zeros(0, dtype=dtype)
+        if np.any(self.headers['number_of_samples_in_this_trace'] != npts):
+            msg = 'Memory mapping requires all traces to have the same ' + \
+                'length.'
+            raise SEGYError(msg)
+        self.npts = npts
+        self.traces = _MemmapTraces(self)
+
+    @property
+    def headers(self):
+        """
+        All trace headers as a structured array in the byte order of the
+        file, mapped from the file.
+        """
+        return self._memmap['header']
+
+    @property
+    def samples(self):
+        """
+        All samples as a two dimensional array in the byte order of the file,
+        mapped from the file. IBM floating point samples are given as their
+        raw 32 bit words, use :meth:`get_data` to convert them.
+        """
+        return self._memmap['data']
+
+    def get_data(self, start=0, stop=None):
+        """
+        Returns the samples of the traces ``start`` to ``stop`` (exclusive)
+        as a two dimensional array in native byte order. Only this range of
+        traces is read from the file.
+        """
+        data = self.samples[start:stop]
+        if self.data_encoding == 1:
+            return ibm2ieee(data)
+        return np.require(data, dtype=data.dtype.newbyteorder(native_str('=')),
+                          requirements=[native_str('C')])
+
+    def iter_traces(self, chunk=1000):
+        """
+        Generator of ``(headers, data)`` tuples of ``chunk`` traces each,
+        with the headers as in :attr:`headers` and the data as returned by
+        :meth:`get_data`. Allows processing files larger than the memory.
+        """
+        for start in range(0, len(self.headers), chunk):
+            yield (self.headers[start:start + chunk],
+                   self.get_data(start, start + chunk))
+
+    def _get_trace(self, index, data):
+        """
+        Creates a :class:`SEGYTrace` with the given data.
+        """
+        trace = SEGYTrace(data_encoding=self.data_encoding,
+                          endian=self.endian)
+        trace.header = SEGYTraceHeader(
+            self.headers[index:index + 1].tostring(), endian=self.endian,
+            unpack_headers=self.unpack_headers)
+        trace.data = data
+        return trace
+
+
+class SEGYMemmapFile(_MemmapMixin, SEGYFile):
+    """
+    SEG Y file with memory mapped traces.
+
+    All traces need to have the same length. The textual and binary file
+    headers are read as with :class:`SEGYFile`, all trace headers and samples
+    are mapped from the file, see :attr:`~_MemmapMixin.headers`,
+    :attr:`~_MemmapMixin.samples`, :meth:`~_MemmapMixin.get_data` and
+    :meth:`~_MemmapMixin.iter_traces`. ``traces`` is a lazy sequence of
+    :class:`SEGYTrace` objects.
+
+    >>> from obspy.core.util import get_example_file
+    >>> filename = get_example_file("1.sgy_first_trace")
+    >>> with open(filename, 'rb') as fh:
+    ...     segy = SEGYMemmapFile(fh)
+    >>> print(segy)
+    1 traces in the SEG Y structure.
+    >>> print(segy.headers['number_of_samples_in_this_trace'])
+    [8000]
+    >>> print(segy.get_data().shape)
+    (1, 8000)
+    """
+    pass
+
+
+class SUMemmapFile(_MemmapMixin, SUFile):
+    """
+    Seismic Unix file with memory mapped traces, see
+    :class:`SEGYMemmapFile`.
+    """
+    data_encoding = 5
 
 
-def _read_su(file, endian=None, unpack_headers=False, headonly=False):
+def _read_su(file, endian=None, unpack_headers=False, headonly=False,
+             mmap=False):
     """
     Reads a Seismic Unix (SU) file and returns a SUFile object.
 
@@ -967,19 +1312,25 @@ def _read_su(file, endian=None, unpack_headers=False, headonly=False):
     :param headonly: Determines whether or not the actual data records will be
         unpacked. Useful if one is just interested in the headers. Defaults to
         False.
+    :type mmap: bool
+    :param mmap: If True, a :class:`SUMemmapFile` with memory mapped trace
+        headers and data is returned. Requires a file on disk with a constant
+        trace length. Defaults to False.
     """
     # Open the file if it is not a file like object.
     if not hasattr(file, 'read') or not hasattr(file, 'tell') or not \
             hasattr(file, 'seek'):
         with open(file, 'rb') as open_file:
             return __read_su(open_file, endian=endian,
-                             unpack_headers=unpack_headers, headonly=headonly)
+                             unpack_headers=unpack_headers, headonly=headonly,
+                             mmap=mmap)
     # Otherwise just read it.
     return __read_su(file, endian=endian, unpack_headers=unpack_headers,
-                     headonly=headonly)
+                     headonly=headonly, mmap=mmap)
 
 
-def __read_su(file, endian=None, unpack_headers=False, headonly=False):
+def __read_su(file, endian=None, unpack_headers=False, headonly=False,
+              mmap=False):
     """
     Reads on open file object and returns a SUFile object.
 
@@ -999,6 +1350,9 @@ def __read_su(file, endian=None, unpack_headers=False, headonly=False):
         unpacked. Useful if one is just interested in the headers. Defaults to
         False.
     """
+    if mmap:
+        return SUMemmapFile(file, endian=endian,
+                            unpack_headers=unpack_headers)
     return SUFile(file, endian=endian, unpack_headers=unpack_headers,
                   headonly=headonly)
 
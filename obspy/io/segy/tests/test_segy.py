@@ -15,8 +15,9 @@ import numpy as np
 from obspy.core.util import NamedTemporaryFile
 from obspy.io.segy.header import (DATA_SAMPLE_FORMAT_PACK_FUNCTIONS,
                                   DATA_SAMPLE_FORMAT_UNPACK_FUNCTIONS)
-from obspy.io.segy.segy import (SEGYBinaryFileHeader, SEGYFile,
-                                SEGYTraceHeader, _read_segy)
+from obspy.io.segy.segy import (SEGYBinaryFileHeader, SEGYError, SEGYFile,
+                                SEGYMemmapFile, SEGYTrace, SEGYTraceHeader,
+                                _pack_traces, _read_segy)
 from obspy.io.segy.tests.header import DTYPES, FILES
 
 
@@ -576,6 +577,99 @@ class SEGYTestCase(unittest.TestCase):
         st = _read_segy(io.BytesIO(data))
         self.assertEqual(len(st.traces[0].data), 512)
 
+    def test_readSEGYMemmap(self):
+        """
+        Memory mapped traces have to match the traces read with SEGYFile.
+        """
+        for file in self.files:
+            file = os.path.join(self.path, file)
+            segy_file = _read_segy(file)
+            # multiply the trace to get a file with several traces
+            for _i in range(4):
+                segy_file.traces.append(_read_segy(file).traces[0])
+                segy_file.traces[-1].data = segy_file.traces[-1].data[::-1]
+                segy_file.traces[-1].header.\
+                    trace_sequence_number_within_line = _i + 2
+            with NamedTemporaryFile() as tf:
+                segy_file.write(tf.name)
+                expected = _read_segy(tf.name)
+                segy = _read_segy(tf.name, mmap=True)
+                self.assertTrue(isinstance(segy, SEGYMemmapFile))
+                self.assertEqual(segy.npts, len(expected.traces[0].data))
+                self.assertEqual(len(segy.traces), 5)
+                self.assertEqual(segy.textual_file_header,
+                                 expected.textual_file_header)
+                np.testing.assert_array_equal(
+                    segy.headers['trace_sequence_number_within_line'],
+                    [tr.header.trace_sequence_number_within_line
+                     for tr in expected.traces])
+                data = segy.get_data()
+                self.assertEqual(data.shape, (5, segy.npts))
+                self.assertEqual(data.dtype, expected.traces[0].data.dtype)
+                for tr, tr_mmap, tr_data in zip(expected.traces,
+                                                segy.traces, data):
+                    np.testing.assert_array_equal(tr_mmap.data, tr.data)
+                    np.testing.assert_array_equal(tr_data, tr.data)
+                    self.assertEqual(str(tr_mmap.header), str(tr.header))
+                np.testing.assert_array_equal(segy.traces[-2].data,
+                                              expected.traces[-2].data)
+                chunks = list(segy.iter_traces(chunk=2))
+                self.assertEqual([len(x[0]) for x in chunks], [2, 2, 1])
+                np.testing.assert_array_equal(
+                    np.concatenate([x[1] for x in chunks]), data)
+                # writing gives the same file
+                with NamedTemporaryFile() as tf2:
+                    segy.write(tf2.name)
+                    with open(tf.name, 'rb') as fh1:
+                        with open(tf2.name, 'rb') as fh2:
+                            self.assertEqual(fh1.read(), fh2.read())
+                del segy, data, chunks
+            # traces of different length can not be mapped
+            segy_file.traces[-1].data = segy_file.traces[-1].data[:-1]
+            with NamedTemporaryFile() as tf:
+                segy_file.write(tf.name)
+                self.assertRaises(SEGYError, _read_segy, tf.name, mmap=True)
+
+    def test_packTraces(self):
+        """
+        Packing many traces at once has to give the same bytes as writing
+        them one by one.
+        """
+        rng = np.random.RandomState(815)
+        traces = []
+        for file, attribs in sorted(self.files.items()):
+            file = os.path.join(self.path, file)
+            # packed headers of both byte orders
+            traces.append(_read_segy(file).traces[0])
+            # unpacked headers with some changed values
+            trace = _read_segy(file, unpack_headers=True).traces[0]
+            trace.header.trace_sequence_number_within_line = 7
+            trace.header.unassigned = b'12345678'
+            traces.append(trace)
+        # empty headers, different lengths and dtypes
+        for dtype, encoding in ((np.float32, 1), (np.float64, 1),
+                                (np.int32, 2), (np.int16, 3),
+                                (np.float32, 5)):
+            for npts in (10, 33):
+                trace = SEGYTrace(data_encoding=encoding)
+                trace.data = (rng.randn(npts) * 1000).astype(dtype)
+                trace.header.source_coordinate_x = -123456
+                trace.header.sample_interval_in_ms_for_this_trace = 40000
+                traces.append(trace)
+        for data_encoding, endian in ((None, None), (None, '<'), (5, '>')):
+            if data_encoding == 5:
+                traces = [tr for tr in traces
+                          if tr.data.dtype == np.float32]
+            expected = io.BytesIO()
+            for trace in traces:
+                trace.write(expected, data_encoding=data_encoding,
+                            endian=endian)
+            self.assertEqual(_pack_traces(traces, data_encoding, endian),
+                             expected.getvalue())
+        # values out of range raise as before
+        traces[0].header.trace_sequence_number_within_line = 2 ** 40
+        self.assertRaises(Exception, _pack_traces, traces)
+
 
 def rms(x, y):
     """
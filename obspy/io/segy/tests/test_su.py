@@ -13,7 +13,8 @@ import unittest
 import numpy as np
 
 from obspy.core.util import NamedTemporaryFile
-from obspy.io.segy.segy import SEGYTraceReadingError, _read_su
+from obspy.io.segy.segy import (SEGYTraceReadingError, SUMemmapFile,
+                                _read_su)
 
 
 class SUTestCase(unittest.TestCase):
@@ -123,6 +124,25 @@ class SUTestCase(unittest.TestCase):
         st = _read_su(io.BytesIO(data))
         self.assertEqual(len(st.traces[0].data), 8000)
 
+    def test_readSUMemmap(self):
+        """
+        Memory mapped SU traces have to match the traces read with SUFile.
+        """
+        file = os.path.join(self.path, '1.su_first_trace')
+        su = _read_su(file)
+        su.traces.append(_read_su(file).traces[0])
+        su.traces[-1].data = su.traces[-1].data * 2
+        with NamedTemporaryFile() as tf:
+            su.write(tf.name)
+            su_mmap = _read_su(tf.name, mmap=True)
+            self.assertTrue(isinstance(su_mmap, SUMemmapFile))
+            self.assertEqual(len(su_mmap.traces), 2)
+            for tr, tr_mmap in zip(su.traces, su_mmap.traces):
+                np.testing.assert_array_equal(tr_mmap.data, tr.data)
+            np.testing.assert_array_equal(
+                su_mmap.samples[1], su.traces[1].data)
+            del su_mmap
+
 
 def suite():
     return unittest.makeSuite(SUTestCase, 'test')
@@ -56,6 +56,18 @@ def unpack_4byte_IBM(file, count, endian='>'):
     return data
 
 
+def ibm2ieee(data):
+    """
+    Converts an array of 4 byte IBM floating points, given as 32 bit
+    unsigned integers of any byte order, into a new native float32 array of
+    the same shape.
+    """
+    # Always copy into native byte order, the conversion works inplace.
+    data = np.array(data, dtype=np.uint32).view(np.float32)
+    clibsegy.ibm2ieee(data.reshape(-1), data.size)
+    return data
+
+
 # Old pure Python/NumPy code
 #
 # def unpack_4byte_IBM(file, count, endian='>'):
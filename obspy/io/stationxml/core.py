@@ -13,6 +13,7 @@ from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 from future.builtins import *  # NOQA
 
+import gzip
 import inspect
 import io
 import math
@@ -22,6 +23,7 @@ import warnings
 from lxml import etree
 
 import obspy
+from obspy.core.util.misc import _write_xml_incrementally
 from obspy.core.util.obspy_types import (ComplexWithUncertainties,
                                          FloatWithUncertaintiesAndUnit)
 from obspy.core.inventory import (CoefficientsTypeResponseStage,
@@ -682,10 +684,13 @@ def _read_phone(phone_element, _ns):
 
 
 def _write_stationxml(inventory, file_or_file_object, validate=False,
-                      **kwargs):
+                      compress=False, **kwargs):
     """
     Writes an inventory object to a buffer.
 
+    Unless validation is requested, the document is written network by
+    network without building the XML tree of the whole inventory in memory.
+
     :type inventory: :class:`~obspy.core.inventory.Inventory`
     :param inventory: The inventory instance to be written.
     :param file_or_file_object: The file or file-like object to be written to.
@@ -693,6 +698,9 @@ def _write_stationxml(inventory, file_or_file_object, validate=False,
     :param validate: If True, the created document will be validated with the
         StationXML schema before being written. Useful for debugging or if you
         don't trust ObsPy. Defaults to False.
+    :type compress: bool
+    :param compress: If True, the StationXML document is gzip compressed.
+        Defaults to False.
     """
     # Check if any of the channels has a data availability element. In that
     # case the namespaces need to be adjusted.
@@ -744,16 +752,13 @@ def _write_stationxml(inventory, file_or_file_object, validate=False,
 
     etree.SubElement(root, "Created").text = _format_time(inventory.created)
 
-    for network in inventory.networks:
-        _write_network(root, network)
-
-    tree = root.getroottree()
-
     # The validation has to be done after parsing once again so that the
     # namespaces are correctly assembled.
     if validate is True:
+        for network in inventory.networks:
+            _write_network(root, network)
         buf = io.BytesIO()
-        tree.write(buf)
+        root.getroottree().write(buf)
         buf.seek(0)
         validates, errors = validate_StationXML(buf)
         buf.close()
@@ -763,8 +768,33 @@ def _write_stationxml(inventory, file_or_file_object, validate=False,
                 msg += "\t%s\n" % err
             raise Exception(msg)
 
-    tree.write(file_or_file_object, pretty_print=True, xml_declaration=True,
-               encoding="UTF-8")
+    # Open filehandler or use an existing file like object.
+    if not hasattr(file_or_file_object, "write"):
+        file_opened = True
+        fh = open(file_or_file_object, "wb")
+    else:
+        file_opened = False
+        fh = file_or_file_object
+
+    try:
+        out = fh
+        if compress:
+            out = gzip.GzipFile(fileobj=fh, mode="wb")
+        if validate is True:
+            out.write(etree.tostring(root, pretty_print=True,
+                                     xml_declaration=True, encoding="UTF-8"))
+        else:
+            _write_xml_incrementally(
+                out, root, root, len(root),
+                (_write_network(None, network)
+                 for network in inventory.networks),
+                encoding="UTF-8")
+        if compress:
+            out.close()
+    finally:
+        # Close if a file has been opened by this function.
+        if file_opened is True:
+            fh.close()
 
 
 def _get_base_node_attributes(element):
@@ -793,9 +823,14 @@ def _write_base_node(element, object_to_read_from):
 def _write_network(parent, network):
     """
     Helper function converting a Network instance to an etree.Element.
+
+    The element is appended to parent unless parent is None.
     """
     attribs = _get_base_node_attributes(network)
-    network_elem = etree.SubElement(parent, "Network", attribs)
+    if parent is None:
+        network_elem = etree.Element("Network", attribs)
+    else:
+        network_elem = etree.SubElement(parent, "Network", attribs)
     _write_base_node(network_elem, network)
 
     # Add the two, network specific fields.
@@ -808,6 +843,7 @@ def _write_network(parent, network):
 
     for station in network.stations:
         _write_station(network_elem, station)
+    return network_elem
 
 
 def _write_floattype(parent, obj, attr_name, tag, additional_mapping={}):
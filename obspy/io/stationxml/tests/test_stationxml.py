@@ -14,6 +14,7 @@ from __future__ import (absolute_import, division, print_function,
 from future.builtins import *  # NOQA
 
 import fnmatch
+import gzip
 import inspect
 import io
 import os
@@ -634,6 +635,39 @@ class StationXMLTestCase(unittest.TestCase):
         self.assertEqual(len(inv.networks), 1)
         self.assertEqual(inv[0].code, "XX")
 
+    def test_incremental_write_is_identical(self):
+        """
+        Writing network by network results in exactly the same document as
+        serializing the whole XML tree, also for compressed output.
+        """
+        inv = obspy.read_inventory(os.path.join(
+            self.data_dir, "IRIS_single_channel_with_response.xml"),
+            format="StationXML")
+        inv += obspy.read_inventory(os.path.join(
+            self.data_dir, "full_random_stationxml.xml"),
+            format="StationXML")
+        # writing with validation serializes the whole tree at once
+        expected = io.BytesIO()
+        inv.write(expected, format="StationXML", validate=True)
+        expected = expected.getvalue()
+        buf = io.BytesIO()
+        inv.write(buf, format="StationXML")
+        self.assertEqual(buf.getvalue(), expected)
+        # inventory without networks
+        inv_empty = Inventory(networks=[], source="ObsPy",
+                              created=inv.created)
+        buf = io.BytesIO()
+        inv_empty.write(buf, format="StationXML")
+        buf.seek(0, 0)
+        self.assertEqual(
+            obspy.read_inventory(buf, format="StationXML").networks, [])
+        # gzip compressed output can be read again
+        buf = io.BytesIO()
+        inv.write(buf, format="StationXML", compress=True)
+        buf.seek(0, 0)
+        with gzip.GzipFile(fileobj=buf, mode="rb") as fh:
+            self.assertEqual(fh.read(), expected)
+
 
 def suite():
     return unittest.makeSuite(StationXMLTestCase, "test")
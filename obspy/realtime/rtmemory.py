@@ -53,6 +53,8 @@ class RtMemory:
         Update specified memory array using specified number of points from
         end of specified data array.
 
+        The memory array is updated in place, no new arrays are allocated.
+
         :type memory_array: numpy.ndarray
         :param memory_array:  Memory array (input or output) in this
             RtMemory object to update.
@@ -61,15 +63,18 @@ class RtMemory:
         :return: NumPy :class:`~numpy.ndarray` object containing updated
             memory array (input or output).
         """
-        if data.size >= np.size(memory_array):
+        size = np.size(memory_array)
+        if size == 0:
+            return memory_array
+        if data.size >= size:
             # data length greater than or equal to memory length
-            memory_array = data[np.size(data) - np.size(memory_array):]
-        else:
+            memory_array[:] = data[data.size - size:]
+        elif data.size:
             # data length less than memory length
             # shift memory
-            memory_array = memory_array[data.size:]
+            memory_array[:size - data.size] = memory_array[data.size:]
             # append data
-            memory_array = np.concatenate((memory_array, data))
+            memory_array[size - data.size:] = data
         return memory_array
 
     def update_output(self, data):
@@ -34,6 +34,9 @@ REALTIME_PROCESS_FUNCTIONS = {
     'tauc': (signal.tauc, 2),
     'mwpintegral': (signal.mwpIntegral, 1),
     'kurtosis': (signal.kurtosis, 3),
+    'bandpass': (signal.bandpass, 1),
+    'highpass': (signal.highpass, 1),
+    'lowpass': (signal.lowpass, 1),
 }
 
 
@@ -48,6 +51,13 @@ class RtTrace(Trace):
 
     :type max_length: int, optional
     :param max_length: maximum trace length in seconds
+    :type ring_buffer: bool, optional
+    :param ring_buffer: If ``True``, data is stored in a preallocated circular
+        buffer of ``max_length`` seconds. Appending a packet then only copies
+        the samples of the packet and the cost of an append does not depend
+        on the length of the buffer. The contiguous :attr:`data` array is
+        only assembled when it is accessed. Requires ``max_length``
+        (default is ``False``).
 
     .. rubric:: Example
 
@@ -129,7 +139,8 @@ class RtTrace(Trace):
             string += str(REALTIME_PROCESS_FUNCTIONS[key][0].__doc__)
         return(string)
 
-    def __init__(self, max_length=None, *args, **kwargs):  # @UnusedVariable
+    def __init__(self, max_length=None, ring_buffer=False, *args,
+                 **kwargs):  # @UnusedVariable
         """
         Initializes an RtTrace.
 
@@ -138,7 +149,11 @@ class RtTrace(Trace):
         # set window length attribute
         if max_length is not None and max_length <= 0:
             raise ValueError("Input max_length out of bounds: %s" % max_length)
+        if ring_buffer and max_length is None:
+            msg = "Ring buffer storage requires max_length to be set."
+            raise ValueError(msg)
         self.max_length = max_length
+        self.ring_buffer = ring_buffer
 
         # initialize processing list
         self.processing = []
@@ -147,6 +162,41 @@ class RtTrace(Trace):
         # added using append
         super(RtTrace, self).__init__(data=np.array([]), header=None)
 
+    @property
+    def data(self):
+        """
+        Data samples of this RtTrace as contiguous :class:`~numpy.ndarray`.
+
+        In ring buffer mode the circular buffer is rotated in place if the
+        stored samples wrap around the end of the buffer, so the returned
+        array is always a view on the buffer and no data is copied as long
+        as no new data has been appended since the last access.
+        """
+        buf = self._buffer
+        start = self._buffer_start
+        npts = self._buffer_npts
+        if start == 0 and npts == len(buf):
+            return buf
+        if start + npts > len(buf):
+            # data wraps around the end of the buffer, unroll it in place
+            buf[:] = np.concatenate((buf[start:], buf[:start]))
+            start = self._buffer_start = 0
+        return buf[start:start + npts]
+
+    @data.setter
+    def data(self, value):
+        self._buffer = value
+        self._buffer_start = 0
+        self._buffer_npts = len(value)
+
+    def __len__(self):
+        """
+        Return number of data samples of the current RtTrace.
+        """
+        return self._buffer_npts
+
+    count = __len__
+
     def __eq__(self, other):
         """
         Implements rich comparison of RtTrace objects for "==" operator.
@@ -213,9 +263,9 @@ class RtTrace(Trace):
                 raise TypeError("Calibration factor differs:",
                                 self.stats.calib, trace.stats.calib)
             # check data type
-            if self.data.dtype != trace.data.dtype:
+            if self._buffer.dtype != trace.data.dtype:
                 raise TypeError("Data type differs:",
-                                self.data.dtype, trace.data.dtype)
+                                self._buffer.dtype, trace.data.dtype)
         # TODO: IMPORTANT? Should improve check for gaps and overlaps
         # and handle more elegantly
         # check times
@@ -261,7 +311,10 @@ class RtTrace(Trace):
                     print("%s: self.stats.starttime adjusted by: %gs"
                           % (self.__class__.__name__, diff -
                              self.stats.delta))
-        # first apply all registered processing to Trace
+        # first apply all registered processing to Trace, all processes work
+        # in place on a single copy of the appended Trace
+        if self.processing:
+            trace = trace.copy()
         for proc in self.processing:
             process_name, options, rtmemory_list = proc
             # if gap or overlap, clear memory
@@ -269,7 +322,6 @@ class RtTrace(Trace):
                 for n in range(len(rtmemory_list)):
                     rtmemory_list[n] = RtMemory()
             # apply processing
-            trace = trace.copy()
             dtype = trace.data.dtype
             if hasattr(process_name, '__call__'):
                 # check if direct function call
@@ -288,6 +340,9 @@ class RtTrace(Trace):
             self.have_appended_data = True
             return trace
         # handle all following data sets
+        if self.ring_buffer:
+            self._ring_append(trace)
+            return trace
         # fix Trace.__add__ parameters
         # TODO: IMPORTANT? Should check for gaps and overlaps and handle
         # more elegantly
@@ -307,6 +362,82 @@ class RtTrace(Trace):
                             fill_value=None)
         return trace
 
+    def _ring_append(self, trace):
+        """
+        Appends data of given Trace to the circular buffer of this RtTrace.
+
+        Gaps are filled with the latest sample value and overlapping samples
+        at the beginning of the appended Trace are discarded. The start time
+        is updated arithmetically for all samples dropped from the beginning
+        of the buffer.
+        """
+        sr = self.stats.sampling_rate
+        data = trace.data
+        # number of missing (positive) or overlapping (negative) samples
+        gap = int(round((trace.stats.starttime - self.stats.endtime) * sr)) - 1
+        if gap < 0:
+            data = data[-gap:]
+        max_samples = int(self.max_length * sr + 0.5)
+        buf = self._buffer
+        if len(buf) != max_samples or not buf.flags.writeable:
+            # allocate ring buffer on first use or if data shared read-only
+            # was assigned, keeping most recent samples
+            old = self.data
+            npts = min(len(old), max_samples)
+            buf = np.empty(max_samples, dtype=old.dtype)
+            buf[:npts] = old[len(old) - npts:]
+            self.stats.starttime += (len(old) - npts) / sr
+            self._buffer = buf
+            self._buffer_start = 0
+            self._buffer_npts = npts
+        if gap > 0 and self._buffer_npts:
+            latest = buf[(self._buffer_start + self._buffer_npts - 1) %
+                         max_samples]
+            # at most one buffer length of the gap is written, the start time
+            # is advanced by the remaining gap samples
+            fill = min(gap, max_samples)
+            self._ring_write(np.empty(fill, dtype=buf.dtype), fill=latest)
+            self.stats.starttime += (gap - fill) / sr
+        self._ring_write(data)
+
+    def _ring_write(self, data, fill=None):
+        """
+        Writes given samples after the last sample of the circular buffer.
+
+        Only the samples of ``data`` are copied. If ``fill`` is given, it is
+        written instead of the values in ``data``.
+        """
+        buf = self._buffer
+        size = len(buf)
+        start = self._buffer_start
+        npts = self._buffer_npts
+        count = len(data)
+        if count >= size:
+            # new data replaces all of the buffer
+            dropped = npts + count - size
+            data = data[count - size:]
+            start = 0
+            if fill is None:
+                buf[:] = data
+            else:
+                buf[:] = fill
+        else:
+            dropped = max(npts + count - size, 0)
+            pos = (start + npts) % size
+            first = min(count, size - pos)
+            if fill is None:
+                buf[pos:pos + first] = data[:first]
+                buf[:count - first] = data[first:]
+            else:
+                buf[pos:pos + first] = fill
+                buf[:count - first] = fill
+            start = (start + dropped) % size
+        self._buffer_start = start
+        self._buffer_npts = min(npts + count, size)
+        if dropped:
+            self.stats.starttime += dropped / self.stats.sampling_rate
+        self.stats.npts = self._buffer_npts
+
     def register_rt_process(self, process, **options):
         """
         Adds real-time processing algorithm to processing list of this RtTrace.
@@ -371,16 +502,26 @@ class RtTrace(Trace):
 
         return len(self.processing)
 
-    def copy(self, *args, **kwargs):
+    def copy(self, copy_on_write=False):
         """
         Returns a deepcopy of this RtTrace.
+
+        :type copy_on_write: bool, optional
+        :param copy_on_write: Share the data array read-only until either
+            trace gets processed, see :meth:`Trace.copy()
+            <obspy.core.trace.Trace.copy>`. Ignored in ring buffer mode, the
+            circular buffer is written in place and always copied.
         """
         # XXX: ugly hack to allow deepcopy of an RtTrace object containing
         # registered NumPy function (numpy.ufunc) calls
-        temp = copy.copy(self.processing)
+        temp = self.processing
         self.processing = []
-        new = copy.deepcopy(self, *args, **kwargs)
-        new.processing = temp
+        try:
+            new = super(RtTrace, self).copy(
+                copy_on_write=copy_on_write and not self.ring_buffer)
+        finally:
+            self.processing = temp
+        new.processing = copy.copy(temp)
         return new
 
 
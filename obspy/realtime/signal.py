@@ -26,8 +26,18 @@ from future.builtins import *  # NOQA
 
 import math
 import sys
+import warnings
+from collections import OrderedDict
 
 import numpy as np
+from scipy.signal import iirfilter
+
+try:
+    from scipy.signal import sosfilt
+    from scipy.signal import zpk2sos
+except ImportError:
+    from obspy.signal._sosfilt import _sosfilt as sosfilt
+    from obspy.signal._sosfilt import _zpk2sos as zpk2sos
 
 from obspy.core.trace import Trace, UTCDateTime
 from obspy.realtime.rtmemory import RtMemory
@@ -37,6 +47,12 @@ _PI = math.pi
 _TWO_PI = 2.0 * math.pi
 _MIN_FLOAT_VAL = 1.0e-20
 
+# maximum number of designed real time filters kept in the cache
+_SOS_CACHE_SIZE = 32
+# second-order sections of already designed real time filters, keyed by
+# filter type, normalized corner frequencies and number of corners
+_SOS_CACHE = OrderedDict()
+
 
 def offset(trace, offset=0.0, rtmemory_list=None):  # @UnusedVariable
     """
@@ -634,3 +650,188 @@ def kurtosis(trace, win=3.0, rtmemory_list=None):
     rtmemory_k4_bar.input[0] = k4_bar_last
 
     return kappa4
+
+
+def _get_sos(btype, freqs, df, corners):
+    """
+    Design Butterworth filter second-order sections for real time filtering.
+
+    The last ``_SOS_CACHE_SIZE`` designed filters are cached, so the filter
+    design is only done once for every packet stream. Corner frequencies are
+    checked against the Nyquist frequency on every call.
+
+    :type btype: str
+    :param btype: Filter type, one of ``"bandpass"``, ``"highpass"`` or
+        ``"lowpass"``.
+    :type freqs: tuple of float
+    :param freqs: Corner frequencies in Hz.
+    :type df: float
+    :param df: Sampling rate in Hz.
+    :type corners: int
+    :param corners: Filter corners / order.
+    :rtype: :class:`numpy.ndarray`
+    :return: Second-order sections of the filter, shape
+        ``(n_sections, 6)``.
+    """
+    fe = 0.5 * df
+    wn = [f / fe for f in freqs]
+    # raise for some bad scenarios, same as in obspy.signal.filter
+    if btype == 'bandpass':
+        if wn[1] > 1:
+            wn[1] = 1.0
+            msg = "Selected high corner frequency is above Nyquist. " + \
+                  "Setting Nyquist as high corner."
+            warnings.warn(msg)
+        if wn[0] > 1:
+            msg = "Selected low corner frequency is above Nyquist."
+            raise ValueError(msg)
+    elif btype == 'lowpass':
+        if wn[0] > 1:
+            wn[0] = 1.0
+            msg = "Selected corner frequency is above Nyquist. " + \
+                  "Setting Nyquist as high corner."
+            warnings.warn(msg)
+    elif wn[0] > 1:
+        msg = "Selected corner frequency is above Nyquist."
+        raise ValueError(msg)
+    key = (btype, tuple(wn), corners)
+    try:
+        sos = _SOS_CACHE.pop(key)
+    except KeyError:
+        if len(wn) == 1:
+            wn = wn[0]
+        z, p, k = iirfilter(corners, wn, btype=btype, ftype='butter',
+                            output='zpk')
+        sos = zpk2sos(z, p, k)
+        while len(_SOS_CACHE) >= _SOS_CACHE_SIZE:
+            _SOS_CACHE.popitem(last=False)
+    _SOS_CACHE[key] = sos
+    return sos
+
+
+def _sosfilt_rt(trace, sos, rtmemory_list):
+    """
+    Apply second-order sections filter, carrying the filter delay values
+    (``zi``) across sequential packets in the given RtMemory object.
+
+    The filter state is kept in double precision regardless of the data type
+    of the processed trace.
+    """
+    if not rtmemory_list:
+        rtmemory_list = [RtMemory()]
+
+    sample = trace.data
+    if np.size(sample) < 1:
+        return sample
+
+    n_sections = sos.shape[0]
+    rtmemory = rtmemory_list[0]
+
+    # initialize memory object, filter starts at rest
+    if not rtmemory.initialized:
+        memory_size_input = 2 * n_sections
+        memory_size_output = 0
+        rtmemory.initialize(np.float64, memory_size_input,
+                            memory_size_output, 0, 0)
+
+    zi = rtmemory.input.reshape(n_sections, 2)
+    new_sample, zf = sosfilt(sos, sample, zi=zi)
+    rtmemory.input[:] = zf.ravel()
+
+    return new_sample
+
+
+def bandpass(trace, freqmin, freqmax, corners=4, rtmemory_list=None):
+    """
+    Apply causal Butterworth-Bandpass filter to data.
+
+    The filter state is carried over between sequential packets, so that the
+    output of the real time filter equals the output of
+    :func:`obspy.signal.filter.bandpass` (with ``zerophase=False``) applied to
+    the concatenated data.
+
+    :type trace: :class:`~obspy.core.trace.Trace`
+    :param trace:  :class:`~obspy.core.trace.Trace` object to append to this
+        RtTrace
+    :type freqmin: float
+    :param freqmin: Pass band low corner frequency.
+    :type freqmax: float
+    :param freqmax: Pass band high corner frequency.
+    :type corners: int, optional
+    :param corners: Filter corners / order (default is 4).
+    :type rtmemory_list: list of :class:`~obspy.realtime.rtmemory.RtMemory`,
+        optional
+    :param rtmemory_list: Persistent memory used by this process for specified
+        trace.
+    :rtype: NumPy :class:`numpy.ndarray`
+    :return: Processed trace data from appended Trace object.
+    """
+    if not isinstance(trace, Trace):
+        msg = "trace parameter must be an obspy.core.trace.Trace object."
+        raise ValueError(msg)
+
+    sos = _get_sos('bandpass', (freqmin, freqmax), trace.stats.sampling_rate,
+                   corners)
+    return _sosfilt_rt(trace, sos, rtmemory_list)
+
+
+def highpass(trace, freq, corners=4, rtmemory_list=None):
+    """
+    Apply causal Butterworth-Highpass filter to data.
+
+    The filter state is carried over between sequential packets, so that the
+    output of the real time filter equals the output of
+    :func:`obspy.signal.filter.highpass` (with ``zerophase=False``) applied to
+    the concatenated data.
+
+    :type trace: :class:`~obspy.core.trace.Trace`
+    :param trace:  :class:`~obspy.core.trace.Trace` object to append to this
+        RtTrace
+    :type freq: float
+    :param freq: Filter corner frequency.
+    :type corners: int, optional
+    :param corners: Filter corners / order (default is 4).
+    :type rtmemory_list: list of :class:`~obspy.realtime.rtmemory.RtMemory`,
+        optional
+    :param rtmemory_list: Persistent memory used by this process for specified
+        trace.
+    :rtype: NumPy :class:`numpy.ndarray`
+    :return: Processed trace data from appended Trace object.
+    """
+    if not isinstance(trace, Trace):
+        msg = "trace parameter must be an obspy.core.trace.Trace object."
+        raise ValueError(msg)
+
+    sos = _get_sos('highpass', (freq,), trace.stats.sampling_rate, corners)
+    return _sosfilt_rt(trace, sos, rtmemory_list)
+
+
+def lowpass(trace, freq, corners=4, rtmemory_list=None):
+    """
+    Apply causal Butterworth-Lowpass filter to data.
+
+    The filter state is carried over between sequential packets, so that the
+    output of the real time filter equals the output of
+    :func:`obspy.signal.filter.lowpass` (with ``zerophase=False``) applied to
+    the concatenated data.
+
+    :type trace: :class:`~obspy.core.trace.Trace`
+    :param trace:  :class:`~obspy.core.trace.Trace` object to append to this
+        RtTrace
+    :type freq: float
+    :param freq: Filter corner frequency.
+    :type corners: int, optional
+    :param corners: Filter corners / order (default is 4).
+    :type rtmemory_list: list of :class:`~obspy.realtime.rtmemory.RtMemory`,
+        optional
+    :param rtmemory_list: Persistent memory used by this process for specified
+        trace.
+    :rtype: NumPy :class:`numpy.ndarray`
+    :return: Processed trace data from appended Trace object.
+    """
+    if not isinstance(trace, Trace):
+        msg = "trace parameter must be an obspy.core.trace.Trace object."
+        raise ValueError(msg)
+
+    sos = _get_sos('lowpass', (freq,), trace.stats.sampling_rate, corners)
+    return _sosfilt_rt(trace, sos, rtmemory_list)
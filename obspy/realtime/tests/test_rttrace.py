@@ -12,7 +12,7 @@ import warnings
 
 import numpy as np
 
-from obspy import Trace
+from obspy import Stream, Trace
 from obspy.core.stream import read
 from obspy.realtime import RtTrace
 from obspy.realtime.rtmemory import RtMemory
@@ -146,6 +146,59 @@ class RtTraceTestCase(unittest.TestCase):
         # append with gap_overlap_check=True will raise a TypeError
         self.assertRaises(TypeError, rtr.append, tr2, gap_overlap_check=True)
 
+    def test_ringBuffer(self):
+        """
+        Ring buffer storage gives the same results as default storage.
+        """
+        tr = read()[0]
+        traces = tr / 20
+        rtr = RtTrace(max_length=7)
+        rtr_ring = RtTrace(max_length=7, ring_buffer=True)
+        for trace in traces:
+            rtr.append(trace, gap_overlap_check=True)
+            rtr_ring.append(trace, gap_overlap_check=True)
+            self.assertEqual(len(rtr_ring), len(rtr))
+            self.assertEqual(rtr_ring.stats.npts, rtr.stats.npts)
+            self.assertEqual(rtr_ring.stats.starttime, rtr.stats.starttime)
+            self.assertEqual(rtr_ring.stats.endtime, rtr.stats.endtime)
+            np.testing.assert_array_equal(rtr_ring.data, rtr.data)
+        self.assertEqual(len(rtr_ring), 700)
+        # buffer is allocated once with the maximum length
+        self.assertEqual(len(rtr_ring._buffer), 700)
+        # packets longer than the buffer
+        rtr_ring = RtTrace(max_length=2, ring_buffer=True)
+        for trace in tr / 3:
+            rtr_ring.append(trace, gap_overlap_check=True)
+        self.assertEqual(rtr_ring.stats.endtime, tr.stats.endtime)
+        np.testing.assert_array_equal(rtr_ring.data, tr.data[-200:])
+        # max_length is required
+        self.assertRaises(ValueError, RtTrace, ring_buffer=True)
+
+    def test_ringBufferGap(self):
+        """
+        Gaps in ring buffer mode are filled with the latest sample value.
+        """
+        rtr = RtTrace(max_length=10, ring_buffer=True)
+        tr = Trace(data=np.array([0, 1, 2]))
+        tr2 = Trace(data=np.array([5, 6]))
+        tr2.stats.starttime = tr.stats.starttime + 5
+        rtr.append(tr)
+        with warnings.catch_warnings(record=True):
+            warnings.simplefilter('ignore', UserWarning)
+            rtr.append(tr2)
+        np.testing.assert_array_equal(rtr.data, [0, 1, 2, 2, 2, 5, 6])
+        self.assertEqual(rtr.stats.starttime, tr.stats.starttime)
+        self.assertEqual(rtr.stats.endtime, tr2.stats.endtime)
+        # gap longer than the buffer
+        tr3 = Trace(data=np.array([7, 8]))
+        tr3.stats.starttime = tr2.stats.endtime + 10000
+        with warnings.catch_warnings(record=True):
+            warnings.simplefilter('ignore', UserWarning)
+            rtr.append(tr3)
+        np.testing.assert_array_equal(rtr.data, [6] * 8 + [7, 8])
+        self.assertEqual(rtr.stats.endtime, tr3.stats.endtime)
+        self.assertEqual(rtr.stats.starttime, tr3.stats.starttime - 8)
+
     def test_copy(self):
         """
         Testing copy of RtTrace object.
@@ -162,6 +215,43 @@ class RtTraceTestCase(unittest.TestCase):
         # register NumPy function call
         rtr.register_rt_process(np.square)
         rtr.copy()
+        # registered processes are kept by the original and the copy
+        self.assertEqual(len(rtr.processing), 3)
+        self.assertEqual(len(rtr.copy().processing), 3)
+        # copy on write, also within streams
+        rtr = RtTrace()
+        rtr.register_rt_process(np.square)
+        rtr.append(read()[0])
+        for new in (rtr.copy(copy_on_write=True),
+                    Stream([rtr]).copy(copy_on_write=True)[0]):
+            self.assertTrue(isinstance(new, RtTrace))
+            self.assertEqual(len(new.processing), 1)
+            self.assertTrue(np.may_share_memory(new.data, rtr.data))
+        # ring buffers are always copied, both traces can be appended to
+        tr = read()[0]
+        for npts in (500, 2500):
+            rtr = RtTrace(max_length=20, ring_buffer=True)
+            rtr.append(tr.slice(endtime=tr.stats.starttime + npts / 100.0))
+            new = rtr.copy(copy_on_write=True)
+            self.assertFalse(np.may_share_memory(new._buffer, rtr._buffer))
+            self.assertEqual(len(new._buffer), len(rtr._buffer))
+            expected = rtr.copy()
+            piece = tr.slice(rtr.stats.endtime + 0.01, rtr.stats.endtime + 1)
+            for rt in (rtr, new, expected):
+                rt.append(piece.copy())
+            np.testing.assert_array_equal(rtr.data, expected.data)
+            np.testing.assert_array_equal(new.data, expected.data)
+            self.assertEqual(new.stats.endtime, piece.stats.endtime)
+        # read-only data assigned to a ring buffer is not written to
+        rtr = RtTrace(max_length=20, ring_buffer=True)
+        rtr.append(tr.slice(endtime=tr.stats.starttime + 5))
+        data = rtr.data.copy()
+        data.flags.writeable = False
+        rtr.data = data
+        rtr.append(tr.slice(rtr.stats.endtime + 0.01, rtr.stats.endtime + 1))
+        self.assertTrue(rtr._buffer.flags.writeable)
+        self.assertFalse(np.may_share_memory(rtr._buffer, data))
+        self.assertEqual(len(rtr), 601)
 
     def test_appendNotFloat32(self):
         """
@@ -8,12 +8,14 @@ from future.builtins import *  # NOQA
 
 import os
 import unittest
+import warnings
 
 import numpy as np
 
 from obspy import read
 from obspy.core.stream import Stream
 from obspy.realtime import RtTrace, signal
+from obspy.signal.filter import bandpass, highpass, lowpass
 
 
 # some debug flags
@@ -249,6 +251,92 @@ class RealTimeSignalTestCase(unittest.TestCase):
         np.testing.assert_almost_equal(trace.data[1:],
                                        self.filt_trace_data[1:])
 
+    def test_bandpass(self):
+        """
+        Testing bandpass function against offline filtering.
+        """
+        trace = self.orig_trace.copy()
+        options = {'freqmin': 0.05, 'freqmax': 0.5, 'corners': 4}
+        # filtering manual
+        self.filt_trace_data = bandpass(
+            trace.data, df=trace.stats.sampling_rate, zerophase=False,
+            **options)
+        # filtering real time
+        process_list = [('bandpass', options)]
+        self._runRtProcess(process_list)
+        # check results
+        np.testing.assert_allclose(self.filt_trace_data, self.rt_trace.data,
+                                   rtol=1e-10, atol=1e-10)
+
+    def test_highpass(self):
+        """
+        Testing highpass function against offline filtering.
+        """
+        trace = self.orig_trace.copy()
+        options = {'freq': 0.1, 'corners': 2}
+        # filtering manual
+        self.filt_trace_data = highpass(
+            trace.data, df=trace.stats.sampling_rate, zerophase=False,
+            **options)
+        # filtering real time
+        process_list = [('highpass', options)]
+        self._runRtProcess(process_list)
+        # check results
+        np.testing.assert_allclose(self.filt_trace_data, self.rt_trace.data,
+                                   rtol=1e-10, atol=1e-10)
+
+    def test_lowpass(self):
+        """
+        Testing lowpass function against offline filtering, also using many
+        small packets.
+        """
+        trace = self.orig_trace.copy()
+        options = {'freq': 0.2, 'corners': 4}
+        # filtering manual
+        self.filt_trace_data = lowpass(
+            trace.data, df=trace.stats.sampling_rate, zerophase=False,
+            **options)
+        # filtering real time
+        process_list = [('lowpass', options)]
+        self._runRtProcess(process_list)
+        # check results
+        np.testing.assert_allclose(self.filt_trace_data, self.rt_trace.data,
+                                   rtol=1e-10, atol=1e-10)
+        # filtering real time in packets of 100 samples
+        rt_trace = RtTrace()
+        rt_trace.register_rt_process('lowpass', **options)
+        for i in range(0, len(trace), 100):
+            rt_trace.append(trace.slice(
+                trace.stats.starttime + i * trace.stats.delta,
+                trace.stats.starttime + (i + 99) * trace.stats.delta))
+        np.testing.assert_allclose(self.filt_trace_data, rt_trace.data,
+                                   rtol=1e-10, atol=1e-10)
+
+    def test_filterCache(self):
+        """
+        Designed filters are cached in a bounded cache and corner
+        frequencies above Nyquist are reported on every call.
+        """
+        signal._SOS_CACHE.clear()
+        for i in range(signal._SOS_CACHE_SIZE + 10):
+            signal._get_sos('lowpass', (0.1 + i * 0.01,), 10.0, 4)
+        self.assertEqual(len(signal._SOS_CACHE), signal._SOS_CACHE_SIZE)
+        sos = signal._get_sos('lowpass', (0.1 + i * 0.01,), 10.0, 4)
+        self.assertTrue(sos is signal._get_sos('lowpass', (0.1 + i * 0.01,),
+                                               10.0, 4))
+        for _i in range(2):
+            with warnings.catch_warnings(record=True) as w:
+                warnings.simplefilter("always")
+                try:
+                    signal._get_sos('lowpass', (6.0,), 10.0, 4)
+                except ValueError:
+                    # newer SciPy versions reject the Nyquist frequency
+                    pass
+            self.assertEqual(len(w), 1)
+            self.assertIn("above Nyquist", str(w[0].message))
+        self.assertRaises(ValueError, signal._get_sos, 'highpass', (6.0,),
+                          10.0, 4)
+
     def _runRtProcess(self, process_list, max_length=None):
         """
         Helper function to create a RtTrace, register all given process
@@ -23,6 +23,7 @@ from future.builtins import *  # NOQA
 
 import math
 import warnings
+from multiprocessing.pool import ThreadPool
 
 import numpy as np
 from scipy.integrate import cumtrapz
@@ -844,10 +845,88 @@ def dump(pow_map, apow_map, i):
     np.savez('apow_map_%d.npz' % i, apow_map)
 
 
+def _cross_spectral_matrix(ft, method):
+    """
+    Computes the cross-spectral matrix of all station pairs at once.
+
+    :type ft: :class:`numpy.ndarray`
+    :param ft: Fourier coefficients of the stations in the frequency band of
+        interest, shape ``(nstat, nf)``.
+    :type method: int
+    :param method: the method to use 0 == bf, 1 == capon
+    :return: Cross-spectral matrix of shape ``(nf, nstat, nstat)`` and
+        normalization of the absolute power for the beamformer.
+    """
+    # R[n, i, j] = ft[i, n] * conj(ft[j, n])
+    R = np.einsum('in,jn->nij', ft, ft.conj())
+    if method == 1:
+        R /= np.abs(R.sum(axis=0))
+    dpow = np.abs(np.einsum('nii->i', R)).sum() * ft.shape[0]
+    return R, dpow
+
+
+def _pinv_stacked(R, rcond=1e-6):
+    """
+    Moore-Penrose pseudo-inverse of a stack of matrices.
+
+    Equivalent to calling :func:`numpy.linalg.pinv` for every matrix
+    ``R[n, :, :]`` but uses one batched singular value decomposition.
+
+    :type R: :class:`numpy.ndarray`
+    :param R: Stack of matrices, shape ``(nf, nstat, nstat)``.
+    :type rcond: float
+    :param rcond: Cutoff for small singular values, relative to the largest
+        singular value of each matrix.
+    """
+    u, s, vh = np.linalg.svd(R)
+    cutoff = rcond * s.max(axis=-1)[:, np.newaxis]
+    large = s > cutoff
+    s_inv = np.zeros_like(s)
+    s_inv[large] = 1. / s[large]
+    # pinv = V * S^-1 * U^H
+    return np.einsum('nji,nj,nkj->nik', vh.conj(), s_inv, u.conj())
+
+
+def _array_processing_window(args):
+    """
+    Beamforming of a single sliding window, see
+    :func:`~obspy.signal.array_analysis.array_processing`.
+
+    Returns ``None`` if the window exceeds the data of the traces.
+    """
+    (data, offset, nsamp, nfft, nlow, nf, tap, steer, prewhiten, grdpts_x,
+     grdpts_y, method) = args
+    nstat = len(data)
+    ft = np.empty((nstat, nf), dtype=np.complex128)
+    try:
+        for i, dat in enumerate(data):
+            dat = dat[offset:offset + nsamp]
+            dat = (dat - dat.mean()) * tap
+            ft[i, :] = np.fft.rfft(dat, nfft)[nlow:nlow + nf]
+    except IndexError:
+        return None
+    relpow_map = np.zeros((grdpts_x, grdpts_y), dtype=np.float64)
+    abspow_map = np.zeros((grdpts_x, grdpts_y), dtype=np.float64)
+    # computing the covariances of the signal at different receivers
+    R, dpow = _cross_spectral_matrix(ft, method)
+    if method == 1:
+        # P(f) = 1/(e.H R(f)^-1 e)
+        R = _pinv_stacked(R, rcond=1e-6)
+    R = np.ascontiguousarray(R, np.complex128)
+
+    errcode = clibsignal.generalizedBeamformer(
+        relpow_map, abspow_map, steer, R, nstat, prewhiten,
+        grdpts_x, grdpts_y, nf, dpow, method)
+    if errcode != 0:
+        msg = 'generalizedBeamforming exited with error %d'
+        raise Exception(msg % errcode)
+    return relpow_map, abspow_map
+
+
 def array_processing(stream, win_len, win_frac, sll_x, slm_x, sll_y, slm_y,
                      sl_s, semb_thres, vel_thres, frqlow, frqhigh, stime,
                      etime, prewhiten, verbose=False, coordsys='lonlat',
-                     timestamp='mlabday', method=0, store=None):
+                     timestamp='mlabday', method=0, store=None, threads=1):
     """
     Method for Seismic-Array-Beamforming/FK-Analysis/Capon
 
@@ -899,11 +978,14 @@ def array_processing(stream, win_len, win_frac, sll_x, slm_x, sll_y, slm_y,
         second arguments and the iteration number as third argument. Useful for
         storing or plotting the map for each iteration. For this purpose the
         dump function of this module can be used.
+    :type threads: int
+    :param threads: Number of threads used to process the sliding windows in
+        parallel. Results are always returned in time order. Defaults to
+        ``1``.
     :return: :class:`numpy.ndarray` of timestamp, relative relpow, absolute
         relpow, backazimuth, slowness
     """
     res = []
-    eotr = True
 
     # check that sampling rates do not vary
     fs = stream[0].stats.sampling_rate
@@ -947,72 +1029,53 @@ def array_processing(stream, win_len, win_frac, sll_x, slm_x, sll_y, slm_y,
     steer = np.empty((nf, grdpts_x, grdpts_y, nstat), dtype=np.complex128)
     clibsignal.calcSteer(nstat, grdpts_x, grdpts_y, nf, nlow,
                          deltaf, time_shift_table, steer)
-    R = np.empty((nf, nstat, nstat), dtype=np.complex128)
-    ft = np.empty((nstat, nf), dtype=np.complex128)
     newstart = stime
     # 0.22 matches 0.2 of historical C bbfk.c
     tap = cosine_taper(nsamp, p=0.22)
+    data = [tr.data[spoint[i]:] for i, tr in enumerate(stream)]
+    # start times and sample offsets of all sliding windows
+    windows = []
     offset = 0
-    relpow_map = np.empty((grdpts_x, grdpts_y), dtype=np.float64)
-    abspow_map = np.empty((grdpts_x, grdpts_y), dtype=np.float64)
-    while eotr:
-        try:
-            for i, tr in enumerate(stream):
-                dat = tr.data[spoint[i] + offset:
-                              spoint[i] + offset + nsamp]
-                dat = (dat - dat.mean()) * tap
-                ft[i, :] = np.fft.rfft(dat, nfft)[nlow:nlow + nf]
-        except IndexError:
-            break
-        ft = np.ascontiguousarray(ft, np.complex128)
-        relpow_map.fill(0.)
-        abspow_map.fill(0.)
-        # computing the covariances of the signal at different receivers
-        dpow = 0.
-        for i in range(nstat):
-            for j in range(i, nstat):
-                R[:, i, j] = ft[i, :] * ft[j, :].conj()
-                if method == 1:
-                    R[:, i, j] /= np.abs(R[:, i, j].sum())
-                if i != j:
-                    R[:, j, i] = R[:, i, j].conjugate()
-                else:
-                    dpow += np.abs(R[:, i, j].sum())
-        dpow *= nstat
-        if method == 1:
-            # P(f) = 1/(e.H R(f)^-1 e)
-            for n in range(nf):
-                R[n, :, :] = np.linalg.pinv(R[n, :, :], rcond=1e-6)
-
-        errcode = clibsignal.generalizedBeamformer(
-            relpow_map, abspow_map, steer, R, nstat, prewhiten,
-            grdpts_x, grdpts_y, nf, dpow, method)
-        if errcode != 0:
-            msg = 'generalizedBeamforming exited with error %d'
-            raise Exception(msg % errcode)
-        ix, iy = np.unravel_index(relpow_map.argmax(), relpow_map.shape)
-        relpow, abspow = relpow_map[ix, iy], abspow_map[ix, iy]
-        if store is not None:
-            store(relpow_map, abspow_map, offset)
-        # here we compute baz, slow
-        slow_x = sll_x + ix * sl_s
-        slow_y = sll_y + iy * sl_s
-
-        slow = np.sqrt(slow_x ** 2 + slow_y ** 2)
-        if slow < 1e-8:
-            slow = 1e-8
-        azimut = 180 * math.atan2(slow_x, slow_y) / math.pi
-        baz = azimut % -360 + 180
-        if relpow > semb_thres and 1. / slow > vel_thres:
-            res.append(np.array([newstart.timestamp, relpow, abspow, baz,
-                                 slow]))
-            if verbose:
-                print(newstart, (newstart + (nsamp / fs)), res[-1][1:])
+    while True:
+        windows.append((newstart, offset))
         if (newstart + (nsamp + nstep) / fs) > etime:
-            eotr = False
+            break
         offset += nstep
-
         newstart += nstep / fs
+    jobs = ((data, offset, nsamp, nfft, nlow, nf, tap, steer, prewhiten,
+             grdpts_x, grdpts_y, method) for _, offset in windows)
+    if threads > 1:
+        pool = ThreadPool(threads)
+        results = pool.imap(_array_processing_window, jobs)
+    else:
+        pool = None
+        results = (_array_processing_window(job) for job in jobs)
+    try:
+        for (newstart, offset), result in zip(windows, results):
+            if result is None:
+                break
+            relpow_map, abspow_map = result
+            ix, iy = np.unravel_index(relpow_map.argmax(), relpow_map.shape)
+            relpow, abspow = relpow_map[ix, iy], abspow_map[ix, iy]
+            if store is not None:
+                store(relpow_map, abspow_map, offset)
+            # here we compute baz, slow
+            slow_x = sll_x + ix * sl_s
+            slow_y = sll_y + iy * sl_s
+
+            slow = np.sqrt(slow_x ** 2 + slow_y ** 2)
+            if slow < 1e-8:
+                slow = 1e-8
+            azimut = 180 * math.atan2(slow_x, slow_y) / math.pi
+            baz = azimut % -360 + 180
+            if relpow > semb_thres and 1. / slow > vel_thres:
+                res.append(np.array([newstart.timestamp, relpow, abspow, baz,
+                                     slow]))
+                if verbose:
+                    print(newstart, (newstart + (nsamp / fs)), res[-1][1:])
+    finally:
+        if pool is not None:
+            pool.terminate()
     res = np.array(res)
     if timestamp == 'julsec':
         pass
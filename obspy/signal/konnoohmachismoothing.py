@@ -23,8 +23,18 @@ from __future__ import (absolute_import, division, print_function,
 from future.builtins import *  # NOQA
 
 import warnings
+from collections import OrderedDict
 
 import numpy as np
+import scipy.sparse
+
+
+# maximum number of sparse smoothing matrices kept in the cache
+_SMOOTHING_MATRIX_CACHE_SIZE = 10
+# number of weights computed at once when building smoothing matrices, limits
+# the size of the temporary arrays
+_BLOCK_SIZE = 2 ** 20
+_SMOOTHING_MATRIX_CACHE = OrderedDict()
 
 
 def konno_ohmachi_smoothing_window(frequencies, center_frequency,
@@ -133,18 +143,165 @@ def calculate_smoothing_matrix(frequencies, bandwidth=40.0, normalize=False):
         scale. Set this parameter to True to normalize it on a normal scale.
         Default to False.
     """
-    # Create matrix to be filled with smoothing entries.
-    sm_matrix = np.empty((len(frequencies), len(frequencies)),
-                         frequencies.dtype)
-    for _i, freq in enumerate(frequencies):
-        sm_matrix[_i, :] = konno_ohmachi_smoothing_window(
-            frequencies, freq, bandwidth, normalize=normalize)
+    if frequencies.dtype != np.float32 and frequencies.dtype != np.float64:
+        msg = 'frequencies needs to have a dtype of float32/64.'
+        raise ValueError(msg)
+    # Same formulae as in konno_ohmachi_smoothing_window() with one row per
+    # center frequency. The windows are computed in place in blocks of rows,
+    # so the temporary arrays stay small compared to the matrix.
+    length = len(frequencies)
+    sm_matrix = np.empty((length, length), dtype=frequencies.dtype)
+    block = max(1, _BLOCK_SIZE // max(length, 1))
+    for start in range(0, length, block):
+        rows = sm_matrix[start:start + block]
+        center = frequencies[start:start + block, np.newaxis]
+        np.divide(frequencies[np.newaxis, :], center, out=rows)
+        np.log10(rows, out=rows)
+        rows *= bandwidth
+        window = np.sin(rows)
+        window /= rows
+        np.power(window, 4, out=rows)
+        rows[frequencies[np.newaxis, :] == center] = 1.0
+    sm_matrix[:, frequencies == 0.0] = 0.0
+    # A center frequency of zero results in a delta peak at zero.
+    zero = frequencies == 0.0
+    sm_matrix[zero, :] = 0.0
+    sm_matrix[np.ix_(zero, zero)] = 1.0
+    if normalize:
+        sm_matrix /= sm_matrix.sum(axis=1)[:, np.newaxis]
+    return sm_matrix
+
+
+def calculate_sparse_smoothing_matrix(frequencies, bandwidth=40.0,
+                                      normalize=False, tolerance=1e-2):
+    """
+    Calculates the Konno & Ohmachi smoothing matrix as a sparse banded
+    matrix.
+
+    Same as :func:`calculate_smoothing_matrix` but all weights below
+    ``tolerance`` are dropped. The Konno & Ohmachi window is bounded by
+    ``(b * log_10(f/f_c))^-4``, so only frequencies within
+    ``tolerance^(-1/4) / b`` decades of the center frequency are kept. The
+    matrix is built in blocks of rows and needs memory proportional to the
+    number of kept weights only, about 12 bytes per weight for float64.
+
+    The kept band has a constant width on a logarithmic scale, so the number
+    of kept weights grows with the square of the number of frequencies for
+    linearly spaced frequencies (e.g. FFT frequencies). The default
+    tolerance of ``1e-2`` essentially keeps the main lobe of every window,
+    which is about 17 % of all weights for FFT frequencies and a quarter of
+    the memory of the dense matrix. The relative error of smoothed spectra
+    then stays below about 1 % (typically 0.01 % to 0.3 %). A tolerance of
+    ``1e-3`` keeps about 28 % of the weights with errors below about
+    0.1 %, ``1e-6`` keeps more than 80 % of the weights and needs more memory
+    than the dense matrix.
+
+    Any spectrum with the same frequency bins as this matrix can later be
+    smoothed with::
+
+        smoothed_spectrum = smoothing_matrix.T.dot(spectrum)
+
+    which also works for many spectra, one per column.
+
+    :type frequencies: :class:`numpy.ndarray` (float32 or float64)
+    :param frequencies:
+        The input frequencies.
+    :type bandwidth: float
+    :param bandwidth:
+        Determines the width of the smoothing peak. Lower values result in a
+        broader peak. Must be greater than 0. Defaults to 40.
+    :type normalize: bool, optional
+    :param normalize:
+        The Konno-Ohmachi smoothing window is normalized on a logarithmic
+        scale. Set this parameter to True to normalize it on a normal scale.
+        The remaining weights are normalized after dropping small weights.
+        Default to False.
+    :type tolerance: float, optional
+    :param tolerance:
+        Weights smaller than this value (relative to the peak of the window)
+        are dropped. Defaults to ``1e-2``.
+    :rtype: :class:`scipy.sparse.csr_matrix`
+    """
+    if frequencies.dtype != np.float32 and frequencies.dtype != np.float64:
+        msg = 'frequencies needs to have a dtype of float32/64.'
+        raise ValueError(msg)
+    if not tolerance > 0:
+        msg = 'tolerance needs to be greater than 0.'
+        raise ValueError(msg)
+    length = len(frequencies)
+    # Work on sorted frequencies, so the kept weights of every center
+    # frequency are one contiguous band.
+    order = np.argsort(frequencies, kind='mergesort')
+    sorted_freqs = frequencies[order]
+    temp = np.geterr()
+    np.seterr(all='ignore')
+    log_freqs = np.log10(np.require(sorted_freqs, np.float64))
+    half_width = tolerance ** -0.25 / bandwidth
+    band_start = np.searchsorted(log_freqs, log_freqs - half_width, 'left')
+    band_end = np.searchsorted(log_freqs, log_freqs + half_width, 'right')
+    counts = band_end - band_start
+    indptr = np.zeros(length + 1, dtype=np.int64)
+    np.cumsum(counts, out=indptr[1:])
+    index_dtype = np.int32 if indptr[-1] < 2 ** 31 else np.int64
+    indptr = indptr.astype(index_dtype)
+    # The CSR arrays are filled directly in blocks of rows of the matrix of
+    # the sorted frequencies, so the temporary arrays stay small.
+    indices = np.empty(indptr[-1], dtype=index_dtype)
+    data = np.empty(indptr[-1], dtype=frequencies.dtype)
+    block = max(1, _BLOCK_SIZE // max(counts.max(), 1)) if length else 1
+    for start in range(0, length, block):
+        stop = min(start + block, length)
+        first, last = indptr[start], indptr[stop]
+        rows = np.repeat(np.arange(stop - start), counts[start:stop])
+        cols = np.arange(first, last, dtype=index_dtype) - np.repeat(
+            indptr[start:stop] - band_start[start:stop], counts[start:stop])
+        # Same formulae as in konno_ohmachi_smoothing_window().
+        center = sorted_freqs[rows + start]
+        freqs = sorted_freqs[cols]
+        weights = bandwidth * np.log10(freqs / center)
+        weights[...] = (np.sin(weights) / weights) ** 4
+        weights[freqs == center] = 1.0
+        weights[(freqs == 0.0) & (center != 0.0)] = 0.0
+        if normalize:
+            weights /= np.bincount(rows, weights=weights,
+                                   minlength=stop - start)[rows]
+        indices[first:last] = cols
+        data[first:last] = weights
+    np.seterr(**temp)
+    sm_matrix = scipy.sparse.csr_matrix((data, indices, indptr),
+                                        shape=(length, length))
+    if np.any(order != np.arange(length)):
+        # back to the order of the given frequencies
+        inverse = np.argsort(order, kind='mergesort')
+        sm_matrix = sm_matrix[inverse][:, inverse]
+    return sm_matrix
+
+
+def _get_sparse_smoothing_matrix(frequencies, bandwidth, normalize,
+                                 tolerance):
+    """
+    Returns a cached sparse smoothing matrix for the given frequency grid.
+
+    Matrices are cached by frequency grid, bandwidth, normalize and
+    tolerance and the least recently used matrix is discarded if more than
+    ``_SMOOTHING_MATRIX_CACHE_SIZE`` matrices are cached.
+    """
+    key = (frequencies.dtype.str, frequencies.tostring(), float(bandwidth),
+           bool(normalize), float(tolerance))
+    try:
+        sm_matrix = _SMOOTHING_MATRIX_CACHE.pop(key)
+    except KeyError:
+        sm_matrix = calculate_sparse_smoothing_matrix(
+            frequencies, bandwidth, normalize=normalize, tolerance=tolerance)
+        while len(_SMOOTHING_MATRIX_CACHE) >= _SMOOTHING_MATRIX_CACHE_SIZE:
+            _SMOOTHING_MATRIX_CACHE.popitem(last=False)
+    _SMOOTHING_MATRIX_CACHE[key] = sm_matrix
     return sm_matrix
 
 
 def konno_ohmachi_smoothing(spectra, frequencies, bandwidth=40, count=1,
                             enforce_no_matrix=False, max_memory_usage=512,
-                            normalize=False):
+                            normalize=False, tolerance=None):
     """
     Smooths a matrix containing one spectra per row with the Konno-Ohmachi
     smoothing window.
@@ -154,6 +311,11 @@ def konno_ohmachi_smoothing(spectra, frequencies, bandwidth=40, count=1,
 
     This method first will estimate the memory usage and then either use a fast
     and memory intensive method or a slow one with a better memory usage.
+    If ``tolerance`` is given, a sparse smoothing matrix that drops all
+    weights below ``tolerance`` is used instead (see
+    :func:`calculate_sparse_smoothing_matrix`). It is cached for the
+    frequency grid, so smoothing many spectra on the same grid in subsequent
+    calls only builds it once.
 
     :type spectra: :class:`numpy.ndarray` (float32 or float64)
     :param spectra:
@@ -186,6 +348,12 @@ def konno_ohmachi_smoothing(spectra, frequencies, bandwidth=40, count=1,
         The Konno-Ohmachi smoothing window is normalized on a logarithmic
         scale. Set this parameter to True to normalize it on a normal scale.
         Default to False.
+    :type tolerance: float, optional
+    :param tolerance:
+        If given, use a cached sparse smoothing matrix dropping all weights
+        smaller than this value. Memory usage then only depends on the number
+        of kept weights and ``enforce_no_matrix`` and ``max_memory_usage``
+        are ignored. Defaults to None.
     """
     if (frequencies.dtype != np.float32 and frequencies.dtype != np.float64) \
        or (spectra.dtype != np.float32 and spectra.dtype != np.float64):
@@ -198,6 +366,14 @@ def konno_ohmachi_smoothing(spectra, frequencies, bandwidth=40, count=1,
         msg = 'frequencies and spectra should have the same dtype. It ' + \
               'will be changed to np.float64 for both.'
         warnings.warn(msg)
+    if tolerance is not None:
+        smoothing_matrix = _get_sparse_smoothing_matrix(
+            frequencies, bandwidth, normalize, tolerance)
+        # Same as np.dot(spectra, smoothing_matrix) for a dense matrix.
+        new_spec = spectra.T
+        for _i in range(count):
+            new_spec = smoothing_matrix.T.dot(new_spec)
+        return np.require(new_spec.T, spectra.dtype, requirements=['C'])
     # Check the dtype to get the correct size.
     if frequencies.dtype == np.float32:
         size = 4.0
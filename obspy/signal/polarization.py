@@ -20,6 +20,7 @@ import scipy.odr
 from scipy import signal
 from scipy.optimize import fminbound
 
+from obspy.core import UTCDateTime
 from obspy.signal.invsim import cosine_taper
 
 
@@ -125,6 +126,81 @@ def eigval(datax, datay, dataz, fk, normf=1.0):
     return leigenv1, leigenv2, leigenv3, rect, plan, dleigenv, drect, dplan
 
 
+def _sliding_windows(data, nsamp, nstep, nwin):
+    """
+    Returns a read-only 2-D view with ``nwin`` sliding windows of length
+    ``nsamp`` and step ``nstep`` on the given 1-D array (no data is copied).
+    """
+    data = np.ascontiguousarray(data)
+    nwin = max(min(nwin, (len(data) - nsamp) // nstep + 1), 0)
+    stride = data.strides[0]
+    windows = np.lib.stride_tricks.as_strided(
+        data, shape=(nwin, nsamp), strides=(nstep * stride, stride))
+    windows.flags.writeable = False
+    return windows
+
+
+def _flinn_windows(Z, N, E, noise_thres=0):
+    """
+    Vectorized :func:`flinn` for many windows at once.
+
+    The covariance matrices of all windows are computed at once and
+    decomposed with a single batched call to :func:`numpy.linalg.eigh`.
+
+    :param Z: Windowed data of Z component, shape ``(nwin, nsamp)``.
+    :type Z: :class:`~numpy.ndarray`
+    :param N: Windowed data of N component, shape ``(nwin, nsamp)``.
+    :type N: :class:`~numpy.ndarray`
+    :param E: Windowed data of E component, shape ``(nwin, nsamp)``.
+    :type E: :class:`~numpy.ndarray`
+    :param noise_tresh: Variance of the noise sphere; data points are excluded
+        when falling within the sphere of radius sqrt(noise_thres),
+        default is set to 0.
+    :type noise_thres: float
+    :returns: Arrays of azimuth, incidence, rectilinearity, and planarity
+        for all windows.
+    """
+    if not Z.shape == N.shape == E.shape:
+        msg = "Windowed data of all components must have the same shape"
+        raise ValueError(msg)
+    if not Z.size:
+        msg = "No windows with data to analyze"
+        raise ValueError(msg)
+    # X[k, c, :] with components East, North, Z of window k
+    X = np.empty((Z.shape[0], 3, Z.shape[1]), dtype=np.float64)
+    X[:, 0, :] = E
+    X[:, 1, :] = N
+    X[:, 2, :] = Z
+    # weights exclude data points inside the noise sphere
+    w = ((X ** 2).sum(axis=1) > noise_thres).astype(np.float64)
+    count = w.sum(axis=1)
+    mean = np.einsum('kn,kcn->kc', w, X) / count[:, np.newaxis]
+    X -= mean[:, :, np.newaxis]
+    X *= w[:, np.newaxis, :]
+    covmat = np.einsum('kin,kjn->kij', X, X) / \
+        (count - 1.0)[:, np.newaxis, np.newaxis]
+    # eigh sorts ascending, reverse to largest eigenvalue first like svd
+    eigenval, eigvec = np.linalg.eigh(covmat)
+    eigenval = np.clip(eigenval[:, ::-1], 0.0, None)
+    eigvec = eigvec[:, :, ::-1]
+    # Rectilinearity defined after Montalbetti & Kanasewich, 1970
+    rect = 1.0 - np.sqrt(eigenval[:, 1] / eigenval[:, 0])
+    # Planarity defined after [Jurkevics1988]_
+    plan = 1.0 - (2.0 * eigenval[:, 2] / (eigenval[:, 1] + eigenval[:, 0]))
+    azimuth = np.degrees(np.arctan2(eigvec[:, 0, 0], eigvec[:, 1, 0]))
+    eve = np.sqrt(eigvec[:, 0, 0] ** 2 + eigvec[:, 1, 0] ** 2)
+    incidence = np.degrees(np.arctan2(eve, eigvec[:, 2, 0]))
+    azimuth[azimuth < 0.0] += 360.0
+    incidence[incidence < 0.0] += 180.0
+    flip = incidence > 90.0
+    incidence[flip] = 180.0 - incidence[flip]
+    azimuth[flip & (azimuth > 180.0)] -= 180.0
+    azimuth[flip & (azimuth <= 180.0)] += 180.0
+    azimuth[azimuth > 180.0] -= 180.0
+
+    return azimuth, incidence, rect, plan
+
+
 def flinn(stream, noise_thres=0):
     """
     Computes the azimuth, incidence, rectilinearity and planarity after the
@@ -138,39 +214,10 @@ def flinn(stream, noise_thres=0):
     :type noise_thres: float
     :returns:  azimuth, incidence, rectilinearity, and planarity
     """
-    mask = (stream[0][:] ** 2 + stream[1][:] ** 2 + stream[2][:] ** 2
-            ) > noise_thres
-    X = np.zeros((3, mask.sum()), dtype=np.float64)
-    # East
-    X[0, :] = stream[2][mask]
-    # North
-    X[1, :] = stream[1][mask]
-    # Z
-    X[2, :] = stream[0][mask]
-
-    covmat = np.cov(X)
-    eigvec, eigenval, v = np.linalg.svd(covmat)
-    # Rectilinearity defined after Montalbetti & Kanasewich, 1970
-    rect = 1.0 - np.sqrt(eigenval[1] / eigenval[0])
-    # Planarity defined after [Jurkevics1988]_
-    plan = 1.0 - (2.0 * eigenval[2] / (eigenval[1] + eigenval[0]))
-    azimuth = math.degrees(math.atan2(eigvec[0][0], eigvec[1][0]))
-    eve = np.sqrt(eigvec[0][0] ** 2 + eigvec[1][0] ** 2)
-    incidence = math.degrees(math.atan2(eve, eigvec[2][0]))
-    if azimuth < 0.0:
-        azimuth = 360.0 + azimuth
-    if incidence < 0.0:
-        incidence += 180.0
-    if incidence > 90.0:
-        incidence = 180.0 - incidence
-        if azimuth > 180.0:
-            azimuth -= 180.0
-        else:
-            azimuth += 180.0
-    if azimuth > 180.0:
-        azimuth -= 180.0
-
-    return azimuth, incidence, rect, plan
+    Z, N, E = [np.atleast_2d(np.asarray(dat, dtype=np.float64))
+               for dat in stream[:3]]
+    azimuth, incidence, rect, plan = _flinn_windows(Z, N, E, noise_thres)
+    return azimuth[0], incidence[0], rect[0], plan[0]
 
 
 def instantaneous_frequency(data, sampling_rate):
@@ -493,48 +540,61 @@ def polarization_analysis(stream, win_len, win_frac, frqlow, frqhigh, stime,
     else:
         nsamp = int(win_len * fs)
         nstep = int(nsamp * win_frac)
-        newstart = stime
+        if nsamp < 2 or nstep < 1:
+            msg = "Window length or step too short for the sampling rate"
+            raise ValueError(msg)
         tap = cosine_taper(nsamp, p=0.22)
-        offset = 0
-        while (newstart + (nsamp + nstep) / fs) < etime:
-            try:
-                data = []
-                Z = []
-                N = []
-                E = []
-                for i, tr in enumerate(stream):
-                    dat = tr.data[spoint[i] + offset:
-                                  spoint[i] + offset + nsamp]
-                    dat = (dat - dat.mean()) * tap
-                    if "Z" in tr.stats.channel:
-                        Z = dat.copy()
-                    if "N" in tr.stats.channel:
-                        N = dat.copy()
-                    if "E" in tr.stats.channel:
-                        E = dat.copy()
-
-                data.append(Z)
-                data.append(N)
-                data.append(E)
-            except IndexError:
-                break
-
-            # we plot against the centre of the sliding window
-            if method.lower() == "pm":
-                azimuth, incidence, error_az, error_inc = \
-                    particle_motion_odr(data, var_noise)
-                res.append(np.array([newstart.timestamp + float(nstep) / fs,
-                           azimuth, incidence, error_az, error_inc]))
-            if method.lower() == "flinn":
-                azimuth, incidence, reclin, plan = flinn(data, var_noise)
-                res.append(np.array([newstart.timestamp + float(nstep) / fs,
-                                    azimuth, incidence, reclin, plan]))
-
-            if verbose:
-                print(newstart, newstart + nsamp / fs, res[-1][1:])
-            offset += nstep
-
+        # start times of all sliding windows, compared with the precision of
+        # UTCDateTime but without creating UTCDateTime objects
+        precision = stime.precision
+        end = np.round(etime.timestamp, precision)
+        newstart = stime.timestamp
+        starts = []
+        while np.round(newstart + (nsamp + nstep) / fs, precision) < end:
+            starts.append(newstart)
             newstart += float(nstep) / fs
+        # views on the data of all windows, no data is copied
+        Z = N = E = None
+        for i, tr in enumerate(stream):
+            windows = _sliding_windows(tr.data[spoint[i]:], nsamp, nstep,
+                                       len(starts))
+            if "Z" in tr.stats.channel:
+                Z = windows
+            if "N" in tr.stats.channel:
+                N = windows
+            if "E" in tr.stats.channel:
+                E = windows
+        if Z is None or N is None or E is None:
+            msg = "Stream must contain Z, N and E components"
+            raise ValueError(msg)
+        nwin = min(len(Z), len(N), len(E))
+        if not nwin:
+            msg = "Time span too short for a single window"
+            raise ValueError(msg)
+        starts = starts[:nwin]
+        # demean and taper all windows at once
+        data = []
+        for windows in (Z, N, E):
+            windows = windows[:nwin]
+            data.append((windows - windows.mean(axis=1)[:, np.newaxis]) * tap)
+        # we plot against the centre of the sliding window
+        timestamps = np.array(starts) + float(nstep) / fs
+        if method.lower() == "pm":
+            for k in range(nwin):
+                azimuth, incidence, error_az, error_inc = \
+                    particle_motion_odr([dat[k] for dat in data], var_noise)
+                res.append(np.array([timestamps[k], azimuth, incidence,
+                                     error_az, error_inc]))
+        elif method.lower() == "flinn":
+            azimuth, incidence, reclin, plan = _flinn_windows(
+                data[0], data[1], data[2], var_noise)
+            res = np.column_stack(
+                [timestamps, azimuth, incidence, reclin, plan])
+
+        if verbose:
+            for k, t in enumerate(starts):
+                print(UTCDateTime(t), UTCDateTime(t + nsamp / fs),
+                      res[k][1:])
 
     res = np.array(res)
 
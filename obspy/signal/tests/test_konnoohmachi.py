@@ -12,9 +12,10 @@ import warnings
 
 import numpy as np
 
-from obspy.signal.konnoohmachismoothing import (calculate_smoothing_matrix,
-                                                konno_ohmachi_smoothing_window,
-                                                konno_ohmachi_smoothing)
+from obspy.signal import konnoohmachismoothing
+from obspy.signal.konnoohmachismoothing import (
+    calculate_smoothing_matrix, calculate_sparse_smoothing_matrix,
+    konno_ohmachi_smoothing_window, konno_ohmachi_smoothing)
 
 
 class KonnoOhmachiTestCase(unittest.TestCase):
@@ -108,8 +109,93 @@ class KonnoOhmachiTestCase(unittest.TestCase):
             # Should not be normalized. Test only for larger frequencies
             # because smaller ones have a smaller window.
             self.assertAlmostEqual(matrix[_i].sum(), 1.0, 5)
+        # Wrong dtypes raise.
+        self.assertRaises(ValueError, calculate_smoothing_matrix,
+                          np.arange(10, dtype=np.int32))
         np.seterr(**temp)
 
+    def test_sparseSmoothingMatrix(self):
+        """
+        Tests the sparse smoothing matrix against the dense one.
+        """
+        temp = np.geterr()
+        np.seterr(all='ignore')
+        # unsorted frequencies including zero
+        frequencies = np.array([0.0, 10.0, 1.0, 2.0, 25.0, 50.0, 100.0, 0.5],
+                               dtype=np.float64)
+        for normalize in (False, True):
+            dense = calculate_smoothing_matrix(frequencies, 20.0,
+                                               normalize=normalize)
+            sparse = calculate_sparse_smoothing_matrix(
+                frequencies, 20.0, normalize=normalize, tolerance=1e-30)
+            self.assertEqual(sparse.dtype, np.float64)
+            np.testing.assert_allclose(sparse.toarray(), dense, rtol=1e-12)
+        # small weights are dropped
+        frequencies = np.linspace(0.0, 50.0, 2001)
+        dense = calculate_smoothing_matrix(frequencies)
+        sparse = calculate_sparse_smoothing_matrix(frequencies,
+                                                   tolerance=1e-4)
+        self.assertLess(sparse.nnz, dense.size // 2)
+        self.assertLess(np.abs(sparse.toarray() - dense).max(), 1e-4)
+        # the default tolerance keeps about the main lobes of FFT grids
+        spectrum = np.abs(np.fft.rfft(np.random.RandomState(0).randn(4000)))
+        sparse = calculate_sparse_smoothing_matrix(frequencies)
+        self.assertEqual(sparse.indices.dtype, np.int32)
+        self.assertLess(sparse.nnz, dense.size // 5)
+        expected = spectrum.dot(dense)
+        np.testing.assert_allclose(sparse.T.dot(spectrum)[1:], expected[1:],
+                                   rtol=2e-2)
+        # built in several blocks of rows
+        block_size = konnoohmachismoothing._BLOCK_SIZE
+        konnoohmachismoothing._BLOCK_SIZE = 1000
+        try:
+            for normalize in (False, True):
+                np.testing.assert_array_equal(
+                    calculate_smoothing_matrix(frequencies,
+                                               normalize=normalize),
+                    dense if not normalize else calculate_smoothing_matrix(
+                        frequencies, normalize=True))
+                blocks = calculate_sparse_smoothing_matrix(
+                    frequencies[::-1], normalize=normalize, tolerance=1e-4)
+                np.testing.assert_allclose(
+                    blocks.toarray()[::-1, ::-1],
+                    calculate_sparse_smoothing_matrix(
+                        frequencies, normalize=normalize,
+                        tolerance=1e-4).toarray(), rtol=1e-12)
+        finally:
+            konnoohmachismoothing._BLOCK_SIZE = block_size
+        np.seterr(**temp)
+
+    def test_konno_ohmachi_smoothing_sparse(self):
+        """
+        Tests smoothing with the cached sparse smoothing matrix.
+        """
+        np.random.seed(1111)
+        spectra = np.random.ranf((5, 200)) * 50
+        frequencies = np.logspace(-3.0, 2.0, 200)
+        konnoohmachismoothing._SMOOTHING_MATRIX_CACHE.clear()
+        for normalize in (False, True):
+            smoothed_1 = konno_ohmachi_smoothing(
+                spectra, frequencies, count=2, normalize=normalize)
+            smoothed_2 = konno_ohmachi_smoothing(
+                spectra, frequencies, count=2, normalize=normalize,
+                tolerance=1e-12)
+            self.assertEqual(smoothed_2.shape, spectra.shape)
+            np.testing.assert_allclose(smoothed_1, smoothed_2, rtol=1e-8)
+            # single spectrum
+            smoothed_3 = konno_ohmachi_smoothing(
+                spectra[0], frequencies, count=2, normalize=normalize,
+                tolerance=1e-12)
+            np.testing.assert_allclose(smoothed_3, smoothed_2[0])
+        # one matrix per normalization is cached
+        cache = konnoohmachismoothing._SMOOTHING_MATRIX_CACHE
+        self.assertEqual(len(cache), 2)
+        matrix = list(cache.values())[-1]
+        konno_ohmachi_smoothing(spectra, frequencies, normalize=True,
+                                tolerance=1e-12)
+        self.assertEqual(len(cache), 2)
+        self.assertTrue(list(cache.values())[-1] is matrix)
+
     def test_konno_ohmachi_smoothing(self):
         """
         Tests the actual smoothing matrix.
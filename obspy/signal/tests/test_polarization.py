@@ -176,6 +176,94 @@ class PolarizationTestCase(unittest.TestCase):
         self.assertTrue(np.allclose(out["timestamp"] - out["timestamp"][0],
                                     np.arange(0, 92, 1)))
 
+    def test_polarization_invalid_input(self):
+        """
+        Missing components and time spans without a single window raise a
+        ValueError.
+        """
+        st = _create_test_data()
+        t = st[0].stats.starttime
+        e = st[0].stats.endtime
+        kwargs = dict(win_len=10.0, win_frac=0.1, frqlow=1.0, frqhigh=5.0)
+        for method in ("pm", "flinn"):
+            kwargs["method"] = method
+            self.assertRaises(ValueError, polarization.polarization_analysis,
+                              st[:2], stime=t, etime=e, **kwargs)
+            self.assertRaises(ValueError, polarization.polarization_analysis,
+                              st, stime=t, etime=t + 5, **kwargs)
+            self.assertRaises(ValueError, polarization.polarization_analysis,
+                              st, stime=t, etime=e, win_len=0.0, win_frac=0.1,
+                              frqlow=1.0, frqhigh=5.0, method=method)
+        empty = np.empty((0, 10))
+        self.assertRaises(ValueError, polarization._flinn_windows,
+                          empty, empty, empty)
+        self.assertRaises(ValueError, polarization._flinn_windows,
+                          np.ones((2, 10)), np.ones((2, 10)), np.ones((1, 10)))
+
+    def test_flinn_windows(self):
+        """
+        Vectorized Flinn analysis of many windows is consistent with
+        computing each window separately.
+        """
+        np.random.seed(815)
+        nwin, nsamp = 50, 200
+        Z = np.random.randn(nwin, nsamp)
+        N = 0.5 * Z + np.random.randn(nwin, nsamp)
+        E = -0.3 * Z + 0.2 * np.random.randn(nwin, nsamp)
+
+        def flinn_svd(z, n, e, noise_thres):
+            # reference: single window using np.cov and svd
+            mask = (z ** 2 + n ** 2 + e ** 2) > noise_thres
+            covmat = np.cov(np.array([e[mask], n[mask], z[mask]]))
+            eigvec, eigenval, _ = np.linalg.svd(covmat)
+            rect = 1.0 - np.sqrt(eigenval[1] / eigenval[0])
+            plan = 1.0 - (2.0 * eigenval[2] / (eigenval[1] + eigenval[0]))
+            azimuth = np.degrees(np.arctan2(eigvec[0][0], eigvec[1][0]))
+            eve = np.sqrt(eigvec[0][0] ** 2 + eigvec[1][0] ** 2)
+            incidence = np.degrees(np.arctan2(eve, eigvec[2][0]))
+            if azimuth < 0.0:
+                azimuth = 360.0 + azimuth
+            if incidence < 0.0:
+                incidence += 180.0
+            if incidence > 90.0:
+                incidence = 180.0 - incidence
+                if azimuth > 180.0:
+                    azimuth -= 180.0
+                else:
+                    azimuth += 180.0
+            if azimuth > 180.0:
+                azimuth -= 180.0
+            return azimuth, incidence, rect, plan
+
+        for noise_thres in (0.0, 0.5):
+            got = polarization._flinn_windows(Z, N, E, noise_thres)
+            for k in range(nwin):
+                expected = flinn_svd(Z[k], N[k], E[k], noise_thres)
+                self.assertEqual(
+                    polarization.flinn([Z[k], N[k], E[k]], noise_thres),
+                    tuple(x[k] for x in got))
+                np.testing.assert_allclose([x[k] for x in got], expected,
+                                           rtol=1e-10, atol=1e-10)
+
+    def test_sliding_windows(self):
+        """
+        Windows are computed as read-only strided views on the data.
+        """
+        data = np.random.RandomState(815).randn(1000)
+        windows = polarization._sliding_windows(data, 100, 25, 1000)
+        self.assertEqual(windows.shape, (37, 100))
+        np.testing.assert_array_equal(windows[3], data[75:175])
+        np.testing.assert_array_equal(windows[-1], data[900:1000])
+        self.assertTrue(np.may_share_memory(windows, data))
+        self.assertFalse(windows.flags.writeable)
+        # the number of windows is limited by nwin and the data length
+        self.assertEqual(
+            polarization._sliding_windows(data, 100, 25, 10).shape,
+            (10, 100))
+        self.assertEqual(
+            polarization._sliding_windows(data[:50], 100, 25, 10).shape,
+            (0, 100))
+
     def test_polarization_vidale(self):
         st = _create_test_data()
         t = st[0].stats.starttime
@@ -22,7 +22,7 @@ class SonicTestCase(unittest.TestCase):
     Test fk analysis, main function is sonic() in array_analysis.py
     """
 
-    def arrayProcessing(self, prewhiten, method):
+    def arrayProcessing(self, prewhiten, method, threads=1):
         np.random.seed(2348)
 
         geometry = np.array([[0.0, 0.0, 0.0],
@@ -89,7 +89,7 @@ class SonicTestCase(unittest.TestCase):
         args = (st, win_len, step_frac, sll_x, slm_x, sll_y, slm_y, sl_s,
                 semb_thres, vel_thres, frqlow, frqhigh, stime, etime)
         kwargs = dict(prewhiten=prewhiten, coordsys='xy', verbose=False,
-                      method=method)
+                      method=method, threads=threads)
         out = array_processing(*args, **kwargs)
         if False:  # 1 for debugging
             print('\n', out[:, 1:])
@@ -149,6 +149,17 @@ class SonicTestCase(unittest.TestCase):
         # XXX relative tolerance should be lower!
         self.assertTrue(np.allclose(ref, out[:, 1:], rtol=4e-5))
 
+    def test_sonicThreads(self):
+        """
+        Processing the sliding windows in parallel gives the same results in
+        the same order.
+        """
+        for method in (0, 1):
+            out = self.arrayProcessing(prewhiten=0, method=method)
+            out_threads = self.arrayProcessing(prewhiten=0, method=method,
+                                               threads=4)
+            np.testing.assert_array_equal(out, out_threads)
+
     def test_getSpoint(self):
         stime = UTCDateTime(1970, 1, 1, 0, 0)
         etime = UTCDateTime(1970, 1, 1, 0, 0) + 10
@@ -345,6 +345,7 @@ import os
 # Convenience imports.
 from .tau import TauPyModel  # NOQA
 from .taup import getTravelTimes, travelTimePlot  # NOQA
+from .travel_time_table import TravelTimeTable  # NOQA
 
 # Internal imports.
 from .taup_create import get_builtin_models as _get_builtin_models
@@ -8,7 +8,7 @@ from __future__ import (absolute_import, division, print_function,
 from future.builtins import *  # NOQA
 from future.utils import native_str
 
-from collections import namedtuple
+from collections import OrderedDict, namedtuple
 
 import numpy as np
 
@@ -91,6 +91,99 @@ SplitLayerInfo = namedtuple(
 )
 
 
+CacheInfo = namedtuple(
+    'CacheInfo',
+    ['hits', 'misses', 'maxsize', 'currsize']
+)
+
+
+class LRUCache(object):
+    """
+    Bounded least recently used cache with hit and miss statistics.
+
+    :param maxsize: Maximum number of entries. A size of 0 disables the
+        cache.
+    :type maxsize: int
+    :param on_evict: Optional function called with key and value of every
+        entry dropped or replaced by the cache.
+    :type on_evict: function
+    """
+    def __init__(self, maxsize=128, on_evict=None):
+        self.maxsize = maxsize
+        self.on_evict = on_evict
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get(self, key):
+        """
+        Return the value stored for key or ``None`` and count the lookup.
+        """
+        try:
+            value = self._data.pop(key)
+        except KeyError:
+            self.misses += 1
+            return None
+        # reinsert as most recently used
+        self._data[key] = value
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        """
+        Store a value, dropping the least recently used entry if full.
+        """
+        if self.maxsize <= 0:
+            return
+        old = self._data.pop(key, None)
+        self._data[key] = value
+        if old is not None and old is not value:
+            self._evicted(key, old)
+        while len(self._data) > self.maxsize:
+            self._evicted(*self._data.popitem(last=False))
+
+    def discard(self, key):
+        """
+        Remove the entry stored for key, if any.
+        """
+        self._data.pop(key, None)
+
+    def keys(self):
+        """
+        Return a list of all keys, least recently used first.
+        """
+        return list(self._data)
+
+    def clear(self):
+        """
+        Remove all entries and reset the statistics.
+        """
+        items = list(self._data.items())
+        self._data.clear()
+        self.hits = 0
+        self.misses = 0
+        for key, value in items:
+            self._evicted(key, value)
+
+    def _evicted(self, key, value):
+        if self.on_evict is not None:
+            self.on_evict(key, value)
+
+    def info(self):
+        """
+        Return the cache statistics as a
+        :class:`~obspy.taup.helper_classes.CacheInfo` tuple.
+        """
+        return CacheInfo(self.hits, self.misses, self.maxsize,
+                         len(self._data))
+
+
 class Arrival(object):
     """
     Convenience class for storing parameters associated with a phase arrival.
@@ -790,6 +790,113 @@ class SeismicPhase(object):
                 self.source_depth))
         return arrivals
 
+    def calc_time_array(self, degrees, chunk=1000):
+        """
+        Calculate arrival times for this phase at many distances at once.
+
+        Vectorized version of :meth:`calc_time` returning arrays instead of
+        :class:`~obspy.taup.helper_classes.Arrival` objects. The arrivals of
+        each distance are in the same order as the ones of :meth:`calc_time`.
+
+        :param degrees: Epicentral distances in degrees.
+        :type degrees: :class:`numpy.ndarray`
+        :param chunk: Number of search distances compared against all ray
+            parameter segments at once.
+        :type chunk: int
+        :returns: Tuple of the arrays ``(index, purist_dist, time, ray_param,
+            takeoff_angle, incident_angle)``, with the index of the distance
+            of each arrival.
+        """
+        degrees = np.asarray(degrees, dtype=np.float64)
+        empty = np.empty(0)
+        if len(self.dist) < 2 or not len(degrees):
+            return (np.empty(0, dtype=np.intp), empty, empty, empty, empty,
+                    empty)
+        # Same search distances as seismic_phase_calc_time_inner_loop().
+        temp_deg = np.abs(degrees) % 360.0
+        # The C loop only subtracts 360 if the distance is larger.
+        temp_deg[(temp_deg == 0) & (np.abs(degrees) > 0)] = 360.0
+        temp_deg = np.where(temp_deg > 180.0, 360.0 - temp_deg, temp_deg)
+        rad_dist = temp_deg * math.pi / 180.0
+        index = []
+        search_dist = []
+        n = 0
+        while True:
+            valid = np.nonzero(n * 2.0 * math.pi + rad_dist <=
+                               self.maxDistance)[0]
+            if not len(valid):
+                break
+            index.append(valid)
+            search_dist.append(n * 2 * math.pi + rad_dist[valid])
+            valid = valid[temp_deg[valid] != 180.0]
+            index.append(valid)
+            search_dist.append((n + 1) * 2.0 * math.pi - rad_dist[valid])
+            n += 1
+        if not index:
+            return (np.empty(0, dtype=np.intp), empty, empty, empty, empty,
+                    empty)
+        # Candidates ordered by distance, keeping the order of the C loop
+        # per distance.
+        index = np.concatenate(index)
+        search_dist = np.concatenate(search_dist)
+        order = np.argsort(index, kind='mergesort')
+        index = index[order]
+        search_dist = search_dist[order]
+        # Ray parameter segments bracketing the search distances.
+        count = len(self.dist)
+        dist_a = self.dist[:-1]
+        dist_b = self.dist[1:]
+        segments = np.ones(count - 1, dtype=np.bool_)
+        if count > 2:
+            segments &= self.ray_param[:-1] != self.ray_param[1:]
+        not_last = np.arange(1, count) != count - 1
+        r_index = []
+        r_dist = []
+        r_ray_num = []
+        for start in range(0, len(search_dist), chunk):
+            sd = search_dist[start:start + chunk, np.newaxis]
+            hit = ((dist_a - sd) * (sd - dist_b) >= 0) & segments
+            hit &= ~((sd == dist_b) & not_last)
+            cand, ray_num = np.nonzero(hit)
+            r_index.append(index[start:start + chunk][cand])
+            r_dist.append(search_dist[start:start + chunk][cand])
+            r_ray_num.append(ray_num)
+        index = np.concatenate(r_index)
+        search_dist = np.concatenate(r_dist)
+        ray_num = np.concatenate(r_ray_num)
+        # Linear interpolation as in linear_interp_arrival().
+        dist_a = self.dist[ray_num]
+        dist_b = self.dist[ray_num + 1]
+        ray_param_a = self.ray_param[ray_num]
+        ray_param_b = self.ray_param[ray_num + 1]
+        time = ((search_dist - dist_a) / (dist_b - dist_a) *
+                (self.time[ray_num + 1] - self.time[ray_num]) +
+                self.time[ray_num])
+        ray_param = ((search_dist - dist_b) * (ray_param_a - ray_param_b) /
+                     (dist_a - dist_b) + ray_param_b)
+        if self.name.endswith("kmps"):
+            takeoff_angle = np.zeros(len(ray_param))
+            incident_angle = np.zeros(len(ray_param))
+        else:
+            vMod = self.tMod.sMod.vMod
+            if self.downGoing[0]:
+                takeoffVelocity = vMod.evaluateBelow(self.source_depth,
+                                                     self.name[0])
+            else:
+                # Fake negative velocity so angle is negative in case of
+                # upgoing ray.
+                takeoffVelocity = -1 * vMod.evaluateAbove(self.source_depth,
+                                                          self.name[0])
+            takeoff_angle = np.degrees(np.arcsin(np.clip(
+                takeoffVelocity * ray_param /
+                (self.tMod.radiusOfEarth - self.source_depth), -1.0, 1.0)))
+            lastLeg = self.legs[-2][0]  # very last item is "END"
+            incident_angle = np.degrees(np.arcsin(
+                vMod.evaluateBelow(0, lastLeg) * ray_param /
+                self.tMod.radiusOfEarth))
+        return (index, search_dist, time, ray_param, takeoff_angle,
+                incident_angle)
+
     def calc_pierce(self, degrees):
         """
         Calculate pierce points for this phase.
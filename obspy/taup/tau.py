@@ -6,6 +6,7 @@ High-level interface to travel-time calculation routines.
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 from future.builtins import *  # NOQA
+from future.utils import native_str
 
 import copy
 
@@ -14,6 +15,7 @@ import matplotlib.pyplot as plt
 import matplotlib.text
 import numpy as np
 
+from .helper_classes import LRUCache
 from .tau_model import TauModel
 from .taup_create import TauP_Create
 from .taup_path import TauP_Path
@@ -283,12 +285,23 @@ class TauPyModel(object):
     Representation of a seismic model and methods for ray paths through it.
     """
 
-    def __init__(self, model="iasp91", verbose=False):
+    def __init__(self, model="iasp91", verbose=False, cache_size=32,
+                 phase_cache_size=2048):
         """
         Loads an already created TauPy model.
 
         :param model: The model name. Either an internal TauPy model or a
             filename in the case of custom models.
+        :param cache_size: Number of depth corrected models kept in a least
+            recently used cache shared by all calls. Repeated calculations
+            for the same source depth then skip the depth correction. ``0``
+            disables the cache.
+        :type cache_size: int
+        :param phase_cache_size: Number of seismic phases, i.e. combinations
+            of source depth and phase name, kept in a least recently used
+            cache. Only phases of source depths in the depth cache are kept.
+            ``0`` disables the cache.
+        :type phase_cache_size: int
 
         Usage:
 
@@ -303,6 +316,28 @@ class TauPyModel(object):
         """
         self.verbose = verbose
         self.model = TauModel.from_file(model)
+        self.model.depth_cache = LRUCache(
+            cache_size, on_evict=self.model.dropCachedPhases)
+        self.model.phase_cache = LRUCache(phase_cache_size)
+
+    def cache_info(self):
+        """
+        Return hits, misses and sizes of the depth corrected model and the
+        seismic phase caches.
+
+        :rtype: dict of :class:`~obspy.taup.helper_classes.CacheInfo`
+
+        >>> from obspy.taup import TauPyModel
+        >>> model = TauPyModel("iasp91")
+        >>> for distance in (10, 20, 30):
+        ...     arrivals = model.get_travel_times(10, distance, ["P"])
+        >>> print(model.cache_info()["depth"])
+        CacheInfo(hits=2, misses=1, maxsize=32, currsize=1)
+        >>> print(model.cache_info()["phase"])
+        CacheInfo(hits=2, misses=1, maxsize=2048, currsize=1)
+        """
+        return {"depth": self.model.depth_cache.info(),
+                "phase": self.model.phase_cache.info()}
 
     def get_travel_times(self, source_depth_in_km, distance_in_degree=None,
                          phase_list=("ttall",)):
@@ -331,6 +366,70 @@ class TauPyModel(object):
         return Arrivals(sorted(tt.arrivals, key=lambda x: x.time),
                         model=self.model)
 
+    def get_travel_times_array(self, source_depth_in_km, distances,
+                               phase_list=("ttall",)):
+        """
+        Return travel times of every given phase for many distances at once.
+
+        All distances are evaluated in one vectorized pass per phase and the
+        results are returned as one structured array instead of
+        :class:`~obspy.taup.helper_classes.Arrival` objects.
+
+        :param source_depth_in_km: Source depth in km
+        :type source_depth_in_km: float
+        :param distances: Epicentral distances in degrees.
+        :type distances: :class:`numpy.ndarray`
+        :param phase_list: List of phases for which travel times should be
+            calculated. If this is empty, all phases will be used.
+        :type phase_list: list of str
+
+        :return: Structured array with the fields ``distance``, ``phase``,
+            ``time``, ``ray_param``, ``takeoff_angle`` and
+            ``incident_angle``, one record per arrival, sorted by distance
+            (in the given order) and time.
+        :rtype: :class:`numpy.ndarray`
+
+        >>> from obspy.taup import TauPyModel
+        >>> model = TauPyModel("iasp91")
+        >>> arrivals = model.get_travel_times_array(10, [50, 60], ["P", "S"])
+        >>> for arr in arrivals:
+        ...     print("%4.1f %s %7.2f" % (arr["distance"], arr["phase"],
+        ...                               arr["time"]))
+        50.0 P  534.29
+        50.0 S  965.82
+        60.0 P  606.67
+        60.0 S 1099.98
+        """
+        distances = np.atleast_1d(np.asarray(distances, dtype=np.float64))
+        tt = TauP_Time(self.model, phase_list, source_depth_in_km, None)
+        tt.depth_correct(source_depth_in_km)
+        tt.recalc_phases()
+        results = []
+        for phase in tt.phases:
+            results.append((phase.name, phase.calc_time_array(distances)))
+        length = max([len(name) for name, _ in results] or [1])
+        dtype = np.dtype([(native_str("distance"), np.float64),
+                          (native_str("phase"), native_str("U%d" % length)),
+                          (native_str("time"), np.float64),
+                          (native_str("ray_param"), np.float64),
+                          (native_str("takeoff_angle"), np.float64),
+                          (native_str("incident_angle"), np.float64)])
+        index = [r[1][0] for r in results] or [np.empty(0, dtype=np.intp)]
+        index = np.concatenate(index)
+        arrivals = np.empty(len(index), dtype=dtype)
+        start = 0
+        for name, (_, _, time, ray_param, takeoff, incident) in results:
+            end = start + len(time)
+            arrivals["phase"][start:end] = name
+            arrivals["time"][start:end] = time
+            arrivals["ray_param"][start:end] = ray_param
+            arrivals["takeoff_angle"][start:end] = takeoff
+            arrivals["incident_angle"][start:end] = incident
+            start = end
+        arrivals["distance"] = distances[index]
+        order = np.lexsort((arrivals["time"], index))
+        return arrivals[order]
+
     def get_pierce_points(self, source_depth_in_km, distance_in_degree,
                           phase_list=("ttall",)):
         """
@@ -8,6 +8,7 @@ from __future__ import (absolute_import, division, print_function,
 from future.builtins import *  # NOQA
 from future.utils import native_str
 
+import multiprocessing
 import os
 from copy import deepcopy
 from itertools import count
@@ -18,9 +19,49 @@ import numpy as np
 from .helper_classes import DepthRange, SlownessModelError, TauModelError
 from .slowness_model import SlownessModel
 from .tau_branch import TauBranch
+from .utils import _memmap_npz_member
 from .velocity_model import VelocityModel
 
 
+# Attributes of the tau branches stored next to the stacked time, distance
+# and tau arrays in serialized models.
+_TAU_BRANCH_DTYPE = [(native_str('DEBUG'), np.bool_),
+                     (native_str('botDepth'), np.float_),
+                     (native_str('isPWave'), np.bool_),
+                     (native_str('maxRayParam'), np.float_),
+                     (native_str('minRayParam'), np.float_),
+                     (native_str('minTurnRayParam'), np.float_),
+                     (native_str('topDepth'), np.float_)]
+
+# Slowness model and ray parameters shared with the worker processes
+# integrating the tau branches.
+_WORKER_STATE = {}
+
+
+def _init_branch_worker(sMod, ray_params):
+    _WORKER_STATE['sMod'] = sMod
+    _WORKER_STATE['ray_params'] = ray_params
+
+
+def _create_branch(args, sMod, ray_params):
+    """
+    Create and integrate a single tau branch.
+    """
+    topDepth, botDepth, isPWave, minPSoFar, debug = args
+    branch = TauBranch(topDepth, botDepth, isPWave)
+    branch.DEBUG = debug
+    branch.createBranch(sMod, minPSoFar, ray_params)
+    return branch
+
+
+def _create_branch_in_worker(args):
+    """
+    Create and integrate a single tau branch in a worker process.
+    """
+    return _create_branch(args, _WORKER_STATE['sMod'],
+                          _WORKER_STATE['ray_params'])
+
+
 class TauModel(object):
     """
     Provides storage of all the TauBranches comprising a model.
@@ -39,8 +80,15 @@ class TauModel(object):
     # happens to fall on a real discontinuity then then it is not
     # included.
     noDisconDepths = []
+    # Optional caches of depth corrected models, keyed by source depth, and
+    # of seismic phases, keyed by source depth and phase name. Set by
+    # TauPyModel and never copied or serialized. Phases are only cached for
+    # depths in the depth cache and dropped together with their depth.
+    depth_cache = None
+    phase_cache = None
 
-    def __init__(self, sMod, spherical=True, debug=False, skip_calc=False):
+    def __init__(self, sMod, spherical=True, debug=False, skip_calc=False,
+                 processes=1):
         self.debug = debug
         self.radiusOfEarth = 6371.0
         # True if this is a spherical slowness model. False if flat.
@@ -61,11 +109,17 @@ class TauModel(object):
         self.sMod = sMod
 
         if not skip_calc:
-            self.calcTauIncFrom()
+            self.calcTauIncFrom(processes=processes)
 
-    def calcTauIncFrom(self):
+    def calcTauIncFrom(self, processes=1):
         """
         Calculates tau for each branch within a slowness model.
+
+        :type processes: int
+        :param processes: Number of processes used to integrate the P and S
+            tau branches. The branches are independent of each other, so
+            with more than one process they are distributed over a
+            :class:`multiprocessing.Pool`.
         """
         # First, we must have at least 1 slowness layer to calculate a
         #  distance. Otherwise we must signal an exception.
@@ -113,6 +167,10 @@ class TauModel(object):
         self.ray_params = tempRayParams[:rayNum]
         if self.debug:
             print("Number of slowness samples for tau:" + str(rayNum))
+        # The minimum slowness at the top of each branch only depends on the
+        # slowness model, so all branches can be set up first and integrated
+        # independently afterwards.
+        tasks = []
         for waveNum, isPWave in enumerate([True, False]):
             # The minimum slowness seen so far.
             minPSoFar = self.sMod.getSlownessLayer(0, isPWave)['topP']
@@ -126,12 +184,8 @@ class TauModel(object):
                     if isPWave else topCritDepth['sLayerNum']
                 botCritLayerNum = (botCritDepth['pLayerNum'] if isPWave
                                    else botCritDepth['sLayerNum']) - 1
-                self.tauBranches[waveNum, critNum] = \
-                    TauBranch(topCritDepth['depth'], botCritDepth['depth'],
-                              isPWave)
-                self.tauBranches[waveNum, critNum].DEBUG = self.debug
-                self.tauBranches[waveNum, critNum].createBranch(
-                    self.sMod, minPSoFar, self.ray_params)
+                tasks.append((topCritDepth['depth'], botCritDepth['depth'],
+                              isPWave, minPSoFar, self.debug))
                 # Update minPSoFar. Note that the new minPSoFar could be at
                 # the start of a discontinuity over a high slowness zone,
                 # so we need to check the top, bottom and the layer just
@@ -146,6 +200,20 @@ class TauModel(object):
                     self.sMod.layerNumberAbove(botCritDepth['depth'], isPWave),
                     isPWave)
                 minPSoFar = min(minPSoFar, botSLayer['botP'])
+        if processes > 1:
+            pool = multiprocessing.Pool(
+                processes, initializer=_init_branch_worker,
+                initargs=(self.sMod, self.ray_params))
+            try:
+                branches = pool.map(_create_branch_in_worker, tasks)
+            finally:
+                pool.close()
+                pool.join()
+        else:
+            branches = [_create_branch(task, self.sMod, self.ray_params)
+                        for task in tasks]
+        for k, branch in enumerate(branches):
+            self.tauBranches[divmod(k, numBranches)] = branch
         # Here we decide which branches are the closest to the Moho, CMB,
         # and IOCB by comparing the depth of the top of the branch with the
         # depths in the Velocity Model.
@@ -183,6 +251,12 @@ class TauModel(object):
             desc += "\n"
         return desc
 
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop('depth_cache', None)
+        state.pop('phase_cache', None)
+        return state
+
     def validate(self):
         # Could implement the model validation; not critical right now
         return True
@@ -211,13 +285,31 @@ class TauModel(object):
             depthCorrected.source_depth = depth
             depthCorrected.sourceBranch = depthCorrected.findBranch(depth)
             depthCorrected.validate()
-            # Put in cache somehow: self.depthCache.put(depthCorrected)
+            if self.depth_cache is not None:
+                self.depth_cache.put(depth, depthCorrected)
         return depthCorrected
 
     def loadFromDepthCache(self, depth):
-        # Could speed up by implementing cache.
-        # Must return None if loading fails.
-        return None
+        """
+        Returns the model depth corrected for depth from the depth cache or
+        None if it is not cached.
+        """
+        if self.depth_cache is None:
+            return None
+        return self.depth_cache.get(depth)
+
+    def dropCachedPhases(self, depth, depthCorrected=None):
+        """
+        Removes all phases built for the source depth from the phase cache.
+
+        Called when the depth corrected model is dropped from the depth
+        cache, so cached phases do not keep it alive.
+        """
+        if self.phase_cache is None:
+            return
+        for key in self.phase_cache.keys():
+            if key[0] == depth:
+                self.phase_cache.discard(key)
 
     def splitBranch(self, depth):
         """
@@ -376,6 +468,10 @@ class TauModel(object):
         """
         Serialize model to numpy npz binary file.
 
+        The time, distance and tau increments of all tau branches are stored
+        as three stacked, uncompressed arrays, so they can be memory mapped
+        by :meth:`deserialize`.
+
         Summary of contents that have to be handled during serialization::
 
             TauModel
@@ -452,13 +548,30 @@ class TauModel(object):
                 'ray_params', 'sourceBranch', 'source_depth', 'spherical']
         arrays = {k: getattr(self, k) for k in keys}
         # b) handle .tauBranches
-        i, j = self.tauBranches.shape
-        for j_ in range(j):
-            for i_ in range(i):
-                # just store the shape of self.tauBranches in the key names for
-                # later reconstruction of array in deserialization.
-                key = 'tauBranches_%i/%i_%i/%i' % (j_, j, i_, i)
-                arrays[key] = self.tauBranches[i_][j_]._to_array()
+        branches = self.tauBranches
+        if len(set(len(b.time) for b in branches.flat)) == 1:
+            # all branches share the same ray parameters, store the
+            # increments in stacked arrays and the remaining attributes of
+            # the branches in a structured array of the same shape
+            attributes = np.empty(branches.shape, dtype=_TAU_BRANCH_DTYPE)
+            for dtype in _TAU_BRANCH_DTYPE:
+                key = dtype[0]
+                attributes[key] = [[getattr(b, key) for b in row]
+                                   for row in branches]
+            arrays['tauBranches'] = attributes
+            for key in ['time', 'dist', 'tau']:
+                arrays['tauBranches.' + key] = np.array(
+                    [[getattr(b, key) for b in row] for row in branches],
+                    dtype=np.float_)
+        else:
+            i, j = branches.shape
+            for j_ in range(j):
+                for i_ in range(i):
+                    # just store the shape of self.tauBranches in the key
+                    # names for later reconstruction of array in
+                    # deserialization.
+                    key = 'tauBranches_%i/%i_%i/%i' % (j_, j, i_, i)
+                    arrays[key] = branches[i_][j_]._to_array()
         # c) handle simple contents of .sMod
         dtypes = [(native_str('DEBUG'), np.bool_),
                   (native_str('DEFAULT_SLOWNESS_TOLERANCE'), np.float_),
@@ -509,12 +622,20 @@ class TauModel(object):
         arrays['vMod'] = velocity_model
         arrays['vMod.layers'] = self.sMod.vMod.layers
         # finally save the collection of (structured) arrays to binary file
-        np.savez_compressed(filename, **arrays)
+        np.savez(filename, **arrays)
 
     @staticmethod
-    def deserialize(filename):
+    def deserialize(filename, mmap=False):
         """
         Deserialize model from numpy npz binary file.
+
+        :type filename: str
+        :param filename: Filename of the model.
+        :type mmap: bool
+        :param mmap: If ``True``, the time, distance and tau increments of
+            the tau branches are memory mapped and only read from disk when
+            needed. Only possible for models written uncompressed by
+            :meth:`serialize`, other models are read completely.
         """
         # XXX: Make this a with statement when old NumPy support is dropped.
         npz = np.load(filename)
@@ -536,20 +657,23 @@ class TauModel(object):
                     arr = arr[()]
                 setattr(model, key, arr)
             # b) handle .tauBranches
-            tau_branch_keys = [key for key in npz.keys()
-                               if key.startswith('tauBranches_')]
-            j, i = tau_branch_keys[0].split("_")[1:]
-            i = int(i.split("/")[1])
-            j = int(j.split("/")[1])
-            branches = np.empty(shape=(i, j), dtype=np.object_)
-            for key in tau_branch_keys:
-                j_, i_ = key.split("_")[1:]
-                i_ = int(i_.split("/")[0])
-                j_ = int(j_.split("/")[0])
-                branches[i_][j_] = TauBranch._from_array(npz[key])
-            # no idea how numpy lays out empty arrays of object type,
-            # make a copy just in case..
-            branches = np.copy(branches)
+            if 'tauBranches' in npz.keys():
+                branches = TauModel._branches_from_arrays(npz, filename, mmap)
+            else:
+                tau_branch_keys = [key for key in npz.keys()
+                                   if key.startswith('tauBranches_')]
+                j, i = tau_branch_keys[0].split("_")[1:]
+                i = int(i.split("/")[1])
+                j = int(j.split("/")[1])
+                branches = np.empty(shape=(i, j), dtype=np.object_)
+                for key in tau_branch_keys:
+                    j_, i_ = key.split("_")[1:]
+                    i_ = int(i_.split("/")[0])
+                    j_ = int(j_.split("/")[0])
+                    branches[i_][j_] = TauBranch._from_array(npz[key])
+                # no idea how numpy lays out empty arrays of object type,
+                # make a copy just in case..
+                branches = np.copy(branches)
             setattr(model, "tauBranches", branches)
             # c) handle simple contents of .sMod
             slowness_model = SlownessModel(vMod=None, skip_model_creation=True)
@@ -591,10 +715,47 @@ class TauModel(object):
         return model
 
     @staticmethod
-    def from_file(model_name):
+    def _branches_from_arrays(npz, filename, mmap):
+        """
+        Create the tau branches from the stacked arrays of a model file.
+        """
+        increments = {}
+        for key in ['time', 'dist', 'tau']:
+            name = 'tauBranches.' + key
+            if mmap:
+                try:
+                    increments[key] = _memmap_npz_member(filename, name)
+                    continue
+                except (ValueError, TypeError):
+                    # compressed or not a file on disk
+                    pass
+            increments[key] = npz[name]
+        attributes = npz['tauBranches']
+        branches = np.empty(shape=attributes.shape, dtype=np.object_)
+        for index in np.ndindex(*attributes.shape):
+            branch = TauBranch()
+            for key in attributes.dtype.names:
+                # numpy scalars like the tau branches of the old format
+                setattr(branch, key, attributes[index][key][()])
+            for key, arr in increments.items():
+                setattr(branch, key, arr[index])
+            branches[index] = branch
+        return branches
+
+    @staticmethod
+    def from_file(model_name, mmap=False):
+        """
+        Load a model from a file or by the name of a builtin model.
+
+        :type model_name: str
+        :param model_name: Filename or name of a builtin model.
+        :type mmap: bool
+        :param mmap: Memory map the tau branches of the model, see
+            :meth:`deserialize`.
+        """
         if os.path.exists(model_name):
             filename = model_name
         else:
             filename = os.path.join(os.path.dirname(__file__), "data",
                                     model_name.lower() + ".npz")
-        return TauModel.deserialize(filename)
+        return TauModel.deserialize(filename, mmap=mmap)
@@ -31,7 +31,7 @@ class TauP_Create(object):
     def __init__(self, input_filename, output_filename, verbose=False,
                  min_delta_p=0.1, max_delta_p=11.0, max_depth_interval=115.0,
                  max_range_interval=2.5, max_interp_error=0.05,
-                 allow_inner_core_s=True):
+                 allow_inner_core_s=True, processes=1):
         self.input_filename = input_filename
         self.output_filename = output_filename
         self.debug = verbose
@@ -41,6 +41,7 @@ class TauP_Create(object):
         self.max_range_interval = max_range_interval
         self.max_interp_error = max_interp_error
         self.allow_inner_core_s = allow_inner_core_s
+        self.processes = processes
 
     def loadVMod(self):
         """
@@ -106,7 +107,7 @@ class TauP_Create(object):
         TauModel.DEBUG = self.debug
         SlownessModel.DEBUG = self.debug
         # Creates tau model from slownesses.
-        return TauModel(self.sMod)
+        return TauModel(self.sMod, processes=self.processes)
 
     def run(self):
         """
@@ -156,7 +157,7 @@ def get_builtin_tvel_files():
     return glob.glob(os.path.join(__DATA_DIR, "*.tvel"))
 
 
-def build_taup_model(tvel_filename, output_folder=None):
+def build_taup_model(tvel_filename, output_folder=None, processes=1):
     """
     Build an ObsPy model file from a "tvel" file.
 
@@ -171,6 +172,9 @@ def build_taup_model(tvel_filename, output_folder=None):
     :param output_folder: Directory in which the built
         :class:`~obspy.taup.tau_model.TauModel` will be stored. Defaults to
         directory of input file.
+    :type processes: int
+    :param processes: Number of processes used to integrate the tau branches
+        of the model.
     """
     if output_folder is None:
         output_folder = __DATA_DIR
@@ -180,7 +184,8 @@ def build_taup_model(tvel_filename, output_folder=None):
 
     print("Building obspy.taup model for '%s' ..." % tvel_filename)
     mod_create = TauP_Create(input_filename=tvel_filename,
-                             output_filename=output_filename)
+                             output_filename=output_filename,
+                             processes=processes)
     mod_create.loadVMod()
     mod_create.run()
 
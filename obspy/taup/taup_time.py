@@ -66,16 +66,49 @@ class TauP_Time(object):
                         break
             # Executed, if break is NOT called.
             else:
-                # Didn't find it precomputed, so recalculate:
-                try:
-                    seismic_phase = SeismicPhase(temp_phase_name,
-                                                 self.depth_corrected_model)
+                # Didn't find it precomputed, so look it up in the cache of
+                # the model or recalculate.
+                seismic_phase = self.cached_phase(temp_phase_name)
+                if seismic_phase is not None:
                     new_phases.append(seismic_phase)
-                except TauModelError:
-                    print("Error with this phase, skipping it: " +
-                          str(temp_phase_name))
+                else:
+                    try:
+                        seismic_phase = SeismicPhase(
+                            temp_phase_name, self.depth_corrected_model)
+                        new_phases.append(seismic_phase)
+                        self.cache_phase(seismic_phase)
+                    except TauModelError:
+                        print("Error with this phase, skipping it: " +
+                              str(temp_phase_name))
             self.phases = new_phases
 
+    def cached_phase(self, phase_name):
+        """
+        Returns the phase from the phase cache of the model if it was built
+        for the current depth corrected model, otherwise None.
+        """
+        if self.model.phase_cache is None:
+            return None
+        seismic_phase = self.model.phase_cache.get(
+            (self.depth_corrected_model.source_depth, phase_name))
+        if seismic_phase is not None and \
+                seismic_phase.tMod is not self.depth_corrected_model:
+            return None
+        return seismic_phase
+
+    def cache_phase(self, seismic_phase):
+        """
+        Stores the phase in the phase cache of the model if the current
+        depth corrected model is in the depth cache, the phase is dropped
+        again together with it.
+        """
+        depth = self.depth_corrected_model.source_depth
+        if self.model.phase_cache is None or \
+                self.model.depth_cache is None or \
+                depth not in self.model.depth_cache:
+            return
+        self.model.phase_cache.put((depth, seismic_phase.name), seismic_phase)
+
     def calculate(self, degrees):
         """
         Calculate the arrival times.
@@ -9,13 +9,18 @@ from future.builtins import *  # NOQA
 from future.utils import native_str
 
 import collections
+import gc
 import inspect
 import os
 import unittest
+import weakref
 
 import numpy as np
 
+from obspy.core.util import NamedTemporaryFile
 from obspy.taup import TauPyModel
+from obspy.taup.tau_model import TauModel
+from obspy.taup.taup_create import TauP_Create
 
 
 # Most generic way to get the data folder path.
@@ -479,6 +484,153 @@ class TauPyModelTestCase(unittest.TestCase):
                     self.assertEqual(round(arrival.ray_param_sec_degree, 2),
                                      round(ray_param, 2))
 
+    def test_cache(self):
+        """
+        Cached depth corrected models and phases give the same results as
+        uncached ones and the cache is bounded.
+        """
+        cached = TauPyModel("iasp91", cache_size=2, phase_cache_size=6)
+        uncached = TauPyModel("iasp91", cache_size=0, phase_cache_size=0)
+        phases = ["P", "S", "PcP", "Pdiff"]
+        for depth in (10.0, 300.0, 10.0, 35.0, 10.0):
+            for distance in (20.0, 100.0):
+                for method in ("get_travel_times", "get_pierce_points",
+                               "get_ray_paths"):
+                    a = getattr(cached, method)(depth, distance, phases)
+                    b = getattr(uncached, method)(depth, distance, phases)
+                    self.assertEqual([x.name for x in a],
+                                     [x.name for x in b])
+                    for x, y in zip(a, b):
+                        self.assertEqual(x.time, y.time)
+                        self.assertEqual(x.ray_param, y.ray_param)
+                        self.assertEqual(x.takeoff_angle, y.takeoff_angle)
+                        if x.path is not None:
+                            np.testing.assert_array_equal(x.path, y.path)
+                        if x.pierce is not None:
+                            np.testing.assert_array_equal(x.pierce, y.pierce)
+        info = cached.cache_info()
+        self.assertEqual(info["depth"].maxsize, 2)
+        self.assertEqual(info["depth"].currsize, 2)
+        # 10 km is the most recently used depth when 35 km evicts 300 km
+        self.assertEqual(info["depth"].misses, 3)
+        self.assertEqual(info["phase"].currsize, 6)
+        self.assertGreater(info["phase"].hits, 0)
+        # phases are only kept for depths in the depth cache
+        self.assertEqual(
+            set(key[0] for key in cached.model.phase_cache.keys()),
+            set([10.0, 35.0]))
+        info = uncached.cache_info()
+        self.assertEqual(info["depth"].currsize, 0)
+        self.assertEqual(info["phase"].currsize, 0)
+        self.assertEqual(info["phase"].hits, 0)
+        # evicted depth corrected models are not kept alive by the phases
+        model = TauPyModel("iasp91", cache_size=1)
+        model.get_travel_times(10.0, 20.0, phases)
+        ref = weakref.ref(model.model.depth_cache.get(10.0))
+        model.get_travel_times(300.0, 20.0, phases)
+        gc.collect()
+        self.assertIsNone(ref())
+        self.assertEqual(
+            set(key[0] for key in model.model.phase_cache.keys()),
+            set([300.0]))
+
+    def test_get_travel_times_array(self):
+        """
+        The vectorized travel times are equal to the ones of
+        get_travel_times() for every distance.
+        """
+        m = TauPyModel(model="iasp91")
+        distances = np.array([0.0, 0.5, 10.0, 35.0, 98.3, 130.0, 145.0,
+                              180.0, 215.0, 360.0, 400.0, -20.0])
+        for depth in (0.0, 35.0, 550.0):
+            arrivals = m.get_travel_times_array(depth, distances,
+                                                ["ttbasic", "2kmps"])
+            expected = []
+            for i, distance in enumerate(distances):
+                expected.extend(
+                    (i, arr.time, arr.name, arr.ray_param,
+                     arr.takeoff_angle, arr.incident_angle)
+                    for arr in m.get_travel_times(
+                        depth, distance, ["ttbasic", "2kmps"]))
+            expected.sort(key=lambda x: x[:2])
+            self.assertEqual(len(arrivals), len(expected))
+            self.assertEqual(arrivals.dtype.names, (
+                "distance", "phase", "time", "ray_param", "takeoff_angle",
+                "incident_angle"))
+            np.testing.assert_array_equal(
+                arrivals["distance"], distances[[x[0] for x in expected]])
+            self.assertEqual(sorted(arrivals["phase"]),
+                             sorted(x[2] for x in expected))
+            for i, key in ((1, "time"), (3, "ray_param"),
+                           (4, "takeoff_angle"), (5, "incident_angle")):
+                np.testing.assert_allclose(
+                    arrivals[key],
+                    np.array([x[i] for x in expected], dtype=np.float64),
+                    rtol=1e-10, atol=1e-10)
+        # no arrivals at all
+        arrivals = m.get_travel_times_array(10.0, [50.0], ["Pn"])
+        self.assertEqual(len(arrivals), 0)
+
+    def test_parallel_build_and_mmap(self):
+        """
+        Tau branches integrated in several processes have to be identical to
+        the serially integrated ones, and models written by serialize() can
+        be memory mapped.
+        """
+        filename = os.path.join(os.path.dirname(DATA), "iasp91.tvel")
+        create = TauP_Create(filename, None)
+        create.loadVMod()
+        serial = create.createTauModel(create.vMod)
+        parallel = TauModel(create.sMod, processes=2)
+        self.assertEqual(serial.tauBranches.shape, parallel.tauBranches.shape)
+        for expected, got in zip(serial.tauBranches.flat,
+                                 parallel.tauBranches.flat):
+            for key in ("topDepth", "botDepth", "isPWave", "minRayParam",
+                        "maxRayParam", "minTurnRayParam"):
+                self.assertEqual(getattr(expected, key), getattr(got, key))
+            for key in ("time", "dist", "tau"):
+                np.testing.assert_array_equal(getattr(expected, key),
+                                              getattr(got, key))
+        self.assertEqual(serial.cmbBranch, parallel.cmbBranch)
+
+        expected = TauPyModel("iasp91")
+        with NamedTemporaryFile(suffix=".npz") as tf:
+            parallel.serialize(tf.name)
+            for mmap in (False, True):
+                model = TauModel.from_file(tf.name, mmap=mmap)
+                branch = model.tauBranches[1, 3]
+                self.assertEqual(isinstance(branch.time, np.memmap), mmap)
+                np.testing.assert_array_equal(
+                    branch.tau, parallel.tauBranches[1, 3].tau)
+                self.assertIsInstance(branch.topDepth, np.float64)
+                m = TauPyModel("iasp91")
+                m.model = model
+                # depth corrections work on memory mapped models as well
+                for depth in (0.0, 35.0, 300.0):
+                    arrivals = m.get_travel_times(depth, 60.0, ["P", "sS"])
+                    self.assertEqual(
+                        [round(x.time, 2) for x in arrivals],
+                        [round(x.time, 2) for x in expected.get_travel_times(
+                            depth, 60.0, ["P", "sS"])])
+                # pierce points and ray paths compared to the model in
+                # memory, both without any previous depth corrections
+                m = TauPyModel("iasp91")
+                m.model = TauModel.from_file(tf.name, mmap=mmap)
+                in_memory = TauPyModel("iasp91")
+                in_memory.model = serial
+                for method in ("get_pierce_points", "get_ray_paths"):
+                    for depth in (0.0, 35.0):
+                        got = getattr(m, method)(depth, 5.0, ["ttbasic"])
+                        exp = getattr(in_memory, method)(depth, 5.0,
+                                                         ["ttbasic"])
+                        self.assertEqual(len(got), len(exp))
+                        for arr_got, arr_exp in zip(got, exp):
+                            attr = "pierce" if "pierce" in method else "path"
+                            np.testing.assert_allclose(
+                                getattr(arr_got, attr)["dist"],
+                                getattr(arr_exp, attr)["dist"])
+                del model, branch, m, in_memory
+
 
 def suite():
     return unittest.makeSuite(TauPyModelTestCase, 'test')
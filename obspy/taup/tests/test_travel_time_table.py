@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Tests the precomputed travel time tables.
+"""
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+from future.builtins import *  # NOQA
+
+import unittest
+
+import numpy as np
+
+from obspy.core.util import NamedTemporaryFile
+from obspy.taup import TauPyModel
+from obspy.taup.travel_time_table import TravelTimeTable
+
+
+class TravelTimeTableTestCase(unittest.TestCase):
+    """
+    Test suite for obspy.taup.travel_time_table.
+    """
+    @classmethod
+    def setUpClass(cls):
+        cls.model = TauPyModel("iasp91")
+        cls.depths = np.arange(0.0, 101.0, 20.0)
+        cls.distances = np.arange(10.0, 41.0, 1.0)
+        cls.table = TravelTimeTable.build(
+            "iasp91", cls.depths, cls.distances, ["P", "S", "PcP"],
+            processes=1)
+
+    def test_build(self):
+        """
+        Grid nodes are the exact first arrivals, parallel building gives the
+        same table.
+        """
+        self.assertEqual(self.table.phases, ["P", "PcP", "S"])
+        self.assertEqual(self.table.times.shape, (3, 6, 31, 1))
+        for depth in (0.0, 60.0):
+            for distance in (10.0, 23.0):
+                arrivals = self.model.get_travel_times(depth, distance,
+                                                       ["P", "S", "PcP"])
+                for phase in self.table.phases:
+                    expected = min(arr.time for arr in arrivals
+                                   if arr.name == phase)
+                    self.assertAlmostEqual(self.table.get_travel_times(
+                        phase, depth, distance), expected, 8)
+        table = TravelTimeTable.build(
+            "iasp91", self.depths, self.distances, ["P", "S", "PcP"],
+            processes=2)
+        np.testing.assert_array_equal(table.times, self.table.times)
+
+    def test_all_branches(self):
+        """
+        In the "all" mode the arrivals of triplicated phases are sorted by
+        time.
+        """
+        table = TravelTimeTable.build(
+            "iasp91", [0.0, 10.0], self.distances, ["P"], mode="all",
+            branches=5, processes=1)
+        self.assertEqual(table.times.shape, (1, 2, 31, 5))
+        times = table.get_travel_times("P", 10.0, 20.0)
+        expected = sorted(arr.time for arr in self.model.get_travel_times(
+            10.0, 20.0, ["P"]))
+        self.assertGreater(len(expected), 1)
+        np.testing.assert_allclose(times[:len(expected)], expected[:5])
+        self.assertTrue(np.isnan(times[len(expected):]).all())
+
+    def test_interpolation(self):
+        """
+        Bilinear and bicubic interpolation between the grid nodes, NaN
+        outside of the grid.
+        """
+        depths = np.array([5.0, 37.0, 90.0])
+        distances = np.array([31.3, 35.9, 38.45])
+        exact = np.array([
+            self.model.get_travel_times(d, x, ["P"])[0].time
+            for d, x in zip(depths, distances)])
+        bilinear = self.table.get_travel_times("P", depths, distances)
+        bicubic = self.table.get_travel_times("P", depths, distances,
+                                              method="bicubic")
+        self.assertEqual(bilinear.shape, (3,))
+        self.assertLess(np.abs(bilinear - exact).max(), 0.5)
+        self.assertLess(np.abs(bicubic - exact).max(), 0.2)
+        # broadcasting and positions outside of the grid
+        times = self.table.get_travel_times(
+            "S", [[0.0], [50.0], [200.0]], [20.0, 5.0])
+        self.assertEqual(times.shape, (3, 2))
+        self.assertTrue(np.isfinite(times[:2, 0]).all())
+        self.assertTrue(np.isnan(times[2]).all())
+        self.assertTrue(np.isnan(times[:, 1]).all())
+        self.assertRaises(ValueError, self.table.get_travel_times, "SKS",
+                          0.0, 20.0)
+        self.assertRaises(ValueError, self.table.get_travel_times, "P",
+                          0.0, 20.0, method="nearest")
+
+    def test_save_load(self):
+        """
+        Tables are saved to npz files and can be memory mapped.
+        """
+        with NamedTemporaryFile(suffix=".npz") as tf:
+            self.table.save(tf.name)
+            for mmap in (False, True):
+                table = TravelTimeTable.load(tf.name, mmap=mmap)
+                self.assertEqual(table.phases, self.table.phases)
+                self.assertEqual(table.model, "iasp91")
+                np.testing.assert_array_equal(table.depths, self.depths)
+                np.testing.assert_array_equal(table.times, self.table.times)
+                self.assertEqual(isinstance(table.times, np.memmap), mmap)
+                np.testing.assert_array_equal(
+                    table.get_travel_times("S", 33.0, 22.2),
+                    self.table.get_travel_times("S", 33.0, 22.2))
+                del table
+
+    def test_error_report(self):
+        """
+        Error report against exact travel times.
+        """
+        report = self.table.error_report(npoints=20, seed=42)
+        self.assertEqual(sorted(report), ["P", "PcP", "S"])
+        for phase, errors in report.items():
+            self.assertEqual(errors["count"] + errors["mismatch"], 20)
+            self.assertLess(errors["rms"], errors["max"] + 1e-12)
+            self.assertLess(errors["max"], 2.0)
+
+
+def suite():
+    return unittest.makeSuite(TravelTimeTableTestCase, 'test')
+
+
+if __name__ == '__main__':
+    unittest.main(defaultTest='suite')
@@ -0,0 +1,357 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Precomputed travel time tables with fast interpolation.
+
+:copyright:
+    The ObsPy Development Team (devs@obspy.org)
+:license:
+    GNU Lesser General Public License, Version 3
+    (http://www.gnu.org/copyleft/lesser.html)
+"""
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+from future.builtins import *  # NOQA
+from future.utils import native_str
+
+import multiprocessing
+
+import numpy as np
+
+from .tau import TauPyModel
+from .utils import _memmap_npz_member, parse_phase_list
+
+
+# TauPyModel instances of a (worker) process, by model name
+_MODELS = {}
+
+
+def _get_model(model):
+    if model not in _MODELS:
+        _MODELS[model] = TauPyModel(model)
+    return _MODELS[model]
+
+
+def _build_depth(args):
+    """
+    Travel times of all phases and distances for one source depth, with up to
+    ``branches`` arrivals per phase sorted by time.
+    """
+    model, depth, distances, phases, branches = args
+    arrivals = _get_model(model).get_travel_times_array(depth, distances,
+                                                        phases)
+    times = np.empty((len(phases), len(distances), branches))
+    times.fill(np.nan)
+    for i, phase in enumerate(phases):
+        arr = arrivals[arrivals["phase"] == phase]
+        # arrivals are sorted by distance and time, count the branches
+        index = np.searchsorted(distances, arr["distance"])
+        rank = np.arange(len(index)) - np.searchsorted(index, index)
+        keep = rank < branches
+        times[i, index[keep], rank[keep]] = arr["time"][keep]
+    return times
+
+
+def _locate(axis, values):
+    """
+    Index of the grid interval containing each value and the relative
+    position within the interval.
+    """
+    index = np.searchsorted(axis, values, side="right") - 1
+    index = np.clip(index, 0, len(axis) - 2)
+    weight = (values - axis[index]) / (axis[index + 1] - axis[index])
+    return index, weight
+
+
+def _cubic_weights(t):
+    """
+    Catmull-Rom weights of the four grid nodes around a position ``t`` in
+    ``[0, 1]`` between the two middle nodes.
+    """
+    t2 = t * t
+    t3 = t2 * t
+    return ((-t3 + 2 * t2 - t) / 2, (3 * t3 - 5 * t2 + 2) / 2,
+            (-3 * t3 + 4 * t2 + t) / 2, (t3 - t2) / 2)
+
+
+class TravelTimeTable(object):
+    """
+    Travel times of seismic phases precomputed on a grid of source depths and
+    epicentral distances.
+
+    Queries are vectorized bilinear or bicubic interpolations in the grid, a
+    lot faster than the exact calculation with
+    :meth:`~obspy.taup.tau.TauPyModel.get_travel_times`. Grid nodes without
+    an arrival of a phase are NaN, so are interpolated values next to them.
+
+    :param depths: Strictly increasing source depths of the grid in km.
+    :type depths: :class:`numpy.ndarray`
+    :param distances: Strictly increasing epicentral distances of the grid in
+        degrees.
+    :type distances: :class:`numpy.ndarray`
+    :param phases: Phase names.
+    :type phases: list of str
+    :param times: Travel times with the shape ``(len(phases), len(depths),
+        len(distances), branches)``. The arrivals of triplicated phases are
+        sorted by time, the first one is the first arrival.
+    :type times: :class:`numpy.ndarray`
+    :param model: Name of the model the table was built with.
+    :type model: str
+
+    .. rubric:: Example
+
+    >>> from obspy.taup.travel_time_table import TravelTimeTable
+    >>> table = TravelTimeTable.build("iasp91", depths=[0, 10, 20, 30],
+    ...                               distances=range(20, 31),
+    ...                               phase_list=["P", "S"], processes=1)
+    >>> print(table)  # doctest: +NORMALIZE_WHITESPACE
+    TravelTimeTable of model iasp91, 2 phase(s), 1 branch(es)
+        depths: 0.0 - 30.0 km (4 nodes)
+        distances: 20.0 - 30.0 deg (11 nodes)
+    >>> times = table.get_travel_times("P", [10.0, 15.0], [20.0, 25.5])
+    >>> print("%.2f %.2f" % tuple(times))
+    272.67 327.68
+    """
+    def __init__(self, depths, distances, phases, times, model=None):
+        self.depths = np.asarray(depths, dtype=np.float64)
+        self.distances = np.asarray(distances, dtype=np.float64)
+        self.phases = [str(phase) for phase in phases]
+        self.times = times
+        self.model = model
+        for name, axis in (("depths", self.depths),
+                           ("distances", self.distances)):
+            if axis.ndim != 1 or len(axis) < 2 or np.any(np.diff(axis) <= 0):
+                msg = "Grid %s must be strictly increasing with at least " \
+                      "two nodes." % name
+                raise ValueError(msg)
+        shape = (len(self.phases), len(self.depths), len(self.distances))
+        if self.times.ndim != 4 or self.times.shape[:3] != shape:
+            msg = "Travel times must have the shape %s + (branches,)." % \
+                str(shape)
+            raise ValueError(msg)
+
+    def __str__(self):
+        ret = ("TravelTimeTable of model {model}, {phases} phase(s), "
+               "{branches} branch(es)\n"
+               "\tdepths: {d0:.1f} - {d1:.1f} km ({nd} nodes)\n"
+               "\tdistances: {x0:.1f} - {x1:.1f} deg ({nx} nodes)")
+        return ret.format(model=self.model, phases=len(self.phases),
+                          branches=self.times.shape[3],
+                          d0=self.depths[0], d1=self.depths[-1],
+                          nd=len(self.depths), x0=self.distances[0],
+                          x1=self.distances[-1], nx=len(self.distances))
+
+    @classmethod
+    def build(cls, model="iasp91", depths=None, distances=None,
+              phase_list=("P", "S"), mode="first", branches=4,
+              processes=None):
+        """
+        Builds a table by calculating exact travel times at every grid node.
+
+        The source depths are distributed to a pool of processes, every one
+        evaluates all distances of a depth with
+        :meth:`~obspy.taup.tau.TauPyModel.get_travel_times_array`.
+
+        :param model: Name of the TauPy model.
+        :type model: str
+        :param depths: Source depths of the grid in km.
+        :param distances: Epicentral distances of the grid in degrees.
+        :param phase_list: Phases to tabulate, see
+            :meth:`~obspy.taup.tau.TauPyModel.get_travel_times`.
+        :param mode: ``"first"`` to store the first arrival of triplicated
+            phases only or ``"all"`` to store up to ``branches`` arrivals
+            per phase, sorted by time.
+        :type mode: str
+        :param branches: Maximum number of arrivals per phase and grid node
+            in ``"all"`` mode.
+        :type branches: int
+        :param processes: Number of processes, defaults to the number of
+            CPUs. ``1`` builds the table in the calling process.
+        :type processes: int
+        """
+        if mode == "first":
+            branches = 1
+        elif mode != "all":
+            msg = "Mode must be 'first' or 'all'."
+            raise ValueError(msg)
+        if depths is None:
+            depths = np.arange(0.0, 701.0, 10.0)
+        if distances is None:
+            distances = np.arange(0.0, 180.1, 1.0)
+        depths = np.asarray(depths, dtype=np.float64)
+        distances = np.asarray(distances, dtype=np.float64)
+        phases = sorted(parse_phase_list(phase_list))
+        tasks = [(model, depth, distances, phases, branches)
+                 for depth in depths]
+        if processes is None:
+            processes = multiprocessing.cpu_count()
+        if processes > 1 and len(depths) > 1:
+            pool = multiprocessing.Pool(processes)
+            try:
+                results = pool.map(_build_depth, tasks, chunksize=1)
+            finally:
+                pool.close()
+                pool.join()
+        else:
+            results = [_build_depth(task) for task in tasks]
+        times = np.ascontiguousarray(np.array(results).swapaxes(0, 1))
+        return cls(depths, distances, phases, times, model=model)
+
+    def save(self, filename):
+        """
+        Saves the table to an uncompressed NumPy ``.npz`` file, which can be
+        memory mapped by :meth:`load`.
+        """
+        np.savez(filename, depths=self.depths, distances=self.distances,
+                 phases=np.array(self.phases, dtype=np.unicode_),
+                 times=np.ascontiguousarray(self.times),
+                 model=np.array(str(self.model), dtype=np.unicode_))
+
+    @classmethod
+    def load(cls, filename, mmap=False):
+        """
+        Loads a table saved with :meth:`save`.
+
+        :param mmap: Memory map the travel times read-only instead of
+            reading them into memory.
+        :type mmap: bool
+        """
+        # XXX: Make this a with statement when old NumPy support is dropped.
+        npz = np.load(filename)
+        try:
+            depths = npz["depths"]
+            distances = npz["distances"]
+            phases = [native_str(x) for x in npz["phases"]]
+            model = native_str(npz["model"][()])
+            if mmap:
+                times = _memmap_npz_member(filename, "times")
+            else:
+                times = npz["times"]
+        finally:
+            if hasattr(npz, "close"):
+                npz.close()
+            else:
+                del npz
+        return cls(depths, distances, phases, times, model=model)
+
+    def get_travel_times(self, phase, depths, distances, method="bilinear"):
+        """
+        Interpolates the travel times of a phase.
+
+        :param phase: Phase name.
+        :type phase: str
+        :param depths: Source depths in km.
+        :type depths: float or :class:`numpy.ndarray`
+        :param distances: Epicentral distances in degrees, broadcast against
+            the depths.
+        :type distances: float or :class:`numpy.ndarray`
+        :param method: ``"bilinear"`` or ``"bicubic"``. Bicubic (Catmull-Rom)
+            interpolation requires evenly spaced grid axes.
+        :type method: str
+        :returns: Travel times in seconds, NaN outside of the grid or where
+            the phase does not exist. Tables with several branches get an
+            additional last axis with the arrivals sorted by time.
+        """
+        try:
+            index = self.phases.index(phase)
+        except ValueError:
+            msg = "Phase '%s' is not in the table." % phase
+            raise ValueError(msg)
+        depths, distances = np.broadcast_arrays(
+            np.asarray(depths, dtype=np.float64),
+            np.asarray(distances, dtype=np.float64))
+        shape = depths.shape
+        depths = depths.ravel()
+        distances = distances.ravel()
+        times = self.times[index]
+        i, wi = _locate(self.depths, depths)
+        j, wj = _locate(self.distances, distances)
+        if method == "bilinear":
+            wi = wi[:, np.newaxis]
+            wj = wj[:, np.newaxis]
+            result = (times[i, j] * (1 - wi) * (1 - wj) +
+                      times[i + 1, j] * wi * (1 - wj) +
+                      times[i, j + 1] * (1 - wi) * wj +
+                      times[i + 1, j + 1] * wi * wj)
+        elif method == "bicubic":
+            for name, axis in (("depths", self.depths),
+                               ("distances", self.distances)):
+                step = np.diff(axis)
+                if not np.allclose(step, step[0]):
+                    msg = "Bicubic interpolation requires evenly spaced " \
+                          "grid %s." % name
+                    raise ValueError(msg)
+            result = np.zeros((len(depths), times.shape[2]))
+            wi = _cubic_weights(wi)
+            wj = _cubic_weights(wj)
+            for k, weight_i in enumerate(wi):
+                ii = np.clip(i + k - 1, 0, len(self.depths) - 1)
+                for l_, weight_j in enumerate(wj):
+                    jj = np.clip(j + l_ - 1, 0, len(self.distances) - 1)
+                    result += times[ii, jj] * \
+                        (weight_i * weight_j)[:, np.newaxis]
+        else:
+            msg = "Method must be 'bilinear' or 'bicubic'."
+            raise ValueError(msg)
+        outside = (depths < self.depths[0]) | (depths > self.depths[-1]) | \
+            (distances < self.distances[0]) | \
+            (distances > self.distances[-1])
+        result[outside] = np.nan
+        if result.shape[1] == 1:
+            return result[:, 0].reshape(shape)
+        return result.reshape(shape + (result.shape[1],))
+
+    def error_report(self, npoints=200, method="bilinear", model=None,
+                     seed=None):
+        """
+        Compares interpolated first arrivals against exact travel times at
+        random positions within the grid.
+
+        :param npoints: Number of random positions.
+        :type npoints: int
+        :param method: Interpolation method, see :meth:`get_travel_times`.
+        :param model: Model for the exact travel times, defaults to the model
+            of the table.
+        :type model: :class:`~obspy.taup.tau.TauPyModel`
+        :param seed: Seed of the random positions.
+        :returns: Dictionary with the maximum and the root mean square
+            absolute error in seconds (``"max"``, ``"rms"``), the number of
+            compared positions (``"count"``) and the number of positions
+            where only one of both has an arrival (``"mismatch"``) per
+            phase.
+        :rtype: dict
+        """
+        if model is None:
+            model = _get_model(self.model)
+        rng = np.random.RandomState(seed)
+        depths = rng.uniform(self.depths[0], self.depths[-1], npoints)
+        distances = rng.uniform(self.distances[0], self.distances[-1],
+                                npoints)
+        exact = np.empty((len(self.phases), npoints))
+        exact.fill(np.nan)
+        for k, (depth, distance) in enumerate(zip(depths, distances)):
+            arrivals = model.get_travel_times_array(depth, [distance],
+                                                    self.phases)
+            # first arrival per phase, the arrivals are sorted by time
+            for arr in arrivals[::-1]:
+                exact[self.phases.index(arr["phase"]), k] = arr["time"]
+        report = {}
+        for i, phase in enumerate(self.phases):
+            times = self.get_travel_times(phase, depths, distances,
+                                          method=method)
+            if times.ndim == 2:
+                times = times[:, 0]
+            both = np.isfinite(times) & np.isfinite(exact[i])
+            error = np.abs(times[both] - exact[i][both])
+            report[phase] = {
+                "max": error.max() if len(error) else np.nan,
+                "rms": np.sqrt(np.mean(error ** 2)) if len(error) else np.nan,
+                "count": int(both.sum()),
+                "mismatch": int((np.isfinite(times) !=
+                                 np.isfinite(exact[i])).sum())}
+        return report
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod(exclude_empty=True)
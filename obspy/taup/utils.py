@@ -6,9 +6,14 @@ Misc functionality.
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 from future.builtins import *  # NOQA
+from future.utils import native_str
 
 import inspect
 import os
+import struct
+import zipfile
+
+import numpy as np
 
 
 ROOT = os.path.dirname(os.path.abspath(inspect.getfile(
@@ -61,3 +66,31 @@ def get_phase_names(phase_name):
         names.append(phase_name)
 
     return names
+
+
+def _memmap_npz_member(filename, name):
+    """
+    Memory maps an array stored uncompressed in a NumPy ``.npz`` file.
+    """
+    with zipfile.ZipFile(filename) as zf:
+        info = zf.getinfo(name + ".npy")
+    if info.compress_type != zipfile.ZIP_STORED:
+        msg = "Can only memory map uncompressed arrays."
+        raise ValueError(msg)
+    with open(filename, "rb") as fh:
+        # skip the local file header of the zip archive
+        fh.seek(info.header_offset)
+        header = fh.read(30)
+        name_length, extra_length = struct.unpack(native_str("<HH"),
+                                                  header[26:30])
+        fh.seek(info.header_offset + 30 + name_length + extra_length)
+        version = np.lib.format.read_magic(fh)
+        if version == (1, 0):
+            shape, fortran_order, dtype = \
+                np.lib.format.read_array_header_1_0(fh)
+        else:
+            shape, fortran_order, dtype = \
+                np.lib.format.read_array_header_2_0(fh)
+        offset = fh.tell()
+    return np.memmap(filename, dtype=dtype, mode="r", offset=offset,
+                     shape=shape, order="F" if fortran_order else "C")